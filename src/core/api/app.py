@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .rest_endpoints import router as rest_router
 from .websocket_endpoints import router as websocket_router
+from .websocket_server import get_websocket_server
 from .github_endpoints import router as github_router
 from .github_auth import router as github_auth_router
 
@@ -26,6 +27,11 @@ app.include_router(websocket_router, prefix="/api")
 app.include_router(github_router, prefix="/api")
 app.include_router(github_auth_router, prefix="/api")
 
+@app.on_event("startup")
+async def create_websocket_server():
+    """Create the WebSocket server with the application's model router."""
+    get_websocket_server()
+
 @app.get("/")
 async def root():
     """Root endpoint returning API information."""
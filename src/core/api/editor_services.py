@@ -306,6 +306,11 @@ async def manage_session(request: SessionRequest):
         logger.error(f"Error in manage_session: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/language-servers")
+async def language_server_status():
+    """Running language server processes with their workspace, load and memory."""
+    return {"servers": language_server_manager.server_stats()}
+
 @router.post("/analyze", response_model=AnalysisResponse)
 async def analyze_code(request: CodeRequest):
     """Perform AI-powered code analysis regardless of language."""
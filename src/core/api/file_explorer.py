@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, Path, UploadFile, File, Form, WebSocket, Body
+from fastapi import APIRouter, HTTPException, Depends, Query, Path, UploadFile, File, Form, WebSocket, Body, Request
 from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
-from typing import List, Optional, Dict, Any, Set, Union, Enum
+from typing import List, Optional, Dict, Any, Set, Union, Iterator
+from enum import Enum
 from datetime import datetime
 import os
 import mimetypes
@@ -9,7 +10,7 @@ import magic
 from pathlib import Path
 import shutil
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import itertools
 import re
 from pydantic import BaseModel, Field
 import logging
@@ -37,6 +38,7 @@ import cv2
 import numpy as np
 from ..security.auth import get_current_user
 from ..models.user import User
+from ..services.file_index import FileIndex, IndexedFile, required_literals
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -158,8 +160,9 @@ class FileSystemEvent(BaseModel):
     old_path: Optional[str] = None
 
 class FileWatcher(FileSystemEventHandler):
-    def __init__(self, base_path: Path):
+    def __init__(self, base_path: Path, index: Optional[FileIndex] = None):
         self.base_path = base_path
+        self.index = index
         self.observer = None
 
     def start(self):
@@ -174,22 +177,35 @@ class FileWatcher(FileSystemEventHandler):
 
     def on_created(self, event):
         if event.is_directory:
+            self._update_index('add_tree', event.src_path)
             self._notify_clients('created', event.src_path, True)
         else:
+            self._update_index('update', event.src_path)
             self._notify_clients('created', event.src_path, False, self._get_metadata(event.src_path))
 
     def on_modified(self, event):
         if not event.is_directory:
+            self._update_index('update', event.src_path)
             self._notify_clients('modified', event.src_path, False, self._get_metadata(event.src_path))
 
     def on_deleted(self, event):
+        self._update_index('remove', event.src_path)
         self._notify_clients('deleted', event.src_path, event.is_directory)
 
     def on_moved(self, event):
+        self._update_index('move', event.src_path, event.dest_path)
         self._notify_clients('moved', event.dest_path, event.is_directory, 
                            self._get_metadata(event.dest_path) if not event.is_directory else None,
                            event.src_path)
 
+    def _update_index(self, method: str, *paths: str):
+        if self.index is None:
+            return
+        try:
+            getattr(self.index, method)(*paths)
+        except Exception as e:
+            logger.error(f"Error updating search index for {paths[0]}: {str(e)}")
+
     def _get_metadata(self, path: str) -> Optional[Dict[str, Any]]:
         try:
             file_path = Path(path)
@@ -218,17 +234,43 @@ class FileWatcher(FileSystemEventHandler):
         except Exception as e:
             logger.error(f"Error notifying clients: {str(e)}")
 
-# Global file watcher instance
+# Global file watcher and search index instances
 file_watcher = None
+file_index = None
+index_build: Optional[asyncio.Future] = None
+
+def get_file_index() -> FileIndex:
+    """The search index of ALLOWED_BASE_PATH, the same one the file watcher keeps current."""
+    global file_index, file_watcher
+    base_path = os.getenv('ALLOWED_BASE_PATH', '/')
+    if file_index is None or file_index.root != os.path.abspath(base_path):
+        file_index = FileIndex(base_path)
+        if file_watcher is not None:
+            # The base path changed: watch and index the new one instead of the old
+            file_watcher.stop()
+            file_watcher = None
+            build_file_index(get_file_watcher().index)
+    return file_index
 
 def get_file_watcher() -> FileWatcher:
     global file_watcher
     if file_watcher is None:
-        base_path = Path(os.getenv('ALLOWED_BASE_PATH', '/'))
-        file_watcher = FileWatcher(base_path)
+        index = get_file_index()
+        file_watcher = FileWatcher(Path(index.root), index)
         file_watcher.start()
     return file_watcher
 
+def build_file_index(index: FileIndex) -> asyncio.Future:
+    """Build the index in the background, logging the error if the build fails."""
+    global index_build
+    index_build = asyncio.get_running_loop().run_in_executor(None, index.build)
+    index_build.add_done_callback(_log_index_build)
+    return index_build
+
+def _log_index_build(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Error building search index: {str(future.exception())}")
+
 @router.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: str):
     """WebSocket endpoint for real-time file system updates."""
@@ -257,8 +299,9 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
 
 @router.on_event("startup")
 async def startup_event():
-    """Initialize file watcher on application startup."""
-    get_file_watcher()
+    """Initialize file watcher and build the search index on application startup."""
+    # Watch first, so changes made while the index builds are not missed
+    build_file_index(get_file_watcher().index)
 
 @router.on_event("shutdown")
 async def shutdown_event():
@@ -312,6 +355,8 @@ class SearchQuery(BaseModel):
     content_type: Optional[str] = None
     language: Optional[str] = None
     hash: Optional[str] = None
+    max_results: int = Field(default=500, ge=1, le=10000, description="Files with matches to return before stopping")
+    max_matches_per_file: int = Field(default=100, ge=1, le=10000)
 
 class CompressionFormat(str, Enum):
     ZIP = "zip"
@@ -721,86 +766,180 @@ async def download_file(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Files searched per executor call between checks for a disconnected client
+SEARCH_BATCH_SIZE = 64
+
+def _passes_stat_filters(entry: IndexedFile, query: SearchQuery) -> bool:
+    """Filters answered from the index's stat data, before any file is read."""
+    if query.file_types and os.path.splitext(entry.path)[1].lower() not in query.file_types:
+        return False
+    if entry.size > MAX_FILE_SIZE:
+        return False
+    if query.min_size and entry.size < query.min_size:
+        return False
+    if query.max_size and entry.size > query.max_size:
+        return False
+    if query.modified_after and datetime.fromtimestamp(entry.mtime) < query.modified_after:
+        return False
+    if query.modified_before and datetime.fromtimestamp(entry.mtime) > query.modified_before:
+        return False
+    # Skip binary files unless specifically searching for them
+    return entry.is_text or bool(query.content_type)
+
+def _detect_encoding(file_path: Path) -> str:
+    """Encoding of a file that did not decode as UTF-8 when it was indexed."""
+    with open(file_path, 'rb') as f:
+        return chardet.detect(f.read(CHUNK_SIZE))['encoding'] or 'utf-8'
+
+def _search_metadata(entry: IndexedFile) -> Dict[str, Any]:
+    """Metadata of a matching file: stat data from its index entry and a hash of its content."""
+    mime_type = mimetypes.guess_type(entry.path)[0] or ('text/plain' if entry.is_text else 'application/octet-stream')
+    digest = hashlib.sha256()
+    with open(entry.path, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return {
+        'size': entry.size,
+        'modified_at': datetime.fromtimestamp(entry.mtime),
+        'mime_type': mime_type,
+        'language': MIME_TO_LANGUAGE.get(mime_type),
+        'is_binary': not entry.is_text,
+        'hash': digest.hexdigest()
+    }
+
+def _search_file(entry: IndexedFile, regex: re.Pattern, query: SearchQuery, base_path: Path) -> Optional[Dict[str, Any]]:
+    file_path = Path(entry.path)
+    try:
+        encoding = 'utf-8' if entry.utf8 else _detect_encoding(file_path)
+        with open(file_path, 'r', encoding=encoding, errors='replace') as f:
+            content = f.read()
+    except (OSError, LookupError) as e:
+        # Removed or unreadable since it was indexed, or an encoding Python does not know
+        logger.warning(f"Skipping {entry.path} in search: {str(e)}")
+        return None
+
+    matches = []
+    line, counted_to = 1, 0
+    for m in regex.finditer(content):
+        # Count newlines only since the previous match
+        line += content.count('\n', counted_to, m.start())
+        counted_to = m.start()
+        matches.append({
+            'line': line,
+            'position': m.start(),
+            'context': content[max(0, m.start()-50):min(len(content), m.end()+50)]
+        })
+        if len(matches) >= query.max_matches_per_file:
+            break
+    if not matches:
+        return None
+
+    # The content hash only for files that matched
+    try:
+        metadata = _search_metadata(entry)
+    except OSError as e:
+        logger.warning(f"Skipping {entry.path} in search: {str(e)}")
+        return None
+    if query.content_type and metadata['mime_type'] != query.content_type:
+        return None
+    if query.language and metadata['language'] != query.language:
+        return None
+    if query.hash and metadata['hash'] != query.hash:
+        return None
+    return {
+        'path': str(file_path.relative_to(base_path)),
+        'metadata': metadata,
+        'matches': matches
+    }
+
+def _search_batch(entries: List[IndexedFile], regex: re.Pattern, query: SearchQuery, base_path: Path) -> List[Dict[str, Any]]:
+    results = []
+    for entry in entries:
+        result = _search_file(entry, regex, query, base_path)
+        if result:
+            results.append(result)
+    return results
+
+def _search_candidates(index: FileIndex, query: SearchQuery) -> Iterator[IndexedFile]:
+    if index.ready:
+        candidates = index.candidates(required_literals(query.pattern, query.use_regex))
+        yield from sorted(candidates, key=lambda entry: entry.path)
+        return
+    # Until the index is built, walk the tree; the entries carry no trigrams
+    for dir_entry in index.walk():
+        try:
+            stat = dir_entry.stat(follow_symlinks=False)
+            with open(dir_entry.path, 'rb') as f:
+                is_text = b'\x00' not in f.read(8192)
+        except OSError:
+            continue
+        yield IndexedFile(dir_entry.path, stat.st_size, stat.st_mtime, stat.st_mtime_ns, is_text, True, False)
+
 @router.post("/search")
 async def search_files(
     query: SearchQuery,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
-    """Search files with various filters."""
+    """Search files with various filters, streaming results as they are found.
+
+    Results are sent as NDJSON, or as server-sent events when the client
+    accepts ``text/event-stream``, one object per matching file and a final
+    ``summary``. Candidates come from the trigram index; size, type and
+    modification time are checked from the index before a file is read.
+    The search stops at ``max_results`` files or when the client disconnects.
+    """
+    pattern = query.pattern if query.use_regex else re.escape(query.pattern)
+    flags = 0 if query.case_sensitive else re.IGNORECASE
     try:
-        results = []
-        base_path = Path(os.getenv('ALLOWED_BASE_PATH', '/'))
-        
-        def search_file(file_path: Path):
-            try:
-                if not file_path.is_file():
-                    return
-                    
-                # Apply filters
-                if query.file_types and file_path.suffix.lower() not in query.file_types:
-                    return
-                    
-                stat = file_path.stat()
-                if query.min_size and stat.st_size < query.min_size:
-                    return
-                if query.max_size and stat.st_size > query.max_size:
-                    return
-                    
-                if query.modified_after and datetime.fromtimestamp(stat.st_mtime) < query.modified_after:
-                    return
-                if query.modified_before and datetime.fromtimestamp(stat.st_mtime) > query.modified_before:
-                    return
-                    
-                metadata = get_file_metadata(file_path)
-                if query.content_type and metadata['mime_type'] != query.content_type:
-                    return
-                if query.language and metadata['language'] != query.language:
-                    return
-                if query.hash and metadata['hash'] != query.hash:
-                    return
-                    
-                # Skip binary files unless specifically searching for them
-                if not query.content_type and not metadata['mime_type'].startswith('text/'):
-                    return
-                    
-                # Read and search file content
-                encoding = detect_encoding(file_path)
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                    
-                pattern = query.pattern
-                if not query.use_regex:
-                    pattern = re.escape(pattern)
-                    
-                flags = 0 if query.case_sensitive else re.IGNORECASE
-                matches = list(re.finditer(pattern, content, flags))
-                
-                if matches:
-                    results.append({
-                        'path': str(file_path.relative_to(base_path)),
-                        'metadata': metadata,
-                        'matches': [
-                            {
-                                'line': content[:m.start()].count('\n') + 1,
-                                'position': m.start(),
-                                'context': content[max(0, m.start()-50):min(len(content), m.end()+50)]
-                            }
-                            for m in matches
-                        ]
-                    })
-            except Exception as e:
-                logger.error(f"Error searching {file_path}: {str(e)}")
-                
-        # Use ThreadPoolExecutor for parallel file searching
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for file_path in base_path.rglob('*'):
-                futures.append(executor.submit(search_file, file_path))
-                
-            # Wait for all searches to complete
-            for future in futures:
-                future.result()
-                
-        return results
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        regex = re.compile(pattern, flags)
+    except re.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid pattern: {str(e)}")
+
+    base_path = Path(os.getenv('ALLOWED_BASE_PATH', '/'))
+    index = get_file_index()
+    server_sent_events = 'text/event-stream' in request.headers.get('accept', '')
+
+    def encode(payload: Dict[str, Any], event: Optional[str] = None) -> str:
+        data = json.dumps(payload, default=str)
+        if server_sent_events:
+            return (f"event: {event}\n" if event else "") + f"data: {data}\n\n"
+        return data + "\n"
+
+    async def stream():
+        loop = asyncio.get_running_loop()
+        candidates = _search_candidates(index, query)
+        sent, scanned, truncated = 0, 0, False
+        try:
+            while not truncated:
+                batch = await loop.run_in_executor(
+                    None,
+                    lambda: list(itertools.islice(candidates, SEARCH_BATCH_SIZE * 4))
+                )
+                if not batch:
+                    break
+                batch = [entry for entry in batch if _passes_stat_filters(entry, query)]
+                for start in range(0, len(batch), SEARCH_BATCH_SIZE):
+                    if await request.is_disconnected():
+                        logger.info("Search client disconnected; stopping")
+                        return
+                    chunk = batch[start:start + SEARCH_BATCH_SIZE]
+                    scanned += len(chunk)
+                    for result in await loop.run_in_executor(None, _search_batch, chunk, regex, query, base_path):
+                        yield encode(result)
+                        sent += 1
+                        if sent >= query.max_results:
+                            truncated = True
+                            break
+                    if truncated:
+                        break
+            yield encode({'summary': {'results': sent, 'files_searched': scanned, 'truncated': truncated, 'indexed': index.ready}}, 'summary')
+        except Exception as e:
+            logger.error(f"Error in search: {str(e)}")
+            yield encode({'error': str(e)}, 'error')
+
+    return StreamingResponse(
+        stream(),
+        media_type='text/event-stream' if server_sent_events else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache'}
+    )
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
 from typing import Optional
-from ..api.websocket_server import websocket_server
+from ..api.websocket_server import get_websocket_server
 from ..auth import get_current_user
 from ..models.user import User
 
@@ -21,7 +21,7 @@ async def websocket_endpoint(
         await websocket.close(code=4001, reason="Authentication required")
         return
         
-    await websocket_server.handle_connection(websocket)
+    await get_websocket_server().handle_connection(websocket)
 
 @router.get("/ws/status")
 async def websocket_status(current_user: User = Depends(get_current_user)):
@@ -33,8 +33,9 @@ async def websocket_status(current_user: User = Depends(get_current_user)):
     Returns:
         Dict containing connection status
     """
+    manager = get_websocket_server().connection_manager
     return {
-        "connected": websocket_server.manager.is_watching(current_user.id),
-        "subscriptions": list(websocket_server.manager.user_subscriptions.get(current_user.id, [])),
-        "last_activity": websocket_server.manager.rate_limits.get(current_user.id, {}).get("last_reset")
+        "connected": current_user.id in manager.active_connections,
+        "subscriptions": list(manager.user_subscriptions.get(current_user.id, [])),
+        "last_activity": manager.rate_limits.get(current_user.id, {}).get("last_reset")
     } 
\ No newline at end of file
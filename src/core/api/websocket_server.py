@@ -1,7 +1,7 @@
 import asyncio
 import json
 import logging
-from typing import Dict, Set, Optional, List
+from typing import Dict, Set, Optional, List, AsyncIterator, TYPE_CHECKING
 from datetime import datetime, timedelta
 from fastapi import WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.security import OAuth2PasswordBearer
@@ -14,9 +14,20 @@ from ..models.websocket import (
     WebSocketMessageType,
     WebSocketSubscription,
     WebSocketError,
-    WebSocketConnectionInfo
+    WebSocketConnectionInfo,
+    WebSocketStreamRequest
 )
 
+if TYPE_CHECKING:
+    from ..providers.router import ModelRouter
+
+# Generation options a client may send with each kind of stream request
+STREAM_OPTIONS = {
+    "code_completion": {"context", "max_tokens", "temperature", "top_p", "stop_sequences"},
+    "plan": {"context", "max_tokens", "temperature", "top_p"},
+}
+MAX_STREAM_TOKENS = 4096
+
 class SecurityManager:
     """Manages WebSocket security features."""
     
@@ -258,10 +269,13 @@ class ConnectionManager:
 class WebSocketServer:
     """WebSocket server for real-time communication."""
     
-    def __init__(self):
+    def __init__(self, model_router: Optional['ModelRouter'] = None, stream_buffer_size: int = 256):
         self.connection_manager = ConnectionManager()
         self.logger = logging.getLogger(__name__)
         self._cleanup_task = None
+        self.model_router = model_router
+        self.stream_buffer_size = stream_buffer_size
+        self.active_streams: Dict[str, Dict[str, asyncio.Task]] = {}
         
     def _start_cleanup_task(self):
         """Start the cleanup task."""
@@ -332,6 +346,7 @@ class WebSocketServer:
                 await self.handle_message(user_id, message)
                 
         except WebSocketDisconnect:
+            self.cancel_streams(user_id)
             self.connection_manager.disconnect(user_id)
             
     async def handle_message(self, user_id: str, message: str):
@@ -361,6 +376,10 @@ class WebSocketServer:
                 await self.handle_subscription(user_id, msg)
             elif msg.type == WebSocketMessageType.UNSUBSCRIBE:
                 await self.handle_unsubscription(user_id, msg)
+            elif msg.type == WebSocketMessageType.STREAM_REQUEST:
+                await self.handle_stream_request(user_id, msg)
+            elif msg.type == WebSocketMessageType.STREAM_CANCEL:
+                self.cancel_streams(user_id, msg.data.get("stream_id"))
                 
         except json.JSONDecodeError:
             await self.send_error(user_id, "Invalid message format")
@@ -421,6 +440,154 @@ class WebSocketServer:
         except (ValueError, TypeError) as e:
             await self.send_error(user_id, f"Invalid unsubscription: {str(e)}")
             
+    async def handle_stream_request(self, user_id: str, message: WebSocketMessage):
+        """Handle a streamed completion request.
+        
+        Args:
+            user_id: ID of the user requesting the stream
+            message: Stream request message
+        """
+        try:
+            request = WebSocketStreamRequest(**message.data)
+        except (ValueError, TypeError) as e:
+            await self.send_stream_error(user_id, message.data.get("stream_id"), f"Invalid stream request: {str(e)}")
+            return
+            
+        if self.model_router is None:
+            await self.send_stream_error(user_id, request.stream_id, "Streaming is not available")
+            return
+            
+        allowed = STREAM_OPTIONS.get(request.kind)
+        if allowed is None:
+            await self.send_stream_error(user_id, request.stream_id, f"Unknown stream kind: {request.kind}")
+            return
+        unsupported = sorted(set(request.options) - allowed)
+        if unsupported:
+            await self.send_stream_error(user_id, request.stream_id, f"Unsupported stream options: {', '.join(unsupported)}")
+            return
+        options = dict(request.options)
+        if "max_tokens" in options:
+            max_tokens = options["max_tokens"]
+            if not isinstance(max_tokens, int) or isinstance(max_tokens, bool) or max_tokens < 1:
+                await self.send_stream_error(user_id, request.stream_id, "max_tokens must be a positive integer")
+                return
+            options["max_tokens"] = min(max_tokens, MAX_STREAM_TOKENS)
+            
+        if request.kind == "code_completion":
+            chunks = self.model_router.stream_code_completion(request.prompt, **options)
+        else:
+            chunks = self.model_router.stream_plan(request.prompt, **options)
+            
+        # A repeated stream ID supersedes the earlier stream
+        self.cancel_streams(user_id, request.stream_id)
+        
+        task = asyncio.create_task(self.forward_stream(user_id, request.stream_id, chunks))
+        streams = self.active_streams.setdefault(user_id, {})
+        streams[request.stream_id] = task
+        
+        def _forget(finished: asyncio.Task):
+            user_streams = self.active_streams.get(user_id, {})
+            if user_streams.get(request.stream_id) is finished:
+                del user_streams[request.stream_id]
+            if not user_streams:
+                self.active_streams.pop(user_id, None)
+                
+        task.add_done_callback(_forget)
+        
+    def cancel_streams(self, user_id: str, stream_id: Optional[str] = None):
+        """Cancel a user's active streams.
+        
+        Args:
+            user_id: ID of the user
+            stream_id: Stream to cancel, or all of the user's streams if None
+        """
+        streams = self.active_streams.get(user_id, {})
+        targets = [stream_id] if stream_id is not None else list(streams)
+        for target in targets:
+            task = streams.get(target)
+            if task and not task.done():
+                task.cancel()
+                
+    async def forward_stream(self, user_id: str, stream_id: str, chunks: AsyncIterator[str]) -> int:
+        """Forward a token stream to a user with backpressure.
+        
+        Chunks are read into a buffer of at most ``stream_buffer_size`` entries;
+        when the client falls behind the buffer fills and the provider stream
+        is paused. Chunks that arrive while a frame is being sent are coalesced
+        into the next frame.
+        
+        Args:
+            user_id: ID of the user to stream to
+            stream_id: ID correlating the stream messages
+            chunks: Async iterator of text chunks
+            
+        Returns:
+            Number of chunk frames sent
+        """
+        buffer: asyncio.Queue = asyncio.Queue(maxsize=self.stream_buffer_size)
+        failures: List[Exception] = []
+        
+        async def pump():
+            try:
+                async for chunk in chunks:
+                    await buffer.put(chunk)
+            except Exception as e:
+                failures.append(e)
+            await buffer.put(None)
+            
+        pump_task = asyncio.create_task(pump())
+        frames = 0
+        try:
+            await self.send_message(user_id, {
+                "type": WebSocketMessageType.STREAM_START.value,
+                "data": {"stream_id": stream_id}
+            })
+            
+            finished = False
+            while not finished:
+                parts = [await buffer.get()]
+                while not buffer.empty():
+                    parts.append(buffer.get_nowait())
+                if parts[-1] is None:
+                    finished = True
+                    parts.pop()
+                    
+                if user_id not in self.connection_manager.active_connections:
+                    self.logger.info(f"Stopping stream {stream_id}: user {user_id} disconnected")
+                    return frames
+                    
+                if parts:
+                    await self.send_message(user_id, {
+                        "type": WebSocketMessageType.STREAM_CHUNK.value,
+                        "data": {"stream_id": stream_id, "text": "".join(parts)}
+                    })
+                    frames += 1
+                    
+            if failures:
+                await self.send_stream_error(user_id, stream_id, str(failures[0]))
+            else:
+                await self.send_message(user_id, {
+                    "type": WebSocketMessageType.STREAM_END.value,
+                    "data": {"stream_id": stream_id, "frames": frames}
+                })
+            return frames
+            
+        finally:
+            pump_task.cancel()
+            
+    async def send_stream_error(self, user_id: str, stream_id: Optional[str], message: str):
+        """Send a stream error message to a user.
+        
+        Args:
+            user_id: ID of the user to send to
+            stream_id: ID of the failed stream
+            message: Error message
+        """
+        await self.send_message(user_id, {
+            "type": WebSocketMessageType.STREAM_ERROR.value,
+            "data": {"stream_id": stream_id, "message": message}
+        })
+        
     async def broadcast_event(self, event: Event):
         """Broadcast an event to subscribed users.
         
@@ -466,9 +633,26 @@ class WebSocketServer:
 # Create a global WebSocket server instance
 websocket_server = None
 
-def get_websocket_server() -> WebSocketServer:
-    """Get the global WebSocket server instance."""
+def _default_model_router() -> Optional['ModelRouter']:
+    """Build the application's model router over the standard provider registry."""
+    try:
+        from ..providers.registry import ProviderRegistry
+        from ..providers.router import ModelRouter
+        return ModelRouter(ProviderRegistry())
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Error creating model router for streaming: {str(e)}")
+        return None
+
+def get_websocket_server(model_router: Optional['ModelRouter'] = None) -> WebSocketServer:
+    """Get the WebSocket server instance, wired to a model router for streaming.
+    
+    Args:
+        model_router: Router to stream completions through; replaces the
+            current one when given, defaults to the application's router
+    """
     global websocket_server
     if websocket_server is None:
-        websocket_server = WebSocketServer()
-    return websocket_server 
\ No newline at end of file
+        websocket_server = WebSocketServer(model_router=model_router or _default_model_router())
+    elif model_router is not None:
+        websocket_server.model_router = model_router
+    return websocket_server
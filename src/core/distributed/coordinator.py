@@ -1,10 +1,12 @@
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
 import logging
 import asyncio
 import aiohttp
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from src.core.distributed.executor import NodeInfo, TaskInfo
+from src.core.distributed.scheduler import TaskScheduler, task_capabilities, task_digests
+from src.core.distributed.transport import PeerClient
 
 logger = logging.getLogger(__name__)
 
@@ -38,9 +40,16 @@ class Coordinator:
         self.task_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
         
         # Scheduling
+        self.scheduler = TaskScheduler()
+        self.schedule_batch_size = 1000
+        self.steal_min_backlog = 4
+        self._schedule_event = asyncio.Event()
         self.scheduling_task: Optional[asyncio.Task] = None
         self.health_check_task: Optional[asyncio.Task] = None
         
+        # Pooled keep-alive connections to worker nodes
+        self.client = PeerClient()
+        
         # HTTP server
         self.app = aiohttp.web.Application()
         self._setup_routes()
@@ -56,6 +65,8 @@ class Coordinator:
         # Task management routes
         self.app.router.add_post("/tasks/submit", self._handle_task_submit)
         self.app.router.add_post("/tasks/update", self._handle_task_update)
+        self.app.router.add_post("/tasks/status_batch", self._handle_task_status_batch)
+        self.app.router.add_post("/tasks/steal", self._handle_task_steal)
         self.app.router.add_get("/tasks/{task_id}", self._handle_task_status)
         
         # Node management routes
@@ -94,6 +105,9 @@ class Coordinator:
             if self.runner:
                 await self.runner.cleanup()
             
+            # Close pooled node connections
+            await self.client.close()
+            
             self.logger.info("Coordinator stopped")
             
         except Exception as e:
@@ -107,15 +121,17 @@ class Coordinator:
             node_id = data["node_id"]
             
             # Create node info
+            capabilities = data["capabilities"]
             node_info = NodeInfo(
                 id=node_id,
                 host=data["host"],
                 port=data["port"],
-                capabilities=data["capabilities"],
+                capabilities=capabilities,
                 load=0.0,
-                available_memory=0.0,
+                available_memory=capabilities.get("memory", 0.0) if isinstance(capabilities, dict) else 0.0,
                 status="registered",
-                last_heartbeat=datetime.now()
+                last_heartbeat=datetime.now(),
+                cached_digests=data.get("cached_digests", [])
             )
             
             # Register node
@@ -125,6 +141,8 @@ class Coordinator:
                 last_heartbeat=datetime.now(),
                 health_status="healthy"
             )
+            self.scheduler.remove_node(node_id)
+            self._sync_scheduler_node(node_id)
             
             self.logger.info(f"Node registered: {node_id}")
             return aiohttp.web.json_response({"status": "success"})
@@ -148,6 +166,7 @@ class Coordinator:
                 
                 # Remove node
                 del self.nodes[node_id]
+                self.scheduler.remove_node(node_id)
                 self.logger.info(f"Node deregistered: {node_id}")
                 
             return aiohttp.web.json_response({"status": "success"})
@@ -165,14 +184,7 @@ class Coordinator:
             data = await request.json()
             node_id = data["node_id"]
             
-            if node_id in self.nodes:
-                # Update node state
-                node_state = self.nodes[node_id]
-                node_state.info.load = data["load"]
-                node_state.info.available_memory = data["available_memory"]
-                node_state.info.status = data["status"]
-                node_state.last_heartbeat = datetime.now()
-                
+            if self._apply_heartbeat(node_id, data):
                 return aiohttp.web.json_response({"status": "success"})
             else:
                 return aiohttp.web.json_response(
@@ -204,12 +216,13 @@ class Coordinator:
                 started_at=None,
                 completed_at=None,
                 result=None,
-                error=None
+                error=None,
+                requirements=data.get("requirements", {})
             )
             
             # Add to task queue
-            await self.task_queue.put((-task.priority, task_id, task))
             self.tasks[task_id] = task
+            await self._enqueue_task(task)
             
             return aiohttp.web.json_response({"status": "success"})
             
@@ -224,18 +237,8 @@ class Coordinator:
         """Handle task status update"""
         try:
             data = await request.json()
-            task_id = data["task_id"]
             
-            if task_id in self.tasks:
-                # Update task info
-                task = self.tasks[task_id]
-                task.status = data["status"]
-                task.result = data.get("result")
-                task.error = data.get("error")
-                
-                if task.status in ["completed", "failed"]:
-                    task.completed_at = datetime.now()
-                
+            if self._apply_task_update(data):
                 return aiohttp.web.json_response({"status": "success"})
             else:
                 return aiohttp.web.json_response(
@@ -250,6 +253,60 @@ class Coordinator:
                 status=400
             )
     
+    async def _handle_task_status_batch(self, request: aiohttp.web.Request) -> aiohttp.web.Response:
+        """Handle a batch of task status updates from one node
+        
+        The batch may carry the node's heartbeat metrics, which saves the
+        node a separate heartbeat request while it is reporting updates.
+        """
+        try:
+            data = await request.json()
+            
+            results = []
+            for update in data.get("updates", []):
+                if self._apply_task_update(update):
+                    results.append({"task_id": update["task_id"], "status": "success"})
+                else:
+                    results.append({"task_id": update["task_id"], "error": "Task not found"})
+            
+            heartbeat = data.get("heartbeat")
+            if heartbeat and not self._apply_heartbeat(data["node_id"], heartbeat):
+                self.logger.warning(f"Heartbeat from unknown node: {data['node_id']}")
+            
+            return aiohttp.web.json_response({"status": "success", "results": results})
+            
+        except Exception as e:
+            self.logger.error(f"Task status batch failed: {str(e)}")
+            return aiohttp.web.json_response(
+                {"error": str(e)},
+                status=400
+            )
+    
+    async def _handle_task_steal(self, request: aiohttp.web.Request) -> aiohttp.web.Response:
+        """Handle an idle node asking for queued work from overloaded peers"""
+        try:
+            data = await request.json()
+            node_id = data["node_id"]
+            
+            if node_id not in self.nodes:
+                return aiohttp.web.json_response(
+                    {"error": "Node not found"},
+                    status=404
+                )
+            
+            stolen = await self._steal_tasks(node_id, data.get("max_tasks", 1))
+            return aiohttp.web.json_response({
+                "status": "success",
+                "tasks": [task.task_id for task in stolen]
+            })
+            
+        except Exception as e:
+            self.logger.error(f"Task steal failed: {str(e)}")
+            return aiohttp.web.json_response(
+                {"error": str(e)},
+                status=400
+            )
+    
     async def _handle_task_status(self, request: aiohttp.web.Request) -> aiohttp.web.Response:
         """Handle task status request"""
         try:
@@ -340,27 +397,34 @@ class Coordinator:
             )
     
     async def _schedule_tasks(self):
-        """Schedule tasks to available nodes"""
+        """Schedule queued tasks to available nodes in batches
+        
+        The loop sleeps until a task is submitted or a node frees capacity,
+        drains up to ``schedule_batch_size`` tasks from the queue and places
+        them through the capability-indexed scheduler. Tasks that cannot be
+        placed wait inside the scheduler instead of being requeued.
+        """
         while True:
             try:
-                # Get next task from queue
-                _, task_id, task = await self.task_queue.get()
+                await self._schedule_event.wait()
+                self._schedule_event.clear()
                 
-                # Find suitable node
-                node_id = await self._find_suitable_node(task)
-                if node_id:
-                    # Assign task to node
+                # Drain a batch of new tasks from the queue
+                tasks = []
+                while not self.task_queue.empty() and len(tasks) < self.schedule_batch_size:
+                    _, _, task = self.task_queue.get_nowait()
+                    if task.status == "pending" and task.node_id is None:
+                        tasks.append(task)
+                if not self.task_queue.empty():
+                    self._schedule_event.set()
+                
+                assignments = self.scheduler.schedule(tasks)
+                for task, node_id in assignments:
                     task.node_id = node_id
-                    self.nodes[node_id].tasks.add(task_id)
-                    
-                    # Notify node
-                    await self._notify_node(node_id, task)
-                    
-                else:
-                    # No suitable node found, requeue task
-                    await self.task_queue.put((-task.priority, task_id, task))
+                    self.nodes[node_id].tasks.add(task.task_id)
                 
-                await asyncio.sleep(0.1)  # Prevent CPU spinning
+                if assignments:
+                    await self._dispatch_assignments(assignments)
                 
             except asyncio.CancelledError:
                 break
@@ -378,6 +442,7 @@ class Coordinator:
                     if current_time - state.last_heartbeat > self.node_timeout:
                         self.logger.warning(f"Node {node_id} heartbeat timeout")
                         state.health_status = "unhealthy"
+                        self._sync_scheduler_node(node_id)
                         
                         # Reassign tasks if needed
                         await self._reassign_node_tasks(node_id)
@@ -389,56 +454,209 @@ class Coordinator:
             except Exception as e:
                 self.logger.error(f"Health check error: {str(e)}")
     
-    async def _find_suitable_node(self, task: TaskInfo) -> Optional[str]:
-        """Find a suitable node for a task"""
-        suitable_nodes = []
+    def _apply_heartbeat(self, node_id: str, data: Dict[str, Any]) -> bool:
+        """Record a node's reported metrics, returning False for unknown nodes"""
+        if node_id not in self.nodes:
+            return False
         
-        for node_id, state in self.nodes.items():
-            if state.health_status != "healthy":
-                continue
-                
-            # Check if node has required capabilities
-            if task.requirements and not all(
-                cap in state.info.capabilities
-                for cap in task.requirements.get("capabilities", [])
-            ):
-                continue
-            
-            # Check resource availability
-            if state.info.load >= state.info.capabilities.get("max_load", 10):
-                continue
-                
-            if state.info.available_memory < task.requirements.get("memory", 512):
-                continue
-            
-            suitable_nodes.append((node_id, state))
+        node_state = self.nodes[node_id]
+        node_state.info.load = data["load"]
+        node_state.info.available_memory = data["available_memory"]
+        node_state.info.status = data["status"]
+        node_state.info.queued = data.get("queued", 0)
+        if "cached_digests" in data:
+            node_state.info.cached_digests = data["cached_digests"]
+        node_state.last_heartbeat = datetime.now()
+        node_state.health_status = "healthy"
+        self._sync_scheduler_node(node_id)
+        return True
+    
+    def _apply_task_update(self, data: Dict[str, Any]) -> bool:
+        """Record a task status update, returning False for unknown tasks"""
+        task = self.tasks.get(data["task_id"])
+        if task is None:
+            return False
         
-        if not suitable_nodes:
-            return None
+        task.status = data["status"]
+        task.result = data.get("result")
+        task.error = data.get("error")
         
-        # Select node with lowest load
-        return min(suitable_nodes, key=lambda x: x[1].info.load)[0]
+        if task.status in ["completed", "failed", "stopped"]:
+            task.completed_at = datetime.now()
+            self._release_task(task)
+        return True
     
-    async def _notify_node(self, node_id: str, task: TaskInfo):
-        """Notify node about assigned task"""
+    def _node_features(self, info: NodeInfo) -> List[str]:
+        """Get the features a node advertises"""
+        if isinstance(info.capabilities, dict):
+            return info.capabilities.get("features", [])
+        return list(info.capabilities)
+    
+    def _node_max_load(self, info: NodeInfo) -> float:
+        """Get the maximum load a node accepts"""
+        if isinstance(info.capabilities, dict):
+            return info.capabilities.get("max_load", 10)
+        return 10
+    
+    def _sync_scheduler_node(self, node_id: str):
+        """Push a node's current state into the scheduler and wake it"""
+        state = self.nodes[node_id]
+        self.scheduler.update_node(
+            node_id,
+            features=self._node_features(state.info),
+            max_load=self._node_max_load(state.info),
+            load=state.info.load,
+            available_memory=state.info.available_memory,
+            healthy=state.health_status == "healthy",
+            digests=state.info.cached_digests
+        )
+        self._schedule_event.set()
+    
+    def _release_task(self, task: TaskInfo):
+        """Free the node capacity held by a task"""
+        if task.node_id is None:
+            return
+        state = self.nodes.get(task.node_id)
+        if state and task.task_id in state.tasks:
+            state.tasks.discard(task.task_id)
+            self.scheduler.release(task.node_id, task)
+            self._schedule_event.set()
+    
+    async def _enqueue_task(self, task: TaskInfo):
+        """Queue a task for scheduling and wake the scheduler"""
+        await self.task_queue.put((-task.priority, task.task_id, task))
+        self._schedule_event.set()
+    
+    async def _dispatch_assignments(self, assignments: List[Tuple[TaskInfo, str]]):
+        """Notify nodes about a batch of assignments, one request per node"""
+        by_node: Dict[str, List[TaskInfo]] = {}
+        for task, node_id in assignments:
+            by_node.setdefault(node_id, []).append(task)
+        
+        await asyncio.gather(*(
+            self._notify_node(node_id, tasks)
+            for node_id, tasks in by_node.items()
+        ))
+    
+    async def _notify_node(self, node_id: str, tasks: List[TaskInfo]):
+        """Notify node about its assigned tasks in a single batch"""
         try:
             state = self.nodes[node_id]
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"http://{state.info.host}:{state.info.port}/tasks/assign",
-                    json={
-                        "task_id": task.task_id,
-                        "script_id": task.script_id,
-                        "requirements": task.requirements
-                    }
-                ) as response:
-                    if response.status != 200:
-                        raise RuntimeError(f"Failed to notify node: {await response.text()}")
+            response = await self.client.post(
+                state.info.host,
+                state.info.port,
+                "/tasks/assign_batch",
+                {
+                    "tasks": [
+                        {
+                            "task_id": task.task_id,
+                            "script_id": task.script_id,
+                            "priority": task.priority,
+                            "requirements": task.requirements
+                        }
+                        for task in tasks
+                    ]
+                }
+            )
+            
+            # Requeue the individual tasks the node rejected
+            rejected = {
+                result["task_id"] for result in response.get("results", [])
+                if "error" in result
+            }
+            for task in tasks:
+                if task.task_id in rejected:
+                    self.logger.warning(f"Node {node_id} rejected task {task.task_id}")
+                    await self._requeue_assignment(task)
                         
         except Exception as e:
             self.logger.error(f"Node notification failed: {str(e)}")
-            # Requeue task
-            await self.task_queue.put((-task.priority, task.task_id, task))
+            
+            # Stop placing tasks on the node until it heartbeats again
+            if node_id in self.nodes:
+                self.nodes[node_id].health_status = "unhealthy"
+            for task in tasks:
+                await self._requeue_assignment(task)
+            if node_id in self.nodes:
+                self._sync_scheduler_node(node_id)
+    
+    async def _requeue_assignment(self, task: TaskInfo):
+        """Release a task that could not be delivered and queue it again"""
+        self._release_task(task)
+        task.node_id = None
+        await self._enqueue_task(task)
+    
+    async def _steal_tasks(self, thief_id: str, max_tasks: int) -> List[TaskInfo]:
+        """Move queued tasks from the most backlogged peers to an idle node
+        
+        Each victim is asked to give up at most half of its queue, and only
+        tasks the thief can run are requested. Tasks whose script or artifacts
+        the thief caches come first; others are only taken from victims with
+        at least ``steal_min_backlog`` queued tasks, where waiting would cost
+        more than fetching. Victims release tasks that have not started yet;
+        those are reserved on the thief and dispatched like any assignment.
+        """
+        thief = self.nodes.get(thief_id)
+        if thief is None or thief.health_status != "healthy":
+            return []
+        
+        features = set(self._node_features(thief.info))
+        cached = set(thief.info.cached_digests)
+        victims = sorted(
+            (
+                (node_id, state) for node_id, state in self.nodes.items()
+                if node_id != thief_id and state.info.queued > 0 and state.health_status == "healthy"
+            ),
+            key=lambda item: -item[1].info.queued
+        )
+        
+        stolen: List[TaskInfo] = []
+        for victim_id, victim in victims:
+            wanted = min(max_tasks - len(stolen), max(1, victim.info.queued // 2))
+            if wanted <= 0:
+                break
+            
+            runnable = [
+                self.tasks[task_id] for task_id in victim.tasks
+                if self.tasks[task_id].status == "pending"
+                and task_capabilities(self.tasks[task_id]) <= features
+            ]
+            candidates = [task.task_id for task in runnable if task_digests(task) & cached]
+            if victim.info.queued >= self.steal_min_backlog:
+                candidates += [task.task_id for task in runnable if not task_digests(task) & cached]
+            if not candidates:
+                continue
+            
+            try:
+                response = await self.client.post(
+                    victim.info.host,
+                    victim.info.port,
+                    "/tasks/release",
+                    {"task_ids": candidates, "max_tasks": wanted}
+                )
+            except Exception as e:
+                self.logger.warning(f"Failed to steal tasks from {victim_id}: {str(e)}")
+                continue
+            
+            released = response.get("released", [])
+            victim.info.queued = max(0, victim.info.queued - len(released))
+            for task_id in released:
+                task = self.tasks.get(task_id)
+                if task is None:
+                    continue
+                self._release_task(task)
+                if self.scheduler.reserve(thief_id, task):
+                    task.node_id = thief_id
+                    thief.tasks.add(task_id)
+                    stolen.append(task)
+                else:
+                    task.node_id = None
+                    await self._enqueue_task(task)
+        
+        if stolen:
+            self.logger.info(f"Node {thief_id} stole {len(stolen)} tasks")
+            await self._notify_node(thief_id, stolen)
+        return stolen
     
     async def _reassign_node_tasks(self, node_id: str):
         """Reassign tasks from a node"""
@@ -447,6 +665,7 @@ class Coordinator:
             
             for task_id in state.tasks:
                 task = self.tasks[task_id]
+                self.scheduler.release(node_id, task)
                 if task.status not in ["completed", "failed"]:
                     # Reset task state
                     task.node_id = None
@@ -454,7 +673,7 @@ class Coordinator:
                     task.started_at = None
                     
                     # Requeue task
-                    await self.task_queue.put((-task.priority, task_id, task))
+                    await self._enqueue_task(task)
             
             # Clear node tasks
             state.tasks.clear()
@@ -2,12 +2,14 @@ from typing import Dict, Any, List, Optional, Tuple
 import logging
 import asyncio
 import json
-import aiohttp
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
 from src.core.script.script_manager import ScriptManager, ScriptContext, ExecutionResult
 from src.core.monitoring.metrics import MetricsCollector
 from src.core.monitoring.analytics import AnalyticsEngine
+from src.core.distributed.transport import PeerClient, RequestBatcher
+from src.core.distributed.slots import ExecutionSlots, PROCESS_MODE, execution_mode, run_script_in_process
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +24,8 @@ class NodeInfo:
     available_memory: float
     status: str
     last_heartbeat: datetime
+    queued: int = 0
+    cached_digests: List[str] = field(default_factory=list)
 
 @dataclass
 class TaskInfo:
@@ -36,6 +40,7 @@ class TaskInfo:
     completed_at: Optional[datetime]
     result: Optional[Dict[str, Any]]
     error: Optional[str]
+    requirements: Dict[str, Any] = field(default_factory=dict)
 
 class DistributedExecutor:
     """Manages distributed script execution across multiple nodes"""
@@ -75,18 +80,23 @@ class DistributedExecutor:
         # Task tracking
         self.active_tasks: Dict[str, TaskInfo] = {}
         self.task_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.slots = ExecutionSlots.from_capabilities(capabilities)
         
-        # Connection management
-        self.session: Optional[aiohttp.ClientSession] = None
+        # Connection management; status updates are batched and carry heartbeats
+        self.client = PeerClient()
+        self.status_batcher = RequestBatcher(
+            self.client,
+            "/tasks/status_batch",
+            self._build_status_batch
+        )
+        self.heartbeat_interval = 5.0
+        self._last_report = 0.0
         self.heartbeat_task: Optional[asyncio.Task] = None
         self.task_processor_task: Optional[asyncio.Task] = None
     
     async def start(self):
         """Start the distributed executor"""
         try:
-            # Create HTTP session
-            self.session = aiohttp.ClientSession()
-            
             # Register with coordinator
             await self._register_with_coordinator()
             
@@ -109,14 +119,15 @@ class DistributedExecutor:
                 self.heartbeat_task.cancel()
             if self.task_processor_task:
                 self.task_processor_task.cancel()
+            await self.slots.shutdown()
             
-            # Close HTTP session
-            if self.session:
-                await self.session.close()
-            
-            # Deregister from coordinator
+            # Deliver pending status updates and deregister from coordinator
+            await self.status_batcher.flush()
             await self._deregister_from_coordinator()
             
+            # Close pooled connections
+            await self.client.close()
+            
             self.node_info.status = "stopped"
             self.logger.info("Distributed executor stopped successfully")
             
@@ -153,10 +164,12 @@ class DistributedExecutor:
                 started_at=None,
                 completed_at=None,
                 result=None,
-                error=None
+                error=None,
+                requirements=requirements or {}
             )
             
             # Add to task queue
+            self.active_tasks[task_id] = task
             await self.task_queue.put((-priority, task_id, task))
             
             # Submit to coordinator
@@ -197,21 +210,19 @@ class DistributedExecutor:
     async def _register_with_coordinator(self):
         """Register this node with the coordinator"""
         try:
-            async with self.session.post(
-                f"http://{self.coordinator_host}:{self.coordinator_port}/nodes/register",
-                json={
+            data = await self.client.post(
+                self.coordinator_host,
+                self.coordinator_port,
+                "/nodes/register",
+                {
                     "node_id": self.node_id,
                     "capabilities": self.capabilities,
                     "host": self.node_info.host,
                     "port": self.node_info.port
                 }
-            ) as response:
-                if response.status != 200:
-                    raise RuntimeError(f"Failed to register with coordinator: {await response.text()}")
-                    
-                data = await response.json()
-                self.node_info.host = data["host"]
-                self.node_info.port = data["port"]
+            )
+            self.node_info.host = data["host"]
+            self.node_info.port = data["port"]
                 
         except Exception as e:
             self.logger.error(f"Failed to register with coordinator: {str(e)}")
@@ -220,103 +231,144 @@ class DistributedExecutor:
     async def _deregister_from_coordinator(self):
         """Deregister this node from the coordinator"""
         try:
-            async with self.session.post(
-                f"http://{self.coordinator_host}:{self.coordinator_port}/nodes/deregister",
-                json={"node_id": self.node_id}
-            ) as response:
-                if response.status != 200:
-                    raise RuntimeError(f"Failed to deregister from coordinator: {await response.text()}")
+            await self.client.post(
+                self.coordinator_host,
+                self.coordinator_port,
+                "/nodes/deregister",
+                {"node_id": self.node_id}
+            )
                     
         except Exception as e:
             self.logger.error(f"Failed to deregister from coordinator: {str(e)}")
             raise
     
     async def _send_heartbeat(self):
-        """Send periodic heartbeat to coordinator"""
+        """Send periodic heartbeat to coordinator
+        
+        Skipped while status batches, which carry the same metrics, keep
+        reaching the coordinator within the heartbeat interval.
+        """
         while True:
             try:
-                # Update node info
-                self.node_info.load = len(self.active_tasks)
-                self.node_info.available_memory = self._get_available_memory()
-                self.node_info.last_heartbeat = datetime.now()
-                
-                # Send heartbeat
-                async with self.session.post(
-                    f"http://{self.coordinator_host}:{self.coordinator_port}/nodes/heartbeat",
-                    json={
-                        "node_id": self.node_id,
-                        "load": self.node_info.load,
-                        "available_memory": self.node_info.available_memory,
-                        "status": self.node_info.status
-                    }
-                ) as response:
-                    if response.status != 200:
-                        self.logger.warning(f"Heartbeat failed: {await response.text()}")
+                if time.monotonic() - self._last_report >= self.heartbeat_interval:
+                    payload = self._heartbeat_payload()
+                    payload["node_id"] = self.node_id
+                    await self.client.post(
+                        self.coordinator_host,
+                        self.coordinator_port,
+                        "/nodes/heartbeat",
+                        payload
+                    )
+                    self._last_report = time.monotonic()
                 
-                await asyncio.sleep(5)  # Send heartbeat every 5 seconds
+                await asyncio.sleep(self.heartbeat_interval)
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"Heartbeat error: {str(e)}")
-                await asyncio.sleep(5)
+                await asyncio.sleep(self.heartbeat_interval)
+    
+    def _heartbeat_payload(self) -> Dict[str, Any]:
+        """Refresh node metrics and return them for the coordinator"""
+        self.node_info.load = self.slots.load
+        self.node_info.available_memory = self._get_available_memory()
+        self.node_info.last_heartbeat = datetime.now()
+        return {
+            "load": self.node_info.load,
+            "available_memory": self.node_info.available_memory,
+            "status": self.node_info.status
+        }
+    
+    def _build_status_batch(self, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build a status batch request with the heartbeat piggybacked"""
+        self._last_report = time.monotonic()
+        return {
+            "node_id": self.node_id,
+            "heartbeat": self._heartbeat_payload(),
+            "updates": updates
+        }
+    
+    async def stop_task(self, task_id: str) -> bool:
+        """Cooperatively cancel a queued or running task
+        
+        Args:
+            task_id: ID of the task
+            
+        Returns:
+            True if the task was stopped
+        """
+        task = self.active_tasks.get(task_id)
+        running = self.slots.running.get(task_id)
+        if task is None or not self.slots.cancel(task_id):
+            return False
+        
+        await asyncio.gather(running, return_exceptions=True)
+        task.status = "stopped"
+        task.completed_at = datetime.now()
+        await self._update_task_status(task)
+        return True
     
     async def _process_tasks(self):
-        """Process tasks from the queue"""
+        """Start tasks from the queue in execution slots"""
         while True:
             try:
                 # Get next task
                 _, task_id, task = await self.task_queue.get()
-                
-                # Update task status
-                task.status = "running"
-                task.started_at = datetime.now()
                 self.active_tasks[task_id] = task
-                
-                try:
-                    # Execute script
-                    result = await self.script_manager.execute_script(task.script_id)
-                    
-                    # Update task with result
-                    task.status = "completed"
-                    task.completed_at = datetime.now()
-                    task.result = {
-                        "success": result.success,
-                        "output": result.output,
-                        "error": result.error,
-                        "execution_time": result.execution_time,
-                        "memory_usage": result.memory_usage
-                    }
-                    
-                except Exception as e:
-                    # Update task with error
-                    task.status = "failed"
-                    task.completed_at = datetime.now()
-                    task.error = str(e)
-                    
-                finally:
-                    # Notify coordinator
-                    await self._update_task_status(task)
+                self.slots.spawn(task_id, self._run_task(task))
                     
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"Task processing error: {str(e)}")
     
+    async def _run_task(self, task: TaskInfo):
+        """Execute a task once an execution slot is free"""
+        def mark_running():
+            task.status = "running"
+            task.started_at = datetime.now()
+        
+        try:
+            # CPU-bound scripts run in the process pool, the rest on the event loop
+            mode = execution_mode(task.requirements)
+            execute = run_script_in_process if mode == PROCESS_MODE else self.script_manager.execute_script
+            result = await self.slots.run(mode, execute, task.script_id, on_start=mark_running)
+            
+            # Update task with result
+            task.status = "completed"
+            task.completed_at = datetime.now()
+            task.result = {
+                "success": result.success,
+                "output": result.output,
+                "error": result.error,
+                "execution_time": result.execution_time,
+                "memory_usage": result.memory_usage
+            }
+            
+        except Exception as e:
+            # Update task with error
+            task.status = "failed"
+            task.completed_at = datetime.now()
+            task.error = str(e)
+        
+        # Notify coordinator
+        await self._update_task_status(task)
+    
     async def _submit_task_to_coordinator(self, task: TaskInfo, requirements: Optional[Dict[str, Any]]):
         """Submit task to coordinator for scheduling"""
         try:
-            async with self.session.post(
-                f"http://{self.coordinator_host}:{self.coordinator_port}/tasks/submit",
-                json={
+            await self.client.post(
+                self.coordinator_host,
+                self.coordinator_port,
+                "/tasks/submit",
+                {
                     "task_id": task.task_id,
                     "script_id": task.script_id,
                     "priority": task.priority,
                     "requirements": requirements or {}
                 }
-            ) as response:
-                if response.status != 200:
-                    raise RuntimeError(f"Failed to submit task to coordinator: {await response.text()}")
+            )
                     
         except Exception as e:
             self.logger.error(f"Failed to submit task to coordinator: {str(e)}")
@@ -325,17 +377,18 @@ class DistributedExecutor:
     async def _update_task_status(self, task: TaskInfo):
         """Update task status with coordinator"""
         try:
-            async with self.session.post(
-                f"http://{self.coordinator_host}:{self.coordinator_port}/tasks/update",
-                json={
+            result = await self.status_batcher.submit(
+                self.coordinator_host,
+                self.coordinator_port,
+                {
                     "task_id": task.task_id,
                     "status": task.status,
                     "result": task.result,
                     "error": task.error
                 }
-            ) as response:
-                if response.status != 200:
-                    self.logger.warning(f"Failed to update task status: {await response.text()}")
+            )
+            if "error" in result:
+                self.logger.warning(f"Failed to update task status: {result['error']}")
                     
         except Exception as e:
             self.logger.error(f"Failed to update task status: {str(e)}")
@@ -0,0 +1,349 @@
+from typing import Dict, Any, List, Optional, Set, Tuple, FrozenSet, Iterable, TYPE_CHECKING
+import heapq
+import itertools
+import logging
+from dataclasses import dataclass, field
+
+if TYPE_CHECKING:
+    from src.core.distributed.executor import TaskInfo
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TASK_MEMORY = 512
+DEFAULT_LOCALITY_SLACK = 2.0
+
+@dataclass
+class NodeSlot:
+    """Scheduler view of a worker node's capacity"""
+    node_id: str
+    features: FrozenSet[str]
+    max_load: float
+    load: float = 0.0
+    available_memory: float = 0.0
+    healthy: bool = True
+    # Tasks assigned since the last report, with the memory set aside for each
+    unreported: Dict[str, float] = field(default_factory=dict)
+    pools: List[FrozenSet[str]] = field(default_factory=list)
+    digests: FrozenSet[str] = frozenset()
+
+    @property
+    def assigned(self) -> int:
+        """Number of tasks assigned since the last report"""
+        return len(self.unreported)
+
+    @property
+    def effective_load(self) -> float:
+        """Reported load plus tasks assigned since the last report"""
+        return self.load + self.assigned
+
+    def has_capacity(self) -> bool:
+        """Check whether the node can accept another task"""
+        return self.healthy and self.effective_load < self.max_load
+
+@dataclass
+class _CapabilityPool:
+    """Nodes offering a capability set, keyed on load, plus tasks waiting for them"""
+    required: FrozenSet[str]
+    heap: List[Tuple[float, int, str]] = field(default_factory=list)
+    entries: Dict[str, int] = field(default_factory=dict)
+    waiting: List[Tuple[int, int, Any]] = field(default_factory=list)
+    members: int = 0
+
+def task_capabilities(task: 'TaskInfo') -> FrozenSet[str]:
+    """Capabilities a task requires"""
+    return frozenset((task.requirements or {}).get("capabilities", []))
+
+def task_memory(task: 'TaskInfo') -> float:
+    """Memory a task requires"""
+    return (task.requirements or {}).get("memory", DEFAULT_TASK_MEMORY)
+
+def task_digests(task: 'TaskInfo') -> FrozenSet[str]:
+    """Script and artifact digests a task reads"""
+    return frozenset([task.script_id, *(task.requirements or {}).get("artifacts", [])])
+
+class TaskScheduler:
+    """Batch task placement over capability-indexed node heaps.
+
+    Nodes are indexed per required capability set in a heap keyed on load, so
+    placing a task costs O(log n) instead of a scan over every node. Tasks
+    that cannot be placed are parked in a per-capability wait queue and are
+    only retried when a node offering that capability set frees capacity.
+    A task no node has the memory for is passed over for smaller ones.
+    
+    Placement is locality aware: a node that already caches the task's
+    script or artifacts is preferred over the least loaded node as long as
+    its load is within ``locality_slack`` of it.
+
+    A node's report already counts the tasks it has received, in its load
+    and in its free memory, so each report replaces the scheduler's view.
+    Only tasks assigned since then are added on top of it, and releasing
+    one of those gives its capacity back; a task the node has reported
+    frees its capacity through the node's next report.
+    """
+
+    def __init__(self, locality_slack: float = DEFAULT_LOCALITY_SLACK):
+        self.nodes: Dict[str, NodeSlot] = {}
+        self.locality_slack = locality_slack
+        self._pools: Dict[FrozenSet[str], _CapabilityPool] = {}
+        self._ready: Set[FrozenSet[str]] = set()
+        self._seq = itertools.count()
+        self._holders: Dict[str, Set[str]] = {}
+
+    def update_node(
+        self,
+        node_id: str,
+        features: Iterable[str],
+        max_load: float,
+        load: float,
+        available_memory: float,
+        healthy: bool = True,
+        digests: Optional[Iterable[str]] = None
+    ):
+        """Add or refresh a node's capacity from its report
+        
+        Args:
+            digests: Script and artifact digests the node caches, or None to
+                keep the previously advertised set
+        """
+        features = frozenset(features)
+        node = self.nodes.get(node_id)
+        if node is None:
+            node = NodeSlot(node_id=node_id, features=features, max_load=max_load)
+            self.nodes[node_id] = node
+            self._join_pools(node)
+        elif features != node.features:
+            self._leave_pools(node)
+            node.features = features
+            self._join_pools(node)
+
+        node.max_load = max_load
+        node.load = load
+        node.available_memory = available_memory
+        node.unreported.clear()
+        node.healthy = healthy
+        if digests is not None:
+            self._set_digests(node, frozenset(digests))
+        self._reindex(node)
+
+    def remove_node(self, node_id: str):
+        """Remove a node; stale heap entries are discarded lazily"""
+        node = self.nodes.pop(node_id, None)
+        if node is None:
+            return
+        self._leave_pools(node)
+        self._set_digests(node, frozenset())
+
+    def reserve(self, node_id: str, task: 'TaskInfo') -> bool:
+        """Place a specific task on a specific node, as when work is stolen
+        
+        Returns:
+            True if the node could take the task
+        """
+        node = self.nodes.get(node_id)
+        if (
+            node is None
+            or not node.has_capacity()
+            or not task_capabilities(task) <= node.features
+            or node.available_memory < task_memory(task)
+        ):
+            return False
+
+        self._assign(node, task, task_memory(task))
+        return True
+
+    def release(self, node_id: str, task: 'TaskInfo'):
+        """Return the capacity held by an assignment the node has not reported yet"""
+        node = self.nodes.get(node_id)
+        if node is None:
+            return
+        memory = node.unreported.pop(task.task_id, None)
+        if memory is None:
+            return
+        node.available_memory += memory
+        self._reindex(node)
+
+    def submit(self, tasks: Iterable['TaskInfo']):
+        """Queue tasks for placement in their capability pools"""
+        for task in tasks:
+            pool = self._get_pool(task_capabilities(task))
+            heapq.heappush(pool.waiting, (-task.priority, next(self._seq), task))
+            self._ready.add(pool.required)
+
+    def schedule(self, tasks: Iterable['TaskInfo'] = ()) -> List[Tuple['TaskInfo', str]]:
+        """Place queued tasks on nodes
+
+        Args:
+            tasks: Newly submitted tasks to queue before placing
+
+        Returns:
+            List of (task, node_id) assignments made in this pass
+        """
+        self.submit(tasks)
+
+        assignments: List[Tuple['TaskInfo', str]] = []
+        ready, self._ready = self._ready, set()
+        # Pools with the fewest nodes first, so tasks that only a few nodes can
+        # run are placed before broader pools fill those nodes
+        for key in sorted(ready, key=lambda key: (self._pools[key].members, sorted(key))):
+            pool = self._pools[key]
+            deferred = []
+            # Smallest memory need no node could fit; node memory only shrinks during a pass
+            unfit_memory = None
+            while pool.waiting:
+                entry = heapq.heappop(pool.waiting)
+                task = entry[2]
+                memory = task_memory(task)
+                if unfit_memory is None or memory < unfit_memory:
+                    node_id = self._place(pool, task)
+                    if node_id is not None:
+                        assignments.append((task, node_id))
+                        continue
+                    unfit_memory = memory
+                # Set aside so a task too large for every node does not hold up smaller ones
+                deferred.append(entry)
+                if not pool.heap:
+                    break
+            for entry in deferred:
+                heapq.heappush(pool.waiting, entry)
+
+        return assignments
+
+    def waiting_count(self) -> int:
+        """Number of tasks parked waiting for capacity"""
+        return sum(len(pool.waiting) for pool in self._pools.values())
+
+    def _place(self, pool: _CapabilityPool, task: 'TaskInfo') -> Optional[str]:
+        """Take the least loaded node in a pool that can fit a task"""
+        memory = task_memory(task)
+        skipped = []
+        chosen = None
+
+        while pool.heap:
+            load, seq, node_id = pool.heap[0]
+            if pool.entries.get(node_id) != seq:
+                heapq.heappop(pool.heap)  # Stale entry
+                continue
+
+            node = self.nodes[node_id]
+            if not node.has_capacity():
+                # Dropped until the node frees capacity and is reindexed
+                heapq.heappop(pool.heap)
+                del pool.entries[node_id]
+                continue
+
+            if node.available_memory < memory:
+                skipped.append(heapq.heappop(pool.heap))
+                continue
+
+            chosen = node
+            break
+
+        for entry in skipped:
+            heapq.heappush(pool.heap, entry)
+
+        local = self._local_node(pool, task, memory)
+        if local is not None and (
+            chosen is None
+            or local.effective_load <= chosen.effective_load + self.locality_slack
+        ):
+            chosen = local
+
+        if chosen is None:
+            return None
+
+        self._assign(chosen, task, memory)
+        return chosen.node_id
+
+    def _assign(self, node: NodeSlot, task: 'TaskInfo', memory: float):
+        """Hold a node's capacity for a task until the node reports it"""
+        node.unreported[task.task_id] = memory
+        node.available_memory -= memory
+        self._reindex(node, capacity_freed=False)
+
+    def _local_node(self, pool: _CapabilityPool, task: 'TaskInfo', memory: float) -> Optional[NodeSlot]:
+        """Pick the pool node caching most of a task's digests, least loaded first"""
+        matches: Dict[str, int] = {}
+        for digest in task_digests(task):
+            for node_id in self._holders.get(digest, ()):
+                if node_id in pool.entries:
+                    matches[node_id] = matches.get(node_id, 0) + 1
+
+        best = None
+        best_key = None
+        for node_id, count in matches.items():
+            node = self.nodes[node_id]
+            if not node.has_capacity() or node.available_memory < memory:
+                continue
+            key = (-count, node.effective_load, node_id)
+            if best_key is None or key < best_key:
+                best, best_key = node, key
+        return best
+
+    def _join_pools(self, node: NodeSlot):
+        """Add a node to every pool its features satisfy"""
+        node.pools = [key for key in self._pools if key <= node.features]
+        for key in node.pools:
+            self._pools[key].members += 1
+
+    def _leave_pools(self, node: NodeSlot):
+        """Take a node out of its pools; stale heap entries are discarded lazily"""
+        for key in node.pools:
+            pool = self._pools[key]
+            pool.entries.pop(node.node_id, None)
+            pool.members -= 1
+        node.pools = []
+
+    def _set_digests(self, node: NodeSlot, digests: FrozenSet[str]):
+        """Replace a node's advertised digests in the holder index"""
+        for digest in node.digests - digests:
+            holders = self._holders.get(digest)
+            if holders is not None:
+                holders.discard(node.node_id)
+                if not holders:
+                    del self._holders[digest]
+        for digest in digests - node.digests:
+            self._holders.setdefault(digest, set()).add(node.node_id)
+        node.digests = digests
+
+    def _reindex(self, node: NodeSlot, capacity_freed: bool = True):
+        """Push a node's current load into every pool it belongs to"""
+        for key in node.pools:
+            pool = self._pools[key]
+            if node.has_capacity():
+                seq = next(self._seq)
+                pool.entries[node.node_id] = seq
+                heapq.heappush(pool.heap, (node.effective_load, seq, node.node_id))
+                if capacity_freed and pool.waiting:
+                    self._ready.add(key)
+            else:
+                pool.entries.pop(node.node_id, None)
+
+            if len(pool.heap) > 4 * len(pool.entries) + 64:
+                self._compact(pool)
+
+    def _compact(self, pool: _CapabilityPool):
+        """Rebuild a pool heap without its stale entries"""
+        pool.heap = [
+            (self.nodes[node_id].effective_load, seq, node_id)
+            for node_id, seq in pool.entries.items()
+        ]
+        heapq.heapify(pool.heap)
+
+    def _get_pool(self, key: FrozenSet[str]) -> _CapabilityPool:
+        """Get or build the pool for a capability set"""
+        pool = self._pools.get(key)
+        if pool is not None:
+            return pool
+
+        pool = _CapabilityPool(required=key)
+        self._pools[key] = pool
+        for node in self.nodes.values():
+            if key <= node.features:
+                node.pools.append(key)
+                pool.members += 1
+                if node.has_capacity():
+                    seq = next(self._seq)
+                    pool.entries[node.node_id] = seq
+                    pool.heap.append((node.effective_load, seq, node.node_id))
+        heapq.heapify(pool.heap)
+        return pool
@@ -0,0 +1,162 @@
+from typing import Dict, Any, Optional, Callable, Awaitable, Union, List
+import os
+import asyncio
+import inspect
+import logging
+import concurrent.futures
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+ASYNC_MODE = "async"
+PROCESS_MODE = "process"
+
+DEFAULT_ASYNC_SLOTS = 10
+
+_process_script_manager = None
+
+def run_script_in_process(script_id: str, **kwargs) -> Any:
+    """Execute a script inside a process pool worker
+
+    Each worker process builds its own ScriptManager on first use, since the
+    parent's instance cannot be shared across processes.
+    """
+    global _process_script_manager
+    if _process_script_manager is None:
+        from src.core.script.script_manager import ScriptManager
+        _process_script_manager = ScriptManager()
+
+    result = _process_script_manager.execute_script(script_id, **kwargs)
+    if inspect.isawaitable(result):
+        result = asyncio.run(result)
+    return result
+
+def execution_mode(requirements: Optional[Dict[str, Any]]) -> str:
+    """Execution mode a task asks for; CPU-bound tasks request ``process``"""
+    mode = (requirements or {}).get("execution", ASYNC_MODE)
+    return PROCESS_MODE if mode == PROCESS_MODE else ASYNC_MODE
+
+class ExecutionSlots:
+    """Bounded concurrent execution for a node's tasks
+
+    I/O-bound tasks share the event loop under ``async_slots``; CPU-bound
+    tasks run in a process pool of ``process_slots`` workers. Every spawned
+    task counts towards ``load`` until it finishes, including tasks still
+    waiting for a slot, so the reported load matches the work the node holds.
+    """
+
+    def __init__(self, async_slots: int = DEFAULT_ASYNC_SLOTS, process_slots: Optional[int] = None):
+        self.async_slots = max(1, int(async_slots))
+        self.process_slots = max(1, int(process_slots or os.cpu_count() or 1))
+        self.running: Dict[str, asyncio.Task] = {}
+        self._async_semaphore = asyncio.Semaphore(self.async_slots)
+        self._process_semaphore = asyncio.Semaphore(self.process_slots)
+        self._process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_capabilities(cls, capabilities: Union[Dict[str, Any], List[str], None]) -> 'ExecutionSlots':
+        """Size slots from node capabilities
+
+        Dict capabilities may set ``async_slots`` and ``process_slots``
+        directly; otherwise async slots follow ``max_load`` and process slots
+        are capped by the CPU count.
+        """
+        if not isinstance(capabilities, dict):
+            return cls()
+
+        max_load = int(capabilities.get("max_load", DEFAULT_ASYNC_SLOTS))
+        return cls(
+            async_slots=capabilities.get("async_slots", max_load),
+            process_slots=capabilities.get("process_slots", min(max_load, os.cpu_count() or 1))
+        )
+
+    @property
+    def load(self) -> int:
+        """Number of tasks running or waiting for a slot"""
+        return len(self.running)
+
+    def spawn(self, task_id: str, coro: Awaitable) -> asyncio.Task:
+        """Run a task's coroutine in the background and track it until done"""
+        task = asyncio.create_task(coro)
+        self.running[task_id] = task
+        task.add_done_callback(lambda _: self._forget(task_id, task))
+        return task
+
+    def cancel(self, task_id: str) -> bool:
+        """Request cooperative cancellation of a task
+
+        Returns:
+            True if the task was running or waiting for a slot
+        """
+        task = self.running.get(task_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def run(
+        self,
+        mode: str,
+        func: Callable,
+        *args,
+        on_start: Optional[Callable[[], None]] = None,
+        **kwargs
+    ) -> Any:
+        """Run a callable once a slot of the given mode is free
+
+        Args:
+            mode: ASYNC_MODE for coroutine functions, PROCESS_MODE for picklable
+                functions run in the process pool
+            func: Callable to run
+            on_start: Called when the slot is acquired, before func starts
+        """
+        if mode == PROCESS_MODE:
+            return await self._run_in_process(partial(func, *args, **kwargs), on_start)
+
+        async with self._async_semaphore:
+            if on_start:
+                on_start()
+            return await func(*args, **kwargs)
+
+    async def shutdown(self):
+        """Cancel outstanding tasks and stop the process pool"""
+        for task in list(self.running.values()):
+            task.cancel()
+        if self.running:
+            await asyncio.gather(*self.running.values(), return_exceptions=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+    async def _run_in_process(self, call: Callable[[], Any], on_start: Optional[Callable[[], None]]) -> Any:
+        """Run a call in the process pool, holding a slot until the process finishes
+
+        A process that is already running cannot be interrupted, so on
+        cancellation the result is discarded but the slot is only returned
+        once the worker process is actually free.
+        """
+        await self._process_semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            if on_start:
+                on_start()
+            future = self._get_process_pool().submit(call)
+        except BaseException:
+            self._process_semaphore.release()
+            raise
+
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self._process_semaphore.release)
+        )
+        return await asyncio.wrap_future(future)
+
+    def _get_process_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        """Get the process pool, creating it on first use"""
+        if self._process_pool is None:
+            self._process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.process_slots)
+        return self._process_pool
+
+    def _forget(self, task_id: str, task: asyncio.Task):
+        """Stop tracking a finished task"""
+        if self.running.get(task_id) is task:
+            del self.running[task_id]
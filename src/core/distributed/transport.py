@@ -0,0 +1,145 @@
+from typing import Dict, Any, List, Optional, Tuple, Callable
+import logging
+import asyncio
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+Peer = Tuple[str, int]
+
+class PeerClient:
+    """Shared keep-alive HTTP client for coordinator and worker RPCs
+
+    A single session is reused for every request, so connections to each
+    peer are pooled and kept alive instead of paying a TCP handshake per call.
+    """
+
+    def __init__(
+        self,
+        limit_per_peer: int = 8,
+        keepalive_timeout: float = 60.0,
+        request_timeout: float = 30.0
+    ):
+        self.limit_per_peer = limit_per_peer
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=self.limit_per_peer,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+        return self._session
+
+    async def post(self, host: str, port: int, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST JSON to a peer and return the decoded response
+
+        Raises:
+            RuntimeError: If the peer responds with a non-200 status
+        """
+        async with self.session.post(f"http://{host}:{port}{path}", json=payload) as response:
+            if response.status != 200:
+                raise RuntimeError(f"Request to {host}:{port}{path} failed: {await response.text()}")
+            return await response.json()
+
+    async def close(self):
+        """Close the shared session and its pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+class RequestBatcher:
+    """Coalesces RPC items per peer into batched requests
+
+    Items submitted for the same peer within ``flush_interval`` (or until
+    ``max_batch`` items accumulate) are sent in one request built by
+    ``build_payload``. The peer must answer with a ``results`` list aligned
+    with the submitted items; each submitter receives its own entry.
+    """
+
+    def __init__(
+        self,
+        client: PeerClient,
+        path: str,
+        build_payload: Callable[[List[Dict[str, Any]]], Dict[str, Any]],
+        max_batch: int = 100,
+        flush_interval: float = 0.01
+    ):
+        self.client = client
+        self.path = path
+        self.build_payload = build_payload
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.batches_sent = 0
+        self._pending: Dict[Peer, List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        self._timers: Dict[Peer, asyncio.TimerHandle] = {}
+        self._in_flight: set = set()
+
+    async def submit(self, host: str, port: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue an item for a peer and wait for its result"""
+        loop = asyncio.get_running_loop()
+        peer = (host, port)
+        future = loop.create_future()
+        self._pending.setdefault(peer, []).append((item, future))
+
+        if len(self._pending[peer]) >= self.max_batch:
+            self._flush_peer(peer)
+        elif peer not in self._timers:
+            self._timers[peer] = loop.call_later(self.flush_interval, self._flush_peer, peer)
+
+        return await future
+
+    async def flush(self):
+        """Send all pending items and wait for outstanding batches"""
+        for peer in list(self._pending):
+            self._flush_peer(peer)
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    def _flush_peer(self, peer: Peer):
+        """Start sending the pending batch for a peer"""
+        timer = self._timers.pop(peer, None)
+        if timer is not None:
+            timer.cancel()
+
+        items = self._pending.pop(peer, [])
+        if not items:
+            return
+
+        task = asyncio.create_task(self._send(peer, items))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, peer: Peer, items: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        """Send one batch and fan the results back out"""
+        host, port = peer
+        try:
+            response = await self.client.post(
+                host, port, self.path, self.build_payload([item for item, _ in items])
+            )
+            self.batches_sent += 1
+            results = response.get("results", [])
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"Batch response from {host}:{port}{self.path} had "
+                    f"{len(results)} results for {len(items)} items"
+                )
+
+            for (_, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
+
+        except Exception as e:
+            logger.error(f"Batched request to {host}:{port}{self.path} failed: {str(e)}")
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
@@ -2,11 +2,15 @@ import asyncio
 import aiohttp
 import logging
 import psutil
+import time
 import uuid
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from src.core.script.script_manager import ScriptManager
 from src.core.distributed.executor import NodeInfo, TaskInfo
+from src.core.distributed.transport import PeerClient, RequestBatcher
+from src.core.distributed.slots import ExecutionSlots, PROCESS_MODE, execution_mode, run_script_in_process
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +43,25 @@ class WorkerNode:
         # Task management
         self.current_tasks: Dict[str, TaskInfo] = {}
         self.script_manager = ScriptManager()
+        self.slots = ExecutionSlots.from_capabilities(self.capabilities)
+        self._task_event = asyncio.Event()
+        
+        # Scripts and artifacts available locally, advertised for locality-aware placement
+        self.cached_digests: OrderedDict = OrderedDict()
+        self.max_cached_digests = 1000
+        
+        # Idle nodes ask the coordinator for queued work from busy peers
+        self.steal_interval = 1.0
+        
+        # Coordinator connection; status updates are batched and carry heartbeats
+        self.heartbeat_interval = 5.0
+        self.client = PeerClient()
+        self.status_batcher = RequestBatcher(
+            self.client,
+            "/tasks/status_batch",
+            self._build_status_batch
+        )
+        self._last_report = 0.0
         
         # HTTP server
         self.app = aiohttp.web.Application()
@@ -48,11 +71,14 @@ class WorkerNode:
         # Background tasks
         self.heartbeat_task: Optional[asyncio.Task] = None
         self.task_processor: Optional[asyncio.Task] = None
+        self.steal_task: Optional[asyncio.Task] = None
     
     def _setup_routes(self):
         """Set up HTTP routes"""
         self.app.router.add_post("/tasks/assign", self._handle_task_assignment)
+        self.app.router.add_post("/tasks/assign_batch", self._handle_task_assignment_batch)
         self.app.router.add_post("/tasks/stop", self._handle_task_stop)
+        self.app.router.add_post("/tasks/release", self._handle_task_release)
     
     async def start(self):
         """Start the worker node"""
@@ -66,6 +92,7 @@ class WorkerNode:
             # Start background tasks
             self.heartbeat_task = asyncio.create_task(self._send_heartbeat())
             self.task_processor = asyncio.create_task(self._process_tasks())
+            self.steal_task = asyncio.create_task(self._steal_work())
             
             # Register with coordinator
             await self._register_with_coordinator()
@@ -84,13 +111,18 @@ class WorkerNode:
                 self.heartbeat_task.cancel()
             if self.task_processor:
                 self.task_processor.cancel()
+            if self.steal_task:
+                self.steal_task.cancel()
+            await self.slots.shutdown()
             
             # Stop HTTP server
             if self.runner:
                 await self.runner.cleanup()
             
-            # Deregister from coordinator
+            # Deliver pending status updates and deregister from coordinator
+            await self.status_batcher.flush()
             await self._deregister_from_coordinator()
+            await self.client.close()
             
             self.logger.info("Worker node stopped")
             
@@ -101,18 +133,18 @@ class WorkerNode:
     async def _register_with_coordinator(self):
         """Register with the coordinator"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"http://{self.coordinator_host}:{self.coordinator_port}/nodes/register",
-                    json={
-                        "node_id": self.node_id,
-                        "host": self.host,
-                        "port": self.port,
-                        "capabilities": self.capabilities
-                    }
-                ) as response:
-                    if response.status != 200:
-                        raise RuntimeError(f"Failed to register with coordinator: {await response.text()}")
+            await self.client.post(
+                self.coordinator_host,
+                self.coordinator_port,
+                "/nodes/register",
+                {
+                    "node_id": self.node_id,
+                    "host": self.host,
+                    "port": self.port,
+                    "capabilities": self.capabilities,
+                    "cached_digests": list(self.cached_digests)
+                }
+            )
                     
         except Exception as e:
             self.logger.error(f"Registration failed: {str(e)}")
@@ -121,58 +153,108 @@ class WorkerNode:
     async def _deregister_from_coordinator(self):
         """Deregister from the coordinator"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"http://{self.coordinator_host}:{self.coordinator_port}/nodes/deregister",
-                    json={"node_id": self.node_id}
-                ) as response:
-                    if response.status != 200:
-                        self.logger.warning(f"Failed to deregister from coordinator: {await response.text()}")
+            await self.client.post(
+                self.coordinator_host,
+                self.coordinator_port,
+                "/nodes/deregister",
+                {"node_id": self.node_id}
+            )
                     
         except Exception as e:
             self.logger.error(f"Deregistration failed: {str(e)}")
     
     async def _send_heartbeat(self):
-        """Send heartbeat to coordinator"""
+        """Send heartbeat to coordinator
+        
+        Status batches already carry the node's metrics, so a standalone
+        heartbeat is only sent when no batch went out during the interval.
+        """
         while True:
             try:
-                # Get current metrics
-                load = psutil.getloadavg()[0]
-                memory = psutil.virtual_memory()
-                
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        f"http://{self.coordinator_host}:{self.coordinator_port}/nodes/heartbeat",
-                        json={
-                            "node_id": self.node_id,
-                            "load": load,
-                            "available_memory": memory.available,
-                            "status": "running"
-                        }
-                    ) as response:
-                        if response.status != 200:
-                            self.logger.warning(f"Heartbeat failed: {await response.text()}")
+                if time.monotonic() - self._last_report >= self.heartbeat_interval:
+                    payload = self._heartbeat_payload()
+                    payload["node_id"] = self.node_id
+                    await self.client.post(
+                        self.coordinator_host,
+                        self.coordinator_port,
+                        "/nodes/heartbeat",
+                        payload
+                    )
+                    self._last_report = time.monotonic()
                 
-                await asyncio.sleep(5)  # Send heartbeat every 5 seconds
+                await asyncio.sleep(self.heartbeat_interval)
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"Heartbeat error: {str(e)}")
-                await asyncio.sleep(5)  # Wait before retrying
+                await asyncio.sleep(self.heartbeat_interval)  # Wait before retrying
+    
+    def _heartbeat_payload(self) -> Dict[str, Any]:
+        """Current node metrics reported to the coordinator"""
+        return {
+            "load": self.slots.load,
+            "queued": self._queued_count(),
+            "cached_digests": list(self.cached_digests),
+            "available_memory": psutil.virtual_memory().available,
+            "status": "running"
+        }
+    
+    def _queued_count(self) -> int:
+        """Number of assigned tasks that have not started yet"""
+        return sum(1 for task in self.current_tasks.values() if task.status == "pending")
+    
+    def _record_digests(self, task: TaskInfo):
+        """Remember the script and artifacts a task brought onto this node"""
+        for digest in [task.script_id, *task.requirements.get("artifacts", [])]:
+            self.cached_digests[digest] = True
+            self.cached_digests.move_to_end(digest)
+        while len(self.cached_digests) > self.max_cached_digests:
+            self.cached_digests.popitem(last=False)
+    
+    async def _steal_work(self):
+        """Ask the coordinator for queued tasks from busy peers while idle"""
+        while True:
+            try:
+                await asyncio.sleep(self.steal_interval)
+                
+                free = self.slots.async_slots - self.slots.load
+                if free > 0 and self._queued_count() == 0:
+                    await self.client.post(
+                        self.coordinator_host,
+                        self.coordinator_port,
+                        "/tasks/steal",
+                        {"node_id": self.node_id, "max_tasks": free}
+                    )
+                
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Work stealing error: {str(e)}")
+    
+    def _build_status_batch(self, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build a status batch request with the heartbeat piggybacked"""
+        self._last_report = time.monotonic()
+        return {
+            "node_id": self.node_id,
+            "heartbeat": self._heartbeat_payload(),
+            "updates": updates
+        }
     
     async def _process_tasks(self):
-        """Process assigned tasks"""
+        """Start assigned tasks as they arrive
+        
+        Tasks are spawned into execution slots, so up to the configured
+        number of scripts run concurrently; the rest wait for a free slot.
+        """
         while True:
             try:
-                # Process each task
-                for task_id, task in list(self.current_tasks.items()):
-                    if task.status == "pending":
-                        await self._execute_task(task)
-                    elif task.status == "running":
-                        await self._check_task_status(task)
+                await self._task_event.wait()
+                self._task_event.clear()
                 
-                await asyncio.sleep(0.1)  # Check tasks every 0.1 seconds
+                for task_id, task in list(self.current_tasks.items()):
+                    if task.status == "pending" and task_id not in self.slots.running:
+                        self.slots.spawn(task_id, self._execute_task(task))
                 
             except asyncio.CancelledError:
                 break
@@ -180,15 +262,20 @@ class WorkerNode:
                 self.logger.error(f"Task processing error: {str(e)}")
     
     async def _execute_task(self, task: TaskInfo):
-        """Execute a task"""
-        try:
-            # Update task status
+        """Execute a task once an execution slot is free"""
+        def mark_running():
             task.status = "running"
             task.started_at = datetime.now()
-            
-            # Execute script
-            result = await self.script_manager.execute_script(
+        
+        try:
+            # CPU-bound scripts run in the process pool, the rest on the event loop
+            mode = execution_mode(task.requirements)
+            execute = run_script_in_process if mode == PROCESS_MODE else self.script_manager.execute_script
+            result = await self.slots.run(
+                mode,
+                execute,
                 task.script_id,
+                on_start=mark_running,
                 requirements=task.requirements
             )
             
@@ -196,6 +283,7 @@ class WorkerNode:
             task.status = "completed"
             task.completed_at = datetime.now()
             task.result = result
+            self._record_digests(task)
             
             # Notify coordinator
             await self._update_task_status(task)
@@ -210,41 +298,30 @@ class WorkerNode:
             await self._update_task_status(task)
             
             self.logger.error(f"Task execution failed: {str(e)}")
+        
+        # Reported, so only the coordinator keeps the finished task
+        self._forget_task(task)
     
-    async def _check_task_status(self, task: TaskInfo):
-        """Check status of a running task"""
-        try:
-            # Check if script is still running
-            if not await self.script_manager.is_script_running(task.script_id):
-                # Get final result
-                result = await self.script_manager.get_script_result(task.script_id)
-                
-                # Update task
-                task.status = "completed"
-                task.completed_at = datetime.now()
-                task.result = result
-                
-                # Notify coordinator
-                await self._update_task_status(task)
-                
-        except Exception as e:
-            self.logger.error(f"Task status check failed: {str(e)}")
+    def _forget_task(self, task: TaskInfo):
+        """Drop a task from the current tasks unless it was assigned again meanwhile"""
+        if self.current_tasks.get(task.task_id) is task:
+            del self.current_tasks[task.task_id]
     
     async def _update_task_status(self, task: TaskInfo):
         """Update task status with coordinator"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"http://{self.coordinator_host}:{self.coordinator_port}/tasks/update",
-                    json={
-                        "task_id": task.task_id,
-                        "status": task.status,
-                        "result": task.result,
-                        "error": task.error
-                    }
-                ) as response:
-                    if response.status != 200:
-                        raise RuntimeError(f"Failed to update task status: {await response.text()}")
+            result = await self.status_batcher.submit(
+                self.coordinator_host,
+                self.coordinator_port,
+                {
+                    "task_id": task.task_id,
+                    "status": task.status,
+                    "result": task.result,
+                    "error": task.error
+                }
+            )
+            if "error" in result:
+                raise RuntimeError(f"Failed to update task status: {result['error']}")
                     
         except Exception as e:
             self.logger.error(f"Task status update failed: {str(e)}")
@@ -253,30 +330,81 @@ class WorkerNode:
         """Handle task assignment"""
         try:
             data = await request.json()
-            task_id = data["task_id"]
+            self._accept_task(data)
+            
+            return aiohttp.web.json_response({"status": "success"})
             
-            # Create task info
-            task = TaskInfo(
-                task_id=task_id,
-                script_id=data["script_id"],
-                node_id=self.node_id,
-                status="pending",
-                priority=data.get("priority", 1),
-                created_at=datetime.now(),
-                started_at=None,
-                completed_at=None,
-                result=None,
-                error=None,
-                requirements=data.get("requirements", {})
+        except Exception as e:
+            self.logger.error(f"Task assignment failed: {str(e)}")
+            return aiohttp.web.json_response(
+                {"error": str(e)},
+                status=400
             )
+    
+    async def _handle_task_assignment_batch(self, request: aiohttp.web.Request) -> aiohttp.web.Response:
+        """Handle a batch of task assignments"""
+        try:
+            data = await request.json()
             
-            # Add to current tasks
-            self.current_tasks[task_id] = task
+            results = []
+            for assignment in data.get("tasks", []):
+                try:
+                    self._accept_task(assignment)
+                    results.append({"task_id": assignment["task_id"], "status": "success"})
+                except Exception as e:
+                    self.logger.error(f"Task assignment failed: {str(e)}")
+                    results.append({"task_id": assignment.get("task_id"), "error": str(e)})
             
-            return aiohttp.web.json_response({"status": "success"})
+            return aiohttp.web.json_response({"status": "success", "results": results})
             
         except Exception as e:
-            self.logger.error(f"Task assignment failed: {str(e)}")
+            self.logger.error(f"Task assignment batch failed: {str(e)}")
+            return aiohttp.web.json_response(
+                {"error": str(e)},
+                status=400
+            )
+    
+    def _accept_task(self, data: Dict[str, Any]):
+        """Add an assigned task to the current tasks"""
+        task_id = data["task_id"]
+        self.current_tasks[task_id] = TaskInfo(
+            task_id=task_id,
+            script_id=data["script_id"],
+            node_id=self.node_id,
+            status="pending",
+            priority=data.get("priority", 1),
+            created_at=datetime.now(),
+            started_at=None,
+            completed_at=None,
+            result=None,
+            error=None,
+            requirements=data.get("requirements", {})
+        )
+        self._task_event.set()
+    
+    async def _handle_task_release(self, request: aiohttp.web.Request) -> aiohttp.web.Response:
+        """Give up queued tasks that have not started so an idle peer can run them"""
+        try:
+            data = await request.json()
+            max_tasks = data.get("max_tasks", len(data["task_ids"]))
+            
+            released = []
+            for task_id in data["task_ids"]:
+                if len(released) >= max_tasks:
+                    break
+                task = self.current_tasks.get(task_id)
+                if task is None or task.status != "pending":
+                    continue
+                
+                # Not started yet, so cancelling only frees its place in the slot queue
+                self.slots.cancel(task_id)
+                del self.current_tasks[task_id]
+                released.append(task_id)
+            
+            return aiohttp.web.json_response({"status": "success", "released": released})
+            
+        except Exception as e:
+            self.logger.error(f"Task release failed: {str(e)}")
             return aiohttp.web.json_response(
                 {"error": str(e)},
                 status=400
@@ -291,7 +419,10 @@ class WorkerNode:
             if task_id in self.current_tasks:
                 task = self.current_tasks[task_id]
                 
-                # Stop script execution
+                # Cancel the task cooperatively, then stop the script itself
+                running = self.slots.running.get(task_id)
+                if self.slots.cancel(task_id):
+                    await asyncio.gather(running, return_exceptions=True)
                 await self.script_manager.stop_script(task.script_id)
                 
                 # Update task status
@@ -302,7 +433,7 @@ class WorkerNode:
                 await self._update_task_status(task)
                 
                 # Remove from current tasks
-                del self.current_tasks[task_id]
+                self._forget_task(task)
                 
                 return aiohttp.web.json_response({"status": "success"})
             else:
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable
+
+import docker
+
+logger = logging.getLogger(__name__)
+
+class AsyncDockerClient:
+    """Runs Docker SDK calls on worker threads so they don't block the event loop.
+
+    The SDK is synchronous: building an image, running an exec or reading a
+    one-shot stats sample blocks the calling thread for up to seconds. Calls
+    made through ``call`` run on a dedicated thread pool and are awaited.
+    """
+
+    def __init__(self, client: docker.DockerClient, max_workers: int = 64):
+        self.client = client
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="docker")
+
+    async def call(self, function: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking SDK call, e.g. ``await docker.call(container.exec_run, command)``."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+
+    async def get_container(self, container_id: str) -> Any:
+        return await self.call(self.client.containers.get, container_id)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+
+class StatsCollector:
+    """Latest resource stats of subscribed containers, from Docker's streaming stats.
+
+    ``subscribe`` opens a ``stats(stream=True)`` subscription for a container;
+    Docker pushes a sample about once a second, which a reader thread hands
+    to the event loop. Reading stats is then a dictionary lookup instead of a
+    one-shot ``stats(stream=False)`` call, which blocks for one to two seconds
+    while Docker takes two samples. The SDK's stream is a blocking socket read,
+    so each subscription holds one thread, idle between samples.
+    """
+
+    def __init__(self):
+        self.samples: Dict[str, Dict[str, Any]] = {}
+        # First sample of each subscription, the baseline for usage deltas
+        self.baselines: Dict[str, Dict[str, Any]] = {}
+        self._streams: Dict[str, threading.Event] = {}
+        self._arrivals: Dict[str, asyncio.Event] = {}
+
+    def subscribe(self, container: Any) -> None:
+        """Start streaming stats for a container; must be called from the event loop."""
+        if container.id in self._streams:
+            return
+        stop = threading.Event()
+        self._streams[container.id] = stop
+        self._arrivals[container.id] = asyncio.Event()
+        threading.Thread(
+            target=self._read,
+            args=(container, stop, asyncio.get_running_loop()),
+            name=f"stats-{container.id[:12]}",
+            daemon=True
+        ).start()
+
+    def unsubscribe(self, container_id: str) -> None:
+        """Stop streaming; the reader thread exits at the next sample or when the stream ends."""
+        stop = self._streams.pop(container_id, None)
+        if stop:
+            stop.set()
+        self.samples.pop(container_id, None)
+        self.baselines.pop(container_id, None)
+        self._arrivals.pop(container_id, None)
+
+    def latest(self, container_id: str) -> Optional[Dict[str, Any]]:
+        return self.samples.get(container_id)
+
+    async def wait_for_sample(self, container_id: str, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+        """Latest sample, waiting up to ``timeout`` for the first one."""
+        arrival = self._arrivals.get(container_id)
+        if arrival and not arrival.is_set():
+            try:
+                await asyncio.wait_for(arrival.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.latest(container_id)
+
+    def usage(self, container_id: str) -> Dict[str, int]:
+        """CPU time and network traffic since the subscription started, and current memory."""
+        latest = self.samples.get(container_id) or {}
+        baseline = self.baselines.get(container_id) or {}
+
+        def cpu(sample):
+            return sample.get("cpu_stats", {}).get("cpu_usage", {}).get("total_usage", 0)
+
+        def network(sample, field):
+            return sum(interface.get(field, 0) for interface in (sample.get("networks") or {}).values())
+
+        return {
+            "cpu_usage": cpu(latest) - cpu(baseline),
+            "memory_usage": latest.get("memory_stats", {}).get("usage", 0),
+            "network_rx": network(latest, "rx_bytes") - network(baseline, "rx_bytes"),
+            "network_tx": network(latest, "tx_bytes") - network(baseline, "tx_bytes")
+        }
+
+    def _read(self, container: Any, stop: threading.Event, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            for sample in container.stats(stream=True, decode=True):
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(self._store, container.id, stop, sample)
+        except Exception as e:
+            # Streams end with an error when the container is removed or the loop closes
+            if not stop.is_set():
+                logger.debug(f"Stats stream for {container.id} ended: {str(e)}")
+
+    def _store(self, container_id: str, stop: threading.Event, sample: Dict[str, Any]) -> None:
+        # Drop samples from a stream that was unsubscribed since
+        if self._streams.get(container_id) is not stop:
+            return
+        self.samples[container_id] = sample
+        self.baselines.setdefault(container_id, sample)
+        self._arrivals[container_id].set()
@@ -11,6 +11,7 @@ from concurrent.futures import ThreadPoolExecutor
 import psutil
 import signal
 import os
+import shutil
 import websockets
 from prometheus_client import Counter, Gauge, Histogram
 import threading
@@ -19,6 +20,8 @@ import select
 import networkx as nx
 from dataclasses import dataclass
 import yaml
+from .async_docker import AsyncDockerClient, StatsCollector
+from .container_pool import ContainerPool, Sandbox
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,8 +31,8 @@ logger = logging.getLogger(__name__)
 container_creation_counter = Counter('container_creation_total', 'Total number of containers created')
 container_execution_counter = Counter('container_execution_total', 'Total number of code executions')
 container_error_counter = Counter('container_error_total', 'Total number of container errors')
-container_memory_usage = Gauge('container_memory_usage_bytes', 'Container memory usage in bytes')
-container_cpu_usage = Gauge('container_cpu_usage_percent', 'Container CPU usage percentage')
+container_memory_usage = Gauge('container_memory_usage_bytes', 'Container memory usage in bytes', ['container_id'])
+container_cpu_usage = Gauge('container_cpu_usage_percent', 'Container CPU usage percentage', ['container_id'])
 container_execution_time = Histogram('container_execution_seconds', 'Container execution time in seconds')
 
 @dataclass
@@ -66,9 +69,11 @@ class ContainerNetwork:
         except nx.NetworkXUnfeasible:
             raise ValueError("Circular dependency detected")
 
-    async def create_network(self, client: docker.DockerClient):
+    async def create_network(self, client: AsyncDockerClient):
         """Create a Docker network for the containers."""
-        self.docker_network = client.networks.create(
+        self.docker = client
+        self.docker_network = await client.call(
+            client.client.networks.create,
             name=f"execution-network-{uuid.uuid4()}",
             driver="bridge"
         )
@@ -76,7 +81,7 @@ class ContainerNetwork:
     async def remove_network(self):
         """Remove the Docker network."""
         if self.docker_network:
-            self.docker_network.remove()
+            await self.docker.call(self.docker_network.remove)
 
 class ContainerConfig:
     """Configuration for container creation and execution."""
@@ -305,11 +310,22 @@ class InteractiveSession:
 class ContainerManager:
     """Manages container creation, execution, and cleanup."""
     
-    def __init__(self, base_path: str = "/tmp/containers"):
-        self.client = docker.from_env()
+    def __init__(
+        self,
+        base_path: str = "/tmp/containers",
+        client: Optional[docker.DockerClient] = None,
+        pool: Optional[ContainerPool] = None
+    ):
+        self.client = client or docker.from_env()
+        # Blocking SDK calls run on the adapter's threads, off the event loop
+        self.docker = pool.docker if pool else AsyncDockerClient(self.client)
+        self.stats = StatsCollector()
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self.pool = pool or ContainerPool(self.docker)
         self.executions: Dict[str, ExecutionResult] = {}
+        # Sandboxes holding code that has not finished running, by execution
+        self.sandboxes: Dict[str, Sandbox] = {}
         self.interactive_sessions: Dict[str, InteractiveSession] = {}
         self.cleanup_task = None
         self.monitoring_task = None
@@ -331,6 +347,7 @@ class ContainerManager:
         async def monitoring_loop():
             while True:
                 await self._monitor_containers()
+                await self.pool.maintain()
                 await asyncio.sleep(5)  # Check every 5 seconds
 
         self.monitoring_task = asyncio.create_task(monitoring_loop())
@@ -348,12 +365,18 @@ class ContainerManager:
     async def cleanup_execution(self, execution_id: str):
         """Clean up a specific execution and its dependencies."""
         try:
+            # A sandbox interrupted mid-run may still be executing code, so it is not reused
+            sandbox = self.sandboxes.pop(execution_id, None)
+            if sandbox:
+                self._stop_tracking(execution_id, sandbox)
+                await self.pool.release(sandbox, reusable=False)
+
             # Stop and remove all containers in the network
             for container_name in self.network.containers:
                 try:
-                    container = self.client.containers.get(container_name)
-                    container.stop()
-                    container.remove()
+                    container = await self.docker.get_container(container_name)
+                    await self.docker.call(container.stop)
+                    await self.docker.call(container.remove)
                 except docker.errors.NotFound:
                     pass
                 except Exception as e:
@@ -374,480 +397,6 @@ class ContainerManager:
             logger.error(f"Error cleaning up execution {execution_id}: {str(e)}")
             raise
 
-    def _get_language_template(self, language: str) -> str:
-        """Get language-specific Dockerfile template."""
-        templates = {
-            "python": """
-FROM python:3.9-slim
-WORKDIR /app
-RUN apt-get update && apt-get install -y \
-    build-essential \
-    && rm -rf /var/lib/apt/lists/*
-COPY requirements.txt .
-RUN pip install --no-cache-dir -r requirements.txt
-COPY . .
-USER nobody
-CMD ["python", "main.py"]
-""",
-            "javascript": """
-FROM node:16-slim
-WORKDIR /app
-COPY package*.json ./
-RUN npm install
-COPY . .
-USER node
-CMD ["node", "index.js"]
-""",
-            "java": """
-FROM openjdk:11-slim
-WORKDIR /app
-COPY pom.xml .
-RUN apt-get update && apt-get install -y maven \
-    && rm -rf /var/lib/apt/lists/*
-COPY src ./src
-RUN mvn package -DskipTests
-USER nobody
-CMD ["java", "-jar", "target/app.jar"]
-""",
-            "go": """
-FROM golang:1.16-alpine
-WORKDIR /app
-COPY go.mod go.sum ./
-RUN go mod download
-COPY . .
-RUN go build -o main .
-USER nobody
-CMD ["./main"]
-""",
-            "ruby": """
-FROM ruby:2.7-slim
-WORKDIR /app
-COPY Gemfile* ./
-RUN bundle install
-COPY . .
-USER nobody
-CMD ["ruby", "main.rb"]
-""",
-            "rust": """
-FROM rust:1.54-slim
-WORKDIR /app
-COPY Cargo.toml Cargo.lock ./
-RUN cargo build --release
-COPY src ./src
-USER nobody
-CMD ["./target/release/app"]
-""",
-            "csharp": """
-FROM mcr.microsoft.com/dotnet/sdk:5.0 AS build
-WORKDIR /app
-COPY *.csproj ./
-RUN dotnet restore
-COPY . .
-RUN dotnet publish -c Release -o out
-FROM mcr.microsoft.com/dotnet/runtime:5.0
-WORKDIR /app
-COPY --from=build /app/out ./
-USER nobody
-CMD ["dotnet", "app.dll"]
-""",
-            "php": """
-FROM php:7.4-cli
-WORKDIR /app
-COPY composer.json composer.lock ./
-RUN curl -sS https://getcomposer.org/installer | php -- --install-dir=/usr/local/bin --filename=composer \
-    && composer install --no-dev --no-scripts
-COPY . .
-USER nobody
-CMD ["php", "main.php"]
-""",
-            "swift": """
-FROM swift:5.5
-WORKDIR /app
-COPY Package.swift ./
-RUN swift package resolve
-COPY Sources ./Sources
-USER nobody
-CMD ["swift", "run"]
-""",
-            "kotlin": """
-FROM openjdk:11-slim
-WORKDIR /app
-COPY build.gradle.kts settings.gradle.kts ./
-RUN apt-get update && apt-get install -y gradle \
-    && rm -rf /var/lib/apt/lists/*
-COPY src ./src
-RUN gradle build --no-daemon
-USER nobody
-CMD ["java", "-jar", "build/libs/app.jar"]
-""",
-            "scala": """
-FROM openjdk:11-slim
-WORKDIR /app
-COPY build.sbt project/ ./
-RUN apt-get update && apt-get install -y sbt \
-    && rm -rf /var/lib/apt/lists/*
-COPY src ./src
-RUN sbt assembly
-USER nobody
-CMD ["java", "-jar", "target/scala-2.13/app-assembly-0.1.0.jar"]
-""",
-            "haskell": """
-FROM haskell:8
-WORKDIR /app
-COPY *.cabal ./
-RUN cabal update
-COPY . .
-RUN cabal build
-USER nobody
-CMD ["./dist/build/app/app"]
-""",
-            "lua": """
-FROM lua:5.4
-WORKDIR /app
-COPY rockspec ./
-RUN luarocks install --local --server https://luarocks.org/dev app-0.1.0-1.rockspec
-COPY . .
-USER nobody
-CMD ["lua", "main.lua"]
-""",
-            "perl": """
-FROM perl:5.32
-WORKDIR /app
-COPY cpanfile ./
-RUN cpanm --installdeps .
-COPY . .
-USER nobody
-CMD ["perl", "main.pl"]
-""",
-            "shell": """
-FROM ubuntu:20.04
-WORKDIR /app
-RUN apt-get update && apt-get install -y \
-    build-essential \
-    && rm -rf /var/lib/apt/lists/*
-COPY . .
-USER nobody
-CMD ["bash", "main.sh"]
-""",
-            "typescript": """
-FROM node:16-slim
-WORKDIR /app
-COPY package*.json ./
-RUN npm install
-COPY tsconfig.json ./
-COPY src ./src
-RUN npm run build
-USER node
-CMD ["node", "dist/main.js"]
-""",
-            "dart": """
-FROM dart:2.19
-WORKDIR /app
-COPY pubspec.yaml ./
-RUN dart pub get
-COPY . .
-USER nobody
-CMD ["dart", "bin/main.dart"]
-""",
-            "julia": """
-FROM julia:1.8
-WORKDIR /app
-COPY Project.toml ./
-RUN julia -e 'using Pkg; Pkg.instantiate()'
-COPY . .
-USER nobody
-CMD ["julia", "src/main.jl"]
-""",
-            "r": """
-FROM r-base:latest
-WORKDIR /app
-COPY install.R ./
-RUN Rscript install.R
-COPY . .
-USER nobody
-CMD ["Rscript", "main.R"]
-""",
-            "matlab": """
-FROM mathworks/matlab:r2021b
-WORKDIR /app
-COPY . .
-USER nobody
-CMD ["matlab", "-batch", "main"]
-""",
-            "fortran": """
-FROM gcc:latest
-WORKDIR /app
-COPY . .
-RUN gfortran -o main main.f90
-USER nobody
-CMD ["./main"]
-""",
-            "cobol": """
-FROM opencobol/gnucobol:latest
-WORKDIR /app
-COPY . .
-RUN cobc -x main.cbl
-USER nobody
-CMD ["./main"]
-""",
-            "pascal": """
-FROM fpc/compiler:latest
-WORKDIR /app
-COPY . .
-RUN fpc main.pas
-USER nobody
-CMD ["./main"]
-""",
-            "ada": """
-FROM gnat:latest
-WORKDIR /app
-COPY . .
-RUN gnatmake main.adb
-USER nobody
-CMD ["./main"]
-""",
-            "prolog": """
-FROM swipl:latest
-WORKDIR /app
-COPY . .
-USER nobody
-CMD ["swipl", "main.pl"]
-""",
-            "erlang": """
-FROM erlang:latest
-WORKDIR /app
-COPY rebar.config ./
-RUN rebar3 get-deps
-COPY . .
-RUN rebar3 compile
-USER nobody
-CMD ["erl", "-noshell", "-s", "main", "start"]
-""",
-            "elixir": """
-FROM elixir:latest
-WORKDIR /app
-COPY mix.exs mix.lock ./
-RUN mix deps.get
-COPY . .
-RUN mix compile
-USER nobody
-CMD ["mix", "run"]
-""",
-            "clojure": """
-FROM clojure:latest
-WORKDIR /app
-COPY project.clj ./
-RUN lein deps
-COPY . .
-RUN lein uberjar
-USER nobody
-CMD ["java", "-jar", "target/uberjar/app.jar"]
-""",
-            "fsharp": """
-FROM mcr.microsoft.com/dotnet/sdk:5.0 AS build
-WORKDIR /app
-COPY *.fsproj ./
-RUN dotnet restore
-COPY . .
-RUN dotnet publish -c Release -o out
-FROM mcr.microsoft.com/dotnet/runtime:5.0
-WORKDIR /app
-COPY --from=build /app/out ./
-USER nobody
-CMD ["dotnet", "app.dll"]
-""",
-            "ocaml": """
-FROM ocaml/opam:latest
-WORKDIR /app
-COPY *.opam ./
-RUN opam install . --deps-only
-COPY . .
-RUN opam exec -- dune build
-USER nobody
-CMD ["./_build/default/bin/main.exe"]
-""",
-            "racket": """
-FROM racket/racket:latest
-WORKDIR /app
-COPY info.rkt ./
-RUN raco pkg install --deps search-auto
-COPY . .
-USER nobody
-CMD ["racket", "main.rkt"]
-""",
-            "smalltalk": """
-FROM pharo/smalltalk:latest
-WORKDIR /app
-COPY . .
-USER nobody
-CMD ["pharo", "main.st"]
-""",
-            "lisp": """
-FROM sbcl:latest
-WORKDIR /app
-COPY . .
-RUN sbcl --load main.lisp --eval "(sb-ext:save-lisp-and-die \"main\" :executable t)"
-USER nobody
-CMD ["./main"]
-""",
-            "scheme": """
-FROM guile:latest
-WORKDIR /app
-COPY . .
-USER nobody
-CMD ["guile", "main.scm"]
-""",
-            "haxe": """
-FROM haxe:latest
-WORKDIR /app
-COPY . .
-RUN haxe --main Main --interp
-USER nobody
-CMD ["haxe", "--main", "Main", "--interp"]
-""",
-            "nim": """
-FROM nimlang/nim:latest
-WORKDIR /app
-COPY . .
-RUN nim c main.nim
-USER nobody
-CMD ["./main"]
-""",
-            "crystal": """
-FROM crystallang/crystal:latest
-WORKDIR /app
-COPY shard.yml ./
-RUN shards install
-COPY . .
-RUN crystal build main.cr
-USER nobody
-CMD ["./main"]
-""",
-            "v": """
-FROM vlang/v:latest
-WORKDIR /app
-COPY . .
-RUN v main.v
-USER nobody
-CMD ["./main"]
-""",
-            "zig": """
-FROM zig:latest
-WORKDIR /app
-COPY . .
-RUN zig build-exe main.zig
-USER nobody
-CMD ["./main"]
-""",
-            "odin": """
-FROM odin:latest
-WORKDIR /app
-COPY . .
-RUN odin build main.odin
-USER nobody
-CMD ["./main"]
-""",
-            "cuda": """
-FROM nvidia/cuda:11.8.0-cudnn8-devel-ubuntu20.04
-WORKDIR /app
-RUN apt-get update && apt-get install -y \
-    build-essential \
-    && rm -rf /var/lib/apt/lists/*
-COPY . .
-RUN nvcc -o main main.cu
-USER nobody
-CMD ["./main"]
-""",
-            "opencl": """
-FROM opencl:latest
-WORKDIR /app
-RUN apt-get update && apt-get install -y \
-    build-essential \
-    opencl-headers \
-    ocl-icd-opencl-dev \
-    && rm -rf /var/lib/apt/lists/*
-COPY . .
-RUN gcc -o main main.c -lOpenCL
-USER nobody
-CMD ["./main"]
-""",
-            "webassembly": """
-FROM emscripten/emsdk:latest
-WORKDIR /app
-COPY . .
-RUN emcc main.c -o main.js
-USER nobody
-CMD ["node", "main.js"]
-""",
-            "solidity": """
-FROM ethereum/solc:latest
-WORKDIR /app
-COPY . .
-RUN solc --bin main.sol
-USER nobody
-CMD ["solc", "--bin", "main.sol"]
-""",
-            "move": """
-FROM move-language/move-cli:latest
-WORKDIR /app
-COPY . .
-RUN move build
-USER nobody
-CMD ["move", "run"]
-""",
-            "vyper": """
-FROM vyperlang/vyper:latest
-WORKDIR /app
-COPY . .
-RUN vyper main.vy
-USER nobody
-CMD ["vyper", "main.vy"]
-""",
-            "teal": """
-FROM algorand/teal:latest
-WORKDIR /app
-COPY . .
-RUN teal main.teal
-USER nobody
-CMD ["teal", "main.teal"]
-"""
-        }
-        return templates.get(language.lower(), templates["python"])
-
-    def _create_dockerfile(self, execution_id: str, config: ContainerConfig) -> str:
-        """Create a Dockerfile for the container."""
-        template = self._get_language_template(config.language)
-        dockerfile_content = f"""
-FROM {template['base_image']}
-
-WORKDIR /app
-
-# Install dependencies
-{" ".join(template['setup_commands'])}
-
-# Copy code
-COPY code.* /app/
-
-# Set resource limits and security options
-ENV PYTHONUNBUFFERED=1
-ENV NODE_OPTIONS="--max-old-space-size={config.memory_limit}"
-ENV LANG=C.UTF-8
-ENV LC_ALL=C.UTF-8
-
-# Create non-root user
-RUN useradd -m -r -s /bin/bash appuser && \
-    chown -R appuser:appuser /app
-
-USER appuser
-
-# Run the code
-CMD {template['run_command']}
-"""
-        dockerfile_path = self.base_path / execution_id / "Dockerfile"
-        dockerfile_path.parent.mkdir(parents=True, exist_ok=True)
-        dockerfile_path.write_text(dockerfile_content)
-        return str(dockerfile_path)
-
     async def create_container_with_dependencies(
         self,
         code: str,
@@ -858,7 +407,7 @@ CMD {template['run_command']}
         execution_id = str(uuid.uuid4())
         
         # Create network for dependencies
-        await self.network.create_network(self.client)
+        await self.network.create_network(self.docker)
         
         try:
             # Add dependencies to network
@@ -895,10 +444,11 @@ CMD {template['run_command']}
         """Start a dependency container."""
         try:
             # Pull image if needed
-            self.client.images.pull(container.image)
+            await self.docker.call(self.client.images.pull, container.image)
             
             # Create container
-            docker_container = self.client.containers.create(
+            docker_container = await self.docker.call(
+                self.client.containers.create,
                 container.image,
                 name=container.name,
                 network=self.network.docker_network.name,
@@ -910,7 +460,7 @@ CMD {template['run_command']}
             )
             
             # Start container
-            docker_container.start()
+            await self.docker.call(docker_container.start)
             
             # Wait for health check if specified
             if container.health_check:
@@ -920,7 +470,7 @@ CMD {template['run_command']}
             logger.error(f"Error starting dependency container {container.name}: {str(e)}")
             raise
 
-    async def _wait_for_health_check(self, container: docker.Container):
+    async def _wait_for_health_check(self, container: docker.models.containers.Container):
         """Wait for container health check to pass."""
         health_check = container.attrs["Config"]["Healthcheck"]
         interval = health_check.get("Interval", 30) / 1000000000  # Convert to seconds
@@ -936,68 +486,49 @@ CMD {template['run_command']}
         raise TimeoutError(f"Container {container.name} failed health check")
 
     async def create_container(self, code: str, config: ContainerConfig) -> str:
-        """Create a container for code execution."""
+        """Take a warm sandbox for the language and copy the code into it."""
         execution_id = str(uuid.uuid4())
-        execution_dir = self.base_path / execution_id
-        execution_dir.mkdir(parents=True, exist_ok=True)
-
-        # Write code to file
-        code_file = execution_dir / f"code.{config.language}"
-        code_file.write_text(code)
-
-        # Create Dockerfile
-        dockerfile_path = self._create_dockerfile(execution_id, config)
-
+        sandbox = None
         try:
-            # Build image
-            image, _ = self.client.images.build(
-                path=str(execution_dir),
-                dockerfile=str(dockerfile_path),
-                tag=f"execution-{execution_id}",
-                rm=True
-            )
-
-            # Create container with security options
-            container = self.client.containers.create(
-                image.id,
-                name=execution_id,
-                mem_limit=config.memory_limit,
-                cpu_period=config.cpu_period,
-                cpu_quota=config.cpu_quota,
-                network_disabled=config.network_disabled,
-                read_only=config.read_only,
-                security_opt=config.security_opt,
-                ulimits=config.ulimits,
-                cap_drop=config.cap_drop,
-                sysctls=config.sysctls,
-                detach=True
-            )
-
+            sandbox = await self.pool.acquire(config)
+            container_creation_counter.inc()
+            await self.pool.inject(sandbox, {sandbox.runtime.source_file: code})
+            self.sandboxes[execution_id] = sandbox
+            self.stats.subscribe(sandbox.container)
             return execution_id
         except Exception as e:
             logger.error(f"Error creating container: {str(e)}")
-            await self.cleanup_execution(execution_id)
+            if sandbox:
+                await self.pool.release(sandbox, reusable=False)
             raise
 
     async def _monitor_containers(self):
         """Monitor container health and resource usage."""
         try:
-            for container_id in list(self.executions.keys()):
+            running = list(self.sandboxes.items())
+            # Refresh every container's status at once; resource usage comes from the stats streams
+            refreshed = await asyncio.gather(
+                *(self.docker.call(sandbox.container.reload) for _, sandbox in running),
+                return_exceptions=True
+            )
+            for (container_id, sandbox), error in zip(running, refreshed):
                 try:
-                    container = self.client.containers.get(container_id)
-                    stats = container.stats(stream=False)
+                    if isinstance(error, Exception):
+                        raise error
+                    stats = self.stats.latest(sandbox.container.id)
                     
                     # Update Prometheus metrics
-                    container_memory_usage.labels(container_id=container_id).set(
-                        stats["memory_stats"]["usage"]
-                    )
-                    container_cpu_usage.labels(container_id=container_id).set(
-                        stats["cpu_stats"]["cpu_usage"]["total_usage"] / 1000000
-                    )
+                    if stats:
+                        container_memory_usage.labels(container_id=container_id).set(
+                            stats.get("memory_stats", {}).get("usage", 0)
+                        )
+                        container_cpu_usage.labels(container_id=container_id).set(
+                            stats.get("cpu_stats", {}).get("cpu_usage", {}).get("total_usage", 0) / 1000000
+                        )
                     
                     # Check container health
-                    if container.status != "running":
-                        logger.warning(f"Container {container_id} is not running: {container.status}")
+                    if sandbox.container.status != "running":
+                        logger.warning(f"Container {container_id} is not running: {sandbox.container.status}")
                         await self.cleanup_execution(container_id)
                 except docker.errors.NotFound:
                     await self.cleanup_execution(container_id)
@@ -1006,6 +537,15 @@ CMD {template['run_command']}
         except Exception as e:
             logger.error(f"Error in monitoring loop: {str(e)}")
 
+    def _stop_tracking(self, execution_id: str, sandbox: Sandbox):
+        """Close an execution's stats stream and drop its metrics."""
+        self.stats.unsubscribe(sandbox.container.id)
+        for gauge in (container_memory_usage, container_cpu_usage):
+            try:
+                gauge.remove(execution_id)
+            except KeyError:
+                pass
+
     async def start_interactive_session(
         self,
         container_id: str,
@@ -1024,44 +564,34 @@ CMD {template['run_command']}
 
     async def execute_code(self, execution_id: str, config: ContainerConfig) -> ExecutionResult:
         """Execute code in the container and capture output."""
+        start_time = datetime.utcnow()
+        sandbox = self.sandboxes.get(execution_id)
+        reusable = True
         try:
-            container = self.client.containers.get(execution_id)
-            
-            # Start container
-            container.start()
-            start_time = datetime.utcnow()
-            
+            if sandbox is None:
+                raise ValueError(f"No container prepared for execution {execution_id}")
+
             # Increment metrics
-            container_creation_counter.inc()
             container_execution_counter.inc()
 
             # Execute with timeout
-            try:
-                with container_execution_time.time():
-                    output = container.exec_run(
-                        config._get_language_template(config.language)["run_command"],
-                        timeout=config.timeout
-                    )
-            except docker.errors.ExecTimeout:
-                container.kill()
+            with container_execution_time.time():
+                exit_code, output, timed_out = await self.pool.run(sandbox, config.timeout)
+            if timed_out:
+                reusable = False
                 container_error_counter.inc()
                 raise TimeoutError(f"Execution timed out after {config.timeout} seconds")
 
-            # Get container stats
-            stats = container.stats(stream=False)
-            resource_usage = {
-                "cpu_usage": stats["cpu_stats"]["cpu_usage"]["total_usage"],
-                "memory_usage": stats["memory_stats"]["usage"],
-                "network_rx": stats["networks"]["eth0"]["rx_bytes"],
-                "network_tx": stats["networks"]["eth0"]["tx_bytes"]
-            }
+            # Usage from the streamed stats, waiting briefly if the stream has not sent a sample yet
+            await self.stats.wait_for_sample(sandbox.container.id)
+            resource_usage = self.stats.usage(sandbox.container.id)
 
             # Create result
             result = ExecutionResult(
                 execution_id=execution_id,
                 status="completed",
-                output=output.output.decode()[:config.max_output_size],
-                exit_code=output.exit_code,
+                output=output.decode(errors="replace")[:config.max_output_size],
+                exit_code=exit_code,
                 start_time=start_time,
                 end_time=datetime.utcnow(),
                 resource_usage=resource_usage
@@ -1084,6 +614,11 @@ CMD {template['run_command']}
             )
             self.executions[execution_id] = result
             raise
+        finally:
+            # Unless stop_execution already released it
+            if sandbox and self.sandboxes.pop(execution_id, None) is sandbox:
+                self._stop_tracking(execution_id, sandbox)
+                await self.pool.release(sandbox, reusable=reusable)
 
     def get_execution_status(self, execution_id: str) -> Optional[ExecutionResult]:
         """Get the status of a code execution."""
@@ -1092,8 +627,9 @@ CMD {template['run_command']}
     async def stop_execution(self, execution_id: str):
         """Stop a running execution."""
         try:
-            container = self.client.containers.get(execution_id)
-            container.kill()
+            sandbox = self.sandboxes.get(execution_id)
+            if sandbox:
+                await self.docker.call(sandbox.container.kill)
             await self.cleanup_execution(execution_id)
         except docker.errors.NotFound:
             pass
@@ -1101,6 +637,11 @@ CMD {template['run_command']}
             logger.error(f"Error stopping execution: {str(e)}")
             raise
 
+    async def shutdown(self):
+        """Remove the pool's idle sandboxes."""
+        await self.pool.shutdown()
+        self.docker.close()
+
     def __del__(self):
         """Cleanup when the manager is destroyed."""
         if self.cleanup_task:
@@ -0,0 +1,405 @@
+import io
+import math
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+import tarfile
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Deque, Tuple, Union
+
+import docker
+from docker.types import Mount, Ulimit
+from prometheus_client import Counter, Gauge
+from .async_docker import AsyncDockerClient
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+pool_acquire_counter = Counter('container_pool_acquire_total', 'Sandbox acquisitions', ['language', 'source'])
+pool_idle_gauge = Gauge('container_pool_idle', 'Idle sandboxes in the pool', ['language'])
+
+# Where code is written inside a sandbox
+WORKSPACE = "/workspace"
+# UID of "nobody", which runs the code
+SANDBOX_UID = 65534
+
+@dataclass
+class LanguageRuntime:
+    """How to run a source file of one language in a prebuilt image."""
+    language: str
+    base_image: str
+    source_file: str
+    command: List[str]
+    # Dockerfile RUN lines baked into the image
+    setup: List[str] = field(default_factory=list)
+    environment: Dict[str, str] = field(default_factory=dict)
+
+    def dockerfile(self) -> str:
+        """Dockerfile of the runtime image: the toolchain and an idle process, no code."""
+        lines = [f"FROM {self.base_image}"]
+        lines += [f"RUN {command}" for command in self.setup]
+        environment = {"LANG": "C.UTF-8", "LC_ALL": "C.UTF-8", "HOME": "/tmp", **self.environment}
+        lines += [f"ENV {name}={value}" for name, value in environment.items()]
+        lines += [
+            # A new volume at /workspace starts out with this directory's owner
+            f"RUN mkdir -p {WORKSPACE} && chown {SANDBOX_UID}:{SANDBOX_UID} {WORKSPACE}",
+            f"WORKDIR {WORKSPACE}",
+            f"USER {SANDBOX_UID}",
+            'CMD ["tail", "-f", "/dev/null"]',
+        ]
+        return "\n".join(lines) + "\n"
+
+    @property
+    def image_tag(self) -> str:
+        # Keyed by the Dockerfile so a changed runtime gets a new image
+        digest = hashlib.sha256(self.dockerfile().encode()).hexdigest()[:12]
+        return f"execution-runtime-{self.language}:{digest}"
+
+# Compiled languages build into /tmp, since the workspace holds only sources
+LANGUAGE_RUNTIMES: Dict[str, LanguageRuntime] = {runtime.language: runtime for runtime in [
+    LanguageRuntime("python", "python:3.9-slim", "main.py", ["python", "main.py"], environment={"PYTHONUNBUFFERED": "1", "PYTHONDONTWRITEBYTECODE": "1"}),
+    LanguageRuntime("javascript", "node:16-slim", "index.js", ["node", "index.js"]),
+    LanguageRuntime("typescript", "node:16-slim", "main.ts", ["ts-node", "main.ts"], setup=["npm install -g typescript ts-node"]),
+    LanguageRuntime("java", "openjdk:11-slim", "Main.java", ["java", "Main.java"]),
+    LanguageRuntime("go", "golang:1.16-alpine", "main.go", ["go", "run", "main.go"], environment={"GOCACHE": "/tmp/go-cache", "GO111MODULE": "off"}),
+    LanguageRuntime("ruby", "ruby:2.7-slim", "main.rb", ["ruby", "main.rb"]),
+    LanguageRuntime("rust", "rust:1.54-slim", "main.rs", ["sh", "-c", "rustc -o /tmp/main main.rs && /tmp/main"]),
+    LanguageRuntime("php", "php:7.4-cli", "main.php", ["php", "main.php"]),
+    LanguageRuntime("haskell", "haskell:8", "main.hs", ["runghc", "main.hs"]),
+    LanguageRuntime("lua", "lua:5.4", "main.lua", ["lua", "main.lua"]),
+    LanguageRuntime("perl", "perl:5.32", "main.pl", ["perl", "main.pl"]),
+    LanguageRuntime("shell", "ubuntu:20.04", "main.sh", ["bash", "main.sh"]),
+    LanguageRuntime("dart", "dart:2.19", "main.dart", ["dart", "run", "main.dart"]),
+    LanguageRuntime("julia", "julia:1.8", "main.jl", ["julia", "main.jl"]),
+    LanguageRuntime("r", "r-base:latest", "main.R", ["Rscript", "main.R"]),
+    LanguageRuntime("fortran", "gcc:latest", "main.f90", ["sh", "-c", "gfortran -o /tmp/main main.f90 && /tmp/main"]),
+    LanguageRuntime("prolog", "swipl:latest", "main.pl", ["swipl", "main.pl"]),
+    LanguageRuntime("erlang", "erlang:latest", "main.erl", ["escript", "main.erl"]),
+    LanguageRuntime("elixir", "elixir:latest", "main.exs", ["elixir", "main.exs"]),
+    LanguageRuntime("ocaml", "ocaml/opam:latest", "main.ml", ["ocaml", "main.ml"]),
+    LanguageRuntime("racket", "racket/racket:latest", "main.rkt", ["racket", "main.rkt"]),
+    LanguageRuntime("scheme", "guile:latest", "main.scm", ["guile", "main.scm"]),
+    LanguageRuntime("nim", "nimlang/nim:latest", "main.nim", ["nim", "c", "-r", "--hints:off", "--nimcache:/tmp/nimcache", "-o:/tmp/main", "main.nim"]),
+    LanguageRuntime("crystal", "crystallang/crystal:latest", "main.cr", ["crystal", "run", "main.cr"]),
+    LanguageRuntime("zig", "zig:latest", "main.zig", ["zig", "run", "main.zig"], environment={"ZIG_GLOBAL_CACHE_DIR": "/tmp/zig-cache"}),
+]}
+
+def get_runtime(language: str) -> LanguageRuntime:
+    """Runtime for a language, Python for languages without one."""
+    return LANGUAGE_RUNTIMES.get(language.lower(), LANGUAGE_RUNTIMES["python"])
+
+def pack_files(files: Dict[str, str]) -> bytes:
+    """Tar archive of text files, owned by the sandbox user."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for name, content in files.items():
+            data = content.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o644
+            info.uid = info.gid = SANDBOX_UID
+            info.mtime = int(time.time())
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+@dataclass
+class Sandbox:
+    """A started container kept for running code of one language."""
+    container: Any
+    key: Tuple[Any, ...]
+    runtime: LanguageRuntime
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    uses: int = 0
+    paused: bool = False
+
+@dataclass
+class DemandEstimate:
+    """Smoothed arrival rate and run time of one kind of sandbox."""
+    interarrival: Optional[float] = None
+    service_time: Optional[float] = None
+    last_acquire: Optional[float] = None
+    smoothing: float = 0.2
+
+    def record_acquire(self, now: float) -> None:
+        if self.last_acquire is not None:
+            self.interarrival = self._smooth(self.interarrival, now - self.last_acquire)
+        self.last_acquire = now
+
+    def record_release(self, held: float) -> None:
+        self.service_time = self._smooth(self.service_time, held)
+
+    def concurrency(self, now: float) -> float:
+        """Expected sandboxes in use at once (arrival rate times run time)."""
+        if not self.interarrival or self.service_time is None:
+            return 0.0
+        # A long pause since the last request counts as a slower arrival rate
+        interarrival = max(self.interarrival, now - (self.last_acquire or now))
+        return self.service_time / max(interarrival, 1e-6)
+
+    def _smooth(self, current: Optional[float], sample: float) -> float:
+        return sample if current is None else current + self.smoothing * (sample - current)
+
+class ContainerPool:
+    """Warm sandboxes per language, so executions skip building and creating containers.
+
+    Each language runs in a runtime image built once and tagged by its
+    Dockerfile's digest. Sandboxes are containers of that image started with
+    an idle process, a writable volume at /workspace and a tmpfs at /tmp,
+    with the root filesystem read-only as configured. Code is copied in with
+    ``put_archive`` and run with ``exec_run``.
+
+    Idle sandboxes are paused. After a run the sandbox's workspace and /tmp
+    are wiped and it goes back to the pool; sandboxes that timed out, failed
+    to clean up or reached ``max_uses`` are removed instead. Sandboxes are
+    pooled per language and container settings, and each pool keeps about
+    as many idle sandboxes as the recent arrival rate times the run time
+    (times ``headroom``), between ``min_idle`` and ``max_idle``.
+
+    Docker calls go through an ``AsyncDockerClient`` and are awaited, so
+    concurrent acquisitions and background replenishment overlap.
+    """
+
+    def __init__(
+        self,
+        client: Union[docker.DockerClient, AsyncDockerClient],
+        min_idle: int = 1,
+        max_idle: int = 8,
+        max_size: int = 32,
+        max_uses: int = 50,
+        idle_ttl: float = 300.0,
+        headroom: float = 1.5,
+        pause_idle: bool = True,
+        workspace_size: str = "64m"
+    ):
+        self.docker = client if isinstance(client, AsyncDockerClient) else AsyncDockerClient(client)
+        self.client = self.docker.client
+        self.min_idle = min_idle
+        self.max_idle = max_idle
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.idle_ttl = idle_ttl
+        self.headroom = headroom
+        self.pause_idle = pause_idle
+        self.workspace_size = workspace_size
+        self.idle: Dict[Tuple[Any, ...], Deque[Sandbox]] = {}
+        self.in_use: Dict[Tuple[Any, ...], int] = {}
+        self.demand: Dict[Tuple[Any, ...], DemandEstimate] = {}
+        self.configs: Dict[Tuple[Any, ...], Any] = {}
+        self.images: Dict[str, str] = {}
+        self._replenishing: Dict[Tuple[Any, ...], asyncio.Task] = {}
+        self._replenish_locks: Dict[Tuple[Any, ...], asyncio.Lock] = {}
+        self._image_locks: Dict[str, asyncio.Lock] = {}
+
+    def pool_key(self, config: Any) -> Tuple[Any, ...]:
+        """Sandboxes are interchangeable when their language and container settings match."""
+        return (
+            get_runtime(config.language).language,
+            config.memory_limit,
+            config.cpu_period,
+            config.cpu_quota,
+            config.network_disabled,
+            config.read_only,
+            tuple(config.security_opt),
+            tuple(sorted(config.ulimits.items())),
+            tuple(config.cap_drop),
+            tuple(sorted(config.sysctls.items())),
+        )
+
+    async def ensure_image(self, runtime: LanguageRuntime) -> str:
+        """Build the runtime image unless it already exists."""
+        tag = runtime.image_tag
+        # Concurrent first requests for a language wait for a single build
+        async with self._image_locks.setdefault(tag, asyncio.Lock()):
+            if tag not in self.images:
+                try:
+                    image = await self.docker.call(self.client.images.get, tag)
+                except docker.errors.ImageNotFound:
+                    logger.info(f"Building runtime image {tag}")
+                    image, _ = await self.docker.call(
+                        self.client.images.build,
+                        fileobj=io.BytesIO(runtime.dockerfile().encode()),
+                        tag=tag,
+                        rm=True,
+                        pull=True
+                    )
+                self.images[tag] = image.id
+        return self.images[tag]
+
+    async def prewarm(self, configs: List[Any]) -> None:
+        """Build images and start the minimum idle sandboxes for the given configurations."""
+        for config in configs:
+            key = self.pool_key(config)
+            self.configs[key] = config
+            await self.replenish(key)
+
+    async def acquire(self, config: Any) -> Sandbox:
+        """Take an idle sandbox for the configuration, starting one if none is idle."""
+        key = self.pool_key(config)
+        self.configs[key] = config
+        now = time.monotonic()
+        self.demand.setdefault(key, DemandEstimate()).record_acquire(now)
+
+        idle = self.idle.setdefault(key, deque())
+        sandbox = None
+        while idle and sandbox is None:
+            candidate = idle.pop()
+            try:
+                if candidate.paused:
+                    await self.docker.call(candidate.container.unpause)
+                    candidate.paused = False
+                sandbox = candidate
+            except Exception as e:
+                logger.warning(f"Discarding broken sandbox {candidate.container.id}: {str(e)}")
+                await self._remove(candidate)
+        source = "warm" if sandbox else "cold"
+        if sandbox is None:
+            sandbox = await self._create(key, config)
+        pool_acquire_counter.labels(language=key[0], source=source).inc()
+        pool_idle_gauge.labels(language=key[0]).set(len(idle))
+
+        self.in_use[key] = self.in_use.get(key, 0) + 1
+        sandbox.last_used = now
+        self._schedule_replenish(key)
+        return sandbox
+
+    async def inject(self, sandbox: Sandbox, files: Dict[str, str]) -> None:
+        """Copy source files into the sandbox's workspace."""
+        if not await self.docker.call(sandbox.container.put_archive, WORKSPACE, pack_files(files)):
+            raise RuntimeError(f"Failed to copy code into sandbox {sandbox.container.id}")
+
+    async def run(self, sandbox: Sandbox, timeout: int) -> Tuple[int, bytes, bool]:
+        """Run the sandbox's source file; returns the exit code, output and whether it timed out."""
+        command = ["timeout", "-s", "KILL", str(timeout), *sandbox.runtime.command]
+        started = time.monotonic()
+        result = await self.docker.call(sandbox.container.exec_run, command, workdir=WORKSPACE, user=str(SANDBOX_UID))
+        sandbox.uses += 1
+        # timeout exits with 124, or 128 + 9 when it had to kill the command
+        timed_out = result.exit_code in (124, 137) and time.monotonic() - started >= timeout
+        return result.exit_code, result.output, timed_out
+
+    async def release(self, sandbox: Sandbox, reusable: bool = True) -> None:
+        """Return a sandbox after a run, wiping it for reuse or removing it."""
+        key = sandbox.key
+        self.in_use[key] = max(self.in_use.get(key, 1) - 1, 0)
+        now = time.monotonic()
+        self.demand.setdefault(key, DemandEstimate()).record_release(now - sandbox.last_used)
+        sandbox.last_used = now
+
+        if reusable and sandbox.uses < self.max_uses and await self._reset(sandbox):
+            idle = self.idle.setdefault(key, deque())
+            if len(idle) < self.max_idle:
+                if self.pause_idle:
+                    try:
+                        await self.docker.call(sandbox.container.pause)
+                        sandbox.paused = True
+                    except Exception as e:
+                        logger.warning(f"Could not pause sandbox {sandbox.container.id}: {str(e)}")
+                idle.append(sandbox)
+                pool_idle_gauge.labels(language=key[0]).set(len(idle))
+                return
+        await self._remove(sandbox)
+        self._schedule_replenish(key)
+
+    def target_idle(self, key: Tuple[Any, ...]) -> int:
+        """Idle sandboxes to keep for a pool given its recent demand."""
+        demand = self.demand.get(key)
+        expected = demand.concurrency(time.monotonic()) if demand else 0.0
+        target = min(max(math.ceil(expected * self.headroom), self.min_idle), self.max_idle)
+        return max(min(target, self.max_size - self.in_use.get(key, 0)), 0)
+
+    async def replenish(self, key: Tuple[Any, ...]) -> None:
+        """Start sandboxes until the pool has its target number idle."""
+        config = self.configs[key]
+        idle = self.idle.setdefault(key, deque())
+        async with self._replenish_locks.setdefault(key, asyncio.Lock()):
+            while len(idle) < self.target_idle(key):
+                try:
+                    sandbox = await self._create(key, config)
+                    if self.pause_idle:
+                        await self.docker.call(sandbox.container.pause)
+                        sandbox.paused = True
+                except Exception as e:
+                    logger.error(f"Error starting sandbox for {key[0]}: {str(e)}")
+                    return
+                idle.append(sandbox)
+        pool_idle_gauge.labels(language=key[0]).set(len(idle))
+
+    async def maintain(self) -> None:
+        """Remove sandboxes idle longer than ``idle_ttl`` beyond each pool's target and top pools up."""
+        now = time.monotonic()
+        for key, idle in self.idle.items():
+            surplus = len(idle) - self.target_idle(key)
+            # Oldest-used sandboxes are at the left
+            while surplus > 0 and idle and now - idle[0].last_used > self.idle_ttl:
+                await self._remove(idle.popleft())
+                surplus -= 1
+            pool_idle_gauge.labels(language=key[0]).set(len(idle))
+        for key in list(self.configs):
+            await self.replenish(key)
+
+    async def shutdown(self) -> None:
+        """Remove every idle sandbox."""
+        for task in self._replenishing.values():
+            task.cancel()
+        removals = []
+        for idle in self.idle.values():
+            while idle:
+                removals.append(self._remove(idle.pop()))
+        await asyncio.gather(*removals)
+
+    def _schedule_replenish(self, key: Tuple[Any, ...]) -> None:
+        task = self._replenishing.get(key)
+        if task is None or task.done():
+            self._replenishing[key] = asyncio.ensure_future(self.replenish(key))
+
+    async def _create(self, key: Tuple[Any, ...], config: Any) -> Sandbox:
+        runtime = get_runtime(config.language)
+        image = await self.ensure_image(runtime)
+        container = await self.docker.call(
+            self.client.containers.create,
+            image,
+            name=f"sandbox-{runtime.language}-{uuid.uuid4().hex[:12]}",
+            mem_limit=config.memory_limit,
+            cpu_period=config.cpu_period,
+            cpu_quota=config.cpu_quota,
+            network_disabled=config.network_disabled,
+            read_only=config.read_only,
+            security_opt=config.security_opt,
+            ulimits=[Ulimit(name=name, soft=limit, hard=limit) for name, limit in config.ulimits.items()],
+            cap_drop=config.cap_drop,
+            sysctls=config.sysctls,
+            # put_archive cannot write into tmpfs mounts, so code goes to an anonymous volume
+            mounts=[Mount(target=WORKSPACE, source=None, type="volume")],
+            tmpfs={"/tmp": f"rw,nosuid,size={self.workspace_size},mode=1777"},
+            labels={"execution-sandbox": runtime.language},
+            detach=True
+        )
+        await self.docker.call(container.start)
+        return Sandbox(container=container, key=key, runtime=runtime)
+
+    async def _reset(self, sandbox: Sandbox) -> bool:
+        """Wipe the workspace, /tmp and leftover processes; False if the sandbox should not be reused."""
+        try:
+            # Runs as the sandbox user, since the containers drop CAP_KILL; kill -1
+            # signals every process of that user except the shell itself
+            result = await self.docker.call(
+                sandbox.container.exec_run,
+                ["sh", "-c", f"kill -KILL -1 2>/dev/null; find {WORKSPACE} /tmp -mindepth 1 -delete"],
+                user=str(SANDBOX_UID)
+            )
+            return result.exit_code == 0
+        except Exception as e:
+            logger.warning(f"Could not reset sandbox {sandbox.container.id}: {str(e)}")
+            return False
+
+    async def _remove(self, sandbox: Sandbox) -> None:
+        try:
+            await self.docker.call(sandbox.container.remove, force=True, v=True)
+        except docker.errors.NotFound:
+            pass
+        except Exception as e:
+            logger.error(f"Error removing sandbox {sandbox.container.id}: {str(e)}")
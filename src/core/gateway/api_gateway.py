@@ -46,6 +46,7 @@ from ..monitoring.audit_logging import (
     AuditEventType,
     AuditEventSeverity
 )
+from ..monitoring.bulk_sink import BulkSinkConfig
 import uuid
 
 # Configure logging
@@ -498,17 +499,19 @@ class APIGateway:
         config_dir: str,
         elasticsearch_url: str = "http://localhost:9200",
         redis_url: str = "redis://localhost:6379",
-        jwt_secret: str = "your-secret-key"
+        jwt_secret: str = "your-secret-key",
+        audit_sink_config: Optional[BulkSinkConfig] = None
     ):
         self.config_dir = Path(config_dir)
         self.es = AsyncElasticsearch([elasticsearch_url])
         self.redis = redis.from_url(redis_url)
         self.jwt_secret = jwt_secret
         
-        # Initialize audit logger
+        # Initialize audit logger; events are queued so requests never wait on audit I/O
         self.audit_logger = AuditLogger(
             config_dir=config_dir,
-            elasticsearch_url=elasticsearch_url
+            elasticsearch_url=elasticsearch_url,
+            sink_config=audit_sink_config
         )
         
         # Load configurations
@@ -282,6 +282,16 @@ class LLMClient:
                 f"Context: {error.get('context', {})}"
             ])
             
+            # The same detail a single-error prompt gets
+            if error.get('stack_trace'):
+                prompt_parts.append("Stack Trace:")
+                prompt_parts.extend(error['stack_trace'])
+                
+            if error.get('patterns'):
+                prompt_parts.append("Detected Patterns:")
+                for pattern in error['patterns']:
+                    prompt_parts.append(f"- {pattern['type']}: {pattern['description']}")
+            
         prompt_parts.extend([
             "\nFor each error, provide:",
             "1. Primary cause",
@@ -0,0 +1,230 @@
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass
+import asyncio
+import hashlib
+import json
+import logging
+
+from .llm_client import LLMClient, ErrorAnalysis
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CoalescerConfig:
+    """Configuration for the error analysis request coalescer."""
+    batch_window: float = 0.05  # Seconds to wait for more errors before flushing
+    max_batch_size: int = 5
+    max_batch_tokens: int = 3000  # Prompt token budget per batch completion
+    chars_per_token: int = 4  # Rough estimate used for token budgeting
+
+@dataclass
+class _PendingRequest:
+    """An error waiting to be dispatched in a batch."""
+    key: str
+    error: Dict[str, Any]
+    tokens: int
+    future: asyncio.Future
+
+@dataclass
+class CoalescerStats:
+    """Counters describing how requests were coalesced."""
+    requests: int = 0
+    deduplicated: int = 0
+    batches: int = 0
+    completions: int = 0
+    fallbacks: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "deduplicated": self.deduplicated,
+            "batches": self.batches,
+            "completions": self.completions,
+            "fallbacks": self.fallbacks
+        }
+
+class ErrorAnalysisCoalescer:
+    """
+    Async front-end for LLMClient error analysis.
+
+    Identical in-flight requests share a single completion (single-flight), and
+    distinct errors arriving within ``batch_window`` are grouped into batch
+    prompts bounded by ``max_batch_size`` and ``max_batch_tokens``. Results are
+    fanned back out to the individual awaiters.
+    """
+
+    def __init__(self, client: LLMClient, config: Optional[CoalescerConfig] = None):
+        """
+        Initialize the coalescer.
+
+        Args:
+            client: LLM client used to run completions
+            config: Coalescing configuration
+        """
+        self.client = client
+        self.config = config or CoalescerConfig()
+        self.stats = CoalescerStats()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[_PendingRequest] = []
+        self._pending_tokens = 0
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: set = set()
+
+    async def analyze_error(
+        self,
+        error_message: str,
+        stack_trace: Optional[List[str]] = None,
+        patterns: Optional[List[Dict[str, Any]]] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> ErrorAnalysis:
+        """
+        Analyze an error, coalescing with other concurrent requests.
+
+        Accepts the same arguments as ``LLMClient.analyze_error``.
+        """
+        error = {
+            "message": error_message,
+            "type": error_message.split(":", 1)[0] if ":" in error_message else "unknown",
+            "context": context or {},
+            "stack_trace": stack_trace,
+            "patterns": patterns
+        }
+        return await self.submit(error)
+
+    async def analyze_errors(self, errors: List[Dict[str, Any]]) -> List[ErrorAnalysis]:
+        """Analyze several error dictionaries concurrently."""
+        return list(await asyncio.gather(*(self.submit(error) for error in errors)))
+
+    async def submit(self, error: Dict[str, Any]) -> ErrorAnalysis:
+        """
+        Submit an error dictionary (``message``, ``type``, ``context``) for analysis.
+
+        Returns:
+            ErrorAnalysis: Analysis result for this error
+        """
+        self.stats.requests += 1
+        key = self._request_key(error)
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats.deduplicated += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        tokens = self._estimate_tokens(error)
+        self._pending.append(_PendingRequest(key, error, tokens, future))
+        self._pending_tokens += tokens
+
+        if (len(self._pending) >= self.config.max_batch_size
+                or self._pending_tokens >= self.config.max_batch_tokens):
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.get_running_loop().call_later(
+                self.config.batch_window, self.flush
+            )
+
+        return await asyncio.shield(future)
+
+    def flush(self) -> None:
+        """Dispatch all pending errors immediately."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        pending, self._pending = self._pending, []
+        self._pending_tokens = 0
+
+        for batch in self._split_batches(pending):
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def close(self) -> None:
+        """Flush pending errors and wait for outstanding batches."""
+        self.flush()
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+
+    def _split_batches(self, pending: List[_PendingRequest]) -> List[List[_PendingRequest]]:
+        """Split pending requests into batches within size and token limits."""
+        batches: List[List[_PendingRequest]] = []
+        current: List[_PendingRequest] = []
+        current_tokens = 0
+
+        for request in pending:
+            if current and (len(current) >= self.config.max_batch_size
+                            or current_tokens + request.tokens > self.config.max_batch_tokens):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(request)
+            current_tokens += request.tokens
+
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _run_batch(self, batch: List[_PendingRequest]) -> None:
+        """Run one completion for a batch and fan results out to awaiters."""
+        self.stats.batches += 1
+        try:
+            if len(batch) == 1:
+                results = [await self._analyze_single(batch[0].error)]
+            else:
+                results = await self._analyze_batch([request.error for request in batch])
+
+            for request, result in zip(batch, results):
+                if not request.future.done():
+                    request.future.set_result(result)
+
+        except Exception as e:
+            logger.error(f"Error during coalesced LLM analysis: {e}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+
+        finally:
+            for request in batch:
+                if self._inflight.get(request.key) is request.future:
+                    del self._inflight[request.key]
+
+    async def _analyze_single(self, error: Dict[str, Any]) -> ErrorAnalysis:
+        """Analyze a lone error with the full single-error prompt."""
+        self.stats.completions += 1
+        return await asyncio.to_thread(
+            self.client.analyze_error,
+            error.get("message", ""),
+            error.get("stack_trace"),
+            error.get("patterns"),
+            error.get("context")
+        )
+
+    async def _analyze_batch(self, errors: List[Dict[str, Any]]) -> List[ErrorAnalysis]:
+        """Analyze several errors with a single batch completion."""
+        self.stats.completions += 1
+        results = await asyncio.to_thread(
+            self.client.analyze_errors_batch, errors, len(errors)
+        )
+
+        if len(results) == len(errors):
+            return results
+
+        # The batch response could not be mapped back onto the errors, so
+        # analyze them individually rather than guessing the alignment.
+        logger.warning(
+            f"Batch analysis returned {len(results)} results for {len(errors)} errors; "
+            "falling back to individual analysis"
+        )
+        self.stats.fallbacks += 1
+        return list(await asyncio.gather(*(self._analyze_single(error) for error in errors)))
+
+    def _estimate_tokens(self, error: Dict[str, Any]) -> int:
+        """Estimate the prompt tokens an error contributes to a batch."""
+        text = json.dumps(error, sort_keys=True, default=str)
+        return max(1, len(text) // self.config.chars_per_token)
+
+    @staticmethod
+    def _request_key(error: Dict[str, Any]) -> str:
+        """Build a deduplication key for an error."""
+        payload = json.dumps(error, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
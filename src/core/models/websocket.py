@@ -41,6 +41,14 @@ class WebSocketMessageType(str, Enum):
     SYSTEM_CONFIG = "system.config"
     SYSTEM_ALERT = "system.alert"
     
+    # Streamed completions
+    STREAM_REQUEST = "stream.request"
+    STREAM_CANCEL = "stream.cancel"
+    STREAM_START = "stream.start"
+    STREAM_CHUNK = "stream.chunk"
+    STREAM_END = "stream.end"
+    STREAM_ERROR = "stream.error"
+    
     # User messages
     USER_STATUS = "user.status"
     USER_ACTIVITY = "user.activity"
@@ -52,6 +60,13 @@ class WebSocketSubscription(BaseModel):
     filters: Optional[Dict[str, Any]] = Field(None, description="Optional filters for the subscription")
     options: Optional[Dict[str, Any]] = Field(None, description="Optional subscription options")
 
+class WebSocketStreamRequest(BaseModel):
+    """Model for streamed completion requests."""
+    stream_id: str = Field(..., description="Client-chosen ID used to correlate stream messages")
+    kind: str = Field("code_completion", description="What to stream: code_completion or plan")
+    prompt: str = Field(..., description="Prompt or task to send to the provider")
+    options: Dict[str, Any] = Field(default_factory=dict, description="Generation options passed to the router")
+
 class WebSocketMessage(BaseModel):
     """Base model for WebSocket messages."""
     type: WebSocketMessageType = Field(..., description="Type of message")
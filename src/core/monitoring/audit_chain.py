@@ -0,0 +1,187 @@
+from typing import Dict, List, Optional, Any
+from datetime import datetime
+import hashlib
+import hmac
+import base64
+import json
+import uuid
+from .bulk_sink import _json_default
+
+# Fields covered by an event's hash; chained events also cover their position
+EVENT_HASH_FIELDS = [
+    "event_id", "event_type", "severity", "timestamp", "user_id", "action",
+    "resource", "details", "ip_address", "user_agent", "session_id",
+    "correlation_id", "metadata"
+]
+CHAIN_FIELDS = ["chain_id", "sequence", "prev_hash"]
+
+CHECKPOINT_FIELDS = [
+    "chain_id", "batch", "first_sequence", "last_sequence", "count",
+    "first_timestamp", "last_timestamp", "prev_chain_hash", "chain_hash",
+    "merkle_root"
+]
+
+GENESIS_HASH = ""
+
+def event_hash(secret_key: str, doc: Dict[str, Any]) -> str:
+    """HMAC of an audit event document.
+
+    Documents written before chaining carry no sequence and hash the event
+    fields alone, so they still verify.
+    """
+    fields = EVENT_HASH_FIELDS + (CHAIN_FIELDS if "sequence" in doc else [])
+    event_str = json.dumps(
+        {field: doc.get(field) for field in fields},
+        sort_keys=True,
+        default=_json_default
+    )
+    hmac_obj = hmac.new(secret_key.encode(), event_str.encode(), hashlib.sha256)
+    return base64.b64encode(hmac_obj.digest()).decode()
+
+def merkle_root(hashes: List[str]) -> str:
+    """Merkle root over event hashes; an odd node is paired with itself."""
+    if not hashes:
+        return hashlib.sha256(b"").hexdigest()
+
+    level = [hashlib.sha256(h.encode()).digest() for h in hashes]
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [
+            hashlib.sha256(level[i] + level[i + 1]).digest()
+            for i in range(0, len(level), 2)
+        ]
+    return level[0].hex()
+
+def sign_checkpoint(secret_key: str, checkpoint: Dict[str, Any]) -> str:
+    """HMAC over the fields of a batch checkpoint."""
+    checkpoint_str = json.dumps(
+        {field: checkpoint.get(field) for field in CHECKPOINT_FIELDS},
+        sort_keys=True
+    )
+    hmac_obj = hmac.new(secret_key.encode(), checkpoint_str.encode(), hashlib.sha256)
+    return base64.b64encode(hmac_obj.digest()).decode()
+
+def verify_batch(
+    secret_key: str,
+    checkpoint: Optional[Dict[str, Any]],
+    events: List[Dict[str, Any]]
+) -> Optional[str]:
+    """Check a batch of chained events against its checkpoint.
+
+    Events must be sorted by sequence. Without a checkpoint (events logged
+    after the last sealed batch) only the hashes and chain links are checked.
+    Runs in a process pool, so it only takes and returns plain data.
+
+    Returns:
+        Why the batch failed verification, or None if it is intact
+    """
+    if checkpoint is not None:
+        if checkpoint.get("signature") != sign_checkpoint(secret_key, checkpoint):
+            return "checkpoint signature mismatch"
+        first_sequence = checkpoint["first_sequence"]
+        expected = list(range(first_sequence, checkpoint["last_sequence"] + 1))
+        prev_hash = checkpoint["prev_chain_hash"]
+    else:
+        if not events:
+            return None
+        first_sequence = events[0].get("sequence")
+        expected = list(range(first_sequence, first_sequence + len(events)))
+        prev_hash = events[0].get("prev_hash")
+
+    if [event.get("sequence") for event in events] != expected:
+        return "events missing from the chain"
+
+    for event in events:
+        if event.get("prev_hash") != prev_hash:
+            return f"chain broken at sequence {event['sequence']}"
+        if event.get("hash") != event_hash(secret_key, event):
+            return f"event {event.get('event_id')} hash mismatch"
+        prev_hash = event["hash"]
+
+    if checkpoint is not None:
+        if prev_hash != checkpoint["chain_hash"]:
+            return "chain hash mismatch"
+        if merkle_root([event["hash"] for event in events]) != checkpoint["merkle_root"]:
+            return "merkle root mismatch"
+    return None
+
+class AuditChain:
+    """Hash chain over the audit events written by one logger.
+
+    Every event records its sequence number and the hash of the previous
+    event, and its own hash covers both. Every ``batch_size`` events the chain
+    is sealed with a signed checkpoint holding the batch's Merkle root, so a
+    range of events can be verified batch by batch without looking anything
+    up per event. Each logger instance starts its own chain, so several
+    writers never interleave sequence numbers.
+    """
+
+    def __init__(self, secret_key: str, batch_size: int = 1000, chain_id: Optional[str] = None):
+        self.secret_key = secret_key
+        self.batch_size = batch_size
+        self.chain_id = chain_id or str(uuid.uuid4())
+        self.sequence = 0
+        self.batch = 0
+        self.last_hash = GENESIS_HASH
+
+        self._batch_prev_hash = GENESIS_HASH
+        self._batch_hashes: List[str] = []
+        self._batch_first_sequence = 0
+        self._batch_first_timestamp: Optional[str] = None
+        self._batch_last_timestamp: Optional[str] = None
+
+    def append(self, doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Link an event document into the chain and set its hash.
+
+        Returns:
+            The checkpoint document if this event completed a batch
+        """
+        if not self._batch_hashes:
+            self._batch_first_sequence = self.sequence
+            self._batch_prev_hash = self.last_hash
+
+        doc["chain_id"] = self.chain_id
+        doc["sequence"] = self.sequence
+        doc["prev_hash"] = self.last_hash
+        doc["hash"] = event_hash(self.secret_key, doc)
+
+        self.sequence += 1
+        self.last_hash = doc["hash"]
+        self._batch_hashes.append(doc["hash"])
+
+        timestamp = doc.get("timestamp")
+        if self._batch_first_timestamp is None or timestamp < self._batch_first_timestamp:
+            self._batch_first_timestamp = timestamp
+        if self._batch_last_timestamp is None or timestamp > self._batch_last_timestamp:
+            self._batch_last_timestamp = timestamp
+
+        if len(self._batch_hashes) >= self.batch_size:
+            return self.seal()
+        return None
+
+    def seal(self) -> Optional[Dict[str, Any]]:
+        """Close the open batch and return its checkpoint, if it has events."""
+        if not self._batch_hashes:
+            return None
+
+        checkpoint = {
+            "chain_id": self.chain_id,
+            "batch": self.batch,
+            "first_sequence": self._batch_first_sequence,
+            "last_sequence": self.sequence - 1,
+            "count": len(self._batch_hashes),
+            "first_timestamp": self._batch_first_timestamp,
+            "last_timestamp": self._batch_last_timestamp,
+            "prev_chain_hash": self._batch_prev_hash,
+            "chain_hash": self.last_hash,
+            "merkle_root": merkle_root(self._batch_hashes),
+            "sealed_at": datetime.now().isoformat()
+        }
+        checkpoint["signature"] = sign_checkpoint(self.secret_key, checkpoint)
+
+        self.batch += 1
+        self._batch_hashes = []
+        self._batch_first_timestamp = None
+        self._batch_last_timestamp = None
+        return checkpoint
@@ -1,17 +1,19 @@
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, AsyncIterator
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from collections import deque
 import logging
-import json
-import hashlib
-import hmac
-import base64
 from enum import Enum
 from elasticsearch import AsyncElasticsearch
 import yaml
 from pathlib import Path
 import asyncio
+import concurrent.futures
+import time
+import os
 import uuid
+from .bulk_sink import BulkIndexSink, BulkSinkConfig, OverflowPolicy
+from .audit_chain import AuditChain, event_hash, verify_batch
 
 logger = logging.getLogger(__name__)
 
@@ -56,13 +58,28 @@ class AuditLogger:
         config_dir: str,
         elasticsearch_url: str = "http://localhost:9200",
         retention_days: int = 90,
-        secret_key: Optional[str] = None
+        secret_key: Optional[str] = None,
+        sink_config: Optional[BulkSinkConfig] = None,
+        checkpoint_batch_size: int = 1000
     ):
         self.config_dir = Path(config_dir)
         self.es = AsyncElasticsearch([elasticsearch_url])
         self.retention_days = retention_days
         self.secret_key = secret_key or str(uuid.uuid4())
         
+        # Events are hash chained and sealed with a Merkle root checkpoint per batch
+        self.chain = AuditChain(self.secret_key, batch_size=checkpoint_batch_size)
+        
+        # Events are buffered and bulk indexed; audit events spill to disk rather than drop
+        self.sink = BulkIndexSink(
+            self.es,
+            sink_config or BulkSinkConfig(
+                overflow_policy=OverflowPolicy.SPILL,
+                spill_dir=str(self.config_dir / "audit_spill")
+            ),
+            name="audit"
+        )
+        
         # Load audit configurations
         self.event_filters: Dict[str, List[Dict[str, Any]]] = {}
         self._load_configs()
@@ -104,6 +121,9 @@ class AuditLogger:
                             "session_id": {"type": "keyword"},
                             "correlation_id": {"type": "keyword"},
                             "metadata": {"type": "object"},
+                            "chain_id": {"type": "keyword"},
+                            "sequence": {"type": "long"},
+                            "prev_hash": {"type": "keyword"},
                             "hash": {"type": "keyword"}
                         }
                     }
@@ -111,16 +131,43 @@ class AuditLogger:
                 ignore=400  # Ignore if index already exists
             )
             
+            # Create batch checkpoint index
+            await self.es.indices.create(
+                index=self._checkpoint_index(),
+                body={
+                    "settings": {
+                        "number_of_shards": 1,
+                        "number_of_replicas": 1
+                    },
+                    "mappings": {
+                        "properties": {
+                            "chain_id": {"type": "keyword"},
+                            "batch": {"type": "long"},
+                            "first_sequence": {"type": "long"},
+                            "last_sequence": {"type": "long"},
+                            "count": {"type": "integer"},
+                            "first_timestamp": {"type": "date"},
+                            "last_timestamp": {"type": "date"},
+                            "prev_chain_hash": {"type": "keyword"},
+                            "chain_hash": {"type": "keyword"},
+                            "merkle_root": {"type": "keyword"},
+                            "sealed_at": {"type": "date"},
+                            "signature": {"type": "keyword"}
+                        }
+                    }
+                },
+                ignore=400
+            )
+            
             # Set up retention policy
             await self._enforce_retention_policy()
             
         except Exception as e:
             logger.error(f"Failed to initialize audit indices: {str(e)}")
             
-    def _generate_hash(self, event: AuditEvent) -> str:
-        """Generate tamper-proof hash for event."""
-        # Create string representation of event
-        event_str = json.dumps({
+    def _event_document(self, event: AuditEvent) -> Dict[str, Any]:
+        """Build the indexed document for an event."""
+        return {
             "event_id": event.event_id,
             "event_type": event.event_type.value,
             "severity": event.severity.value,
@@ -134,16 +181,21 @@ class AuditLogger:
             "session_id": event.session_id,
             "correlation_id": event.correlation_id,
             "metadata": event.metadata
-        }, sort_keys=True)
+        }
         
-        # Generate HMAC using secret key
-        hmac_obj = hmac.new(
-            self.secret_key.encode(),
-            event_str.encode(),
-            hashlib.sha256
-        )
-        return base64.b64encode(hmac_obj.digest()).decode()
+    def _verify_document(self, event_doc: Dict[str, Any]) -> bool:
+        """Check an indexed event against its stored hash."""
+        return event_hash(self.secret_key, event_doc) == event_doc.get("hash")
+        
+    def _checkpoint_index(self) -> str:
+        return f"audit-checkpoints-{datetime.now().strftime('%Y.%m')}"
         
+    def _seal_batch(self) -> None:
+        """Queue a checkpoint for the open batch of events."""
+        checkpoint = self.chain.seal()
+        if checkpoint:
+            self.sink.submit(self._checkpoint_index(), checkpoint)
+            
     def _should_log_event(self, event: AuditEvent) -> bool:
         """Check if event should be logged based on filters."""
         if event.event_type.value not in self.event_filters:
@@ -177,45 +229,38 @@ class AuditLogger:
         return True
         
     async def log_event(self, event: AuditEvent) -> bool:
-        """Log an audit event with tamper-proof verification."""
+        """Log an audit event with tamper-proof verification.
+        
+        The event is queued for bulk indexing and this returns without waiting
+        for Elasticsearch; call ``flush`` to make queued events searchable.
+        """
         try:
             # Check if event should be logged
             if not self._should_log_event(event):
                 return False
                 
-            # Generate tamper-proof hash
-            event_hash = self._generate_hash(event)
+            # Link into the hash chain; a full batch yields its checkpoint
+            doc = self._event_document(event)
+            checkpoint = self.chain.append(doc)
             
-            # Prepare document for Elasticsearch
-            doc = {
-                "event_id": event.event_id,
-                "event_type": event.event_type.value,
-                "severity": event.severity.value,
-                "timestamp": event.timestamp,
-                "user_id": event.user_id,
-                "action": event.action,
-                "resource": event.resource,
-                "details": event.details,
-                "ip_address": event.ip_address,
-                "user_agent": event.user_agent,
-                "session_id": event.session_id,
-                "correlation_id": event.correlation_id,
-                "metadata": event.metadata,
-                "hash": event_hash
-            }
-            
-            # Store in Elasticsearch
-            await self.es.index(
-                index=f"audit-logs-{event.timestamp.strftime('%Y.%m')}",
-                document=doc
+            # Queue for Elasticsearch, checkpoints in the same bulk stream
+            submitted = self.sink.submit(
+                f"audit-logs-{event.timestamp.strftime('%Y.%m')}",
+                doc
             )
-            
-            return True
+            if checkpoint:
+                self.sink.submit(self._checkpoint_index(), checkpoint)
+            return submitted
             
         except Exception as e:
             logger.error(f"Failed to log audit event: {str(e)}")
             return False
             
+    async def flush(self) -> None:
+        """Seal the open batch and index all queued audit events now."""
+        self._seal_batch()
+        await self.sink.flush()
+            
     async def verify_event_integrity(self, event_id: str) -> bool:
         """Verify the integrity of an audit event."""
         try:
@@ -232,41 +277,233 @@ class AuditLogger:
             if not result["hits"]["hits"]:
                 return False
                 
-            event_doc = result["hits"]["hits"][0]["_source"]
-            
-            # Recreate event object
-            event = AuditEvent(
-                event_id=event_doc["event_id"],
-                event_type=AuditEventType(event_doc["event_type"]),
-                severity=AuditEventSeverity(event_doc["severity"]),
-                timestamp=datetime.fromisoformat(event_doc["timestamp"]),
-                user_id=event_doc["user_id"],
-                action=event_doc["action"],
-                resource=event_doc["resource"],
-                details=event_doc["details"],
-                ip_address=event_doc["ip_address"],
-                user_agent=event_doc["user_agent"],
-                session_id=event_doc["session_id"],
-                correlation_id=event_doc["correlation_id"],
-                metadata=event_doc["metadata"]
-            )
-            
             # Generate hash and compare
-            expected_hash = self._generate_hash(event)
-            return expected_hash == event_doc["hash"]
+            return self._verify_document(result["hits"]["hits"][0]["_source"])
             
         except Exception as e:
             logger.error(f"Failed to verify event integrity: {str(e)}")
             return False
             
+    async def verify_range(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        workers: Optional[int] = None,
+        page_size: int = 1000
+    ) -> Dict[str, Any]:
+        """Verify every chained audit event logged between two times.
+        
+        Checkpoints overlapping the range are streamed first, then each
+        chain's events are streamed with search_after and verified batch by
+        batch in a process pool. Events logged after a chain's last
+        checkpoint are checked for hashes and chain links only.
+        
+        Args:
+            workers: Process pool size; 0 verifies in the event loop
+            page_size: Documents fetched per search request
+            
+        Returns:
+            Counts, throughput and the first batch that failed verification
+        """
+        started = time.perf_counter()
+        report = {
+            "verified": True,
+            "events": 0,
+            "batches": 0,
+            "unsealed_events": 0,
+            "first_tampered_batch": None
+        }
+        if workers is None:
+            workers = os.cpu_count() or 1
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+        in_flight = deque()
+        max_in_flight = 2 * max(workers, 1)
+        loop = asyncio.get_running_loop()
+        
+        def record_failure(label: Dict[str, Any], reason: str) -> None:
+            # Results arrive out of order; keep the earliest batch in chain order
+            report["verified"] = False
+            first = report["first_tampered_batch"]
+            key = (label["chain_id"], label["first_sequence"])
+            if first is None or key < (first["chain_id"], first["first_sequence"]):
+                report["first_tampered_batch"] = {**label, "reason": reason}
+                
+        async def collect() -> None:
+            label, future = in_flight.popleft()
+            reason = await future
+            if reason:
+                record_failure(label, reason)
+                
+        async def submit(checkpoint: Optional[Dict[str, Any]], events: List[Dict[str, Any]]) -> None:
+            source = checkpoint or {"chain_id": events[0].get("chain_id"), "batch": None}
+            label = {
+                "chain_id": source["chain_id"],
+                "batch": source["batch"],
+                "first_sequence": source.get("first_sequence", events[0].get("sequence") if events else None),
+                "last_sequence": source.get("last_sequence", events[-1].get("sequence") if events else None)
+            }
+            if pool:
+                future = loop.run_in_executor(pool, verify_batch, self.secret_key, checkpoint, events)
+            else:
+                future = loop.create_future()
+                future.set_result(verify_batch(self.secret_key, checkpoint, events))
+            in_flight.append((label, future))
+            report["events"] += len(events)
+            if checkpoint:
+                report["batches"] += 1
+            else:
+                report["unsealed_events"] += len(events)
+            if len(in_flight) >= max_in_flight:
+                await collect()
+                
+        try:
+            # Group overlapping checkpoints by chain
+            checkpoints: Dict[str, List[Dict[str, Any]]] = {}
+            async for checkpoint in self._scan(
+                "audit-checkpoints-*",
+                {"bool": {"filter": [
+                    {"range": {"first_timestamp": {"lte": end_time.isoformat()}}},
+                    {"range": {"last_timestamp": {"gte": start_time.isoformat()}}}
+                ]}},
+                [{"chain_id": "asc"}, {"first_sequence": "asc"}],
+                page_size
+            ):
+                checkpoints.setdefault(checkpoint["chain_id"], []).append(checkpoint)
+                
+            for chain_id, chain_checkpoints in checkpoints.items():
+                # Consecutive checkpoints must link up
+                for prev, checkpoint in zip(chain_checkpoints, chain_checkpoints[1:]):
+                    if (
+                        checkpoint["first_sequence"] == prev["last_sequence"] + 1
+                        and checkpoint["prev_chain_hash"] != prev["chain_hash"]
+                    ):
+                        record_failure(
+                            {key: checkpoint[key] for key in ("chain_id", "batch", "first_sequence", "last_sequence")},
+                            "checkpoint does not follow the previous batch"
+                        )
+                        
+                # Stream the chain's events, cutting them at checkpoint bounds
+                position = 0
+                batch_events = []
+                async for event in self._scan(
+                    "audit-logs-*",
+                    {"bool": {"filter": [
+                        {"term": {"chain_id": chain_id}},
+                        {"range": {"sequence": {
+                            "gte": chain_checkpoints[0]["first_sequence"],
+                            "lte": chain_checkpoints[-1]["last_sequence"]
+                        }}}
+                    ]}},
+                    [{"sequence": "asc"}],
+                    page_size
+                ):
+                    while (
+                        position < len(chain_checkpoints)
+                        and event["sequence"] > chain_checkpoints[position]["last_sequence"]
+                    ):
+                        await submit(chain_checkpoints[position], batch_events)
+                        batch_events = []
+                        position += 1
+                    if position < len(chain_checkpoints) and event["sequence"] >= chain_checkpoints[position]["first_sequence"]:
+                        batch_events.append(event)
+                while position < len(chain_checkpoints):
+                    await submit(chain_checkpoints[position], batch_events)
+                    batch_events = []
+                    position += 1
+                    
+            # Events in the range that no checkpoint covers yet
+            unsealed = []
+            tails = {
+                chain_id: (chain_checkpoints[-1]["last_sequence"], chain_checkpoints[-1]["chain_hash"])
+                for chain_id, chain_checkpoints in checkpoints.items()
+            }
+            async for event in self._scan(
+                "audit-logs-*",
+                {"bool": {
+                    "filter": [
+                        {"exists": {"field": "sequence"}},
+                        {"range": {"timestamp": {"gte": start_time.isoformat(), "lte": end_time.isoformat()}}}
+                    ],
+                    "must_not": [
+                        {"bool": {"filter": [
+                            {"term": {"chain_id": chain_id}},
+                            {"range": {"sequence": {"lte": chain_checkpoints[-1]["last_sequence"]}}}
+                        ]}}
+                        for chain_id, chain_checkpoints in checkpoints.items()
+                    ]
+                }},
+                [{"chain_id": "asc"}, {"sequence": "asc"}],
+                page_size
+            ):
+                if unsealed and (event["chain_id"] != unsealed[-1]["chain_id"] or len(unsealed) >= page_size):
+                    await submit(None, unsealed)
+                    unsealed = []
+                    
+                # Links inside a chunk are checked with it; check the link into it here
+                tail = tails.get(event["chain_id"])
+                if (
+                    not unsealed and tail
+                    and event["sequence"] == tail[0] + 1 and event.get("prev_hash") != tail[1]
+                ):
+                    record_failure(
+                        {"chain_id": event["chain_id"], "batch": None,
+                         "first_sequence": event["sequence"], "last_sequence": event["sequence"]},
+                        f"chain broken at sequence {event['sequence']}"
+                    )
+                tails[event["chain_id"]] = (event["sequence"], event.get("hash"))
+                unsealed.append(event)
+            if unsealed:
+                await submit(None, unsealed)
+                
+            while in_flight:
+                await collect()
+                
+        except Exception as e:
+            logger.error(f"Failed to verify audit range: {str(e)}")
+            report["verified"] = False
+            report["error"] = str(e)
+            
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+            if pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                
+        elapsed = time.perf_counter() - started
+        report["elapsed_seconds"] = round(elapsed, 3)
+        report["events_per_second"] = round(report["events"] / elapsed, 1) if elapsed > 0 else 0.0
+        return report
+        
+    async def _scan(
+        self,
+        index: str,
+        query: Dict[str, Any],
+        sort: List[Dict[str, str]],
+        page_size: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream matching documents in sort order using search_after."""
+        search_after = None
+        while True:
+            body = {"query": query, "sort": sort, "size": page_size}
+            if search_after is not None:
+                body["search_after"] = search_after
+            result = await self.es.search(index=index, body=body)
+            
+            hits = result["hits"]["hits"]
+            for hit in hits:
+                yield hit["_source"]
+            if len(hits) < page_size:
+                return
+            search_after = hits[-1]["sort"]
+            
     async def _enforce_retention_policy(self) -> None:
         """Enforce retention policy for audit logs."""
         try:
             # Calculate cutoff date
             cutoff_date = datetime.now() - timedelta(days=self.retention_days)
             
-            # Get all audit log indices
-            indices = await self.es.indices.get_alias(name="audit-logs-*")
+            # Get all audit log and checkpoint indices
+            indices = await self.es.indices.get_alias(name="audit-logs-*,audit-checkpoints-*")
             
             for index_name in indices:
                 # Check index date
@@ -346,8 +583,8 @@ class AuditLogger:
             for hit in result["hits"]["hits"]:
                 event = hit["_source"]
                 
-                # Verify event integrity
-                if not await self.verify_event_integrity(event["event_id"]):
+                # Verify event integrity against its stored hash
+                if not self._verify_document(event):
                     logger.warning(f"Event integrity check failed: {event['event_id']}")
                     continue
                     
@@ -442,5 +679,7 @@ class AuditLogger:
             return {}
             
     async def close(self) -> None:
-        """Close connections and cleanup."""
+        """Seal the open batch, flush queued events, close connections and cleanup."""
+        self._seal_batch()
+        await self.sink.close()
         await self.es.close() 
\ No newline at end of file
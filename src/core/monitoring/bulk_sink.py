@@ -0,0 +1,288 @@
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+from collections import deque
+from enum import Enum
+from pathlib import Path
+import logging
+import asyncio
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+class OverflowPolicy(Enum):
+    """What to do with new documents when the sink queue is full."""
+    DROP_NEWEST = "drop_newest"
+    DROP_OLDEST = "drop_oldest"
+    SPILL = "spill"
+
+@dataclass
+class BulkSinkConfig:
+    """Configuration for a buffered bulk index sink."""
+    max_batch_size: int = 500
+    max_batch_bytes: int = 5 * 1024 * 1024
+    flush_interval: float = 1.0
+    max_queue_size: int = 10000
+    overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+    spill_dir: Optional[str] = None
+    max_retries: int = 3
+    retry_backoff: float = 0.5
+
+@dataclass
+class BulkSinkStats:
+    """Counters describing what happened to submitted documents."""
+    submitted: int = 0
+    indexed: int = 0
+    failed: int = 0
+    dropped: int = 0
+    spilled: int = 0
+    replayed: int = 0
+    bulk_requests: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+def _json_default(value: Any) -> Any:
+    """Serialize values the JSON encoder does not handle natively."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+class BulkIndexSink:
+    """Buffered Elasticsearch writer that batches documents into _bulk requests.
+
+    ``submit`` only enqueues, so callers never wait on Elasticsearch. A
+    background task sends a batch whenever ``max_batch_size`` documents or
+    ``max_batch_bytes`` are buffered, or ``flush_interval`` elapses. When the
+    queue is full the overflow policy drops or spills documents to disk;
+    spilled documents are replayed once the queue has drained. Items rejected
+    with retryable statuses are retried with backoff, and a batch that still
+    cannot be delivered is spilled when a spill directory is configured.
+    """
+
+    RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, es: Any, config: Optional[BulkSinkConfig] = None, name: str = "bulk"):
+        self.es = es
+        self.config = config or BulkSinkConfig()
+        self.name = name
+        self.stats = BulkSinkStats()
+
+        self._queue: deque = deque()
+        self._queued_bytes = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+        self._delivering = True
+
+        self._spill_path: Optional[Path] = None
+        if self.config.spill_dir:
+            self._spill_path = Path(self.config.spill_dir) / f"{name}-spill.jsonl"
+        elif self.config.overflow_policy == OverflowPolicy.SPILL:
+            logger.warning(f"Sink {name} has no spill directory; overflow will drop new documents")
+
+    def submit(self, index: str, document: Dict[str, Any]) -> bool:
+        """Queue a document for indexing without waiting for Elasticsearch.
+
+        Returns:
+            False if the document was dropped because the sink is full or closed
+        """
+        if self._closed:
+            self.stats.dropped += 1
+            return False
+
+        self.stats.submitted += 1
+        size = len(json.dumps(document, default=_json_default))
+
+        if len(self._queue) >= self.config.max_queue_size:
+            if not self._handle_overflow(index, document, size):
+                return False
+        else:
+            self._enqueue(index, document, size)
+
+        self._ensure_flusher()
+        if (
+            len(self._queue) >= self.config.max_batch_size
+            or self._queued_bytes >= self.config.max_batch_bytes
+        ):
+            self._wakeup.set()
+        return True
+
+    @property
+    def queue_size(self) -> int:
+        """Number of documents waiting to be sent."""
+        return len(self._queue)
+
+    async def flush(self) -> None:
+        """Send everything queued, and any spilled documents, right now."""
+        async with self._get_flush_lock():
+            while self._queue:
+                await self._send_batch(self._take_batch())
+            await self._replay_spill()
+
+    async def close(self) -> None:
+        """Stop accepting documents and flush what is buffered."""
+        self._closed = True
+        if self._flusher:
+            # Let the flusher finish its current batch and drain the queue
+            self._wakeup.set()
+            await self._flusher
+            self._flusher = None
+        await self.flush()
+
+    def _enqueue(self, index: str, document: Dict[str, Any], size: int) -> None:
+        self._queue.append((index, document, size))
+        self._queued_bytes += size
+
+    def _handle_overflow(self, index: str, document: Dict[str, Any], size: int) -> bool:
+        """Apply the overflow policy; returns False if the document was dropped."""
+        policy = self.config.overflow_policy
+        if policy == OverflowPolicy.DROP_OLDEST:
+            _, _, dropped_size = self._queue.popleft()
+            self._queued_bytes -= dropped_size
+            self.stats.dropped += 1
+            self._enqueue(index, document, size)
+            return True
+
+        if policy == OverflowPolicy.SPILL and self._spill_path:
+            self._spill([(index, document)])
+            return True
+
+        self.stats.dropped += 1
+        return False
+
+    def _ensure_flusher(self) -> None:
+        """Start the background flusher on first use."""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run())
+
+    def _get_flush_lock(self) -> asyncio.Lock:
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        return self._flush_lock
+
+    async def _run(self) -> None:
+        """Flush on size triggers or after the flush interval until closed."""
+        while not self._closed:
+            try:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.config.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+                async with self._get_flush_lock():
+                    while self._queue:
+                        await self._send_batch(self._take_batch())
+                    await self._replay_spill()
+
+            except Exception as e:
+                logger.error(f"Sink {self.name} flush failed: {str(e)}")
+
+    def _take_batch(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Pop up to one batch worth of documents from the queue."""
+        batch = []
+        batch_bytes = 0
+        while self._queue and len(batch) < self.config.max_batch_size:
+            index, document, size = self._queue[0]
+            if batch and batch_bytes + size > self.config.max_batch_bytes:
+                break
+            self._queue.popleft()
+            self._queued_bytes -= size
+            batch_bytes += size
+            batch.append((index, document))
+        return batch
+
+    async def _send_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Send a batch, retrying retryable failures, then spill or drop the rest."""
+        pending = batch
+        for attempt in range(self.config.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self.config.retry_backoff * (2 ** (attempt - 1)))
+            try:
+                pending = await self._bulk(pending)
+                self._delivering = True
+            except Exception as e:
+                logger.warning(f"Sink {self.name} bulk request failed: {str(e)}")
+            if not pending:
+                return
+
+        self._delivering = False
+        if self._spill_path:
+            self._spill(pending)
+        else:
+            self.stats.failed += len(pending)
+            logger.error(f"Sink {self.name} dropped {len(pending)} documents after retries")
+
+    async def _bulk(self, batch: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Send one _bulk request; returns the items worth retrying."""
+        operations = []
+        for index, document in batch:
+            operations.append({"index": {"_index": index}})
+            operations.append(document)
+
+        self.stats.bulk_requests += 1
+        response = await self.es.bulk(operations=operations)
+        if not response.get("errors"):
+            self.stats.indexed += len(batch)
+            return []
+
+        retry = []
+        for item, result in zip(batch, response.get("items", [])):
+            status = result.get("index", {}).get("status", 500)
+            if status < 300:
+                self.stats.indexed += 1
+            elif status in self.RETRYABLE_STATUSES:
+                retry.append(item)
+            else:
+                self.stats.failed += 1
+                logger.error(f"Sink {self.name} rejected document: {result['index'].get('error')}")
+        return retry
+
+    def _spill(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Append documents to the spill file."""
+        try:
+            self._spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._spill_path, "a") as f:
+                for index, document in items:
+                    f.write(json.dumps({"index": index, "document": document}, default=_json_default))
+                    f.write("\n")
+            self.stats.spilled += len(items)
+        except Exception as e:
+            self.stats.dropped += len(items)
+            logger.error(f"Sink {self.name} failed to spill documents: {str(e)}")
+
+    async def _replay_spill(self) -> None:
+        """Send spilled documents once the live queue is empty and Elasticsearch is reachable."""
+        if not self._spill_path or not self._delivering:
+            return
+        replay_path = self._spill_path.with_suffix(".replay")
+        if not self._spill_path.exists() and not replay_path.exists():
+            return
+
+        if not replay_path.exists():
+            os.replace(self._spill_path, replay_path)
+
+        batch = []
+        with open(replay_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                batch.append((entry["index"], entry["document"]))
+                if len(batch) >= self.config.max_batch_size:
+                    await self._send_replayed(batch)
+                    batch = []
+        if batch:
+            await self._send_replayed(batch)
+        replay_path.unlink()
+
+    async def _send_replayed(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        self.stats.replayed += len(batch)
+        await self._send_batch(batch)
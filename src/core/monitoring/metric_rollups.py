@@ -0,0 +1,324 @@
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime
+import copy
+import json
+import math
+import time
+import uuid
+
+# Rollup resolutions in seconds, finest first
+DEFAULT_RESOLUTIONS = {"1s": 1, "1m": 60, "1h": 3600}
+
+# How long the rollup indices of each resolution are kept, as an ILM age;
+# finer resolutions produce far more documents and are kept for less time
+DEFAULT_RETENTION = {"1s": "2d", "1m": "30d", "1h": "365d"}
+# Retention of resolutions missing from the retention mapping
+FALLBACK_RETENTION = "30d"
+
+# Index template for the rollup documents of MetricRollups.to_document:
+# identifiers and labels are keywords so term filters and sorts work on
+# them, and the serialized histogram is stored but not indexed. Installed
+# per resolution by rollup_index_template, so each has its own retention
+ROLLUP_INDEX_TEMPLATE = {
+    "name": "metrics-rollup",
+    "index_patterns": ["metrics-rollup-*"],
+    "template": {
+        "mappings": {
+            "dynamic_templates": [
+                {
+                    "labels_as_keywords": {
+                        "path_match": "labels.*",
+                        "mapping": {"type": "keyword"}
+                    }
+                }
+            ],
+            "properties": {
+                "rollup_id": {"type": "keyword"},
+                "name": {"type": "keyword"},
+                "resolution": {"type": "keyword"},
+                "labels": {"type": "object"},
+                "labels_key": {"type": "keyword"},
+                "bucket_start": {"type": "double"},
+                "timestamp": {"type": "date"},
+                "count": {"type": "long"},
+                "sum": {"type": "double"},
+                "min": {"type": "double"},
+                "max": {"type": "double"},
+                "histogram": {"type": "keyword", "index": False, "doc_values": False}
+            }
+        }
+    }
+}
+
+def rollup_index(resolution: str, bucket_start: float) -> str:
+    """Name of the daily rollup index holding a bucket.
+
+    ILM reads the index's origination date from the date suffix, so each
+    index is deleted once its day is older than the retention.
+    """
+    return f"metrics-rollup-{resolution}-{datetime.fromtimestamp(bucket_start).strftime('%Y.%m.%d')}"
+
+def rollup_lifecycle_policy(resolution: str, retention: str) -> Dict[str, Any]:
+    """ILM policy deleting a resolution's rollup indices after ``retention``."""
+    return {
+        "name": f"metrics-rollup-{resolution}",
+        "policy": {
+            "phases": {
+                "hot": {"min_age": "0ms", "actions": {}},
+                "delete": {"min_age": retention, "actions": {"delete": {}}}
+            }
+        }
+    }
+
+def rollup_index_template(resolution: str) -> Dict[str, Any]:
+    """ROLLUP_INDEX_TEMPLATE for one resolution's indices, under its ILM policy."""
+    template = copy.deepcopy(ROLLUP_INDEX_TEMPLATE)
+    template["name"] = f"metrics-rollup-{resolution}"
+    template["index_patterns"] = [f"metrics-rollup-{resolution}-*"]
+    template["template"]["settings"] = {
+        "index.lifecycle.name": f"metrics-rollup-{resolution}",
+        "index.lifecycle.parse_origination_date": True
+    }
+    return template
+
+class HdrHistogram:
+    """Mergeable histogram with bounded relative error.
+
+    Values fall into logarithmic buckets sized so any recorded value is
+    reported within ``10 ** -significant_figures`` of its true value, in the
+    spirit of HdrHistogram but for float values of either sign. Histograms
+    from different buckets or processes merge by adding counts.
+    """
+
+    def __init__(self, significant_figures: int = 2):
+        self.significant_figures = significant_figures
+        relative_error = 10 ** -significant_figures
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self.counts: Dict[int, int] = {}
+        self.negative_counts: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def record(self, value: float, count: int = 1) -> None:
+        """Record a value ``count`` times."""
+        self.count += count
+        if value == 0:
+            self.zero_count += count
+            return
+        counts = self.counts if value > 0 else self.negative_counts
+        index = math.ceil(math.log(abs(value)) / self._log_gamma)
+        counts[index] = counts.get(index, 0) + count
+
+    def merge(self, other: 'HdrHistogram') -> None:
+        """Add another histogram's counts into this one."""
+        if other.significant_figures != self.significant_figures:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        for index, count in other.negative_counts.items():
+            self.negative_counts[index] = self.negative_counts.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the value at quantile ``q`` (0 to 1)."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        buckets = (
+            [(-self._bucket_value(index), count) for index, count in sorted(self.negative_counts.items(), reverse=True)]
+            + [(0.0, self.zero_count)]
+            + [(self._bucket_value(index), count) for index, count in sorted(self.counts.items())]
+        )
+        for value, count in buckets:
+            seen += count
+            if count and seen > rank:
+                return value
+        return buckets[-1][0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "significant_figures": self.significant_figures,
+            "zero_count": self.zero_count,
+            "counts": {str(index): count for index, count in self.counts.items()},
+            "negative_counts": {str(index): count for index, count in self.negative_counts.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HdrHistogram':
+        histogram = cls(data.get("significant_figures", 2))
+        histogram.zero_count = data.get("zero_count", 0)
+        histogram.counts = {int(index): count for index, count in data.get("counts", {}).items()}
+        histogram.negative_counts = {int(index): count for index, count in data.get("negative_counts", {}).items()}
+        histogram.count = histogram.zero_count + sum(histogram.counts.values()) + sum(histogram.negative_counts.values())
+        return histogram
+
+    def _bucket_value(self, index: int) -> float:
+        """Representative value of a bucket, within the relative error of its members."""
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+@dataclass
+class RollupBucket:
+    """Aggregate of the samples of one series in one time bucket."""
+    count: int = 0
+    sum: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+    histogram: HdrHistogram = field(default_factory=HdrHistogram)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.histogram.record(value)
+
+    def merge(self, other: 'RollupBucket') -> None:
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.histogram.merge(other.histogram)
+
+    def summary(self) -> Dict[str, Any]:
+        """Statistics reported for the bucket by range queries."""
+        mean = self.sum / self.count if self.count else None
+        return {
+            "value": mean,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "mean": mean,
+            "p50": self.histogram.quantile(0.5),
+            "p95": self.histogram.quantile(0.95),
+            "p99": self.histogram.quantile(0.99)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "histogram": self.histogram.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RollupBucket':
+        histogram = data["histogram"]
+        if isinstance(histogram, str):
+            histogram = json.loads(histogram)
+        return cls(
+            count=data["count"],
+            sum=data["sum"],
+            min=data["min"],
+            max=data["max"],
+            histogram=HdrHistogram.from_dict(histogram)
+        )
+
+def labels_key(labels: Optional[Dict[str, str]]) -> str:
+    """Stable identifier for a label set."""
+    return json.dumps(labels or {}, sort_keys=True)
+
+def labels_match(labels: Dict[str, str], selector: Optional[Dict[str, str]]) -> bool:
+    """Whether a series' labels include every selected label."""
+    return all(labels.get(key) == value for key, value in (selector or {}).items())
+
+class MetricRollups:
+    """In-process aggregation of metric samples into fixed-resolution rollups.
+
+    Every sample updates one bucket per resolution. Buckets are drained once
+    closed (their interval plus ``lateness`` has passed) and indexed as
+    rollup documents; a sample arriving after its bucket was drained starts a
+    new partial bucket, which queries merge with the stored one.
+    """
+
+    def __init__(self, resolutions: Optional[Dict[str, int]] = None, lateness: float = 5.0):
+        self.resolutions = dict(sorted(
+            (resolutions or DEFAULT_RESOLUTIONS).items(), key=lambda item: item[1]
+        ))
+        self.lateness = lateness
+        # (resolution, name, labels key, bucket start) -> (labels, bucket)
+        self.buckets: Dict[Tuple[str, str, str, float], Tuple[Dict[str, str], RollupBucket]] = {}
+
+    def record(self, name: str, value: float, labels: Optional[Dict[str, str]], timestamp: float) -> None:
+        """Add a sample taken at a UNIX timestamp to every resolution."""
+        key = labels_key(labels)
+        for resolution, seconds in self.resolutions.items():
+            start = math.floor(timestamp / seconds) * seconds
+            entry = self.buckets.get((resolution, name, key, start))
+            if entry is None:
+                entry = (dict(labels or {}), RollupBucket())
+                self.buckets[(resolution, name, key, start)] = entry
+            entry[1].add(value)
+
+    def drain(self, now: Optional[float] = None, include_open: bool = False) -> List[Dict[str, Any]]:
+        """Remove closed buckets and return them as rollup documents."""
+        now = time.time() if now is None else now
+        documents = []
+        for key in list(self.buckets):
+            resolution, name, _, start = key
+            if include_open or start + self.resolutions[resolution] + self.lateness <= now:
+                labels, bucket = self.buckets.pop(key)
+                documents.append(self.to_document(resolution, name, labels, start, bucket))
+        return documents
+
+    def query(
+        self,
+        resolution: str,
+        name: str,
+        start: float,
+        end: float,
+        labels: Optional[Dict[str, str]] = None
+    ) -> List[Tuple[Dict[str, str], float, RollupBucket]]:
+        """Buckets not yet drained for a series within a time range."""
+        return [
+            (bucket_labels, bucket_start, bucket)
+            for (bucket_resolution, bucket_name, _, bucket_start), (bucket_labels, bucket) in self.buckets.items()
+            if bucket_resolution == resolution and bucket_name == name
+            and self.bucket_floor(resolution, start) <= bucket_start <= end
+            and labels_match(bucket_labels, labels)
+        ]
+
+    def pick_resolution(self, start: float, end: float, max_points: int) -> str:
+        """Coarsest resolution that still yields ``max_points`` points over the range.
+
+        Falls back to the finest resolution for ranges shorter than that.
+        """
+        step = (end - start) / max(max_points, 1)
+        adequate = [resolution for resolution, seconds in self.resolutions.items() if seconds <= step]
+        return adequate[-1] if adequate else next(iter(self.resolutions))
+
+    def bucket_floor(self, resolution: str, timestamp: float) -> float:
+        seconds = self.resolutions[resolution]
+        return math.floor(timestamp / seconds) * seconds
+
+    @staticmethod
+    def to_document(
+        resolution: str,
+        name: str,
+        labels: Dict[str, str],
+        start: float,
+        bucket: RollupBucket
+    ) -> Dict[str, Any]:
+        """Rollup document indexed for a bucket.
+
+        The histogram is stored as a JSON string so its bucket indices do
+        not become mapped fields.
+        """
+        document = {
+            "rollup_id": uuid.uuid4().hex,
+            "name": name,
+            "resolution": resolution,
+            "labels": labels,
+            "labels_key": labels_key(labels),
+            "bucket_start": start,
+            "timestamp": datetime.fromtimestamp(start).isoformat(),
+            **bucket.to_dict()
+        }
+        document["histogram"] = json.dumps(document["histogram"])
+        return document
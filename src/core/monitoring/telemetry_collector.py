@@ -1,9 +1,11 @@
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, AsyncIterator, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from collections import OrderedDict, deque
 import logging
 import time
 import json
+import random
 import prometheus_client as prom
 from prometheus_client import Counter, Histogram, Gauge, Summary
 import opentelemetry
@@ -19,6 +21,11 @@ from elasticsearch import AsyncElasticsearch
 import asyncio
 from contextlib import asynccontextmanager
 import uuid
+from .bulk_sink import BulkIndexSink, BulkSinkConfig
+from .metric_rollups import (
+    MetricRollups, RollupBucket, labels_key, rollup_index, rollup_index_template,
+    rollup_lifecycle_policy, DEFAULT_RETENTION, FALLBACK_RETENTION
+)
 
 logger = logging.getLogger(__name__)
 
@@ -50,7 +57,14 @@ class TelemetryCollector:
         elasticsearch_url: str = "http://localhost:9200",
         jaeger_host: str = "localhost",
         jaeger_port: int = 6831,
-        service_name: str = "api_gateway"
+        service_name: str = "api_gateway",
+        sink_config: Optional[BulkSinkConfig] = None,
+        rollup_resolutions: Optional[Dict[str, int]] = None,
+        rollup_flush_interval: float = 10.0,
+        rollup_retention: Optional[Dict[str, str]] = None,
+        raw_sample_rate: float = 0.0,
+        max_sessions: int = 10000,
+        max_session_actions: int = 1000
     ):
         # Initialize Prometheus metrics
         self.REQUEST_COUNT = Counter(
@@ -91,11 +105,22 @@ class TelemetryCollector:
         self._setup_tracing(jaeger_host, jaeger_port, service_name)
         self._setup_metrics()
         
-        # Initialize Elasticsearch client
+        # Initialize Elasticsearch client; documents are buffered and bulk indexed
         self.es = AsyncElasticsearch([elasticsearch_url])
+        self.sink = BulkIndexSink(self.es, sink_config, name="telemetry")
         
-        # Initialize session tracking
-        self.active_sessions: Dict[str, Dict[str, Any]] = {}
+        # Metrics are aggregated in process; only a sample of raw values is indexed
+        self.rollups = MetricRollups(rollup_resolutions)
+        self.rollup_flush_interval = rollup_flush_interval
+        self.rollup_retention = rollup_retention or DEFAULT_RETENTION
+        self.raw_sample_rate = raw_sample_rate
+        self._rollup_flusher: Optional[asyncio.Task] = None
+        self._index_template: Optional[asyncio.Task] = None
+        
+        # Initialize session tracking, least recently active sessions are evicted first
+        self.max_sessions = max_sessions
+        self.max_session_actions = max_session_actions
+        self.active_sessions: OrderedDict = OrderedDict()
         
     def _setup_tracing(self, jaeger_host: str, jaeger_port: int, service_name: str) -> None:
         """Setup distributed tracing."""
@@ -136,35 +161,32 @@ class TelemetryCollector:
     async def record_performance_metric(self, metric: PerformanceMetric) -> None:
         """Record a performance metric."""
         try:
-            # Update Prometheus metric
-            if metric.type == "gauge":
-                self.METRICS[metric.name].labels(**metric.labels).set(metric.value)
-            elif metric.type == "counter":
-                self.METRICS[metric.name].labels(**metric.labels).inc(metric.value)
-            elif metric.type == "histogram":
-                self.METRICS[metric.name].labels(**metric.labels).observe(metric.value)
-                
-            # Store in Elasticsearch
-            await self.es.index(
-                index=f"metrics-{datetime.now().strftime('%Y.%m')}",
-                document={
-                    "name": metric.name,
-                    "value": metric.value,
-                    "timestamp": metric.timestamp,
-                    "labels": metric.labels,
-                    "type": metric.type
-                }
-            )
+            # Aggregate into rollups, flushed periodically
+            self.rollups.record(metric.name, metric.value, metric.labels, metric.timestamp.timestamp())
+            self._ensure_rollup_flusher()
+            
+            # Queue a sample of raw values for Elasticsearch
+            if self.raw_sample_rate and random.random() < self.raw_sample_rate:
+                self.sink.submit(
+                    f"metrics-{datetime.now().strftime('%Y.%m')}",
+                    {
+                        "name": metric.name,
+                        "value": metric.value,
+                        "timestamp": metric.timestamp,
+                        "labels": metric.labels,
+                        "type": metric.type
+                    }
+                )
         except Exception as e:
             logger.error(f"Failed to record performance metric: {str(e)}")
             
     async def record_user_action(self, action: UserAction) -> None:
         """Record a user action."""
         try:
-            # Store in Elasticsearch
-            await self.es.index(
-                index=f"user-actions-{datetime.now().strftime('%Y.%m')}",
-                document={
+            # Queue for Elasticsearch
+            self.sink.submit(
+                f"user-actions-{datetime.now().strftime('%Y.%m')}",
+                {
                     "user_id": action.user_id,
                     "action": action.action,
                     "timestamp": action.timestamp,
@@ -175,14 +197,22 @@ class TelemetryCollector:
                 }
             )
             
-            # Update session tracking
-            if action.session_id not in self.active_sessions:
-                self.active_sessions[action.session_id] = {
+            # Update session tracking, keeping the most recent actions per session
+            session = self.active_sessions.get(action.session_id)
+            if session is None:
+                session = {
                     "user_id": action.user_id,
                     "start_time": action.timestamp,
-                    "actions": []
+                    "action_count": 0,
+                    "actions": deque(maxlen=self.max_session_actions)
                 }
-            self.active_sessions[action.session_id]["actions"].append(action)
+                self.active_sessions[action.session_id] = session
+                while len(self.active_sessions) > self.max_sessions:
+                    self.active_sessions.popitem(last=False)
+            else:
+                self.active_sessions.move_to_end(action.session_id)
+            session["actions"].append(action)
+            session["action_count"] += 1
             
         except Exception as e:
             logger.error(f"Failed to record user action: {str(e)}")
@@ -218,10 +248,10 @@ class TelemetryCollector:
                 error_type=error_type
             ).inc()
             
-            # Store in Elasticsearch
-            await self.es.index(
-                index=f"errors-{datetime.now().strftime('%Y.%m')}",
-                document={
+            # Queue for Elasticsearch
+            self.sink.submit(
+                f"errors-{datetime.now().strftime('%Y.%m')}",
+                {
                     "method": method,
                     "endpoint": endpoint,
                     "error_type": error_type,
@@ -244,7 +274,7 @@ class TelemetryCollector:
         return {
             "user_id": session["user_id"],
             "duration": (datetime.now() - session["start_time"]).total_seconds(),
-            "action_count": len(session["actions"]),
+            "action_count": session["action_count"],
             "actions": [
                 {
                     "action": action.action,
@@ -260,51 +290,136 @@ class TelemetryCollector:
         metric_name: str,
         start_time: datetime,
         end_time: datetime,
-        labels: Optional[Dict[str, str]] = None
+        labels: Optional[Dict[str, str]] = None,
+        resolution: Optional[str] = None,
+        max_points: int = 500
     ) -> List[Dict[str, Any]]:
-        """Get performance metrics for a time range."""
+        """Get performance metrics for a time range.
+        
+        Served from rollups at the coarsest resolution giving ``max_points``
+        points per series over the range, unless ``resolution`` is given.
+        Each point carries count, sum, min, max, mean and percentiles; its
+        ``value`` is the mean.
+        """
         try:
+            start = start_time.timestamp()
+            end = end_time.timestamp()
+            resolution = resolution or self.rollups.pick_resolution(start, end, max_points)
+            
             query = {
-                "query": {
-                    "bool": {
-                        "must": [
-                            {"term": {"name": metric_name}},
-                            {
-                                "range": {
-                                    "timestamp": {
-                                        "gte": start_time,
-                                        "lte": end_time
-                                    }
+                "bool": {
+                    "filter": [
+                        {"term": {"name": metric_name}},
+                        {"term": {"resolution": resolution}},
+                        {
+                            "range": {
+                                "bucket_start": {
+                                    "gte": self.rollups.bucket_floor(resolution, start),
+                                    "lte": end
                                 }
                             }
-                        ]
-                    }
+                        }
+                    ]
                 }
             }
             
             if labels:
                 for key, value in labels.items():
-                    query["query"]["bool"]["must"].append(
+                    query["bool"]["filter"].append(
                         {"term": {f"labels.{key}": value}}
                     )
                     
-            result = await self.es.search(
-                index=f"metrics-{datetime.now().strftime('%Y.%m')}",
-                body=query
-            )
+            # Merge stored rollups with buckets not flushed yet
+            points: Dict[Tuple[str, float], Tuple[Dict[str, str], RollupBucket]] = {}
             
+            def add(point_labels: Dict[str, str], bucket_start: float, bucket: RollupBucket) -> None:
+                key = (labels_key(point_labels), bucket_start)
+                if key in points:
+                    points[key][1].merge(bucket)
+                else:
+                    points[key] = (point_labels, bucket)
+                    
+            async for doc in self._scan(f"metrics-rollup-{resolution}-*", query):
+                add(doc["labels"], doc["bucket_start"], RollupBucket.from_dict(doc))
+            for point_labels, bucket_start, bucket in self.rollups.query(resolution, metric_name, start, end, labels):
+                merged = RollupBucket()
+                merged.merge(bucket)
+                add(point_labels, bucket_start, merged)
+                
             return [
                 {
-                    "value": hit["_source"]["value"],
-                    "timestamp": hit["_source"]["timestamp"],
-                    "labels": hit["_source"]["labels"]
+                    "timestamp": datetime.fromtimestamp(bucket_start),
+                    "labels": point_labels,
+                    "resolution": resolution,
+                    **bucket.summary()
                 }
-                for hit in result["hits"]["hits"]
+                for (_, bucket_start), (point_labels, bucket) in sorted(
+                    points.items(), key=lambda item: (item[0][1], item[0][0])
+                )
             ]
         except Exception as e:
             logger.error(f"Failed to get performance metrics: {str(e)}")
             return []
             
+    async def _scan(self, index: str, query: Dict[str, Any], page_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """Stream matching rollup documents using search_after."""
+        search_after = None
+        while True:
+            body = {
+                "query": query,
+                "sort": [{"bucket_start": "asc"}, {"rollup_id": "asc"}],
+                "size": page_size
+            }
+            if search_after is not None:
+                body["search_after"] = search_after
+            result = await self.es.search(index=index, body=body)
+            
+            hits = result["hits"]["hits"]
+            for hit in hits:
+                yield hit["_source"]
+            if len(hits) < page_size:
+                return
+            search_after = hits[-1]["sort"]
+            
+    async def initialize(self) -> None:
+        """Install the lifecycle policies and index templates for rollup indices."""
+        await self._ensure_index_template()
+        
+    def _ensure_index_template(self) -> asyncio.Task:
+        """Install the rollup index templates once, before any rollup index is created."""
+        if self._index_template is None:
+            self._index_template = asyncio.create_task(self._put_index_template())
+        return self._index_template
+        
+    async def _put_index_template(self) -> None:
+        try:
+            for resolution in self.rollups.resolutions:
+                retention = self.rollup_retention.get(resolution, FALLBACK_RETENTION)
+                await self.es.ilm.put_lifecycle(**rollup_lifecycle_policy(resolution, retention))
+                await self.es.indices.put_index_template(**rollup_index_template(resolution))
+        except Exception as e:
+            logger.error(f"Failed to install metric rollup index templates: {str(e)}")
+            
+    def _ensure_rollup_flusher(self) -> None:
+        """Start the periodic rollup flush on first use."""
+        self._ensure_index_template()
+        if self._rollup_flusher is None or self._rollup_flusher.done():
+            self._rollup_flusher = asyncio.create_task(self._flush_rollups_periodically())
+            
+    async def _flush_rollups_periodically(self) -> None:
+        await self._ensure_index_template()
+        while True:
+            await asyncio.sleep(self.rollup_flush_interval)
+            try:
+                self._flush_rollups()
+            except Exception as e:
+                logger.error(f"Failed to flush metric rollups: {str(e)}")
+                
+    def _flush_rollups(self, include_open: bool = False) -> None:
+        """Queue closed rollup buckets, or all of them, for indexing."""
+        for doc in self.rollups.drain(include_open=include_open):
+            self.sink.submit(rollup_index(doc["resolution"], doc["bucket_start"]), doc)
+            
     async def cleanup_old_sessions(self, max_age_hours: int = 24) -> None:
         """Clean up old sessions."""
         cutoff = datetime.now() - timedelta(hours=max_age_hours)
@@ -316,7 +431,19 @@ class TelemetryCollector:
         for session_id in expired_sessions:
             del self.active_sessions[session_id]
             
+    async def flush(self) -> None:
+        """Index all rollups and queued telemetry documents now."""
+        await self._ensure_index_template()
+        self._flush_rollups(include_open=True)
+        await self.sink.flush()
+            
     async def close(self) -> None:
-        """Close connections and cleanup."""
+        """Flush rollups and queued documents, close connections and cleanup."""
+        if self._rollup_flusher:
+            self._rollup_flusher.cancel()
+            self._rollup_flusher = None
+        await self._ensure_index_template()
+        self._flush_rollups(include_open=True)
+        await self.sink.close()
         await self.es.close()
         # Add any other cleanup tasks here 
\ No newline at end of file
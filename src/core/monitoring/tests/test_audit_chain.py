@@ -0,0 +1,240 @@
+import pytest
+import bisect
+import fnmatch
+import json
+from datetime import datetime, timedelta
+from ..audit_chain import AuditChain, event_hash, merkle_root, verify_batch
+from ..audit_logging import AuditLogger, AuditEvent, AuditEventType, AuditEventSeverity
+from ..bulk_sink import BulkSinkConfig
+
+class FakeIndices:
+    async def create(self, index, body=None, ignore=None):
+        return {"acknowledged": True}
+
+    async def get_alias(self, name):
+        return {}
+
+    async def delete(self, index):
+        return {"acknowledged": True}
+
+class InMemoryElasticsearch:
+    """Local Elasticsearch stand-in supporting _bulk and sorted search_after queries.
+
+    Sorted results are cached per query until the next bulk write, so paging
+    through a large index stays cheap.
+    """
+
+    def __init__(self):
+        self.indices = FakeIndices()
+        self.docs = {}
+        self.searches = 0
+        self._results = {}
+
+    async def bulk(self, operations):
+        self._results.clear()
+        items = []
+        for action, document in zip(operations[::2], operations[1::2]):
+            self.docs.setdefault(action["index"]["_index"], []).append(document)
+            items.append({"index": {"status": 201}})
+        return {"errors": False, "items": items}
+
+    async def search(self, index, body):
+        self.searches += 1
+        sort_fields = [next(iter(field)) for field in body.get("sort", [])]
+        key = json.dumps([index, body["query"], sort_fields], sort_keys=True)
+        if key not in self._results:
+            hits = sorted(
+                (
+                    ([doc.get(field) for field in sort_fields], doc)
+                    for name, docs in self.docs.items() if fnmatch.fnmatch(name, index)
+                    for doc in docs if self._matches(doc, body["query"])
+                ),
+                key=lambda hit: hit[0]
+            )
+            self._results[key] = ([sort for sort, _ in hits], [doc for _, doc in hits])
+        sorts, docs = self._results[key]
+
+        start = bisect.bisect_right(sorts, body["search_after"]) if "search_after" in body else 0
+        end = start + body.get("size", 10)
+        return {"hits": {"hits": [
+            {"_source": dict(doc), "sort": sort}
+            for sort, doc in zip(sorts[start:end], docs[start:end])
+        ]}}
+
+    async def close(self):
+        pass
+
+    def _matches(self, doc, query):
+        if "term" in query:
+            field, value = next(iter(query["term"].items()))
+            return doc.get(field) == value
+        if "exists" in query:
+            return doc.get(query["exists"]["field"]) is not None
+        if "range" in query:
+            field, bounds = next(iter(query["range"].items()))
+            value = doc.get(field)
+            if value is None:
+                return False
+            return ("gte" not in bounds or value >= bounds["gte"]) and ("lte" not in bounds or value <= bounds["lte"])
+        if "bool" in query:
+            clauses = query["bool"]
+            return (
+                all(self._matches(doc, clause) for clause in clauses.get("filter", []))
+                and not any(self._matches(doc, clause) for clause in clauses.get("must_not", []))
+            )
+        return True
+
+def make_event(i: int, timestamp: datetime) -> AuditEvent:
+    """Create an audit event."""
+    return AuditEvent(
+        event_id=f"event_{i}",
+        event_type=AuditEventType.DATA_ACCESS,
+        severity=AuditEventSeverity.INFO,
+        timestamp=timestamp,
+        user_id=f"user_{i % 7}",
+        action="read",
+        resource=f"/api/items/{i}",
+        details={"status_code": 200},
+        ip_address="127.0.0.1",
+        user_agent="pytest",
+        session_id=None,
+        correlation_id=None,
+        metadata={}
+    )
+
+async def make_logger(tmp_path, es, batch_size: int = 10) -> AuditLogger:
+    """Create an audit logger writing to an in-memory Elasticsearch."""
+    audit_logger = AuditLogger(
+        config_dir=str(tmp_path),
+        secret_key="test-secret",
+        sink_config=BulkSinkConfig(flush_interval=60),
+        checkpoint_batch_size=batch_size
+    )
+    await audit_logger.es.close()
+    audit_logger.es = es
+    audit_logger.sink.es = es
+    return audit_logger
+
+async def log_events(audit_logger: AuditLogger, count: int, start: datetime):
+    for i in range(count):
+        await audit_logger.log_event(make_event(i, start + timedelta(seconds=i)))
+    await audit_logger.flush()
+
+def test_chain_links_events_and_seals_batches():
+    """Test events are linked and every full batch yields a checkpoint."""
+    chain = AuditChain("secret", batch_size=3)
+    docs = [{"event_id": str(i), "timestamp": f"2024-01-01T00:00:0{i}"} for i in range(4)]
+    checkpoints = [chain.append(doc) for doc in docs]
+
+    assert checkpoints[:2] == [None, None]
+    assert checkpoints[2]["first_sequence"] == 0
+    assert checkpoints[2]["last_sequence"] == 2
+    assert checkpoints[2]["merkle_root"] == merkle_root([doc["hash"] for doc in docs[:3]])
+    assert docs[1]["prev_hash"] == docs[0]["hash"]
+    assert all(doc["hash"] == event_hash("secret", doc) for doc in docs)
+
+    tail = chain.seal()
+    assert tail["prev_chain_hash"] == checkpoints[2]["chain_hash"]
+    assert chain.seal() is None
+
+    assert verify_batch("secret", checkpoints[2], docs[:3]) is None
+    assert verify_batch("secret", tail, docs[3:]) is None
+
+def test_verify_batch_detects_tampering():
+    """Test edits, deletions and forged checkpoints are reported."""
+    chain = AuditChain("secret", batch_size=4)
+    docs = [{"event_id": str(i), "timestamp": "2024-01-01T00:00:00", "action": "read"} for i in range(4)]
+    checkpoint = [chain.append(doc) for doc in docs][-1]
+
+    edited = [dict(doc) for doc in docs]
+    edited[2]["action"] = "delete"
+    assert verify_batch("secret", checkpoint, edited) == "event 2 hash mismatch"
+
+    assert verify_batch("secret", checkpoint, docs[:1] + docs[2:]) == "events missing from the chain"
+
+    forged = dict(checkpoint, merkle_root="0" * 64)
+    assert verify_batch("secret", forged, docs) == "checkpoint signature mismatch"
+    assert verify_batch("other-secret", checkpoint, docs) == "checkpoint signature mismatch"
+
+def test_unchained_documents_still_verify():
+    """Test documents indexed before chaining keep their original hash."""
+    doc = {"event_id": "legacy", "timestamp": "2024-01-01T00:00:00", "action": "read"}
+    doc["hash"] = event_hash("secret", doc)
+    assert "sequence" not in doc
+    assert event_hash("secret", doc) == doc["hash"]
+
+@pytest.mark.asyncio
+async def test_checkpoints_are_written_with_events(tmp_path):
+    """Test checkpoints travel in the same bulk stream as their events."""
+    es = InMemoryElasticsearch()
+    audit_logger = await make_logger(tmp_path, es, batch_size=10)
+    await log_events(audit_logger, 25, datetime(2024, 1, 1))
+
+    events = [doc for name, docs in es.docs.items() if name.startswith("audit-logs-") for doc in docs]
+    checkpoints = [doc for name, docs in es.docs.items() if name.startswith("audit-checkpoints-") for doc in docs]
+    assert len(events) == 25
+    assert [(cp["first_sequence"], cp["last_sequence"]) for cp in checkpoints] == [(0, 9), (10, 19), (20, 24)]
+    assert await audit_logger.verify_event_integrity("event_3")
+    await audit_logger.close()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [0, 2])
+async def test_verify_range_passes_intact_log(tmp_path, workers):
+    """Test an untouched range verifies without per-event lookups."""
+    es = InMemoryElasticsearch()
+    audit_logger = await make_logger(tmp_path, es, batch_size=10)
+    start = datetime(2024, 1, 1)
+    await log_events(audit_logger, 95, start)
+
+    es.searches = 0
+    report = await audit_logger.verify_range(start, start + timedelta(days=1), workers=workers, page_size=20)
+
+    assert report["verified"]
+    assert report["events"] == 95
+    assert report["batches"] == 10
+    assert report["first_tampered_batch"] is None
+    assert report["events_per_second"] > 0
+    assert es.searches < 20
+    await audit_logger.close()
+
+@pytest.mark.asyncio
+async def test_verify_range_reports_first_tampered_batch(tmp_path):
+    """Test the earliest tampered batch is reported."""
+    es = InMemoryElasticsearch()
+    audit_logger = await make_logger(tmp_path, es, batch_size=10)
+    start = datetime(2024, 1, 1)
+    await log_events(audit_logger, 50, start)
+
+    events = next(docs for name, docs in es.docs.items() if name.startswith("audit-logs-"))
+    events[42]["action"] = "delete"
+    events.remove(events[17])
+
+    report = await audit_logger.verify_range(start, start + timedelta(days=1), workers=2)
+
+    assert not report["verified"]
+    assert report["first_tampered_batch"]["batch"] == 1
+    assert report["first_tampered_batch"]["first_sequence"] == 10
+    assert report["first_tampered_batch"]["reason"] == "events missing from the chain"
+    await audit_logger.close()
+
+@pytest.mark.asyncio
+async def test_verify_range_checks_unsealed_events(tmp_path):
+    """Test events after the last checkpoint are verified by their chain links."""
+    es = InMemoryElasticsearch()
+    audit_logger = await make_logger(tmp_path, es, batch_size=10)
+    start = datetime(2024, 1, 1)
+    for i in range(15):
+        await audit_logger.log_event(make_event(i, start + timedelta(seconds=i)))
+    await audit_logger.sink.flush()
+
+    report = await audit_logger.verify_range(start, start + timedelta(days=1), workers=0)
+    assert report["verified"]
+    assert report["batches"] == 1
+    assert report["unsealed_events"] == 5
+
+    events = next(docs for name, docs in es.docs.items() if name.startswith("audit-logs-"))
+    events[12]["prev_hash"] = "forged"
+    report = await audit_logger.verify_range(start, start + timedelta(days=1), workers=0)
+    assert not report["verified"]
+    assert report["first_tampered_batch"]["batch"] is None
+    await audit_logger.close()
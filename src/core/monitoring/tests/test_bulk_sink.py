@@ -0,0 +1,162 @@
+import pytest
+import asyncio
+import json
+from datetime import datetime
+from ..bulk_sink import BulkIndexSink, BulkSinkConfig, OverflowPolicy
+
+class FakeElasticsearch:
+    """Local stand-in for the Elasticsearch _bulk API."""
+
+    def __init__(self, fail_requests: int = 0, item_statuses=None, delay: float = 0.0):
+        self.requests = []
+        self.documents = []
+        self.fail_requests = fail_requests
+        self.item_statuses = list(item_statuses or [])
+        self.delay = delay
+
+    async def bulk(self, operations):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail_requests:
+            self.fail_requests -= 1
+            raise ConnectionError("elasticsearch unavailable")
+
+        pairs = list(zip(operations[::2], operations[1::2]))
+        self.requests.append(pairs)
+        items = []
+        for action, document in pairs:
+            status = self.item_statuses.pop(0) if self.item_statuses else 201
+            if status < 300:
+                self.documents.append((action["index"]["_index"], document))
+            items.append({"index": {"status": status, "error": None if status < 300 else "rejected"}})
+        return {"errors": any(item["index"]["status"] >= 300 for item in items), "items": items}
+
+@pytest.mark.asyncio
+async def test_submit_batches_by_size():
+    """Test documents are sent in _bulk requests of at most max_batch_size."""
+    es = FakeElasticsearch()
+    sink = BulkIndexSink(es, BulkSinkConfig(max_batch_size=10, flush_interval=60))
+
+    for i in range(25):
+        assert sink.submit("logs", {"i": i})
+    await asyncio.sleep(0.01)
+
+    # Filling a batch wakes the flusher long before the flush interval
+    assert [len(request) for request in es.requests] == [10, 10, 5]
+    assert [doc["i"] for _, doc in es.documents] == list(range(25))
+    await sink.close()
+
+@pytest.mark.asyncio
+async def test_flush_interval_sends_partial_batch():
+    """Test a partial batch is sent once the flush interval elapses."""
+    es = FakeElasticsearch()
+    sink = BulkIndexSink(es, BulkSinkConfig(max_batch_size=100, flush_interval=0.05))
+
+    sink.submit("logs", {"i": 1})
+    await asyncio.sleep(0.15)
+
+    assert len(es.documents) == 1
+    await sink.close()
+
+@pytest.mark.asyncio
+async def test_submit_does_not_wait_for_elasticsearch():
+    """Test callers return immediately even when Elasticsearch is slow."""
+    es = FakeElasticsearch(delay=0.5)
+    sink = BulkIndexSink(es, BulkSinkConfig(max_batch_size=1, flush_interval=60))
+
+    start = asyncio.get_running_loop().time()
+    for i in range(100):
+        sink.submit("logs", {"i": i})
+    assert asyncio.get_running_loop().time() - start < 0.1
+
+    sink.config.max_batch_size = 100
+    await sink.close()
+    assert len(es.documents) == 100
+
+@pytest.mark.asyncio
+async def test_drop_policies_bound_the_queue():
+    """Test full queues drop the newest or oldest documents."""
+    es = FakeElasticsearch()
+    newest = BulkIndexSink(es, BulkSinkConfig(
+        max_queue_size=3, max_batch_size=100, flush_interval=60,
+        overflow_policy=OverflowPolicy.DROP_NEWEST
+    ))
+    results = [newest.submit("logs", {"i": i}) for i in range(5)]
+    assert results == [True, True, True, False, False]
+    assert newest.stats.dropped == 2
+    await newest.close()
+    assert [doc["i"] for _, doc in es.documents] == [0, 1, 2]
+
+    es = FakeElasticsearch()
+    oldest = BulkIndexSink(es, BulkSinkConfig(
+        max_queue_size=3, max_batch_size=100, flush_interval=60,
+        overflow_policy=OverflowPolicy.DROP_OLDEST
+    ))
+    for i in range(5):
+        oldest.submit("logs", {"i": i})
+    await oldest.close()
+    assert [doc["i"] for _, doc in es.documents] == [2, 3, 4]
+
+@pytest.mark.asyncio
+async def test_overflow_spills_to_disk_and_replays(tmp_path):
+    """Test overflow is written to disk and indexed once the queue drains."""
+    es = FakeElasticsearch()
+    sink = BulkIndexSink(es, BulkSinkConfig(
+        max_queue_size=2, max_batch_size=100, flush_interval=60,
+        overflow_policy=OverflowPolicy.SPILL, spill_dir=str(tmp_path)
+    ))
+
+    for i in range(5):
+        assert sink.submit("audit", {"i": i, "timestamp": datetime(2024, 1, 1)})
+
+    spill_file = tmp_path / "bulk-spill.jsonl"
+    assert len(spill_file.read_text().splitlines()) == 3
+    assert sink.stats.spilled == 3
+
+    await sink.close()
+    assert sorted(doc["i"] for _, doc in es.documents) == [0, 1, 2, 3, 4]
+    assert sink.stats.replayed == 3
+    assert not list(tmp_path.iterdir())
+
+@pytest.mark.asyncio
+async def test_failed_requests_are_retried():
+    """Test connection failures and retryable item errors are retried."""
+    es = FakeElasticsearch(fail_requests=1, item_statuses=[201, 429, 201])
+    sink = BulkIndexSink(es, BulkSinkConfig(flush_interval=60, retry_backoff=0.01))
+
+    for i in range(3):
+        sink.submit("logs", {"i": i})
+    await sink.flush()
+
+    assert sorted(doc["i"] for _, doc in es.documents) == [0, 1, 2]
+    assert [len(request) for request in es.requests] == [3, 1]
+    assert sink.stats.indexed == 3
+    await sink.close()
+
+@pytest.mark.asyncio
+async def test_undeliverable_batches_spill(tmp_path):
+    """Test batches that exhaust their retries are kept on disk."""
+    es = FakeElasticsearch(fail_requests=10)
+    sink = BulkIndexSink(es, BulkSinkConfig(
+        flush_interval=60, max_retries=1, retry_backoff=0.01, spill_dir=str(tmp_path)
+    ), name="audit")
+
+    sink.submit("audit", {"i": 1})
+    await sink.flush()
+
+    lines = (tmp_path / "audit-spill.jsonl").read_text().splitlines()
+    assert json.loads(lines[0]) == {"index": "audit", "document": {"i": 1}}
+
+    # Once Elasticsearch recovers the spilled batch is delivered
+    es.fail_requests = 0
+    sink.submit("audit", {"i": 2})
+    await sink.close()
+    assert sorted(doc["i"] for _, doc in es.documents) == [1, 2]
+
+@pytest.mark.asyncio
+async def test_closed_sink_rejects_documents():
+    """Test documents submitted after close are dropped."""
+    sink = BulkIndexSink(FakeElasticsearch())
+    await sink.close()
+    assert not sink.submit("logs", {"i": 1})
+    assert sink.stats.dropped == 1
@@ -0,0 +1,109 @@
+import pytest
+import random
+from ..metric_rollups import (
+    HdrHistogram, MetricRollups, RollupBucket, ROLLUP_INDEX_TEMPLATE, DEFAULT_RETENTION,
+    rollup_index, rollup_index_template, rollup_lifecycle_policy
+)
+
+def test_histogram_quantiles_within_relative_error():
+    """Test percentiles are reported within the configured precision."""
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(0, 1) for _ in range(10000))
+    histogram = HdrHistogram(significant_figures=2)
+    for value in values:
+        histogram.record(value)
+
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(histogram.quantile(q) - exact) / exact < 0.02
+
+def test_histogram_merge_and_serialization():
+    """Test histograms merge and survive a round trip through a document."""
+    first = HdrHistogram()
+    second = HdrHistogram()
+    for value in (-5.0, 0.0, 1.0, 2.0):
+        first.record(value)
+    for value in (3.0, 400.0):
+        second.record(value)
+    first.merge(second)
+
+    restored = HdrHistogram.from_dict(first.to_dict())
+    assert restored.count == 6
+    assert restored.quantile(0.0) == pytest.approx(-5.0, rel=0.01)
+    assert restored.quantile(1.0) == pytest.approx(400.0, rel=0.01)
+    assert restored.zero_count == 1
+
+def test_samples_roll_up_into_every_resolution():
+    """Test each sample updates its 1s, 1m and 1h buckets."""
+    rollups = MetricRollups()
+    for i in range(120):
+        rollups.record("latency", float(i), {"endpoint": "/a"}, 3600.0 + i)
+
+    assert len(rollups.query("1s", "latency", 3600, 3720)) == 120
+    minutes = rollups.query("1m", "latency", 3600, 3720)
+    assert [bucket.count for _, _, bucket in minutes] == [60, 60]
+    (labels, start, hour), = rollups.query("1h", "latency", 3600, 7199)
+    assert labels == {"endpoint": "/a"}
+    assert start == 3600
+    assert (hour.count, hour.min, hour.max, hour.sum) == (120, 0.0, 119.0, sum(range(120)))
+
+def test_drain_returns_only_closed_buckets():
+    """Test open buckets stay in memory until they close or are forced out."""
+    rollups = MetricRollups(lateness=5.0)
+    rollups.record("latency", 1.0, {}, 100.5)
+
+    documents = rollups.drain(now=106.0)
+    assert [doc["resolution"] for doc in documents] == ["1s"]
+    assert RollupBucket.from_dict(documents[0]).count == 1
+
+    documents = rollups.drain(now=106.0, include_open=True)
+    assert sorted(doc["resolution"] for doc in documents) == ["1h", "1m"]
+    assert not rollups.buckets
+
+def test_query_filters_by_labels():
+    """Test label selectors match series carrying those labels."""
+    rollups = MetricRollups()
+    rollups.record("requests", 1.0, {"endpoint": "/a", "method": "GET"}, 60.0)
+    rollups.record("requests", 1.0, {"endpoint": "/b", "method": "GET"}, 60.0)
+
+    assert len(rollups.query("1m", "requests", 0, 120, {"method": "GET"})) == 2
+    assert len(rollups.query("1m", "requests", 0, 120, {"endpoint": "/a"})) == 1
+
+def test_pick_resolution_uses_coarsest_adequate():
+    """Test the query path picks the coarsest resolution meeting the point budget."""
+    rollups = MetricRollups()
+    assert rollups.pick_resolution(0, 300, max_points=500) == "1s"
+    assert rollups.pick_resolution(0, 86400, max_points=500) == "1m"
+    assert rollups.pick_resolution(0, 30 * 86400, max_points=500) == "1h"
+    assert rollups.pick_resolution(0, 86400, max_points=100000) == "1s"
+
+def test_index_template_maps_every_rollup_field():
+    """Test rollup documents are mapped as keywords and numbers, not dynamic text."""
+    rollups = MetricRollups()
+    rollups.record("http.request.latency", 1.0, {"endpoint": "/a"}, 100.0)
+    document = rollups.drain(include_open=True)[0]
+    mappings = ROLLUP_INDEX_TEMPLATE["template"]["mappings"]
+
+    assert set(document) <= set(mappings["properties"])
+    for field in ("rollup_id", "name", "resolution", "labels_key"):
+        assert mappings["properties"][field]["type"] == "keyword"
+    assert mappings["properties"]["bucket_start"]["type"] == "double"
+    assert mappings["properties"]["histogram"]["index"] is False
+    labels, = mappings["dynamic_templates"]
+    assert labels["labels_as_keywords"] == {"path_match": "labels.*", "mapping": {"type": "keyword"}}
+
+def test_rollup_indices_expire_per_resolution():
+    """Test each resolution's daily rollup indices are deleted by its own ILM policy."""
+    assert rollup_index("1s", 0.0).startswith("metrics-rollup-1s-")
+    assert rollup_index("1s", 0.0) != rollup_index("1s", 86400.0)
+
+    policy = rollup_lifecycle_policy("1s", DEFAULT_RETENTION["1s"])
+    assert policy["name"] == "metrics-rollup-1s"
+    assert policy["policy"]["phases"]["delete"] == {"min_age": "2d", "actions": {"delete": {}}}
+
+    template = rollup_index_template("1s")
+    assert template["index_patterns"] == ["metrics-rollup-1s-*"]
+    assert template["template"]["settings"]["index.lifecycle.name"] == policy["name"]
+    assert template["template"]["settings"]["index.lifecycle.parse_origination_date"] is True
+    assert template["template"]["mappings"] == ROLLUP_INDEX_TEMPLATE["template"]["mappings"]
+    assert "settings" not in ROLLUP_INDEX_TEMPLATE["template"]
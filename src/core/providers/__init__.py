@@ -2,6 +2,7 @@ from .config import ProviderConfig, Capability
 from .response import ProviderResponse, TextResponse, ImageResponse, PlanResponse
 from .registry import ProviderRegistry
 from .router import ModelRouter
+from .streaming import StreamMetrics, StreamStats
 from .adapters import (
     BaseProviderAdapter,
     OpenAIAdapter,
@@ -23,6 +24,8 @@ __all__ = [
     'PlanResponse',
     'ProviderRegistry',
     'ModelRouter',
+    'StreamMetrics',
+    'StreamStats',
     'BaseProviderAdapter',
     'OpenAIAdapter',
     'AnthropicAdapter',
@@ -1,7 +1,7 @@
 import logging
 import json
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, AsyncIterator, Iterator
 import base64
 from .base import BaseProviderAdapter, AuthenticationError
 from ..config import Capability, ProviderConfig
@@ -78,6 +78,77 @@ class AnthropicAdapter(BaseProviderAdapter):
             logger.error(f"Anthropic text generation error: {str(e)}")
             raise
     
+    def _stream_text_impl(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Stream text using Anthropic's API"""
+        try:
+            model = kwargs.get('model', self.config.model or 'claude-3-sonnet-20240229')
+            
+            request = {
+                "model": model,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": kwargs.get('temperature', 0.7),
+                "max_tokens": kwargs.get('max_tokens', 1000),
+                "top_p": kwargs.get('top_p', 1.0),
+            }
+            if 'system_message' in kwargs:
+                request["system"] = kwargs['system_message']
+            if kwargs.get('stop'):
+                request["stop_sequences"] = kwargs['stop']
+            
+            with self.client.messages.stream(**request) as stream:
+                for text in stream.text_stream:
+                    yield text
+            
+        except Exception as e:
+            logger.error(f"Anthropic text streaming error: {str(e)}")
+            raise
+    
+    async def stream_code_completion(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 100,
+        temperature: float = 0.7,
+        top_p: float = 0.95,
+        stop_sequences: Optional[List[str]] = None
+    ) -> AsyncIterator[str]:
+        """Stream a code completion from Anthropic token by token"""
+        system_message = "You are an expert programmer. Continue the code exactly where it ends. Respond with code only."
+        if context:
+            system_message += f"\nContext: {json.dumps(context, default=str)}"
+        
+        async for chunk in self._stream_text(
+            prompt,
+            system_message=system_message,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            stop=stop_sequences
+        ):
+            yield chunk
+    
+    async def stream_plan(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        top_p: float = 0.95
+    ) -> AsyncIterator[str]:
+        """Stream a plan from Anthropic token by token"""
+        system_message = "You are an expert project planner. Create a detailed, structured plan to achieve the given task."
+        if context:
+            system_message += f"\nContext: {json.dumps(context, default=str)}"
+        
+        async for chunk in self._stream_text(
+            task,
+            system_message=system_message,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p
+        ):
+            yield chunk
+    
     def _generate_code_impl(self, spec: str, **kwargs) -> str:
         """Generate code using Anthropic's API"""
         try:
@@ -1,8 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, Union, List
+from typing import Dict, Any, Optional, Union, List, AsyncIterator, Iterator
 import logging
 from ..config import ProviderConfig, Capability
 from ..response import TextResponse, ImageResponse, PlanResponse
+from ..streaming import iterate_in_thread
 
 logger = logging.getLogger(__name__)
 
@@ -78,6 +79,58 @@ class BaseProviderAdapter(ABC):
         """Generate a plan for the given task"""
         pass
     
+    async def stream_code_completion(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 100,
+        temperature: float = 0.7,
+        top_p: float = 0.95,
+        stop_sequences: Optional[List[str]] = None
+    ) -> AsyncIterator[str]:
+        """Stream a code completion as it is generated.
+        
+        Providers without native streaming yield the complete completion as a
+        single chunk.
+        """
+        yield await self.generate_code_completion(
+            prompt,
+            context=context,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            stop_sequences=stop_sequences
+        )
+    
+    async def stream_plan(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        top_p: float = 0.95
+    ) -> AsyncIterator[str]:
+        """Stream a plan as it is generated.
+        
+        Providers without native streaming yield the complete plan as a single
+        chunk.
+        """
+        yield await self.generate_plan(
+            task,
+            context=context,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p
+        )
+    
+    def _stream_text(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Stream text from the provider's blocking client without blocking the event loop"""
+        return iterate_in_thread(lambda: self._stream_text_impl(prompt, **kwargs))
+    
+    def _stream_text_impl(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Implementation of streamed text generation; override for native streaming"""
+        yield self._generate_text_impl(prompt, **kwargs)
+    
     def get_capability_score(self, capability: Capability) -> float:
         """Get the provider's score for a specific capability"""
         return self.config.capabilities.get(capability, 0.0)
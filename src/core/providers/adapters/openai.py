@@ -1,7 +1,7 @@
 import logging
 import json
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, AsyncIterator, Iterator
 import base64
 from .base import BaseProviderAdapter, AuthenticationError
 from ..config import Capability, ProviderConfig
@@ -86,6 +86,79 @@ class OpenAIAdapter(BaseProviderAdapter):
             logger.error(f"OpenAI text generation error: {str(e)}")
             raise
     
+    def _stream_text_impl(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Stream text using OpenAI's API"""
+        try:
+            model = kwargs.get('model', self.config.model or 'gpt-3.5-turbo')
+            
+            messages = [{"role": "user", "content": prompt}]
+            if 'system_message' in kwargs:
+                messages.insert(0, {"role": "system", "content": kwargs['system_message']})
+            
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=kwargs.get('temperature', 0.7),
+                max_tokens=kwargs.get('max_tokens', 1000),
+                top_p=kwargs.get('top_p', 1.0),
+                stop=kwargs.get('stop'),
+                stream=True,
+            )
+            
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            
+        except Exception as e:
+            logger.error(f"OpenAI text streaming error: {str(e)}")
+            raise
+    
+    async def stream_code_completion(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 100,
+        temperature: float = 0.7,
+        top_p: float = 0.95,
+        stop_sequences: Optional[List[str]] = None
+    ) -> AsyncIterator[str]:
+        """Stream a code completion from OpenAI token by token"""
+        system_message = "You are an expert programmer. Continue the code exactly where it ends. Respond with code only."
+        if context:
+            system_message += f"\nContext: {json.dumps(context, default=str)}"
+        
+        async for chunk in self._stream_text(
+            prompt,
+            system_message=system_message,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            stop=stop_sequences
+        ):
+            yield chunk
+    
+    async def stream_plan(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        top_p: float = 0.95
+    ) -> AsyncIterator[str]:
+        """Stream a plan from OpenAI token by token"""
+        system_message = "You are an expert project planner. Create a detailed, structured plan to achieve the given task."
+        if context:
+            system_message += f"\nContext: {json.dumps(context, default=str)}"
+        
+        async for chunk in self._stream_text(
+            task,
+            system_message=system_message,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p
+        ):
+            yield chunk
+    
     def _generate_code_impl(self, spec: str, **kwargs) -> str:
         """Generate code using OpenAI's API"""
         try:
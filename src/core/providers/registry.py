@@ -148,6 +148,19 @@ class ProviderRegistry:
                 
         return self._adapter_instances[name]
     
+    def get_adapter(self, name: str) -> Optional[BaseProviderAdapter]:
+        """Get an initialized adapter by provider name"""
+        return self.get_provider(name)
+    
+    def get_providers_for_capability(self, capability: Capability) -> List[Tuple[str, float]]:
+        """List enabled providers supporting a capability, best score first"""
+        candidates = [
+            (name, config.capabilities[capability])
+            for name, config in self.providers.items()
+            if config.enabled and capability in config.capabilities
+        ]
+        return sorted(candidates, key=lambda item: item[1], reverse=True)
+    
     def list_providers(self) -> List[str]:
         """List all registered providers"""
         return list(self.providers.keys())
@@ -1,7 +1,8 @@
 import logging
-from typing import Dict, List, Any, Optional, TYPE_CHECKING
+from typing import Dict, List, Any, Optional, AsyncIterator, Callable, TYPE_CHECKING
 from .config import Capability
 from .response import ProviderResponse, TextResponse, ImageResponse, PlanResponse
+from .streaming import StreamMetrics, metered_stream
 
 if TYPE_CHECKING:
     from .registry import ProviderRegistry
@@ -14,6 +15,7 @@ class ModelRouter:
     
     def __init__(self, registry: 'ProviderRegistry'):
         self.registry = registry
+        self.stream_metrics = StreamMetrics()
     
     def route_text_generation(self, prompt: str, **kwargs) -> TextResponse:
         """Route a text generation request to the best provider"""
@@ -202,5 +204,68 @@ class ModelRouter:
             plan={},
             provider="none"
         )
-
-
+    
+    async def stream_code_completion(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Stream a code completion from the best provider"""
+        async for chunk in self._route_stream(
+            Capability.CODE_COMPLETION,
+            "code completion",
+            lambda adapter: adapter.stream_code_completion(prompt, **kwargs)
+        ):
+            yield chunk
+    
+    async def stream_plan(self, task: str, **kwargs) -> AsyncIterator[str]:
+        """Stream a plan from the best provider"""
+        async for chunk in self._route_stream(
+            Capability.PLANNING,
+            "planning",
+            lambda adapter: adapter.stream_plan(task, **kwargs)
+        ):
+            yield chunk
+    
+    def get_stream_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get time-to-first-token and tokens/sec metrics per provider"""
+        return self.stream_metrics.to_dict()
+    
+    async def _route_stream(
+        self,
+        capability: Capability,
+        description: str,
+        open_stream: Callable[['BaseProviderAdapter'], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """Stream from providers in order, falling back until one produces output.
+        
+        Once a provider has emitted a chunk the stream is committed to it, so a
+        later failure is raised to the caller rather than retried elsewhere.
+        """
+        providers = self.registry.get_providers_for_capability(capability)
+        
+        if not providers:
+            logger.error(f"No providers available for {description}")
+            raise RuntimeError(f"No providers available for {description}")
+        
+        errors = []
+        for provider_name, confidence in providers:
+            adapter = self.registry.get_adapter(provider_name)
+            if not adapter:
+                continue
+            
+            logger.info(f"Attempting streamed {description} with provider: {provider_name}")
+            started = False
+            try:
+                async for chunk in metered_stream(provider_name, open_stream(adapter), self.stream_metrics):
+                    started = True
+                    yield chunk
+                logger.info(f"Successfully streamed {description} with provider: {provider_name}")
+                return
+            
+            except Exception as e:
+                if started:
+                    raise
+                logger.error(f"Error with provider {provider_name}: {str(e)}")
+                errors.append(f"{provider_name}: {str(e)}")
+        
+        # If we get here, all providers failed
+        error_msg = "All providers failed: " + "; ".join(errors)
+        logger.error(error_msg)
+        raise RuntimeError(error_msg)
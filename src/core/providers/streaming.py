@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, AsyncIterator, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_STREAM_DONE = object()
+
+# A producer holds its thread for the stream's whole life, waits on a slow
+# consumer included, so producers get threads of their own instead of the
+# default executor that asyncio.to_thread and file search share
+MAX_STREAM_THREADS = int(os.getenv("MAX_STREAM_THREADS", "64"))
+stream_executor = ThreadPoolExecutor(max_workers=MAX_STREAM_THREADS, thread_name_prefix="stream-producer")
+
+class _StreamFailure:
+    """Wraps an exception raised by a producer thread"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+async def iterate_in_thread(
+    factory: Callable[[], Iterable[str]],
+    max_buffered: int = 64,
+    executor: Optional[Executor] = None
+) -> AsyncIterator[str]:
+    """Consume a blocking iterator on a worker thread as an async iterator.
+
+    At most ``max_buffered`` chunks are held between the producer thread and
+    the consumer, so a slow consumer stalls the provider stream instead of
+    buffering it in memory. Closing the async iterator stops the producer.
+    Producers run on ``stream_executor`` unless another executor is given;
+    once its threads are all busy, new streams wait for one to finish.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    slots = threading.Semaphore(max_buffered)
+    stopped = threading.Event()
+
+    def deliver(item: Any) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            stopped.set()  # Event loop closed underneath us
+
+    def produce() -> None:
+        try:
+            for chunk in factory():
+                while not slots.acquire(timeout=0.1):
+                    if stopped.is_set():
+                        return
+                if stopped.is_set():
+                    return
+                deliver(chunk)
+        except BaseException as e:
+            deliver(_StreamFailure(e))
+        finally:
+            deliver(_STREAM_DONE)
+
+    loop.run_in_executor(executor or stream_executor, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_DONE:
+                break
+            if isinstance(item, _StreamFailure):
+                raise item.error
+            slots.release()
+            yield item
+    finally:
+        stopped.set()
+
+@dataclass
+class StreamStats:
+    """Streaming statistics for a single provider"""
+    streams: int = 0
+    failures: int = 0
+    tokens: int = 0
+    total_duration: float = 0.0
+    total_time_to_first_token: float = 0.0
+    last_time_to_first_token: Optional[float] = None
+
+    @property
+    def average_time_to_first_token(self) -> float:
+        """Mean time to first token in seconds"""
+        return self.total_time_to_first_token / self.streams if self.streams else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Token throughput across all completed streams"""
+        return self.tokens / self.total_duration if self.total_duration > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "streams": self.streams,
+            "failures": self.failures,
+            "tokens": self.tokens,
+            "average_time_to_first_token": self.average_time_to_first_token,
+            "last_time_to_first_token": self.last_time_to_first_token,
+            "tokens_per_second": self.tokens_per_second
+        }
+
+class StreamMetrics:
+    """Records time-to-first-token and throughput per provider.
+
+    Each streamed chunk is counted as one token; provider streaming APIs emit
+    roughly one token per delta.
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, StreamStats] = {}
+
+    def get_stats(self, provider: str) -> StreamStats:
+        """Get (creating if needed) the statistics for a provider"""
+        if provider not in self._stats:
+            self._stats[provider] = StreamStats()
+        return self._stats[provider]
+
+    def record_stream(
+        self,
+        provider: str,
+        time_to_first_token: Optional[float],
+        tokens: int,
+        duration: float
+    ) -> None:
+        """Record a completed stream"""
+        stats = self.get_stats(provider)
+        stats.streams += 1
+        stats.tokens += tokens
+        stats.total_duration += duration
+        if time_to_first_token is not None:
+            stats.total_time_to_first_token += time_to_first_token
+            stats.last_time_to_first_token = time_to_first_token
+
+    def record_failure(self, provider: str) -> None:
+        """Record a stream that failed"""
+        self.get_stats(provider).failures += 1
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.to_dict() for name, stats in self._stats.items()}
+
+async def metered_stream(
+    provider: str,
+    stream: AsyncIterator[str],
+    metrics: StreamMetrics
+) -> AsyncIterator[str]:
+    """Pass a provider stream through while recording its metrics"""
+    start = time.monotonic()
+    first_token_at: Optional[float] = None
+    tokens = 0
+    try:
+        async for chunk in stream:
+            if first_token_at is None:
+                first_token_at = time.monotonic()
+            tokens += 1
+            yield chunk
+    except Exception:
+        metrics.record_failure(provider)
+        raise
+
+    metrics.record_stream(
+        provider,
+        first_token_at - start if first_token_at is not None else None,
+        tokens,
+        time.monotonic() - start
+    )
@@ -13,7 +13,6 @@ class GoLanguageServer(LanguageServer):
         """Get diagnostics for Go code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 3,
             "method": "textDocument/diagnostic",
             "params": {
                 "textDocument": {
@@ -24,15 +23,13 @@ class GoLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {}).get("diagnostics", [])
 
     async def format(self, code: str, file_path: Optional[str] = None, style_config: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Format Go code using gofmt."""
         request = {
             "jsonrpc": "2.0",
-            "id": 4,
             "method": "textDocument/formatting",
             "params": {
                 "textDocument": {
@@ -47,8 +44,7 @@ class GoLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         changes = response.get("result", [])
         return code, changes
 
@@ -56,7 +52,6 @@ class GoLanguageServer(LanguageServer):
         """Get completion suggestions for Go code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 5,
             "method": "textDocument/completion",
             "params": {
                 "textDocument": {
@@ -69,8 +64,7 @@ class GoLanguageServer(LanguageServer):
                 "context": context or {}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("items", []), result.get("triggerCharacters", [])
 
@@ -78,7 +72,6 @@ class GoLanguageServer(LanguageServer):
         """Get hover information for Go code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 6,
             "method": "textDocument/hover",
             "params": {
                 "textDocument": {
@@ -90,8 +83,7 @@ class GoLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("contents", []), result.get("range")
 
@@ -99,7 +91,6 @@ class GoLanguageServer(LanguageServer):
         """Find definition locations for Go code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 7,
             "method": "textDocument/definition",
             "params": {
                 "textDocument": {
@@ -111,8 +102,7 @@ class GoLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", [])
         return result, result[0].get("uri") if result else None
 
@@ -120,7 +110,6 @@ class GoLanguageServer(LanguageServer):
         """Find references to a symbol."""
         request = {
             "jsonrpc": "2.0",
-            "id": 8,
             "method": "textDocument/references",
             "params": {
                 "textDocument": {
@@ -133,15 +122,13 @@ class GoLanguageServer(LanguageServer):
                 "context": {"includeDeclaration": True}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", [])
 
     async def rename(self, code: str, position: Dict[str, int], new_name: str) -> Dict[str, Any]:
         """Rename a symbol."""
         request = {
             "jsonrpc": "2.0",
-            "id": 9,
             "method": "textDocument/rename",
             "params": {
                 "textDocument": {
@@ -154,8 +141,7 @@ class GoLanguageServer(LanguageServer):
                 "newName": new_name
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {})
 
 class RustLanguageServer(LanguageServer):
@@ -170,7 +156,6 @@ class RustLanguageServer(LanguageServer):
         """Get diagnostics for Rust code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 3,
             "method": "textDocument/diagnostic",
             "params": {
                 "textDocument": {
@@ -181,15 +166,13 @@ class RustLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {}).get("diagnostics", [])
 
     async def format(self, code: str, file_path: Optional[str] = None, style_config: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Format Rust code using rustfmt."""
         request = {
             "jsonrpc": "2.0",
-            "id": 4,
             "method": "textDocument/formatting",
             "params": {
                 "textDocument": {
@@ -204,8 +187,7 @@ class RustLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         changes = response.get("result", [])
         return code, changes
 
@@ -213,7 +195,6 @@ class RustLanguageServer(LanguageServer):
         """Get completion suggestions for Rust code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 5,
             "method": "textDocument/completion",
             "params": {
                 "textDocument": {
@@ -226,8 +207,7 @@ class RustLanguageServer(LanguageServer):
                 "context": context or {}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("items", []), result.get("triggerCharacters", [])
 
@@ -235,7 +215,6 @@ class RustLanguageServer(LanguageServer):
         """Get hover information for Rust code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 6,
             "method": "textDocument/hover",
             "params": {
                 "textDocument": {
@@ -247,8 +226,7 @@ class RustLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("contents", []), result.get("range")
 
@@ -256,7 +234,6 @@ class RustLanguageServer(LanguageServer):
         """Find definition locations for Rust code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 7,
             "method": "textDocument/definition",
             "params": {
                 "textDocument": {
@@ -268,8 +245,7 @@ class RustLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", [])
         return result, result[0].get("uri") if result else None
 
@@ -277,7 +253,6 @@ class RustLanguageServer(LanguageServer):
         """Get code actions for the given range."""
         request = {
             "jsonrpc": "2.0",
-            "id": 8,
             "method": "textDocument/codeAction",
             "params": {
                 "textDocument": {
@@ -290,8 +265,7 @@ class RustLanguageServer(LanguageServer):
                 "context": context
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", [])
 
 class CppLanguageServer(LanguageServer):
@@ -306,7 +280,6 @@ class CppLanguageServer(LanguageServer):
         """Get diagnostics for C++ code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 3,
             "method": "textDocument/diagnostic",
             "params": {
                 "textDocument": {
@@ -317,15 +290,13 @@ class CppLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {}).get("diagnostics", [])
 
     async def format(self, code: str, file_path: Optional[str] = None, style_config: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Format C++ code using clang-format."""
         request = {
             "jsonrpc": "2.0",
-            "id": 4,
             "method": "textDocument/formatting",
             "params": {
                 "textDocument": {
@@ -340,8 +311,7 @@ class CppLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         changes = response.get("result", [])
         return code, changes
 
@@ -349,7 +319,6 @@ class CppLanguageServer(LanguageServer):
         """Get completion suggestions for C++ code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 5,
             "method": "textDocument/completion",
             "params": {
                 "textDocument": {
@@ -362,8 +331,7 @@ class CppLanguageServer(LanguageServer):
                 "context": context or {}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("items", []), result.get("triggerCharacters", [])
 
@@ -371,7 +339,6 @@ class CppLanguageServer(LanguageServer):
         """Get hover information for C++ code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 6,
             "method": "textDocument/hover",
             "params": {
                 "textDocument": {
@@ -383,8 +350,7 @@ class CppLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("contents", []), result.get("range")
 
@@ -392,7 +358,6 @@ class CppLanguageServer(LanguageServer):
         """Find definition locations for C++ code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 7,
             "method": "textDocument/definition",
             "params": {
                 "textDocument": {
@@ -404,8 +369,7 @@ class CppLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", [])
         return result, result[0].get("uri") if result else None
 
@@ -413,7 +377,6 @@ class CppLanguageServer(LanguageServer):
         """Get semantic highlighting information."""
         request = {
             "jsonrpc": "2.0",
-            "id": 8,
             "method": "textDocument/semanticHighlighting",
             "params": {
                 "textDocument": {
@@ -424,8 +387,7 @@ class CppLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", [])
 
 class PHPLanguageServer(LanguageServer):
@@ -440,7 +402,6 @@ class PHPLanguageServer(LanguageServer):
         """Get diagnostics for PHP code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 3,
             "method": "textDocument/diagnostic",
             "params": {
                 "textDocument": {
@@ -451,15 +412,13 @@ class PHPLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {}).get("diagnostics", [])
 
     async def format(self, code: str, file_path: Optional[str] = None, style_config: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Format PHP code using PHP_CodeSniffer."""
         request = {
             "jsonrpc": "2.0",
-            "id": 4,
             "method": "textDocument/formatting",
             "params": {
                 "textDocument": {
@@ -474,8 +433,7 @@ class PHPLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         changes = response.get("result", [])
         return code, changes
 
@@ -483,7 +441,6 @@ class PHPLanguageServer(LanguageServer):
         """Get completion suggestions for PHP code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 5,
             "method": "textDocument/completion",
             "params": {
                 "textDocument": {
@@ -496,8 +453,7 @@ class PHPLanguageServer(LanguageServer):
                 "context": context or {}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("items", []), result.get("triggerCharacters", [])
 
@@ -505,7 +461,6 @@ class PHPLanguageServer(LanguageServer):
         """Get hover information for PHP code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 6,
             "method": "textDocument/hover",
             "params": {
                 "textDocument": {
@@ -517,8 +472,7 @@ class PHPLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("contents", []), result.get("range")
 
@@ -526,7 +480,6 @@ class PHPLanguageServer(LanguageServer):
         """Find definition locations for PHP code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 7,
             "method": "textDocument/definition",
             "params": {
                 "textDocument": {
@@ -538,8 +491,7 @@ class PHPLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", [])
         return result, result[0].get("uri") if result else None
 
@@ -547,12 +499,10 @@ class PHPLanguageServer(LanguageServer):
         """Search for symbols in the workspace."""
         request = {
             "jsonrpc": "2.0",
-            "id": 8,
             "method": "workspace/symbol",
             "params": {
                 "query": query
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", []) 
\ No newline at end of file
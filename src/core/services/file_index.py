@@ -0,0 +1,243 @@
+import os
+import re
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Iterator, Iterable, DefaultDict
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+# Directories never worth searching: VCS data, dependency caches and, when
+# the root is /, the kernel's virtual filesystems
+EXCLUDED_DIRS = {'.git', '.hg', '.svn', 'node_modules', '__pycache__', '.venv', 'venv', '.mypy_cache', '.pytest_cache', '.tox'}
+EXCLUDED_ROOTS = {'/proc', '/sys', '/dev', '/run'}
+
+# Bytes read to tell text from binary
+SNIFF_SIZE = 8192
+
+def trigrams(text: str) -> Set[str]:
+    """Case-folded three-character substrings of text."""
+    text = text.lower()
+    return set(map(''.join, zip(text, text[1:], text[2:])))
+
+def required_literals(pattern: str, use_regex: bool) -> List[str]:
+    """Literal strings every match of the pattern must contain.
+
+    For a regular expression these are the runs of plain characters outside
+    alternations, character classes and repeats; an empty list means the
+    pattern constrains nothing an index can use.
+    """
+    if not use_regex:
+        return [pattern]
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return []
+
+    literals: List[str] = []
+    run: List[str] = []
+
+    def walk(items):
+        for op, value in items:
+            if op is sre_parse.LITERAL:
+                run.append(chr(value))
+            elif op is sre_parse.SUBPATTERN:
+                # A group is matched exactly once, so its literals are required
+                walk(value[-1])
+            else:
+                if run:
+                    literals.append("".join(run))
+                    run.clear()
+
+    walk(parsed)
+    if run:
+        literals.append("".join(run))
+    return [literal for literal in literals if len(literal) >= 3]
+
+@dataclass(frozen=True)
+class IndexedFile:
+    path: str
+    size: int
+    mtime: float
+    mtime_ns: int
+    is_text: bool
+    # Whether the content decoded as UTF-8; other encodings need detecting before a search reads them
+    utf8: bool
+    # False when the content is not in the postings, e.g. too large: the file is a candidate for every search
+    indexed: bool
+
+class FileIndex:
+    """Trigram index of the text files under a root directory.
+
+    ``candidates`` narrows a search to the files containing every trigram
+    of the pattern's required literals, plus the files too large to index,
+    using the size and modification time recorded at indexing so filters
+    on them need no ``stat``. ``build`` walks the tree once; afterwards
+    ``update``, ``remove`` and ``move`` keep it current, called by the
+    ``FileWatcher`` as the filesystem changes. Until the first build
+    finishes, ``ready`` is False and searches should walk the tree.
+
+    Entries keep no trigrams of their own, so the postings are the only
+    copy; forgetting files sweeps the postings once for all of them.
+    """
+
+    def __init__(self, root: str, max_file_size: int = 512 * 1024, max_indexed_files: int = 200000):
+        self.root = os.path.abspath(root)
+        self.max_file_size = max_file_size
+        self.max_indexed_files = max_indexed_files
+        self.files: Dict[str, IndexedFile] = {}
+        self.postings: DefaultDict[str, Set[str]] = defaultdict(set)
+        self.unindexed: Set[str] = set()
+        self.indexed_count = 0
+        self.ready = False
+        self._lock = threading.RLock()
+
+    def walk(self, top: Optional[str] = None) -> Iterator[os.DirEntry]:
+        """Regular files under top, skipping excluded directories and not following symlinks."""
+        stack = [top or self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in EXCLUDED_DIRS and entry.path not in EXCLUDED_ROOTS:
+                                    stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                yield entry
+                        except OSError:
+                            continue
+            except OSError as e:
+                logger.debug(f"Skipping {directory}: {str(e)}")
+
+    def build(self) -> None:
+        """Index every file under the root."""
+        count = 0
+        for entry in self.walk():
+            self.update(entry.path, entry.stat(follow_symlinks=False))
+            count += 1
+        self.ready = True
+        logger.info(f"Indexed {self.indexed_count} of {count} files under {self.root}")
+
+    def update(self, path: str, stat: Optional[os.stat_result] = None) -> None:
+        """Index a created or modified file; unchanged files are not read again."""
+        path = os.path.abspath(path)
+        if self._excluded(path):
+            return
+        try:
+            stat = stat or os.stat(path, follow_symlinks=False)
+        except OSError:
+            self.remove(path)
+            return
+        existing = self.files.get(path)
+        if existing and existing.size == stat.st_size and existing.mtime_ns == stat.st_mtime_ns:
+            return
+
+        is_text, utf8, grams = True, True, None
+        try:
+            with open(path, 'rb') as f:
+                head = f.read(SNIFF_SIZE)
+                is_text = b'\x00' not in head
+                indexable = is_text and stat.st_size <= self.max_file_size and (
+                    existing is not None and existing.indexed or self.indexed_count < self.max_indexed_files
+                )
+                if indexable:
+                    data = head + f.read()
+                    try:
+                        grams = trigrams(data.decode('utf-8'))
+                    except UnicodeDecodeError:
+                        utf8 = False
+        except OSError as e:
+            logger.debug(f"Cannot index {path}: {str(e)}")
+            self.remove(path)
+            return
+
+        entry = IndexedFile(path, stat.st_size, stat.st_mtime, stat.st_mtime_ns, is_text, utf8, grams is not None)
+        with self._lock:
+            self._drop(path)
+            self.files[path] = entry
+            if grams is None:
+                self.unindexed.add(path)
+            else:
+                self.indexed_count += 1
+                postings = self.postings
+                for gram in grams:
+                    postings[gram].add(path)
+
+    def add_tree(self, path: str) -> None:
+        """Index a directory created or moved under the root."""
+        for entry in self.walk(os.path.abspath(path)):
+            self.update(entry.path, entry.stat(follow_symlinks=False))
+
+    def remove(self, path: str) -> None:
+        """Forget a deleted file, or every file under a deleted directory."""
+        path = os.path.abspath(path)
+        with self._lock:
+            if path in self.files:
+                self._drop(path)
+                return
+            prefix = path.rstrip(os.sep) + os.sep
+            self._drop(*[child for child in self.files if child.startswith(prefix)])
+
+    def move(self, source: str, destination: str) -> None:
+        """Follow a rename of a file or directory."""
+        self.remove(source)
+        if os.path.isdir(destination):
+            self.add_tree(destination)
+        else:
+            self.update(destination)
+
+    def candidates(self, literals: Iterable[str]) -> List[IndexedFile]:
+        """Files that may contain all of the literals."""
+        required = set()
+        for literal in literals:
+            required |= trigrams(literal)
+        with self._lock:
+            if not required:
+                return list(self.files.values())
+            paths: Optional[Set[str]] = None
+            # Intersect the rarest trigrams first
+            for gram in sorted(required, key=lambda gram: len(self.postings.get(gram, ()))):
+                posting = self.postings.get(gram)
+                if not posting:
+                    paths = set()
+                    break
+                paths = set(posting) if paths is None else paths & posting
+                if not paths:
+                    break
+            paths = (paths or set()) | self.unindexed
+            return [self.files[path] for path in paths]
+
+    def _excluded(self, path: str) -> bool:
+        if path != self.root and not path.startswith(self.root.rstrip(os.sep) + os.sep):
+            return True
+        parts = path[len(self.root):].split(os.sep)
+        return any(part in EXCLUDED_DIRS for part in parts[:-1]) or any(
+            path == root or path.startswith(root + os.sep) for root in EXCLUDED_ROOTS if root.startswith(self.root)
+        )
+
+    def _drop(self, *paths: str) -> None:
+        dropped = set()
+        for path in paths:
+            entry = self.files.pop(path, None)
+            if entry is None:
+                continue
+            self.unindexed.discard(path)
+            if entry.indexed:
+                self.indexed_count -= 1
+                dropped.add(path)
+        if not dropped:
+            return
+        for gram in list(self.postings):
+            posting = self.postings[gram]
+            # Intersecting walks the smaller set, so a large drop costs no more per trigram than a small one
+            posting -= posting & dropped
+            if not posting:
+                del self.postings[gram]
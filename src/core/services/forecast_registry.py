@@ -0,0 +1,196 @@
+from typing import Dict, List, Optional, Any, Tuple, Hashable, Union
+from dataclasses import dataclass, field
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+import threading
+import logging
+import time
+import numpy as np
+from .usage_history import UsageSeries, as_usage_series
+
+class Forecaster:
+    """Base class for forecasting models kept by a ForecastModelRegistry.
+
+    ``fit`` trains a model from scratch. ``update`` brings a fitted model up
+    to date with samples added since it was fitted; it refits by default, and
+    models that can warm-start or train incrementally override it. Both
+    receive the full history as arrays and return the model together with
+    the forecast it produces, which the registry serves until the next fit.
+    """
+
+    name = "forecaster"
+
+    def fit(self, timestamps: np.ndarray, values: np.ndarray) -> Tuple[Any, Dict[str, Any]]:
+        raise NotImplementedError
+
+    def update(self,
+               model: Any,
+               timestamps: np.ndarray,
+               values: np.ndarray,
+               new_samples: int) -> Tuple[Any, Dict[str, Any]]:
+        return self.fit(timestamps, values)
+
+@dataclass
+class ForecastEntry:
+    """Latest fitted model and forecast for one series."""
+    model: Any = None
+    forecast: Dict[str, Any] = field(default_factory=dict)
+    # Timestamp of the newest sample the model has seen
+    fitted_through: Optional[np.datetime64] = None
+    # Timestamp of the newest sample submitted for fitting, ahead of fitted_through while a job runs
+    submitted_through: Optional[np.datetime64] = None
+    updates_since_fit: int = 0
+    pending: Optional[Future] = None
+    fitted_at: Optional[float] = None
+
+class ForecastModelRegistry:
+    """Cache of fitted forecasting models per (resource, series, model).
+
+    ``forecast`` answers from the latest fitted model without training. When
+    the history it is given has samples the model has not seen, an update is
+    queued on a background worker pool: the model's ``update`` (warm start or
+    incremental training) for up to ``refit_every`` updates, then a full
+    ``fit`` to keep drift bounded. Only one job runs per series at a time;
+    samples arriving meanwhile are picked up by the next job.
+
+    With ``block_on_first_fit`` the first request for a series waits for its
+    initial fit, so callers never see an empty forecast; otherwise it returns
+    an empty forecast until the fit completes.
+    """
+
+    def __init__(self,
+                 max_workers: int = 2,
+                 refit_every: int = 24,
+                 min_new_samples: int = 1,
+                 max_entries: int = 1000,
+                 block_on_first_fit: bool = True):
+        self.refit_every = refit_every
+        self.min_new_samples = min_new_samples
+        self.max_entries = max_entries
+        self.block_on_first_fit = block_on_first_fit
+        self.entries: "OrderedDict[Tuple[Hashable, ...], ForecastEntry]" = OrderedDict()
+        self.stats = {"requests": 0, "fits": 0, "updates": 0, "errors": 0}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="forecast-fit")
+        self._lock = threading.Lock()
+
+    def forecast(self,
+                 resource: str,
+                 series: str,
+                 historical_data: Union[UsageSeries, List[Dict[str, Any]]],
+                 forecaster: Forecaster) -> Dict[str, Any]:
+        """Latest forecast for a series, queueing a refresh if there are new samples."""
+        entry = self.refresh(resource, series, historical_data, forecaster)
+        if entry is None:
+            return {}
+        pending = entry.pending
+        if pending is not None and entry.model is None and self.block_on_first_fit:
+            try:
+                pending.result()
+            except Exception:
+                pass
+        return entry.forecast
+
+    def refresh(self,
+                resource: str,
+                series: str,
+                historical_data: Union[UsageSeries, List[Dict[str, Any]]],
+                forecaster: Forecaster) -> Optional[ForecastEntry]:
+        """Queue a fit or update if the history has samples the model has not seen.
+
+        Does not wait for the job, so several models can be queued before
+        reading their forecasts.
+        """
+        if not len(historical_data):
+            return None
+        history = as_usage_series(historical_data)
+        key = (resource, series, forecaster.name)
+        newest = history.timestamps[-1]
+
+        with self._lock:
+            self.stats["requests"] += 1
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = ForecastEntry()
+                self.entries[key] = entry
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            self.entries.move_to_end(key)
+
+            if entry.pending is None:
+                seen = entry.submitted_through
+                if seen is None or newest < seen:
+                    # Never fitted, or the history was replaced by an older one
+                    self._submit(key, entry, history, forecaster, newest, full=True)
+                elif newest > seen and self._new_samples(history, seen) >= self.min_new_samples:
+                    full = entry.model is None or entry.updates_since_fit + 1 >= self.refit_every
+                    self._submit(key, entry, history, forecaster, newest, full=full)
+            return entry
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for queued fits to finish."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            pending = [entry.pending for entry in self.entries.values() if entry.pending is not None]
+        for future in pending:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                future.result(timeout=remaining)
+            except Exception:
+                pass
+
+    def invalidate(self, resource: Optional[str] = None) -> None:
+        """Drop cached models, for one resource or all of them."""
+        with self._lock:
+            for key in [key for key in self.entries if resource is None or key[0] == resource]:
+                del self.entries[key]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _new_samples(self, history: UsageSeries, seen: np.datetime64) -> int:
+        """Count samples newer than ``seen``."""
+        timestamps = history.timestamps
+        return len(timestamps) - int(np.searchsorted(timestamps, seen, side="right"))
+
+    def _submit(self,
+                key: Tuple[Hashable, ...],
+                entry: ForecastEntry,
+                history: UsageSeries,
+                forecaster: Forecaster,
+                newest: np.datetime64,
+                full: bool) -> None:
+        """Queue a fit or update; called with the lock held."""
+        previous = entry.submitted_through
+        new_samples = 0 if full else self._new_samples(history, previous)
+        model = entry.model
+        # Copy the columns, since the series' buffers are reused as samples arrive
+        timestamps = history.timestamps.copy()
+        values = history.column(key[1]).copy()
+
+        def run() -> None:
+            # Bookkeeping happens here rather than in a done callback so that it
+            # is complete by the time anyone waiting on the future wakes up
+            try:
+                if full:
+                    fitted, forecast = forecaster.fit(timestamps, values)
+                else:
+                    fitted, forecast = forecaster.update(model, timestamps, values, new_samples)
+            except Exception as e:
+                logging.error(f"Error fitting {key[2]} forecast for {key[0]}/{key[1]}: {str(e)}")
+                with self._lock:
+                    # Let the next request retry these samples
+                    entry.submitted_through = previous if entry.model is not None else None
+                    entry.pending = None
+                    self.stats["errors"] += 1
+                raise
+            with self._lock:
+                entry.model = fitted
+                entry.forecast = forecast
+                entry.fitted_through = newest
+                entry.fitted_at = time.time()
+                entry.updates_since_fit = 0 if full else entry.updates_since_fit + 1
+                entry.pending = None
+                self.stats["fits" if full else "updates"] += 1
+
+        entry.submitted_through = newest
+        entry.pending = self._executor.submit(run)
@@ -1,95 +1,130 @@
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable, AsyncIterator
+from contextlib import asynccontextmanager
 import asyncio
+import functools
 import json
 import subprocess
 from pathlib import Path
+from urllib.parse import urlparse, unquote
 import os
-from .language_servers import (
-    PythonLanguageServer,
-    TypeScriptLanguageServer,
-    JavaLanguageServer,
-    HTMLLanguageServer,
-    CSSLanguageServer,
-    GoLanguageServer,
-    RustLanguageServer,
-    CppLanguageServer,
-    PHPLanguageServer
-)
-from .more_language_servers import (
-    RubyLanguageServer,
-    SwiftLanguageServer,
-    KotlinLanguageServer,
-    ScalaLanguageServer
-)
-from ..models.language_models import LanguageServer
 from ..config import settings
+from .lsp_transport import LspConnection, RequestCancelled
+from .lsp_documents import OpenDocuments, TextDocument, apply_text_edits
+from .lsp_pool import LanguageServerPool, ServerInstance, workspace_root
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Requests made obsolete by the next request of the same method
+SUPERSEDED_METHODS = {"textDocument/completion"}
+
 class LanguageServer:
     """Base class for language servers."""
     def __init__(self, server_path: str, server_args: List[str]):
         self.server_path = server_path
         self.server_args = server_args
         self.process = None
+        self.connection: Optional[LspConnection] = None
         self.initialized = False
         self.capabilities = {}
+        # Workspace the server is started in, as a file:// URI
+        self.root_uri: Optional[str] = None
+        # Diagnostics the server pushed with textDocument/publishDiagnostics, by URI
+        self.published_diagnostics: Dict[str, List[Dict[str, Any]]] = {}
+        self.documents = OpenDocuments(self)
+        self._stderr_task = None
 
     async def start(self):
         """Start the language server process."""
         try:
+            # Editors may send paths of files not saved to this machine
+            root = Path(unquote(urlparse(self.root_uri).path)) if self.root_uri else None
             self.process = await asyncio.create_subprocess_exec(
                 self.server_path,
                 *self.server_args,
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
+                cwd=root if root and root.is_dir() else None
             )
+            # A new process has none of the previous one's documents open
+            self.documents = OpenDocuments(self)
+            self.initialized = False
+            self.connection = LspConnection(self.process.stdout, self.process.stdin)
+            self._register_handlers(self.connection)
+            self.connection.start()
+            # An unread stderr pipe would eventually block the server
+            self._stderr_task = asyncio.ensure_future(self._drain_stderr())
             await self.initialize()
         except Exception as e:
             logger.error(f"Error starting language server: {str(e)}")
             raise
 
+    def is_running(self) -> bool:
+        """Check whether the server process is up and its connection open."""
+        return bool(self.process and self.process.returncode is None and self.connection and not self.connection.closed)
+
+    def _register_handlers(self, connection: LspConnection):
+        """Handle the notifications and requests servers commonly send."""
+        connection.on_notification("textDocument/publishDiagnostics", self._store_diagnostics)
+        connection.on_request("workspace/configuration", lambda params: [None] * len((params or {}).get("items", [])))
+        connection.on_request("window/workDoneProgress/create", lambda params: None)
+        connection.on_request("client/registerCapability", lambda params: None)
+
+    def _store_diagnostics(self, params: Dict[str, Any]):
+        self.published_diagnostics[params["uri"]] = params.get("diagnostics", [])
+        self.documents.diagnostics_published(params["uri"], params.get("version"), self.published_diagnostics[params["uri"]])
+
+    async def _drain_stderr(self):
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                return
+            logger.debug(f"{self.server_path}: {line.decode(errors='replace').rstrip()}")
+
     async def initialize(self):
         """Initialize the language server."""
         if not self.initialized:
             # Send initialize request
             initialize_request = {
                 "jsonrpc": "2.0",
-                "id": 1,
                 "method": "initialize",
                 "params": {
                     "processId": os.getpid(),
-                    "rootUri": None,
+                    "rootUri": self.root_uri,
+                    "workspaceFolders": [{"uri": self.root_uri, "name": Path(unquote(urlparse(self.root_uri).path)).name}] if self.root_uri else None,
                     "capabilities": {}
                 }
             }
-            await self.send_request(initialize_request)
-            
-            # Wait for initialize response
-            response = await self.receive_response()
-            self.capabilities = response.get("result", {}).get("capabilities", {})
+            response = await self.send_request(initialize_request)
+            self.capabilities = (response.get("result") or {}).get("capabilities", {})
+            await self.send_notification("initialized", {})
             self.initialized = True
 
-    async def send_request(self, request: Dict[str, Any]):
-        """Send a request to the language server."""
+    async def send_request(self, request: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send a request to the language server and return its response.
+
+        The request is sent under a fresh id, so requests from concurrent
+        callers can be outstanding at once. A completion request cancels the
+        previous one still outstanding.
+        """
         if not self.process:
             await self.start()
-        
-        request_str = json.dumps(request) + "\n"
-        self.process.stdin.write(request_str.encode())
-        await self.process.stdin.drain()
 
-    async def receive_response(self) -> Dict[str, Any]:
-        """Receive a response from the language server."""
+        method = request["method"]
+        return await self.connection.call(
+            {key: value for key, value in request.items() if key != "id"},
+            timeout=timeout,
+            supersede=method if method in SUPERSEDED_METHODS else None
+        )
+
+    async def send_notification(self, method: str, params: Optional[Dict[str, Any]] = None):
+        """Send a notification to the language server."""
         if not self.process:
-            raise RuntimeError("Language server not started")
-        
-        response = await self.process.stdout.readline()
-        return json.loads(response.decode())
+            await self.start()
+        await self.connection.notify(method, params)
 
     async def diagnose(self, code: str, file_path: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Get diagnostics for the code."""
@@ -114,29 +149,26 @@ class LanguageServer:
     async def stop(self):
         """Stop the language server."""
         if self.process:
-            # Send shutdown request
-            shutdown_request = {
-                "jsonrpc": "2.0",
-                "id": 2,
-                "method": "shutdown"
-            }
-            await self.send_request(shutdown_request)
-            
-            # Wait for shutdown response
-            await self.receive_response()
-            
-            # Send exit notification
-            exit_notification = {
-                "jsonrpc": "2.0",
-                "method": "exit"
-            }
-            await self.send_request(exit_notification)
-            
-            # Terminate process
-            self.process.terminate()
-            await self.process.wait()
-            self.process = None
-            self.initialized = False
+            try:
+                # Send shutdown request
+                shutdown_request = {
+                    "jsonrpc": "2.0",
+                    "method": "shutdown"
+                }
+                await self.send_request(shutdown_request, timeout=5)
+
+                # Send exit notification
+                await self.send_notification("exit")
+            finally:
+                await self.connection.close()
+                if self.process.returncode is None:
+                    self.process.terminate()
+                await self.process.wait()
+                if self._stderr_task:
+                    self._stderr_task.cancel()
+                self.process = None
+                self.connection = None
+                self.initialized = False
 
 class PythonLanguageServer(LanguageServer):
     """Python language server using Pyright."""
@@ -150,7 +182,6 @@ class PythonLanguageServer(LanguageServer):
         """Get diagnostics for Python code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 3,
             "method": "textDocument/diagnostic",
             "params": {
                 "textDocument": {
@@ -161,15 +192,13 @@ class PythonLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {}).get("diagnostics", [])
 
     async def format(self, code: str, file_path: Optional[str] = None, style_config: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Format Python code using black."""
         request = {
             "jsonrpc": "2.0",
-            "id": 4,
             "method": "textDocument/formatting",
             "params": {
                 "textDocument": {
@@ -184,8 +213,7 @@ class PythonLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         changes = response.get("result", [])
         return code, changes
 
@@ -193,7 +221,6 @@ class PythonLanguageServer(LanguageServer):
         """Get completion suggestions for Python code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 5,
             "method": "textDocument/completion",
             "params": {
                 "textDocument": {
@@ -206,8 +233,7 @@ class PythonLanguageServer(LanguageServer):
                 "context": context or {}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("items", []), result.get("triggerCharacters", [])
 
@@ -215,7 +241,6 @@ class PythonLanguageServer(LanguageServer):
         """Get hover information for Python code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 6,
             "method": "textDocument/hover",
             "params": {
                 "textDocument": {
@@ -227,8 +252,7 @@ class PythonLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("contents", []), result.get("range")
 
@@ -236,7 +260,6 @@ class PythonLanguageServer(LanguageServer):
         """Find definition locations for Python code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 7,
             "method": "textDocument/definition",
             "params": {
                 "textDocument": {
@@ -248,8 +271,7 @@ class PythonLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", [])
         return result, result[0].get("uri") if result else None
 
@@ -265,7 +287,6 @@ class TypeScriptLanguageServer(LanguageServer):
         """Get diagnostics for TypeScript code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 3,
             "method": "textDocument/diagnostic",
             "params": {
                 "textDocument": {
@@ -276,15 +297,13 @@ class TypeScriptLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {}).get("diagnostics", [])
 
     async def format(self, code: str, file_path: Optional[str] = None, style_config: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Format TypeScript code using prettier."""
         request = {
             "jsonrpc": "2.0",
-            "id": 4,
             "method": "textDocument/formatting",
             "params": {
                 "textDocument": {
@@ -299,8 +318,7 @@ class TypeScriptLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         changes = response.get("result", [])
         return code, changes
 
@@ -308,7 +326,6 @@ class TypeScriptLanguageServer(LanguageServer):
         """Get completion suggestions for TypeScript code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 5,
             "method": "textDocument/completion",
             "params": {
                 "textDocument": {
@@ -321,8 +338,7 @@ class TypeScriptLanguageServer(LanguageServer):
                 "context": context or {}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("items", []), result.get("triggerCharacters", [])
 
@@ -330,7 +346,6 @@ class TypeScriptLanguageServer(LanguageServer):
         """Get hover information for TypeScript code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 6,
             "method": "textDocument/hover",
             "params": {
                 "textDocument": {
@@ -342,8 +357,7 @@ class TypeScriptLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("contents", []), result.get("range")
 
@@ -351,7 +365,6 @@ class TypeScriptLanguageServer(LanguageServer):
         """Find definition locations for TypeScript code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 7,
             "method": "textDocument/definition",
             "params": {
                 "textDocument": {
@@ -363,8 +376,7 @@ class TypeScriptLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", [])
         return result, result[0].get("uri") if result else None
 
@@ -380,7 +392,6 @@ class JavaLanguageServer(LanguageServer):
         """Get diagnostics for Java code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 3,
             "method": "textDocument/diagnostic",
             "params": {
                 "textDocument": {
@@ -391,15 +402,13 @@ class JavaLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {}).get("diagnostics", [])
 
     async def format(self, code: str, file_path: Optional[str] = None, style_config: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Format Java code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 4,
             "method": "textDocument/formatting",
             "params": {
                 "textDocument": {
@@ -414,8 +423,7 @@ class JavaLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         changes = response.get("result", [])
         return code, changes
 
@@ -423,7 +431,6 @@ class JavaLanguageServer(LanguageServer):
         """Get completion suggestions for Java code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 5,
             "method": "textDocument/completion",
             "params": {
                 "textDocument": {
@@ -436,8 +443,7 @@ class JavaLanguageServer(LanguageServer):
                 "context": context or {}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("items", []), result.get("triggerCharacters", [])
 
@@ -445,7 +451,6 @@ class JavaLanguageServer(LanguageServer):
         """Get hover information for Java code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 6,
             "method": "textDocument/hover",
             "params": {
                 "textDocument": {
@@ -457,8 +462,7 @@ class JavaLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("contents", []), result.get("range")
 
@@ -466,7 +470,6 @@ class JavaLanguageServer(LanguageServer):
         """Find definition locations for Java code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 7,
             "method": "textDocument/definition",
             "params": {
                 "textDocument": {
@@ -478,8 +481,7 @@ class JavaLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", [])
         return result, result[0].get("uri") if result else None
 
@@ -495,7 +497,6 @@ class HTMLLanguageServer(LanguageServer):
         """Get diagnostics for HTML code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 3,
             "method": "textDocument/diagnostic",
             "params": {
                 "textDocument": {
@@ -506,15 +507,13 @@ class HTMLLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {}).get("diagnostics", [])
 
     async def format(self, code: str, file_path: Optional[str] = None, style_config: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Format HTML code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 4,
             "method": "textDocument/formatting",
             "params": {
                 "textDocument": {
@@ -529,8 +528,7 @@ class HTMLLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         changes = response.get("result", [])
         return code, changes
 
@@ -538,7 +536,6 @@ class HTMLLanguageServer(LanguageServer):
         """Get completion suggestions for HTML code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 5,
             "method": "textDocument/completion",
             "params": {
                 "textDocument": {
@@ -551,8 +548,7 @@ class HTMLLanguageServer(LanguageServer):
                 "context": context or {}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("items", []), result.get("triggerCharacters", [])
 
@@ -560,7 +556,6 @@ class HTMLLanguageServer(LanguageServer):
         """Get hover information for HTML code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 6,
             "method": "textDocument/hover",
             "params": {
                 "textDocument": {
@@ -572,8 +567,7 @@ class HTMLLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("contents", []), result.get("range")
 
@@ -581,7 +575,6 @@ class HTMLLanguageServer(LanguageServer):
         """Find definition locations for HTML code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 7,
             "method": "textDocument/definition",
             "params": {
                 "textDocument": {
@@ -593,8 +586,7 @@ class HTMLLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", [])
         return result, result[0].get("uri") if result else None
 
@@ -610,7 +602,6 @@ class CSSLanguageServer(LanguageServer):
         """Get diagnostics for CSS code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 3,
             "method": "textDocument/diagnostic",
             "params": {
                 "textDocument": {
@@ -621,15 +612,13 @@ class CSSLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {}).get("diagnostics", [])
 
     async def format(self, code: str, file_path: Optional[str] = None, style_config: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Format CSS code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 4,
             "method": "textDocument/formatting",
             "params": {
                 "textDocument": {
@@ -644,8 +633,7 @@ class CSSLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         changes = response.get("result", [])
         return code, changes
 
@@ -653,7 +641,6 @@ class CSSLanguageServer(LanguageServer):
         """Get completion suggestions for CSS code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 5,
             "method": "textDocument/completion",
             "params": {
                 "textDocument": {
@@ -666,8 +653,7 @@ class CSSLanguageServer(LanguageServer):
                 "context": context or {}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("items", []), result.get("triggerCharacters", [])
 
@@ -675,7 +661,6 @@ class CSSLanguageServer(LanguageServer):
         """Get hover information for CSS code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 6,
             "method": "textDocument/hover",
             "params": {
                 "textDocument": {
@@ -687,8 +672,7 @@ class CSSLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("contents", []), result.get("range")
 
@@ -696,7 +680,6 @@ class CSSLanguageServer(LanguageServer):
         """Find definition locations for CSS code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 7,
             "method": "textDocument/definition",
             "params": {
                 "textDocument": {
@@ -708,71 +691,153 @@ class CSSLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", [])
         return result, result[0].get("uri") if result else None
 
+# Server class for each language, as "module.Class" under this package; the other
+# modules import LanguageServer from this one, so they are loaded on first use
+LANGUAGE_SERVER_CLASSES = {
+    "python": "language_servers.PythonLanguageServer",
+    "typescript": "language_servers.TypeScriptLanguageServer",
+    "java": "language_servers.JavaLanguageServer",
+    "html": "language_servers.HTMLLanguageServer",
+    "css": "language_servers.CSSLanguageServer",
+    "go": "additional_language_servers.GoLanguageServer",
+    "rust": "additional_language_servers.RustLanguageServer",
+    "cpp": "additional_language_servers.CppLanguageServer",
+    "php": "additional_language_servers.PHPLanguageServer",
+    "ruby": "more_language_servers.RubyLanguageServer",
+    "swift": "more_language_servers.SwiftLanguageServer",
+    "kotlin": "more_language_servers.KotlinLanguageServer",
+    "scala": "more_language_servers.ScalaLanguageServer",
+}
+
+def document_uri(language: str, file_path: Optional[str]) -> str:
+    """URI a document is opened under: its file, or one scratch document per language."""
+    if file_path:
+        return Path(file_path).absolute().as_uri()
+    return f"untitled:{language}"
+
+def _create_server(server_class: Callable[[], LanguageServer], config: Dict[str, Any]) -> LanguageServer:
+    server = server_class()
+    if "command" in config:
+        server.server_path = config["command"]
+        server.server_args = config.get("args", [])
+    return server
+
+class _PendingCompletion:
+    """Completion calls for one document waiting out the debounce window."""
+    def __init__(self, code: str, position: Dict[str, int]):
+        self.code = code
+        self.position = position
+        self.future = asyncio.get_running_loop().create_future()
+
 class LanguageServerManager:
-    """Manages language servers for different programming languages."""
-    def __init__(self):
-        self.servers: Dict[str, LanguageServer] = {}
+    """Manages language servers for different programming languages.
+
+    Servers run in a ``LanguageServerPool``, one or more processes per
+    language and workspace, so a heavy project does not hold up others.
+    Documents stay open on the servers: each call syncs the given text as
+    the next version of the document (see ``OpenDocuments``) and requests
+    refer to it by URI, so servers analyze edits incrementally instead of
+    seeing a new document every time. Diagnostics, hover and definition
+    responses are cached for the document version they were computed on.
+    Completion calls for a document that arrive within
+    ``completion_debounce`` seconds of each other are coalesced into one
+    request for the latest text and position.
+    """
+    def __init__(self, servers: Optional[Dict[str, Callable[[], LanguageServer]]] = None, completion_debounce: float = 0.05,
+                 diagnostics_timeout: float = 2.0, **pool_options: Any):
         self.initialized = False
-        self._load_language_servers()
-
-    def _load_language_servers(self):
-        """Load language server configurations from settings."""
+        self.completion_debounce = completion_debounce
+        self.diagnostics_timeout = diagnostics_timeout
+        self._pending_completions: Dict[Tuple[str, str], _PendingCompletion] = {}
+        if servers is None:
+            servers = self._load_language_servers()
+        options = {**getattr(settings, "LANGUAGE_SERVER_POOL", {}), **pool_options}
+        self.pool = LanguageServerPool(servers, **options)
+        self.initialized = True
+
+    def _load_language_servers(self) -> Dict[str, Callable[[], LanguageServer]]:
+        """Server factory for each language; settings.LANGUAGE_SERVERS may override commands."""
         try:
-            server_configs = settings.LANGUAGE_SERVERS
-            for lang, config in server_configs.items():
-                self.servers[lang] = LanguageServer(
-                    name=config["name"],
-                    command=config["command"],
-                    args=config.get("args", []),
-                    env=config.get("env", {}),
-                    capabilities=config.get("capabilities", {}),
-                    initialization_options=config.get("initialization_options", {})
-                )
-            self.initialized = True
+            import importlib
+            overrides = getattr(settings, "LANGUAGE_SERVERS", {}) or {}
+            factories = {}
+            for lang, class_path in LANGUAGE_SERVER_CLASSES.items():
+                module_name, class_name = class_path.rsplit(".", 1)
+                module = importlib.import_module(f".{module_name}", __package__)
+                factories[lang] = functools.partial(_create_server, getattr(module, class_name), overrides.get(lang, {}))
+            return factories
         except Exception as e:
             logger.error(f"Error loading language servers: {str(e)}")
             raise
 
     def has_server(self, language: str) -> bool:
         """Check if a language server is available for the given language."""
-        return language in self.servers
-
-    def get_server(self, language: str) -> Optional[LanguageServer]:
-        """Get the language server for the given language."""
-        return self.servers.get(language)
-
-    async def initialize_server(self, language: str) -> bool:
-        """Initialize a language server if not already running."""
-        if not self.has_server(language):
-            return False
-
-        server = self.servers[language]
-        if not server.is_running():
-            try:
-                await server.start()
-                return True
-            except Exception as e:
-                logger.error(f"Error initializing {language} server: {str(e)}")
-                return False
-        return True
+        return language in self.pool.factories
+
+    def server_stats(self) -> List[Dict[str, Any]]:
+        """Running server processes with their load and memory."""
+        return self.pool.stats()
+
+    @asynccontextmanager
+    async def _open(self, language: str, code: str, file_path: Optional[str]) -> AsyncIterator[Tuple[ServerInstance, TextDocument]]:
+        """Lease a server for the file's workspace and sync the document to it.
+
+        The document stays at the synced version for the whole block, so a
+        concurrent call for the same URI (every call without a file path
+        shares one per language) cannot change it under the request.
+        """
+        uri = document_uri(language, file_path)
+        async with self.pool.lease(language, workspace_root(file_path), uri) as instance:
+            async with instance.server.documents.hold(uri, language, code) as document:
+                yield instance, document
+
+    async def _cached_request(self, instance: ServerInstance, document: TextDocument, method: str, params: Dict[str, Any]) -> Any:
+        """Result of a request on a document, from the cache while the document is unchanged."""
+        key = (method, json.dumps(params, sort_keys=True))
+        hit, result = instance.cache.get(instance.language, document.uri, document.version, key)
+        if hit:
+            return result
+        version = document.version
+        response = await instance.server.send_request({
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": {"textDocument": {"uri": document.uri}, **params}
+        })
+        result = response.get("result")
+        instance.cache.put(instance.language, document.uri, version, key, result)
+        return result
+
+    async def diagnostics(self, language: str, code: str, file_path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Diagnostics for the code, computed once per document version."""
+        async with self._open(language, code, file_path) as (instance, document):
+            server = instance.server
+            if "diagnosticProvider" in server.capabilities:
+                report = await self._cached_request(instance, document, "textDocument/diagnostic", {})
+                return (report or {}).get("items", [])
+
+            # Servers without pull diagnostics publish them after each change
+            hit, diagnostics = instance.cache.get(language, document.uri, document.version, "published")
+            if hit:
+                return diagnostics
+            version = document.version
+            diagnostics = await server.documents.wait_for_diagnostics(document, self.diagnostics_timeout)
+            if diagnostics is None:
+                return []
+            instance.cache.put(language, document.uri, version, "published", diagnostics)
+            return diagnostics
 
     async def lint(self, language: str, code: str, file_path: Optional[str] = None) -> Dict[str, Any]:
         """Get linting results from the language server."""
-        if not await self.initialize_server(language):
-            raise RuntimeError(f"No language server available for {language}")
-
-        server = self.servers[language]
         try:
-            diagnostics = await server.diagnose(code, file_path)
-            style_issues = await server.check_style(code, file_path)
+            diagnostics = await self.diagnostics(language, code, file_path)
             return {
                 "diagnostics": diagnostics,
-                "style_issues": style_issues
+                "style_issues": [],
+                "suggestions": []
             }
         except Exception as e:
             logger.error(f"Error in lint: {str(e)}")
@@ -780,14 +845,19 @@ class LanguageServerManager:
 
     async def format(self, language: str, code: str, file_path: Optional[str] = None) -> Dict[str, Any]:
         """Format code using the language server."""
-        if not await self.initialize_server(language):
-            raise RuntimeError(f"No language server available for {language}")
-
-        server = self.servers[language]
         try:
-            formatted_code, changes = await server.format(code, file_path)
+            async with self._open(language, code, file_path) as (instance, document):
+                response = await instance.server.send_request({
+                    "jsonrpc": "2.0",
+                    "method": "textDocument/formatting",
+                    "params": {
+                        "textDocument": {"uri": document.uri},
+                        "options": {"tabSize": 4, "insertSpaces": True}
+                    }
+                })
+            changes = response.get("result") or []
             return {
-                "formatted_code": formatted_code,
+                "formatted_code": apply_text_edits(code, changes),
                 "changes": changes
             }
         except Exception as e:
@@ -795,32 +865,60 @@ class LanguageServerManager:
             raise
 
     async def complete(self, language: str, code: str, position: Dict[str, int], file_path: Optional[str] = None) -> Dict[str, Any]:
-        """Get completion suggestions from the language server."""
-        if not await self.initialize_server(language):
-            raise RuntimeError(f"No language server available for {language}")
-
-        server = self.servers[language]
+        """Get completion suggestions from the language server.
+
+        Calls for the same document within the debounce window share one
+        request, made for the text and position of the last of them.
+        """
+        key = (language, document_uri(language, file_path))
+        pending = self._pending_completions.get(key)
+        if pending is None:
+            pending = _PendingCompletion(code, position)
+            self._pending_completions[key] = pending
+            asyncio.ensure_future(self._send_completion(key, pending, language, file_path))
+        else:
+            pending.code, pending.position = code, position
         try:
-            suggestions, trigger_char = await server.complete(code, position, file_path)
-            return {
-                "suggestions": suggestions,
-                "trigger_character": trigger_char
-            }
+            return await asyncio.shield(pending.future)
+        except RequestCancelled:
+            # A newer completion request replaced this one before it was answered
+            return {"suggestions": [], "trigger_characters": []}
         except Exception as e:
             logger.error(f"Error in complete: {str(e)}")
             raise
 
+    async def _send_completion(self, key: Tuple[str, str], pending: _PendingCompletion, language: str, file_path: Optional[str]):
+        await asyncio.sleep(self.completion_debounce)
+        # Later calls start a new batch
+        del self._pending_completions[key]
+        try:
+            async with self._open(language, pending.code, file_path) as (instance, document):
+                server = instance.server
+                response = await server.send_request({
+                    "jsonrpc": "2.0",
+                    "method": "textDocument/completion",
+                    "params": {"textDocument": {"uri": document.uri}, "position": pending.position}
+                })
+            result = response.get("result") or []
+            items = result.get("items", []) if isinstance(result, dict) else result
+            trigger_characters = (server.capabilities.get("completionProvider") or {}).get("triggerCharacters", [])
+            pending.future.set_result({"suggestions": items, "trigger_characters": trigger_characters})
+        except Exception as e:
+            pending.future.set_exception(e)
+            # Each caller sees the exception; this marks it retrieved if none are left waiting
+            pending.future.exception()
+
     async def hover(self, language: str, code: str, position: Dict[str, int], file_path: Optional[str] = None) -> Dict[str, Any]:
         """Get hover information from the language server."""
-        if not await self.initialize_server(language):
-            raise RuntimeError(f"No language server available for {language}")
-
-        server = self.servers[language]
         try:
-            contents, range_info = await server.hover(code, position, file_path)
+            async with self._open(language, code, file_path) as (instance, document):
+                result = await self._cached_request(instance, document, "textDocument/hover", {"position": position}) or {}
+            contents = result.get("contents", [])
+            # MarkedString | MarkedString[] | MarkupContent, as a list of objects
+            contents = contents if isinstance(contents, list) else [contents]
             return {
-                "contents": contents,
-                "range": range_info
+                "contents": [{"language": "plaintext", "value": item} if isinstance(item, str) else item for item in contents],
+                "range": result.get("range")
             }
         except Exception as e:
             logger.error(f"Error in hover: {str(e)}")
@@ -828,15 +926,13 @@ class LanguageServerManager:
 
     async def definition(self, language: str, code: str, position: Dict[str, int], file_path: Optional[str] = None) -> Dict[str, Any]:
         """Find definition locations using the language server."""
-        if not await self.initialize_server(language):
-            raise RuntimeError(f"No language server available for {language}")
-
-        server = self.servers[language]
         try:
-            locations, symbol = await server.definition(code, position, file_path)
+            async with self._open(language, code, file_path) as (instance, document):
+                result = await self._cached_request(instance, document, "textDocument/definition", {"position": position}) or []
+            locations = result if isinstance(result, list) else [result]
             return {
                 "locations": locations,
-                "symbol": symbol
+                "uri": locations[0].get("uri") if locations else None
             }
         except Exception as e:
             logger.error(f"Error in definition: {str(e)}")
@@ -844,21 +940,23 @@ class LanguageServerManager:
 
     async def analyze(self, language: str, code: str, file_path: Optional[str] = None) -> Dict[str, Any]:
         """Perform code analysis using the language server."""
-        if not await self.initialize_server(language):
-            raise RuntimeError(f"No language server available for {language}")
-
-        server = self.servers[language]
         try:
-            analysis = await server.analyze(code, file_path)
-            return analysis
+            return {"diagnostics": await self.diagnostics(language, code, file_path)}
         except Exception as e:
             logger.error(f"Error in analyze: {str(e)}")
             raise
 
+    async def close_document(self, language: str, file_path: Optional[str] = None):
+        """Close a document on every server that has it open and drop its cached responses."""
+        uri = document_uri(language, file_path)
+        for instance in self.pool.instances.get((language, workspace_root(file_path)), []):
+            if instance.server.is_running():
+                await instance.server.documents.close(uri)
+            instance.cache.forget(language, uri)
+
     async def shutdown(self):
         """Shutdown all language servers."""
-        for server in self.servers.values():
-            try:
-                await server.stop()
-            except Exception as e:
-                logger.error(f"Error shutting down server: {str(e)}") 
\ No newline at end of file
+        try:
+            await self.pool.shutdown()
+        except Exception as e:
+            logger.error(f"Error shutting down servers: {str(e)}")
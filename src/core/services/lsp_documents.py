@@ -0,0 +1,200 @@
+import logging
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from collections import OrderedDict
+import asyncio
+
+logger = logging.getLogger(__name__)
+
+# TextDocumentSyncKind
+SYNC_NONE = 0
+SYNC_FULL = 1
+SYNC_INCREMENTAL = 2
+
+def position_at(text: str, offset: int) -> Dict[str, int]:
+    """LSP position of a string offset; characters are counted in UTF-16 code units."""
+    line = text.count("\n", 0, offset)
+    line_start = text.rfind("\n", 0, offset) + 1
+    segment = text[line_start:offset]
+    # Characters outside the BMP take two UTF-16 code units
+    character = len(segment) + sum(1 for char in segment if ord(char) > 0xFFFF)
+    return {"line": line, "character": character}
+
+def offset_at(text: str, position: Dict[str, int]) -> int:
+    """String offset of an LSP position; the inverse of ``position_at``."""
+    line_start = 0
+    for _ in range(position["line"]):
+        newline = text.find("\n", line_start)
+        if newline < 0:
+            return len(text)
+        line_start = newline + 1
+    line_end = text.find("\n", line_start)
+    line_end = len(text) if line_end < 0 else line_end
+    offset, units = line_start, 0
+    while offset < line_end and units < position["character"]:
+        units += 2 if ord(text[offset]) > 0xFFFF else 1
+        offset += 1
+    return offset
+
+def apply_text_edits(text: str, edits: List[Dict[str, Any]]) -> str:
+    """Text after applying TextEdits, whose ranges all refer to the original text."""
+    # Applied back to front so earlier offsets stay valid; edits inserted at
+    # the same position keep their order
+    spans = sorted(
+        ((offset_at(text, edit["range"]["start"]), offset_at(text, edit["range"]["end"]), index, edit["newText"])
+         for index, edit in enumerate(edits)),
+        reverse=True
+    )
+    for start, end, _, new_text in spans:
+        text = text[:start] + new_text + text[end:]
+    return text
+
+def text_change(old: str, new: str) -> Dict[str, Any]:
+    """Incremental change event replacing the span where two texts differ."""
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[len(old) - 1 - suffix] == new[len(new) - 1 - suffix]:
+        suffix += 1
+    return {
+        "range": {"start": position_at(old, prefix), "end": position_at(old, len(old) - suffix)},
+        "text": new[prefix:len(new) - suffix]
+    }
+
+def sync_kind(capabilities: Dict[str, Any]) -> int:
+    """How the server wants document changes sent."""
+    sync = capabilities.get("textDocumentSync", SYNC_FULL)
+    if isinstance(sync, dict):
+        return sync.get("change", SYNC_NONE)
+    return sync
+
+@dataclass
+class TextDocument:
+    """A document open on a language server."""
+    uri: str
+    language_id: str
+    version: int
+    text: str
+    # Diagnostics the server published for this document and the version they were for
+    diagnostics: Optional[List[Dict[str, Any]]] = None
+    diagnostics_version: Optional[int] = None
+    diagnostics_published: asyncio.Event = field(default_factory=asyncio.Event)
+
+class OpenDocuments:
+    """Documents open on one language server process.
+
+    ``sync`` opens a document the first time it is seen and afterwards sends
+    only what changed, as a ``didChange`` with the next version: a single
+    replaced range when the server accepts incremental changes, the full
+    text otherwise. Unchanged text sends nothing, so the server keeps its
+    analysis of the current version.
+    """
+
+    def __init__(self, server: Any):
+        self.server = server
+        self.documents: Dict[str, TextDocument] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def sync(self, uri: str, language_id: str, text: str) -> TextDocument:
+        """Bring the server's copy of a document up to date with text."""
+        # Concurrent edits of one document must reach the server in version order
+        async with self._locks.setdefault(uri, asyncio.Lock()):
+            return await self._sync(uri, language_id, text)
+
+    @asynccontextmanager
+    async def hold(self, uri: str, language_id: str, text: str) -> AsyncIterator[TextDocument]:
+        """Sync a document and keep it at that version until the block exits.
+
+        Requests made inside the block see the text that was synced, not an
+        edit from a concurrent caller of the same document.
+        """
+        async with self._locks.setdefault(uri, asyncio.Lock()):
+            yield await self._sync(uri, language_id, text)
+
+    async def _sync(self, uri: str, language_id: str, text: str) -> TextDocument:
+        document = self.documents.get(uri)
+        if document is None:
+            document = TextDocument(uri=uri, language_id=language_id, version=1, text=text)
+            await self.server.send_notification("textDocument/didOpen", {
+                "textDocument": {"uri": uri, "languageId": language_id, "version": 1, "text": text}
+            })
+            self.documents[uri] = document
+        elif document.text != text:
+            if sync_kind(self.server.capabilities) == SYNC_INCREMENTAL:
+                change = text_change(document.text, text)
+            else:
+                change = {"text": text}
+            await self.server.send_notification("textDocument/didChange", {
+                "textDocument": {"uri": uri, "version": document.version + 1},
+                "contentChanges": [change]
+            })
+            document.version += 1
+            document.text = text
+            document.diagnostics_published.clear()
+        return document
+
+    async def close(self, uri: str):
+        """Close a document on the server."""
+        # After any request still using the document; the lock stays for callers already waiting on it
+        async with self._locks.setdefault(uri, asyncio.Lock()):
+            if self.documents.pop(uri, None):
+                await self.server.send_notification("textDocument/didClose", {"textDocument": {"uri": uri}})
+
+    def diagnostics_published(self, uri: str, version: Optional[int], diagnostics: List[Dict[str, Any]]):
+        """Record diagnostics pushed by the server for a document."""
+        document = self.documents.get(uri)
+        if document is None:
+            return
+        # Servers that omit the version are answering the latest change
+        version = document.version if version is None else version
+        if version == document.version:
+            document.diagnostics = diagnostics
+            document.diagnostics_version = version
+            document.diagnostics_published.set()
+
+    async def wait_for_diagnostics(self, document: TextDocument, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        """Diagnostics for the document's current version, waiting up to timeout for the server to publish them."""
+        if document.diagnostics_version != document.version:
+            try:
+                await asyncio.wait_for(document.diagnostics_published.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return document.diagnostics
+
+class ResponseCache:
+    """Responses for a document version, dropped as soon as the document changes.
+
+    Keyed by (server, uri); each entry holds the version it was computed for
+    and at most ``max_entries`` responses, oldest evicted first.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries: Dict[Tuple[str, str], Tuple[int, "OrderedDict[Any, Any]"]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, server: str, uri: str, version: int, key: Any) -> Tuple[bool, Any]:
+        cached = self.entries.get((server, uri))
+        if cached and cached[0] == version and key in cached[1]:
+            self.hits += 1
+            return True, cached[1][key]
+        self.misses += 1
+        return False, None
+
+    def put(self, server: str, uri: str, version: int, key: Any, value: Any):
+        cached = self.entries.get((server, uri))
+        if cached is None or cached[0] != version:
+            cached = (version, OrderedDict())
+            self.entries[(server, uri)] = cached
+        cached[1][key] = value
+        if len(cached[1]) > self.max_entries:
+            cached[1].popitem(last=False)
+
+    def forget(self, server: str, uri: Optional[str] = None):
+        """Drop a document's responses, or all of a server's."""
+        for entry in [entry for entry in self.entries if entry[0] == server and uri in (None, entry[1])]:
+            del self.entries[entry]
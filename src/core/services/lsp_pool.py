@@ -0,0 +1,294 @@
+import logging
+from typing import Dict, Any, List, Optional, Tuple, Callable, AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+import asyncio
+import itertools
+import time
+
+import psutil
+from prometheus_client import Counter, Gauge
+from .lsp_documents import ResponseCache
+from .lsp_transport import JsonRpcError
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+server_instances_gauge = Gauge('language_server_instances', 'Running language server processes', ['language'])
+server_memory_gauge = Gauge('language_server_memory_bytes', 'Resident memory of language server processes', ['language'])
+server_restarts_counter = Counter('language_server_restarts_total', 'Language servers restarted after a crash or failed probe', ['language'])
+server_evictions_counter = Counter('language_server_evictions_total', 'Idle language servers stopped', ['language'])
+
+# Files marking the root of a project, nearest first
+WORKSPACE_MARKERS = (
+    ".git", "pyproject.toml", "setup.py", "package.json", "tsconfig.json", "go.mod", "Cargo.toml",
+    "pom.xml", "build.gradle", "build.gradle.kts", "build.sbt", "composer.json", "Gemfile",
+    "Package.swift", "compile_commands.json", "CMakeLists.txt",
+)
+
+# Request no server implements; any answer, error or not, shows it is responsive
+PROBE_METHOD = "$/healthCheck"
+
+def workspace_root(file_path: Optional[str]) -> Optional[str]:
+    """Project directory a file belongs to, or its own directory; None for untitled documents."""
+    if not file_path:
+        return None
+    directory = Path(file_path).absolute().parent
+    for candidate in (directory, *directory.parents):
+        if any((candidate / marker).exists() for marker in WORKSPACE_MARKERS):
+            return str(candidate)
+    return str(directory)
+
+@dataclass
+class ServerInstance:
+    """One language server process serving a workspace."""
+    language: str
+    root: Optional[str]
+    server: Any
+    name: str
+    # Responses for this process's documents; replaced when it restarts
+    cache: ResponseCache = field(default_factory=ResponseCache)
+    in_flight: int = 0
+    requests: int = 0
+    restarts: int = 0
+    started: bool = False
+    last_used: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def pid(self) -> Optional[int]:
+        process = getattr(self.server, "process", None)
+        return process.pid if process else None
+
+    def memory_rss(self) -> int:
+        """Resident memory of the server and its child processes, in bytes."""
+        if self.pid is None:
+            return 0
+        try:
+            process = psutil.Process(self.pid)
+            return sum(p.memory_info().rss for p in [process, *process.children(recursive=True)])
+        except psutil.Error:
+            return 0
+
+class LanguageServerPool:
+    """Language server processes keyed by language and workspace root.
+
+    ``lease`` routes each request to the least busy process for its
+    workspace, preferring one that already has the document open, and
+    starts another process (up to ``max_per_workspace``) when every one is
+    busy. At ``max_instances`` processes in total, the least recently used
+    idle process is stopped to make room; if none is idle, requests share
+    the existing processes. Processes that crashed are restarted on their
+    next lease. ``maintain`` stops processes idle for ``idle_ttl`` seconds
+    and probes the other idle ones, restarting any that do not answer
+    within ``probe_timeout``. Busy processes are not probed: a server
+    working through a long request may not answer in time, and restarting
+    it would fail the requests in flight.
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]], max_instances: int = 16, max_per_workspace: int = 2,
+                 idle_ttl: float = 600.0, probe_interval: float = 30.0, probe_timeout: float = 5.0):
+        self.factories = factories
+        self.max_instances = max_instances
+        self.max_per_workspace = max_per_workspace
+        self.idle_ttl = idle_ttl
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.instances: Dict[Tuple[str, Optional[str]], List[ServerInstance]] = {}
+        self._ids = itertools.count(1)
+        self._maintenance_task: Optional[asyncio.Task] = None
+
+    def all_instances(self) -> List[ServerInstance]:
+        return [instance for instances in self.instances.values() for instance in instances]
+
+    @asynccontextmanager
+    async def lease(self, language: str, root: Optional[str] = None, uri: Optional[str] = None) -> AsyncIterator[ServerInstance]:
+        """Running server instance for a request, counted as busy until the block exits."""
+        if language not in self.factories:
+            raise RuntimeError(f"No language server available for {language}")
+        if self._maintenance_task is None:
+            self._maintenance_task = asyncio.ensure_future(self._maintenance_loop())
+
+        instance = self._route(language, root, uri)
+        instance.in_flight += 1
+        instance.requests += 1
+        try:
+            await self._ensure_running(instance)
+            yield instance
+        finally:
+            instance.in_flight -= 1
+            instance.last_used = time.monotonic()
+
+    def _route(self, language: str, root: Optional[str], uri: Optional[str]) -> ServerInstance:
+        instances = self.instances.setdefault((language, root), [])
+        best = min(
+            instances,
+            key=lambda instance: (instance.in_flight, uri not in instance.server.documents.documents, -instance.last_used),
+            default=None
+        )
+        if best is None or (best.in_flight > 0 and len(instances) < self.max_per_workspace):
+            if self._make_room():
+                best = ServerInstance(
+                    language=language,
+                    root=root,
+                    server=self.factories[language](),
+                    name=f"{language}-{next(self._ids)}"
+                )
+                if root:
+                    best.server.root_uri = Path(root).as_uri()
+                instances.append(best)
+        if best is None:
+            raise RuntimeError(f"All {self.max_instances} language servers are busy")
+        return best
+
+    def _make_room(self) -> bool:
+        """Whether another process may start, stopping the least recently used idle one if needed."""
+        instances = self.all_instances()
+        if len(instances) < self.max_instances:
+            return True
+        idle = [instance for instance in instances if instance.in_flight == 0]
+        if not idle:
+            return False
+        victim = min(idle, key=lambda instance: instance.last_used)
+        self._discard(victim)
+        server_evictions_counter.labels(language=victim.language).inc()
+        asyncio.ensure_future(self._stop(victim))
+        return True
+
+    def _discard(self, instance: ServerInstance):
+        instances = self.instances.get((instance.language, instance.root), [])
+        if instance in instances:
+            instances.remove(instance)
+        if not instances:
+            self.instances.pop((instance.language, instance.root), None)
+
+    async def _ensure_running(self, instance: ServerInstance):
+        # One start per process, however many requests are waiting for it
+        async with instance.lock:
+            if instance.server.is_running():
+                return
+            if instance.started:
+                logger.warning(f"Language server {instance.name} for {instance.root} exited; restarting")
+                await self._restart(instance)
+                return
+            try:
+                await instance.server.start()
+            except Exception:
+                self._discard(instance)
+                raise
+            instance.started = True
+            self._update_gauges()
+
+    async def _restart(self, instance: ServerInstance):
+        """Replace a crashed or unresponsive process; its documents are reopened as they are used."""
+        instance.restarts += 1
+        server_restarts_counter.labels(language=instance.language).inc()
+        await self._terminate(instance)
+        instance.cache = ResponseCache()
+        await instance.server.start()
+        self._update_gauges()
+
+    async def _terminate(self, instance: ServerInstance):
+        server = instance.server
+        if getattr(server, "_stderr_task", None):
+            server._stderr_task.cancel()
+        if server.connection:
+            await server.connection.close()
+        if server.process:
+            if server.process.returncode is None:
+                server.process.kill()
+            await server.process.wait()
+            server.process = None
+        server.initialized = False
+
+    async def _stop(self, instance: ServerInstance):
+        async with instance.lock:
+            try:
+                await asyncio.wait_for(instance.server.stop(), self.probe_timeout * 2)
+            except Exception as e:
+                logger.warning(f"Language server {instance.name} did not shut down cleanly: {str(e)}")
+                await self._terminate(instance)
+        self._update_gauges()
+
+    async def probe(self, instance: ServerInstance) -> bool:
+        """Whether a server answers a request within ``probe_timeout``."""
+        if not instance.server.is_running():
+            return False
+        try:
+            await instance.server.connection.request(PROBE_METHOD, timeout=self.probe_timeout)
+        except JsonRpcError:
+            pass
+        except (asyncio.TimeoutError, ConnectionError):
+            return False
+        return True
+
+    async def maintain(self) -> None:
+        """Stop servers idle longer than ``idle_ttl`` and restart idle ones that fail their probe."""
+        now = time.monotonic()
+        for instance in self.all_instances():
+            if instance.in_flight > 0 or instance.lock.locked():
+                continue
+            if now - instance.last_used > self.idle_ttl:
+                logger.info(f"Stopping idle language server {instance.name} for {instance.root}")
+                self._discard(instance)
+                server_evictions_counter.labels(language=instance.language).inc()
+                await self._stop(instance)
+            elif instance.started and not await self.probe(instance) and instance.in_flight == 0:
+                # Requests leased while the probe was waiting are left to their own timeouts
+                logger.warning(f"Language server {instance.name} for {instance.root} failed its health check; restarting")
+                async with instance.lock:
+                    try:
+                        await self._restart(instance)
+                    except Exception as e:
+                        logger.error(f"Error restarting language server {instance.name}: {str(e)}")
+        self._update_gauges()
+
+    async def _maintenance_loop(self):
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            try:
+                await self.maintain()
+            except Exception as e:
+                logger.error(f"Error maintaining language servers: {str(e)}")
+
+    def _update_gauges(self):
+        counts: Dict[str, int] = {}
+        memory: Dict[str, int] = {}
+        for instance in self.all_instances():
+            if instance.server.is_running():
+                counts[instance.language] = counts.get(instance.language, 0) + 1
+                memory[instance.language] = memory.get(instance.language, 0) + instance.memory_rss()
+        for language in self.factories:
+            server_instances_gauge.labels(language=language).set(counts.get(language, 0))
+            server_memory_gauge.labels(language=language).set(memory.get(language, 0))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """State and resident memory of each server process."""
+        now = time.monotonic()
+        return [
+            {
+                "name": instance.name,
+                "language": instance.language,
+                "workspace": instance.root,
+                "pid": instance.pid,
+                "running": instance.server.is_running(),
+                "in_flight": instance.in_flight,
+                "requests": instance.requests,
+                "restarts": instance.restarts,
+                "idle_seconds": round(now - instance.last_used, 1) if instance.in_flight == 0 else 0.0,
+                "memory_rss": instance.memory_rss(),
+                "open_documents": len(instance.server.documents.documents),
+            }
+            for instance in self.all_instances()
+        ]
+
+    async def shutdown(self) -> None:
+        """Stop every server."""
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            self._maintenance_task = None
+        instances = self.all_instances()
+        self.instances.clear()
+        await asyncio.gather(*(self._stop(instance) for instance in instances if instance.started))
+        self._update_gauges()
@@ -0,0 +1,229 @@
+import logging
+from typing import Dict, Any, Optional, Callable, Awaitable, Union
+import asyncio
+import json
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC and LSP error codes
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+REQUEST_CANCELLED = -32800
+
+Handler = Callable[[Any], Union[Any, Awaitable[Any]]]
+
+class JsonRpcError(Exception):
+    """Error response from the other end of a JSON-RPC connection."""
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(f"{message} ({code})")
+        self.code = code
+        self.message = message
+        self.data = data
+
+class RequestCancelled(JsonRpcError):
+    """The request was cancelled before its response arrived."""
+    def __init__(self, message: str = "Request cancelled"):
+        super().__init__(REQUEST_CANCELLED, message)
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """Frame a message with the LSP base protocol's Content-Length header."""
+    body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    return f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Read one framed message; None at end of stream."""
+    length = None
+    while True:
+        line = await reader.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            if length is None:
+                # Blank line without headers, e.g. between messages from a lenient server
+                continue
+            break
+        name, _, value = line.decode("ascii").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    body = await reader.readexactly(length)
+    return json.loads(body.decode("utf-8"))
+
+class LspConnection:
+    """Multiplexed JSON-RPC connection to a language server.
+
+    A background task reads framed messages and resolves the future of the
+    request each response answers, so any number of requests can be in
+    flight at once. Notifications and requests from the server go to
+    handlers registered with ``on_notification`` and ``on_request``.
+
+    A request started with a ``supersede`` key cancels the previous
+    outstanding request with the same key, e.g. a completion request made
+    obsolete by the next keystroke: its caller gets ``RequestCancelled`` and
+    the server is sent ``$/cancelRequest``. The same happens when a caller
+    stops waiting, e.g. on timeout.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: Any):
+        self.reader = reader
+        self.writer = writer
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.notification_handlers: Dict[str, Handler] = {}
+        self.request_handlers: Dict[str, Handler] = {}
+        self._superseded: Dict[str, int] = {}
+        self._next_id = 0
+        self._write_lock = asyncio.Lock()
+        self._reader_task: Optional[asyncio.Task] = None
+        self.closed = False
+
+    def start(self):
+        """Start reading messages from the server."""
+        if self._reader_task is None:
+            self._reader_task = asyncio.ensure_future(self._read_loop())
+
+    def on_notification(self, method: str, handler: Handler):
+        """Call ``handler(params)`` for each notification of a method."""
+        self.notification_handlers[method] = handler
+
+    def on_request(self, method: str, handler: Handler):
+        """Answer server requests of a method with ``handler(params)``."""
+        self.request_handlers[method] = handler
+
+    async def call(self, message: Dict[str, Any], timeout: Optional[float] = None, supersede: Optional[str] = None) -> Dict[str, Any]:
+        """Send a request message under a fresh id and return the response message."""
+        if self.closed:
+            raise ConnectionError("Language server connection is closed")
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+
+        if supersede:
+            previous = self._superseded.get(supersede)
+            self._superseded[supersede] = request_id
+            if previous in self.pending:
+                await self.cancel(previous)
+
+        try:
+            await self._write({**message, "jsonrpc": "2.0", "id": request_id})
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # The caller stopped waiting: let the server drop the work too
+            if request_id in self.pending:
+                await self.cancel(request_id)
+            raise
+        finally:
+            self.pending.pop(request_id, None)
+            if supersede and self._superseded.get(supersede) == request_id:
+                del self._superseded[supersede]
+
+    async def request(self, method: str, params: Any = None, timeout: Optional[float] = None, supersede: Optional[str] = None) -> Any:
+        """Send a request and return its result, raising ``JsonRpcError`` on an error response."""
+        message = {"method": method}
+        if params is not None:
+            message["params"] = params
+        response = await self.call(message, timeout, supersede)
+        return response.get("result")
+
+    async def notify(self, method: str, params: Any = None):
+        """Send a notification."""
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._write(message)
+
+    async def cancel(self, request_id: int):
+        """Fail an outstanding request with ``RequestCancelled`` and tell the server."""
+        future = self.pending.pop(request_id, None)
+        if future and not future.done():
+            future.set_exception(RequestCancelled())
+            # Retrieved here so an unawaited cancellation is not reported as unhandled
+            future.exception()
+        if not self.closed:
+            try:
+                await self.notify("$/cancelRequest", {"id": request_id})
+            except ConnectionError:
+                pass
+
+    async def close(self):
+        """Stop reading and fail outstanding requests."""
+        self.closed = True
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+        self._fail_pending(ConnectionError("Language server connection closed"))
+
+    async def _write(self, message: Dict[str, Any]):
+        if self.closed:
+            raise ConnectionError("Language server connection is closed")
+        async with self._write_lock:
+            self.writer.write(encode_message(message))
+            await self.writer.drain()
+
+    async def _read_loop(self):
+        try:
+            while True:
+                message = await read_message(self.reader)
+                if message is None:
+                    break
+                if "method" in message:
+                    if "id" in message:
+                        asyncio.ensure_future(self._answer(message))
+                    else:
+                        await self._dispatch_notification(message)
+                else:
+                    self._resolve(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error reading from language server: {str(e)}")
+        self.closed = True
+        self._fail_pending(ConnectionError("Language server closed the connection"))
+
+    def _resolve(self, message: Dict[str, Any]):
+        future = self.pending.get(message.get("id"))
+        if future is None or future.done():
+            # Response to a request that was cancelled or timed out
+            return
+        error = message.get("error")
+        if error:
+            future.set_exception(JsonRpcError(error.get("code", INTERNAL_ERROR), error.get("message", ""), error.get("data")))
+        else:
+            future.set_result(message)
+
+    async def _dispatch_notification(self, message: Dict[str, Any]):
+        handler = self.notification_handlers.get(message["method"])
+        if handler is None:
+            return
+        try:
+            result = handler(message.get("params"))
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.error(f"Error handling {message['method']} notification: {str(e)}")
+
+    async def _answer(self, message: Dict[str, Any]):
+        handler = self.request_handlers.get(message["method"])
+        response = {"jsonrpc": "2.0", "id": message["id"]}
+        if handler is None:
+            response["error"] = {"code": METHOD_NOT_FOUND, "message": f"Unhandled method {message['method']}"}
+        else:
+            try:
+                result = handler(message.get("params"))
+                response["result"] = await result if asyncio.iscoroutine(result) else result
+            except Exception as e:
+                response["error"] = {"code": INTERNAL_ERROR, "message": str(e)}
+        try:
+            await self._write(response)
+        except ConnectionError:
+            pass
+
+    def _fail_pending(self, error: Exception):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+                future.exception()
+        self.pending.clear()
@@ -0,0 +1,184 @@
+from typing import Dict, Optional, Any, Tuple, Callable
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBRegressor
+from prophet import Prophet
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.layers import LSTM, Dense, Dropout
+from tensorflow.keras.optimizers import Adam
+from .forecast_registry import Forecaster
+from .statistical_forecast import FORECAST_HORIZON
+from .usage_history import hour_of_day, day_of_week, month_of_year
+
+def create_sequences(data: np.ndarray, seq_length: int = 24) -> Tuple[np.ndarray, np.ndarray]:
+    """Create sequences for time series prediction."""
+    X, y = [], []
+    for i in range(len(data) - seq_length):
+        X.append(data[i:(i + seq_length)])
+        y.append(data[i + seq_length])
+    return np.array(X), np.array(y)
+
+def calendar_features(timestamps: np.ndarray) -> np.ndarray:
+    """Hour of day, day of week (Monday is 0) and month columns for datetime64 timestamps."""
+    return np.column_stack([hour_of_day(timestamps), day_of_week(timestamps), month_of_year(timestamps)])
+
+def prophet_warm_start(model: Prophet) -> Dict[str, Any]:
+    """Fitted Prophet parameters in the form ``Prophet.fit(init=...)`` takes."""
+    init = {name: model.params[name][0][0] for name in ['k', 'm', 'sigma_obs']}
+    init.update({name: model.params[name][0] for name in ['delta', 'beta']})
+    return init
+
+class ProphetForecaster(Forecaster):
+    """Prophet with daily, weekly and yearly seasonality.
+
+    Updates refit starting from the previous fit's parameters, which
+    converges in far fewer iterations than a cold fit. ``derived`` adds
+    series computed from the forecast's columns to the result, as for the
+    statistical forecasters; ``seasonal`` is the sum of Prophet's
+    seasonality terms.
+    """
+
+    name = "prophet"
+
+    def __init__(self, derived: Optional[Dict[str, Callable[[Dict[str, np.ndarray]], np.ndarray]]] = None):
+        self.derived = derived or {}
+
+    def fit(self, timestamps: np.ndarray, values: np.ndarray) -> Tuple[Any, Dict[str, Any]]:
+        return self._fit(timestamps, values)
+
+    def update(self, model: Any, timestamps: np.ndarray, values: np.ndarray, new_samples: int) -> Tuple[Any, Dict[str, Any]]:
+        return self._fit(timestamps, values, prophet_warm_start(model))
+
+    def _fit(self, timestamps: np.ndarray, values: np.ndarray, init: Optional[Dict[str, Any]] = None) -> Tuple[Any, Dict[str, Any]]:
+        model = Prophet(
+            yearly_seasonality=True,
+            weekly_seasonality=True,
+            daily_seasonality=True,
+            changepoint_prior_scale=0.05
+        )
+        history = pd.DataFrame({'ds': timestamps, 'y': values})
+        if init is None:
+            model.fit(history)
+        else:
+            model.fit(history, init=init)
+        
+        future = model.make_future_dataframe(periods=FORECAST_HORIZON, freq='H')
+        forecast = model.predict(future)
+        
+        result = {
+            "model": "prophet",
+            "forecast": forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].to_dict('records'),
+            "trend": forecast['trend'].tolist()
+        }
+        columns = {name: forecast[name].to_numpy() for name in forecast.columns if name != 'ds'}
+        columns['seasonal'] = columns['additive_terms']
+        for name, derive in self.derived.items():
+            result[name] = np.asarray(derive(columns)).tolist()
+        return model, result
+
+class LSTMForecaster(Forecaster):
+    """Two-layer LSTM over windows of ``seq_length`` samples.
+
+    Updates keep the network and its scaler and train ``update_epochs`` more
+    epochs on the windows ending in new samples, instead of ``epochs`` from
+    scratch on the whole history.
+    """
+
+    name = "lstm"
+
+    def __init__(self, epochs: int = 50, update_epochs: int = 5, seq_length: int = 24):
+        self.epochs = epochs
+        self.update_epochs = update_epochs
+        self.seq_length = seq_length
+
+    def fit(self, timestamps: np.ndarray, values: np.ndarray) -> Tuple[Any, Dict[str, Any]]:
+        scaler = StandardScaler()
+        scaled_data = scaler.fit_transform(values.reshape(-1, 1))
+        X, y = create_sequences(scaled_data, self.seq_length)
+        
+        model = Sequential([
+            LSTM(50, return_sequences=True, input_shape=(self.seq_length, 1)),
+            Dropout(0.2),
+            LSTM(50, return_sequences=False),
+            Dropout(0.2),
+            Dense(1)
+        ])
+        model.compile(optimizer=Adam(learning_rate=0.001), loss='mse')
+        model.fit(X, y, epochs=self.epochs, batch_size=32, verbose=0)
+        
+        return (model, scaler), self._forecast(model, scaler, scaled_data)
+
+    def update(self, state: Any, timestamps: np.ndarray, values: np.ndarray, new_samples: int) -> Tuple[Any, Dict[str, Any]]:
+        model, scaler = state
+        scaled_data = scaler.transform(values.reshape(-1, 1))
+        X, y = create_sequences(scaled_data[-(new_samples + self.seq_length):], self.seq_length)
+        if len(X):
+            model.fit(X, y, epochs=self.update_epochs, batch_size=32, verbose=0)
+        return state, self._forecast(model, scaler, scaled_data)
+
+    def _forecast(self, model: Any, scaler: StandardScaler, scaled_data: np.ndarray) -> Dict[str, Any]:
+        last_sequence = scaled_data[-self.seq_length:]
+        forecast = []
+        for _ in range(FORECAST_HORIZON):
+            next_pred = model.predict(last_sequence.reshape(1, self.seq_length, 1), verbose=0)
+            forecast.append(next_pred[0][0])
+            last_sequence = np.append(last_sequence[1:], next_pred)
+        
+        forecast = scaler.inverse_transform(np.array(forecast).reshape(-1, 1))
+        return {
+            "model": "lstm",
+            "forecast": forecast.ravel().tolist()
+        }
+
+class XGBoostForecaster(Forecaster):
+    """Gradient boosted trees over windows of usage and calendar features.
+
+    Updates continue boosting the existing model with ``update_estimators``
+    trees fitted on the windows ending in new samples.
+    """
+
+    name = "xgboost"
+
+    def __init__(self, n_estimators: int = 100, update_estimators: int = 10, seq_length: int = 24):
+        self.n_estimators = n_estimators
+        self.update_estimators = update_estimators
+        self.seq_length = seq_length
+
+    def fit(self, timestamps: np.ndarray, values: np.ndarray) -> Tuple[Any, Dict[str, Any]]:
+        features = np.column_stack([values, calendar_features(timestamps)])
+        X, y = create_sequences(features, self.seq_length)
+        model = self._regressor(self.n_estimators)
+        model.fit(X.reshape(X.shape[0], -1), y[:, 0])
+        return model, self._forecast(model, timestamps, features)
+
+    def update(self, model: Any, timestamps: np.ndarray, values: np.ndarray, new_samples: int) -> Tuple[Any, Dict[str, Any]]:
+        features = np.column_stack([values, calendar_features(timestamps)])
+        X, y = create_sequences(features[-(new_samples + self.seq_length):], self.seq_length)
+        if len(X):
+            updated = self._regressor(self.update_estimators)
+            updated.fit(X.reshape(X.shape[0], -1), y[:, 0], xgb_model=model.get_booster())
+            model = updated
+        return model, self._forecast(model, timestamps, features)
+
+    def _regressor(self, n_estimators: int) -> XGBRegressor:
+        return XGBRegressor(
+            n_estimators=n_estimators,
+            learning_rate=0.1,
+            max_depth=6,
+            random_state=42
+        )
+
+    def _forecast(self, model: Any, timestamps: np.ndarray, features: np.ndarray) -> Dict[str, Any]:
+        last_sequence = features[-self.seq_length:]
+        future = timestamps[-1] + np.arange(1, FORECAST_HORIZON + 1) * np.timedelta64(1, 'h')
+        future_calendar = calendar_features(future)
+        forecast = []
+        for i in range(FORECAST_HORIZON):
+            next_pred = float(model.predict(last_sequence.reshape(1, -1))[0])
+            forecast.append(next_pred)
+            last_sequence = np.vstack([last_sequence[1:], np.append(next_pred, future_calendar[i])])
+        return {
+            "model": "xgboost",
+            "forecast": forecast
+        }
@@ -13,7 +13,6 @@ class RubyLanguageServer(LanguageServer):
         """Get diagnostics for Ruby code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 3,
             "method": "textDocument/diagnostic",
             "params": {
                 "textDocument": {
@@ -24,15 +23,13 @@ class RubyLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {}).get("diagnostics", [])
 
     async def format(self, code: str, file_path: Optional[str] = None, style_config: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Format Ruby code using rubocop."""
         request = {
             "jsonrpc": "2.0",
-            "id": 4,
             "method": "textDocument/formatting",
             "params": {
                 "textDocument": {
@@ -47,8 +44,7 @@ class RubyLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         changes = response.get("result", [])
         return code, changes
 
@@ -56,7 +52,6 @@ class RubyLanguageServer(LanguageServer):
         """Get completion suggestions for Ruby code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 5,
             "method": "textDocument/completion",
             "params": {
                 "textDocument": {
@@ -69,8 +64,7 @@ class RubyLanguageServer(LanguageServer):
                 "context": context or {}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("items", []), result.get("triggerCharacters", [])
 
@@ -78,7 +72,6 @@ class RubyLanguageServer(LanguageServer):
         """Get hover information for Ruby code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 6,
             "method": "textDocument/hover",
             "params": {
                 "textDocument": {
@@ -90,8 +83,7 @@ class RubyLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("contents", []), result.get("range")
 
@@ -99,7 +91,6 @@ class RubyLanguageServer(LanguageServer):
         """Find definition locations for Ruby code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 7,
             "method": "textDocument/definition",
             "params": {
                 "textDocument": {
@@ -111,8 +102,7 @@ class RubyLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", [])
         return result, result[0].get("uri") if result else None
 
@@ -128,7 +118,6 @@ class SwiftLanguageServer(LanguageServer):
         """Get diagnostics for Swift code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 3,
             "method": "textDocument/diagnostic",
             "params": {
                 "textDocument": {
@@ -139,15 +128,13 @@ class SwiftLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {}).get("diagnostics", [])
 
     async def format(self, code: str, file_path: Optional[str] = None, style_config: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Format Swift code using swift-format."""
         request = {
             "jsonrpc": "2.0",
-            "id": 4,
             "method": "textDocument/formatting",
             "params": {
                 "textDocument": {
@@ -162,8 +149,7 @@ class SwiftLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         changes = response.get("result", [])
         return code, changes
 
@@ -171,7 +157,6 @@ class SwiftLanguageServer(LanguageServer):
         """Get completion suggestions for Swift code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 5,
             "method": "textDocument/completion",
             "params": {
                 "textDocument": {
@@ -184,8 +169,7 @@ class SwiftLanguageServer(LanguageServer):
                 "context": context or {}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("items", []), result.get("triggerCharacters", [])
 
@@ -193,7 +177,6 @@ class SwiftLanguageServer(LanguageServer):
         """Get hover information for Swift code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 6,
             "method": "textDocument/hover",
             "params": {
                 "textDocument": {
@@ -205,8 +188,7 @@ class SwiftLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("contents", []), result.get("range")
 
@@ -214,7 +196,6 @@ class SwiftLanguageServer(LanguageServer):
         """Find definition locations for Swift code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 7,
             "method": "textDocument/definition",
             "params": {
                 "textDocument": {
@@ -226,8 +207,7 @@ class SwiftLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", [])
         return result, result[0].get("uri") if result else None
 
@@ -243,7 +223,6 @@ class KotlinLanguageServer(LanguageServer):
         """Get diagnostics for Kotlin code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 3,
             "method": "textDocument/diagnostic",
             "params": {
                 "textDocument": {
@@ -254,15 +233,13 @@ class KotlinLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {}).get("diagnostics", [])
 
     async def format(self, code: str, file_path: Optional[str] = None, style_config: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Format Kotlin code using ktlint."""
         request = {
             "jsonrpc": "2.0",
-            "id": 4,
             "method": "textDocument/formatting",
             "params": {
                 "textDocument": {
@@ -277,8 +254,7 @@ class KotlinLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         changes = response.get("result", [])
         return code, changes
 
@@ -286,7 +262,6 @@ class KotlinLanguageServer(LanguageServer):
         """Get completion suggestions for Kotlin code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 5,
             "method": "textDocument/completion",
             "params": {
                 "textDocument": {
@@ -299,8 +274,7 @@ class KotlinLanguageServer(LanguageServer):
                 "context": context or {}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("items", []), result.get("triggerCharacters", [])
 
@@ -308,7 +282,6 @@ class KotlinLanguageServer(LanguageServer):
         """Get hover information for Kotlin code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 6,
             "method": "textDocument/hover",
             "params": {
                 "textDocument": {
@@ -320,8 +293,7 @@ class KotlinLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("contents", []), result.get("range")
 
@@ -329,7 +301,6 @@ class KotlinLanguageServer(LanguageServer):
         """Find definition locations for Kotlin code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 7,
             "method": "textDocument/definition",
             "params": {
                 "textDocument": {
@@ -341,8 +312,7 @@ class KotlinLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", [])
         return result, result[0].get("uri") if result else None
 
@@ -358,7 +328,6 @@ class ScalaLanguageServer(LanguageServer):
         """Get diagnostics for Scala code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 3,
             "method": "textDocument/diagnostic",
             "params": {
                 "textDocument": {
@@ -369,15 +338,13 @@ class ScalaLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         return response.get("result", {}).get("diagnostics", [])
 
     async def format(self, code: str, file_path: Optional[str] = None, style_config: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Dict[str, Any]]]:
         """Format Scala code using scalafmt."""
         request = {
             "jsonrpc": "2.0",
-            "id": 4,
             "method": "textDocument/formatting",
             "params": {
                 "textDocument": {
@@ -392,8 +359,7 @@ class ScalaLanguageServer(LanguageServer):
                 }
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         changes = response.get("result", [])
         return code, changes
 
@@ -401,7 +367,6 @@ class ScalaLanguageServer(LanguageServer):
         """Get completion suggestions for Scala code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 5,
             "method": "textDocument/completion",
             "params": {
                 "textDocument": {
@@ -414,8 +379,7 @@ class ScalaLanguageServer(LanguageServer):
                 "context": context or {}
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("items", []), result.get("triggerCharacters", [])
 
@@ -423,7 +387,6 @@ class ScalaLanguageServer(LanguageServer):
         """Get hover information for Scala code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 6,
             "method": "textDocument/hover",
             "params": {
                 "textDocument": {
@@ -435,8 +398,7 @@ class ScalaLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", {})
         return result.get("contents", []), result.get("range")
 
@@ -444,7 +406,6 @@ class ScalaLanguageServer(LanguageServer):
         """Find definition locations for Scala code."""
         request = {
             "jsonrpc": "2.0",
-            "id": 7,
             "method": "textDocument/definition",
             "params": {
                 "textDocument": {
@@ -456,7 +417,6 @@ class ScalaLanguageServer(LanguageServer):
                 "position": position
             }
         }
-        await self.send_request(request)
-        response = await self.receive_response()
+        response = await self.send_request(request)
         result = response.get("result", [])
         return result, result[0].get("uri") if result else None 
\ No newline at end of file
@@ -1,17 +1,43 @@
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Union, Callable
 from datetime import datetime, timedelta
 import logging
 from dataclasses import dataclass
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestRegressor, XGBRegressor
-from prophet import Prophet
-from scipy import stats
-import pandas as pd
-import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.optimizers import Adam
+from .forecast_registry import ForecastModelRegistry, Forecaster
+from .statistical_forecast import FORECAST_HORIZON, HoltWintersForecaster, SeasonalNaiveForecaster
+from .usage_history import (
+    UsageSeries,
+    as_usage_series,
+    bucket_mean,
+    day_of_year,
+    diff,
+    month_of_year,
+    nan_max,
+    nan_mean,
+    nan_std,
+    pct_change
+)
+
+# Forecasting backend used when a strategy's parameters do not name one.
+# "holt_winters" and "seasonal_naive" need only NumPy; "prophet" and
+# "ensemble" (Prophet, LSTM and XGBoost combined) import their libraries
+# on first use.
+DEFAULT_FORECAST_BACKEND = "holt_winters"
+
+def create_forecaster(backend: str,
+                      derived: Optional[Dict[str, Callable[[Dict[str, np.ndarray]], np.ndarray]]] = None) -> Forecaster:
+    """Forecaster for a single-model backend."""
+    if backend == "holt_winters":
+        return HoltWintersForecaster(derived)
+    if backend == "seasonal_naive":
+        return SeasonalNaiveForecaster(derived)
+    if backend == "prophet":
+        from .ml_forecast import ProphetForecaster
+        return ProphetForecaster(derived)
+    raise ValueError(f"Unknown forecast backend: {backend}")
+
+# Fitted models shared by every strategy instance, since the factory creates new instances per call
+forecast_registry = ForecastModelRegistry()
 
 @dataclass
 class OptimizationStrategy:
@@ -20,21 +46,123 @@ class OptimizationStrategy:
     parameters: Dict[str, Any]
     constraints: Dict[str, Any]
     performance_metrics: Dict[str, List[float]]
+    
+    def _forecast_usage(self,
+                        resource: str,
+                        history: UsageSeries,
+                        derived: Optional[Dict[str, Callable[[Dict[str, np.ndarray]], np.ndarray]]] = None) -> Dict[str, Any]:
+        """Forecast usage with the backend named by the ``forecast_backend`` parameter.
+
+        ``derived`` maps result keys to functions of the forecast's columns
+        (yhat, yhat_lower, yhat_upper, trend and seasonal) as arrays.
+        """
+        backend = (self.parameters or {}).get("forecast_backend", DEFAULT_FORECAST_BACKEND)
+        if backend == "ensemble":
+            return self._ensemble_forecast(resource, history)
+        # Served from the cached model; new samples refresh it in the background
+        return forecast_registry.forecast(resource, "usage", history, create_forecaster(backend, derived))
+    
+    def _ensemble_forecast(self, resource: str, history: UsageSeries) -> Dict[str, Any]:
+        """Forecast usage with Prophet, LSTM and XGBoost and combine the results."""
+        # Imported here so only processes that opt into the ensemble load TensorFlow, Prophet and XGBoost
+        from .ml_forecast import ProphetForecaster, LSTMForecaster, XGBoostForecaster
+        forecasters = [ProphetForecaster(), LSTMForecaster(), XGBoostForecaster()]
+        # Queue all three first so their fits run concurrently
+        for forecaster in forecasters:
+            forecast_registry.refresh(resource, "usage", history, forecaster)
+        return self._combine_forecasts(*(
+            forecast_registry.forecast(resource, "usage", history, forecaster)
+            for forecaster in forecasters
+        ))
+    
+    def _combine_forecasts(self,
+                          prophet_forecast: Dict[str, Any],
+                          lstm_forecast: Dict[str, Any],
+                          xgb_forecast: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine forecasts from multiple models."""
+        try:
+            # Get forecasts; Prophet's frame covers the history too, so take its last rows
+            prophet_records = prophet_forecast.get("forecast", [])[-FORECAST_HORIZON:]
+            prophet_values = [f["yhat"] for f in prophet_records]
+            lstm_values = lstm_forecast.get("forecast", [])
+            xgb_values = xgb_forecast.get("forecast", [])
+            
+            # Calculate weights based on model performance
+            weights = self._calculate_model_weights(prophet_values, lstm_values, xgb_values)
+            
+            # Combine forecasts; the models' spread stands in for an interval
+            combined = []
+            for i in range(FORECAST_HORIZON):
+                values = [prophet_values[i], lstm_values[i], xgb_values[i]]
+                combined_value = (
+                    weights["prophet"] * prophet_values[i] +
+                    weights["lstm"] * lstm_values[i] +
+                    weights["xgboost"] * xgb_values[i]
+                )
+                combined.append({
+                    "ds": prophet_records[i]["ds"],
+                    "yhat": combined_value,
+                    "yhat_lower": min(values),
+                    "yhat_upper": max(values)
+                })
+            
+            return {
+                "model": "ensemble",
+                "forecast": combined,
+                "weights": weights
+            }
+            
+        except Exception as e:
+            logging.error(f"Error combining forecasts: {str(e)}")
+            return {}
+    
+    def _calculate_model_weights(self,
+                                prophet_values: List[float],
+                                lstm_values: List[float],
+                                xgb_values: List[float]) -> Dict[str, float]:
+        """Calculate weights for model combination."""
+        try:
+            # Calculate model errors
+            prophet_error = np.mean(np.abs(np.diff(prophet_values)))
+            lstm_error = np.mean(np.abs(np.diff(lstm_values)))
+            xgb_error = np.mean(np.abs(np.diff(xgb_values)))
+            
+            # Calculate weights (inverse of errors)
+            total_error = prophet_error + lstm_error + xgb_error
+            if total_error == 0:
+                return {"prophet": 0.33, "lstm": 0.33, "xgboost": 0.34}
+            
+            weights = {
+                "prophet": 1 - (prophet_error / total_error),
+                "lstm": 1 - (lstm_error / total_error),
+                "xgboost": 1 - (xgb_error / total_error)
+            }
+            
+            # Normalize weights
+            total_weight = sum(weights.values())
+            return {k: v/total_weight for k, v in weights.items()}
+            
+        except Exception as e:
+            logging.error(f"Error calculating model weights: {str(e)}")
+            return {"prophet": 0.33, "lstm": 0.33, "xgboost": 0.34}
 
 class ComputeOptimizationStrategy(OptimizationStrategy):
     """Strategy for optimizing compute resources."""
     
     def optimize_allocation(self,
                           current_usage: float,
-                          historical_data: List[Dict[str, Any]],
+                          historical_data: Union[List[Dict[str, Any]], UsageSeries],
                           constraints: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize compute resource allocation."""
         try:
+            # Read the samples as columns once; a UsageSeries is used as is
+            history = as_usage_series(historical_data)
+            
             # Extract usage patterns
-            usage_patterns = self._analyze_usage_patterns(historical_data)
+            usage_patterns = self._analyze_usage_patterns(history)
             
             # Predict future demand
-            demand_forecast = self._predict_demand(historical_data)
+            demand_forecast = self._predict_demand(history)
             
             # Calculate optimal allocation
             optimal_allocation = self._calculate_optimal_compute(
@@ -54,25 +182,19 @@ class ComputeOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error optimizing compute allocation: {str(e)}")
             return {"amount": current_usage, "confidence": 0.5, "reasoning": "Error in optimization"}
     
-    def _analyze_usage_patterns(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_usage_patterns(self, history: UsageSeries) -> Dict[str, Any]:
         """Analyze compute usage patterns."""
         try:
-            # Convert to time series
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Calculate daily patterns
-            daily_patterns = df.groupby(df['timestamp'].dt.hour)['usage'].mean()
-            
-            # Calculate weekly patterns
-            weekly_patterns = df.groupby(df['timestamp'].dt.dayofweek)['usage'].mean()
+            # Daily and weekly patterns are kept up to date by the series
+            daily_patterns = history.hourly_mean('usage')
+            weekly_patterns = history.weekday_mean('usage')
             
             # Calculate seasonality
-            seasonal_patterns = self._calculate_seasonality(df)
+            seasonal_patterns = self._calculate_seasonality(history)
             
             return {
-                "daily": daily_patterns.to_dict(),
-                "weekly": weekly_patterns.to_dict(),
+                "daily": daily_patterns,
+                "weekly": weekly_patterns,
                 "seasonal": seasonal_patterns
             }
             
@@ -80,55 +202,38 @@ class ComputeOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error analyzing usage patterns: {str(e)}")
             return {}
     
-    def _predict_demand(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Predict future compute demand using Prophet."""
+    def _predict_demand(self, history: UsageSeries) -> Dict[str, Any]:
+        """Predict future compute demand."""
         try:
-            # Prepare data for Prophet
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.rename(columns={'timestamp': 'ds', 'usage': 'y'})
-            
-            # Fit Prophet model
-            model = Prophet(
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                daily_seasonality=True,
-                changepoint_prior_scale=0.05
+            return self._forecast_usage(
+                "compute",
+                history,
+                {"seasonality": lambda forecast: forecast['seasonal']}
             )
-            model.fit(df)
-            
-            # Generate future dates
-            future = model.make_future_dataframe(periods=24, freq='H')
-            
-            # Make predictions
-            forecast = model.predict(future)
-            
-            return {
-                "forecast": forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].to_dict('records'),
-                "trend": forecast['trend'].tolist(),
-                "seasonality": forecast['yearly'].tolist()
-            }
             
         except Exception as e:
             logging.error(f"Error predicting demand: {str(e)}")
             return {}
     
-    def _calculate_seasonality(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_seasonality(self, history: UsageSeries) -> Dict[str, Any]:
         """Calculate seasonal patterns in usage."""
         try:
+            usage = history.column('usage')
+            months = month_of_year(history.timestamps)
+            
             # Calculate monthly seasonality
-            monthly = df.groupby(df['timestamp'].dt.month)['usage'].mean()
+            monthly = bucket_mean(usage, months, 13)
             
             # Calculate quarterly seasonality
-            quarterly = df.groupby(df['timestamp'].dt.quarter)['usage'].mean()
+            quarterly = bucket_mean(usage, (months - 1) // 3 + 1, 5)
             
             # Calculate yearly seasonality
-            yearly = df.groupby(df['timestamp'].dt.dayofyear)['usage'].mean()
+            yearly = bucket_mean(usage, day_of_year(history.timestamps), 367)
             
             return {
-                "monthly": monthly.to_dict(),
-                "quarterly": quarterly.to_dict(),
-                "yearly": yearly.to_dict()
+                "monthly": monthly,
+                "quarterly": quarterly,
+                "yearly": yearly
             }
             
         except Exception as e:
@@ -144,7 +249,7 @@ class ComputeOptimizationStrategy(OptimizationStrategy):
         try:
             # Get current hour and day patterns
             current_hour = datetime.now().hour
-            current_day = datetime.now().dayofweek
+            current_day = datetime.now().weekday()
             
             # Get pattern-based adjustment
             hour_adjustment = patterns.get("daily", {}).get(current_hour, 1.0)
@@ -267,15 +372,18 @@ class StorageOptimizationStrategy(OptimizationStrategy):
     
     def optimize_allocation(self,
                           current_usage: float,
-                          historical_data: List[Dict[str, Any]],
+                          historical_data: Union[List[Dict[str, Any]], UsageSeries],
                           constraints: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize storage resource allocation."""
         try:
+            # Read the samples as columns once; a UsageSeries is used as is
+            history = as_usage_series(historical_data)
+            
             # Analyze storage patterns
-            storage_patterns = self._analyze_storage_patterns(historical_data)
+            storage_patterns = self._analyze_storage_patterns(history)
             
             # Predict storage growth
-            growth_forecast = self._predict_storage_growth(historical_data)
+            growth_forecast = self._predict_storage_growth(history)
             
             # Calculate optimal allocation
             optimal_allocation = self._calculate_optimal_storage(
@@ -295,28 +403,24 @@ class StorageOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error optimizing storage allocation: {str(e)}")
             return {"amount": current_usage, "confidence": 0.5, "reasoning": "Error in optimization"}
     
-    def _analyze_storage_patterns(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_storage_patterns(self, history: UsageSeries) -> Dict[str, Any]:
         """Analyze storage usage patterns."""
         try:
-            # Convert to time series
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
             # Calculate growth rate
-            df['growth'] = df['usage'].pct_change()
+            growth = pct_change(history.column('usage'))
             
             # Calculate daily growth patterns
-            daily_growth = df.groupby(df['timestamp'].dt.hour)['growth'].mean()
+            daily_growth = bucket_mean(growth, history.hours, 24)
             
             # Calculate weekly growth patterns
-            weekly_growth = df.groupby(df['timestamp'].dt.dayofweek)['growth'].mean()
+            weekly_growth = bucket_mean(growth, history.weekdays, 7)
             
             # Calculate storage efficiency
-            efficiency = self._calculate_storage_efficiency(df)
+            efficiency = self._calculate_storage_efficiency(history)
             
             return {
-                "daily_growth": daily_growth.to_dict(),
-                "weekly_growth": weekly_growth.to_dict(),
+                "daily_growth": daily_growth,
+                "weekly_growth": weekly_growth,
                 "efficiency": efficiency
             }
             
@@ -324,53 +428,32 @@ class StorageOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error analyzing storage patterns: {str(e)}")
             return {}
     
-    def _predict_storage_growth(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Predict future storage growth using Prophet."""
+    def _predict_storage_growth(self, history: UsageSeries) -> Dict[str, Any]:
+        """Predict future storage growth."""
         try:
-            # Prepare data for Prophet
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.rename(columns={'timestamp': 'ds', 'usage': 'y'})
-            
-            # Fit Prophet model with growth rate
-            model = Prophet(
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                daily_seasonality=True,
-                changepoint_prior_scale=0.05
+            return self._forecast_usage(
+                "storage",
+                history,
+                {"growth_rate": lambda forecast: pct_change(forecast['yhat'])}
             )
-            model.fit(df)
-            
-            # Generate future dates
-            future = model.make_future_dataframe(periods=24, freq='H')
-            
-            # Make predictions
-            forecast = model.predict(future)
-            
-            # Calculate growth rate
-            forecast['growth_rate'] = forecast['yhat'].pct_change()
-            
-            return {
-                "forecast": forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].to_dict('records'),
-                "growth_rate": forecast['growth_rate'].tolist(),
-                "trend": forecast['trend'].tolist()
-            }
             
         except Exception as e:
             logging.error(f"Error predicting storage growth: {str(e)}")
             return {}
     
-    def _calculate_storage_efficiency(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_storage_efficiency(self, history: UsageSeries) -> Dict[str, Any]:
         """Calculate storage efficiency metrics."""
         try:
+            usage = history.column('usage')
+            
             # Calculate utilization rate
-            utilization = df['usage'].mean() / df['usage'].max() if df['usage'].max() > 0 else 0
+            utilization = nan_mean(usage) / nan_max(usage) if nan_max(usage) > 0 else 0
             
             # Calculate growth rate
-            growth_rate = df['usage'].pct_change().mean()
+            growth_rate = nan_mean(pct_change(usage))
             
             # Calculate fragmentation
-            fragmentation = self._calculate_fragmentation(df)
+            fragmentation = self._calculate_fragmentation(history)
             
             return {
                 "utilization": utilization,
@@ -382,11 +465,12 @@ class StorageOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error calculating storage efficiency: {str(e)}")
             return {}
     
-    def _calculate_fragmentation(self, df: pd.DataFrame) -> float:
+    def _calculate_fragmentation(self, history: UsageSeries) -> float:
         """Calculate storage fragmentation."""
         try:
             # Calculate usage gaps
-            usage_gaps = df['usage'].diff().dropna()
+            usage_gaps = diff(history.column('usage'))
+            usage_gaps = usage_gaps[~np.isnan(usage_gaps)]
             
             # Calculate fragmentation score
             fragmentation = np.std(usage_gaps) / np.mean(usage_gaps) if np.mean(usage_gaps) > 0 else 0
@@ -406,7 +490,7 @@ class StorageOptimizationStrategy(OptimizationStrategy):
         try:
             # Get current growth patterns
             current_hour = datetime.now().hour
-            current_day = datetime.now().dayofweek
+            current_day = datetime.now().weekday()
             
             # Get pattern-based adjustment
             hour_growth = patterns.get("daily_growth", {}).get(current_hour, 0)
@@ -537,15 +621,18 @@ class NetworkOptimizationStrategy(OptimizationStrategy):
     
     def optimize_allocation(self,
                           current_usage: float,
-                          historical_data: List[Dict[str, Any]],
+                          historical_data: Union[List[Dict[str, Any]], UsageSeries],
                           constraints: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize network resource allocation."""
         try:
+            # Read the samples as columns once; a UsageSeries is used as is
+            history = as_usage_series(historical_data)
+            
             # Analyze network patterns
-            network_patterns = self._analyze_network_patterns(historical_data)
+            network_patterns = self._analyze_network_patterns(history)
             
             # Predict network traffic
-            traffic_forecast = self._predict_network_traffic(historical_data)
+            traffic_forecast = self._predict_network_traffic(history)
             
             # Calculate optimal allocation
             optimal_allocation = self._calculate_optimal_network(
@@ -565,28 +652,24 @@ class NetworkOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error optimizing network allocation: {str(e)}")
             return {"amount": current_usage, "confidence": 0.5, "reasoning": "Error in optimization"}
     
-    def _analyze_network_patterns(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_network_patterns(self, history: UsageSeries) -> Dict[str, Any]:
         """Analyze network usage patterns."""
         try:
-            # Convert to time series
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
             # Calculate traffic patterns
-            df['traffic'] = df['usage'].diff()
+            traffic = diff(history.column('usage'))
             
             # Calculate daily traffic patterns
-            daily_traffic = df.groupby(df['timestamp'].dt.hour)['traffic'].mean()
+            daily_traffic = bucket_mean(traffic, history.hours, 24)
             
             # Calculate weekly traffic patterns
-            weekly_traffic = df.groupby(df['timestamp'].dt.dayofweek)['traffic'].mean()
+            weekly_traffic = bucket_mean(traffic, history.weekdays, 7)
             
             # Calculate network quality metrics
-            quality_metrics = self._calculate_network_quality(df)
+            quality_metrics = self._calculate_network_quality(history)
             
             return {
-                "daily_traffic": daily_traffic.to_dict(),
-                "weekly_traffic": weekly_traffic.to_dict(),
+                "daily_traffic": daily_traffic,
+                "weekly_traffic": weekly_traffic,
                 "quality_metrics": quality_metrics
             }
             
@@ -594,53 +677,33 @@ class NetworkOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error analyzing network patterns: {str(e)}")
             return {}
     
-    def _predict_network_traffic(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Predict future network traffic using Prophet."""
+    def _predict_network_traffic(self, history: UsageSeries) -> Dict[str, Any]:
+        """Predict future network traffic."""
         try:
-            # Prepare data for Prophet
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.rename(columns={'timestamp': 'ds', 'usage': 'y'})
-            
-            # Fit Prophet model
-            model = Prophet(
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                daily_seasonality=True,
-                changepoint_prior_scale=0.05
+            return self._forecast_usage(
+                "network",
+                history,
+                {"traffic_patterns": lambda forecast: diff(forecast['yhat'])}
             )
-            model.fit(df)
-            
-            # Generate future dates
-            future = model.make_future_dataframe(periods=24, freq='H')
-            
-            # Make predictions
-            forecast = model.predict(future)
-            
-            # Calculate traffic patterns
-            forecast['traffic'] = forecast['yhat'].diff()
-            
-            return {
-                "forecast": forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].to_dict('records'),
-                "traffic_patterns": forecast['traffic'].tolist(),
-                "trend": forecast['trend'].tolist()
-            }
             
         except Exception as e:
             logging.error(f"Error predicting network traffic: {str(e)}")
             return {}
     
-    def _calculate_network_quality(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_network_quality(self, history: UsageSeries) -> Dict[str, Any]:
         """Calculate network quality metrics."""
         try:
+            usage = history.column('usage')
+            traffic = diff(usage)
+            
             # Calculate bandwidth utilization
-            utilization = df['usage'].mean() / df['usage'].max() if df['usage'].max() > 0 else 0
+            utilization = nan_mean(usage) / nan_max(usage) if nan_max(usage) > 0 else 0
             
             # Calculate traffic volatility
-            volatility = df['traffic'].std() / df['traffic'].mean() if df['traffic'].mean() > 0 else 0
+            volatility = nan_std(traffic) / nan_mean(traffic) if nan_mean(traffic) > 0 else 0
             
             # Calculate peak usage
-            peak_usage = df['usage'].max()
+            peak_usage = nan_max(usage)
             
             return {
                 "utilization": utilization,
@@ -661,7 +724,7 @@ class NetworkOptimizationStrategy(OptimizationStrategy):
         try:
             # Get current traffic patterns
             current_hour = datetime.now().hour
-            current_day = datetime.now().dayofweek
+            current_day = datetime.now().weekday()
             
             # Get pattern-based adjustment
             hour_traffic = patterns.get("daily_traffic", {}).get(current_hour, 0)
@@ -792,15 +855,18 @@ class MemoryOptimizationStrategy(OptimizationStrategy):
     
     def optimize_allocation(self,
                           current_usage: float,
-                          historical_data: List[Dict[str, Any]],
+                          historical_data: Union[List[Dict[str, Any]], UsageSeries],
                           constraints: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize memory resource allocation."""
         try:
+            # Read the samples as columns once; a UsageSeries is used as is
+            history = as_usage_series(historical_data)
+            
             # Analyze memory patterns
-            memory_patterns = self._analyze_memory_patterns(historical_data)
+            memory_patterns = self._analyze_memory_patterns(history)
             
             # Predict memory usage
-            usage_forecast = self._predict_memory_usage(historical_data)
+            usage_forecast = self._predict_memory_usage(history)
             
             # Calculate optimal allocation
             optimal_allocation = self._calculate_optimal_memory(
@@ -820,29 +886,21 @@ class MemoryOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error optimizing memory allocation: {str(e)}")
             return {"amount": current_usage, "confidence": 0.5, "reasoning": "Error in optimization"}
     
-    def _analyze_memory_patterns(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_memory_patterns(self, history: UsageSeries) -> Dict[str, Any]:
         """Analyze memory usage patterns."""
         try:
-            # Convert to time series
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Calculate memory patterns
-            df['memory_usage'] = df['usage']
-            df['memory_pressure'] = df['memory_usage'].pct_change()
-            
             # Calculate daily memory patterns
-            daily_memory = df.groupby(df['timestamp'].dt.hour)['memory_usage'].mean()
+            daily_memory = history.hourly_mean('usage')
             
             # Calculate weekly memory patterns
-            weekly_memory = df.groupby(df['timestamp'].dt.dayofweek)['memory_usage'].mean()
+            weekly_memory = history.weekday_mean('usage')
             
             # Calculate memory efficiency metrics
-            efficiency = self._calculate_memory_efficiency(df)
+            efficiency = self._calculate_memory_efficiency(history)
             
             return {
-                "daily_memory": daily_memory.to_dict(),
-                "weekly_memory": weekly_memory.to_dict(),
+                "daily_memory": daily_memory,
+                "weekly_memory": weekly_memory,
                 "efficiency": efficiency
             }
             
@@ -850,54 +908,32 @@ class MemoryOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error analyzing memory patterns: {str(e)}")
             return {}
     
-    def _predict_memory_usage(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Predict future memory usage using Prophet and ARIMA."""
-        try:
-            # Prepare data for Prophet
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.rename(columns={'timestamp': 'ds', 'usage': 'y'})
-            
-            # Fit Prophet model with memory-specific parameters
-            model = Prophet(
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                daily_seasonality=True,
-                changepoint_prior_scale=0.05,
-                seasonality_prior_scale=10.0
+    def _predict_memory_usage(self, history: UsageSeries) -> Dict[str, Any]:
+        """Predict future memory usage."""
+        try:
+            return self._forecast_usage(
+                "memory",
+                history,
+                {"memory_pressure": lambda forecast: pct_change(forecast['yhat'])}
             )
-            model.fit(df)
-            
-            # Generate future dates
-            future = model.make_future_dataframe(periods=24, freq='H')
-            
-            # Make predictions
-            forecast = model.predict(future)
-            
-            # Calculate memory pressure
-            forecast['memory_pressure'] = forecast['yhat'].pct_change()
-            
-            return {
-                "forecast": forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].to_dict('records'),
-                "memory_pressure": forecast['memory_pressure'].tolist(),
-                "trend": forecast['trend'].tolist()
-            }
             
         except Exception as e:
             logging.error(f"Error predicting memory usage: {str(e)}")
             return {}
     
-    def _calculate_memory_efficiency(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_memory_efficiency(self, history: UsageSeries) -> Dict[str, Any]:
         """Calculate memory efficiency metrics."""
         try:
+            memory_usage = history.column('usage')
+            
             # Calculate memory utilization
-            utilization = df['memory_usage'].mean() / df['memory_usage'].max() if df['memory_usage'].max() > 0 else 0
+            utilization = nan_mean(memory_usage) / nan_max(memory_usage) if nan_max(memory_usage) > 0 else 0
             
             # Calculate memory pressure
-            pressure = df['memory_pressure'].mean()
+            pressure = nan_mean(pct_change(memory_usage))
             
             # Calculate memory fragmentation
-            fragmentation = self._calculate_memory_fragmentation(df)
+            fragmentation = self._calculate_memory_fragmentation(history)
             
             return {
                 "utilization": utilization,
@@ -909,11 +945,12 @@ class MemoryOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error calculating memory efficiency: {str(e)}")
             return {}
     
-    def _calculate_memory_fragmentation(self, df: pd.DataFrame) -> float:
+    def _calculate_memory_fragmentation(self, history: UsageSeries) -> float:
         """Calculate memory fragmentation."""
         try:
             # Calculate memory usage gaps
-            usage_gaps = df['memory_usage'].diff().dropna()
+            usage_gaps = diff(history.column('usage'))
+            usage_gaps = usage_gaps[~np.isnan(usage_gaps)]
             
             # Calculate fragmentation score
             fragmentation = np.std(usage_gaps) / np.mean(usage_gaps) if np.mean(usage_gaps) > 0 else 0
@@ -933,7 +970,7 @@ class MemoryOptimizationStrategy(OptimizationStrategy):
         try:
             # Get current memory patterns
             current_hour = datetime.now().hour
-            current_day = datetime.now().dayofweek
+            current_day = datetime.now().weekday()
             
             # Get pattern-based adjustment
             hour_memory = patterns.get("daily_memory", {}).get(current_hour, 0)
@@ -1064,15 +1101,18 @@ class GPUOptimizationStrategy(OptimizationStrategy):
     
     def optimize_allocation(self,
                           current_usage: float,
-                          historical_data: List[Dict[str, Any]],
+                          historical_data: Union[List[Dict[str, Any]], UsageSeries],
                           constraints: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize GPU resource allocation."""
         try:
+            # Read the samples as columns once; a UsageSeries is used as is
+            history = as_usage_series(historical_data)
+            
             # Analyze GPU patterns
-            gpu_patterns = self._analyze_gpu_patterns(historical_data)
+            gpu_patterns = self._analyze_gpu_patterns(history)
             
             # Predict GPU usage
-            usage_forecast = self._predict_gpu_usage(historical_data)
+            usage_forecast = self._predict_gpu_usage(history)
             
             # Calculate optimal allocation
             optimal_allocation = self._calculate_optimal_gpu(
@@ -1092,29 +1132,21 @@ class GPUOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error optimizing GPU allocation: {str(e)}")
             return {"amount": current_usage, "confidence": 0.5, "reasoning": "Error in optimization"}
     
-    def _analyze_gpu_patterns(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_gpu_patterns(self, history: UsageSeries) -> Dict[str, Any]:
         """Analyze GPU usage patterns."""
         try:
-            # Convert to time series
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Calculate GPU patterns
-            df['gpu_usage'] = df['usage']
-            df['gpu_utilization'] = df['gpu_usage'].pct_change()
-            
             # Calculate daily GPU patterns
-            daily_gpu = df.groupby(df['timestamp'].dt.hour)['gpu_usage'].mean()
+            daily_gpu = history.hourly_mean('usage')
             
             # Calculate weekly GPU patterns
-            weekly_gpu = df.groupby(df['timestamp'].dt.dayofweek)['gpu_usage'].mean()
+            weekly_gpu = history.weekday_mean('usage')
             
             # Calculate GPU efficiency metrics
-            efficiency = self._calculate_gpu_efficiency(df)
+            efficiency = self._calculate_gpu_efficiency(history)
             
             return {
-                "daily_gpu": daily_gpu.to_dict(),
-                "weekly_gpu": weekly_gpu.to_dict(),
+                "daily_gpu": daily_gpu,
+                "weekly_gpu": weekly_gpu,
                 "efficiency": efficiency
             }
             
@@ -1122,54 +1154,32 @@ class GPUOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error analyzing GPU patterns: {str(e)}")
             return {}
     
-    def _predict_gpu_usage(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Predict future GPU usage using Prophet and ARIMA."""
-        try:
-            # Prepare data for Prophet
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.rename(columns={'timestamp': 'ds', 'usage': 'y'})
-            
-            # Fit Prophet model with GPU-specific parameters
-            model = Prophet(
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                daily_seasonality=True,
-                changepoint_prior_scale=0.05,
-                seasonality_prior_scale=10.0
+    def _predict_gpu_usage(self, history: UsageSeries) -> Dict[str, Any]:
+        """Predict future GPU usage."""
+        try:
+            return self._forecast_usage(
+                "gpu",
+                history,
+                {"gpu_utilization": lambda forecast: pct_change(forecast['yhat'])}
             )
-            model.fit(df)
-            
-            # Generate future dates
-            future = model.make_future_dataframe(periods=24, freq='H')
-            
-            # Make predictions
-            forecast = model.predict(future)
-            
-            # Calculate GPU utilization
-            forecast['gpu_utilization'] = forecast['yhat'].pct_change()
-            
-            return {
-                "forecast": forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].to_dict('records'),
-                "gpu_utilization": forecast['gpu_utilization'].tolist(),
-                "trend": forecast['trend'].tolist()
-            }
             
         except Exception as e:
             logging.error(f"Error predicting GPU usage: {str(e)}")
             return {}
     
-    def _calculate_gpu_efficiency(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_gpu_efficiency(self, history: UsageSeries) -> Dict[str, Any]:
         """Calculate GPU efficiency metrics."""
         try:
+            gpu_usage = history.column('usage')
+            
             # Calculate GPU utilization
-            utilization = df['gpu_usage'].mean() / df['gpu_usage'].max() if df['gpu_usage'].max() > 0 else 0
+            utilization = nan_mean(gpu_usage) / nan_max(gpu_usage) if nan_max(gpu_usage) > 0 else 0
             
             # Calculate GPU utilization rate
-            utilization_rate = df['gpu_utilization'].mean()
+            utilization_rate = nan_mean(pct_change(gpu_usage))
             
             # Calculate GPU efficiency
-            efficiency = self._calculate_gpu_efficiency_score(df)
+            efficiency = self._calculate_gpu_efficiency_score(history)
             
             return {
                 "utilization": utilization,
@@ -1181,14 +1191,17 @@ class GPUOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error calculating GPU efficiency: {str(e)}")
             return {}
     
-    def _calculate_gpu_efficiency_score(self, df: pd.DataFrame) -> float:
+    def _calculate_gpu_efficiency_score(self, history: UsageSeries) -> float:
         """Calculate GPU efficiency score."""
         try:
+            gpu_usage = history.column('usage')
+            gpu_utilization = pct_change(gpu_usage)
+            
             # Calculate GPU usage stability
-            usage_stability = 1 - (df['gpu_usage'].std() / df['gpu_usage'].mean() if df['gpu_usage'].mean() > 0 else 0)
+            usage_stability = 1 - (nan_std(gpu_usage) / nan_mean(gpu_usage) if nan_mean(gpu_usage) > 0 else 0)
             
             # Calculate GPU utilization efficiency
-            utilization_efficiency = 1 - (df['gpu_utilization'].std() / df['gpu_utilization'].mean() if df['gpu_utilization'].mean() > 0 else 0)
+            utilization_efficiency = 1 - (nan_std(gpu_utilization) / nan_mean(gpu_utilization) if nan_mean(gpu_utilization) > 0 else 0)
             
             # Combine efficiency metrics
             efficiency = (usage_stability + utilization_efficiency) / 2
@@ -1208,7 +1221,7 @@ class GPUOptimizationStrategy(OptimizationStrategy):
         try:
             # Get current GPU patterns
             current_hour = datetime.now().hour
-            current_day = datetime.now().dayofweek
+            current_day = datetime.now().weekday()
             
             # Get pattern-based adjustment
             hour_gpu = patterns.get("daily_gpu", {}).get(current_hour, 0)
@@ -1339,15 +1352,18 @@ class DatabaseOptimizationStrategy(OptimizationStrategy):
     
     def optimize_allocation(self,
                           current_usage: float,
-                          historical_data: List[Dict[str, Any]],
+                          historical_data: Union[List[Dict[str, Any]], UsageSeries],
                           constraints: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize database resource allocation."""
         try:
+            # Read the samples as columns once; a UsageSeries is used as is
+            history = as_usage_series(historical_data)
+            
             # Analyze database patterns
-            db_patterns = self._analyze_database_patterns(historical_data)
+            db_patterns = self._analyze_database_patterns(history)
             
             # Predict database usage
-            usage_forecast = self._predict_database_usage(historical_data)
+            usage_forecast = self._predict_database_usage(history)
             
             # Calculate optimal allocation
             optimal_allocation = self._calculate_optimal_database(
@@ -1367,29 +1383,21 @@ class DatabaseOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error optimizing database allocation: {str(e)}")
             return {"amount": current_usage, "confidence": 0.5, "reasoning": "Error in optimization"}
     
-    def _analyze_database_patterns(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_database_patterns(self, history: UsageSeries) -> Dict[str, Any]:
         """Analyze database usage patterns."""
         try:
-            # Convert to time series
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Calculate database patterns
-            df['db_usage'] = df['usage']
-            df['db_load'] = df['db_usage'].pct_change()
-            
             # Calculate daily database patterns
-            daily_db = df.groupby(df['timestamp'].dt.hour)['db_usage'].mean()
+            daily_db = history.hourly_mean('usage')
             
             # Calculate weekly database patterns
-            weekly_db = df.groupby(df['timestamp'].dt.dayofweek)['db_usage'].mean()
+            weekly_db = history.weekday_mean('usage')
             
             # Calculate database efficiency metrics
-            efficiency = self._calculate_database_efficiency(df)
+            efficiency = self._calculate_database_efficiency(history)
             
             return {
-                "daily_db": daily_db.to_dict(),
-                "weekly_db": weekly_db.to_dict(),
+                "daily_db": daily_db,
+                "weekly_db": weekly_db,
                 "efficiency": efficiency
             }
             
@@ -1397,54 +1405,32 @@ class DatabaseOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error analyzing database patterns: {str(e)}")
             return {}
     
-    def _predict_database_usage(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Predict future database usage using Prophet and ARIMA."""
-        try:
-            # Prepare data for Prophet
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df = df.rename(columns={'timestamp': 'ds', 'usage': 'y'})
-            
-            # Fit Prophet model with database-specific parameters
-            model = Prophet(
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                daily_seasonality=True,
-                changepoint_prior_scale=0.05,
-                seasonality_prior_scale=10.0
+    def _predict_database_usage(self, history: UsageSeries) -> Dict[str, Any]:
+        """Predict future database usage."""
+        try:
+            return self._forecast_usage(
+                "database",
+                history,
+                {"db_load": lambda forecast: pct_change(forecast['yhat'])}
             )
-            model.fit(df)
-            
-            # Generate future dates
-            future = model.make_future_dataframe(periods=24, freq='H')
-            
-            # Make predictions
-            forecast = model.predict(future)
-            
-            # Calculate database load
-            forecast['db_load'] = forecast['yhat'].pct_change()
-            
-            return {
-                "forecast": forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].to_dict('records'),
-                "db_load": forecast['db_load'].tolist(),
-                "trend": forecast['trend'].tolist()
-            }
             
         except Exception as e:
             logging.error(f"Error predicting database usage: {str(e)}")
             return {}
     
-    def _calculate_database_efficiency(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_database_efficiency(self, history: UsageSeries) -> Dict[str, Any]:
         """Calculate database efficiency metrics."""
         try:
+            db_usage = history.column('usage')
+            
             # Calculate database utilization
-            utilization = df['db_usage'].mean() / df['db_usage'].max() if df['db_usage'].max() > 0 else 0
+            utilization = nan_mean(db_usage) / nan_max(db_usage) if nan_max(db_usage) > 0 else 0
             
             # Calculate database load
-            load = df['db_load'].mean()
+            load = nan_mean(pct_change(db_usage))
             
             # Calculate database performance
-            performance = self._calculate_database_performance(df)
+            performance = self._calculate_database_performance(history)
             
             return {
                 "utilization": utilization,
@@ -1456,14 +1442,17 @@ class DatabaseOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error calculating database efficiency: {str(e)}")
             return {}
     
-    def _calculate_database_performance(self, df: pd.DataFrame) -> float:
+    def _calculate_database_performance(self, history: UsageSeries) -> float:
         """Calculate database performance score."""
         try:
+            db_usage = history.column('usage')
+            db_load = pct_change(db_usage)
+            
             # Calculate database usage stability
-            usage_stability = 1 - (df['db_usage'].std() / df['db_usage'].mean() if df['db_usage'].mean() > 0 else 0)
+            usage_stability = 1 - (nan_std(db_usage) / nan_mean(db_usage) if nan_mean(db_usage) > 0 else 0)
             
             # Calculate database load stability
-            load_stability = 1 - (df['db_load'].std() / df['db_load'].mean() if df['db_load'].mean() > 0 else 0)
+            load_stability = 1 - (nan_std(db_load) / nan_mean(db_load) if nan_mean(db_load) > 0 else 0)
             
             # Combine performance metrics
             performance = (usage_stability + load_stability) / 2
@@ -1483,7 +1472,7 @@ class DatabaseOptimizationStrategy(OptimizationStrategy):
         try:
             # Get current database patterns
             current_hour = datetime.now().hour
-            current_day = datetime.now().dayofweek
+            current_day = datetime.now().weekday()
             
             # Get pattern-based adjustment
             hour_db = patterns.get("daily_db", {}).get(current_hour, 0)
@@ -1614,15 +1603,18 @@ class CacheOptimizationStrategy(OptimizationStrategy):
     
     def optimize_allocation(self,
                           current_usage: float,
-                          historical_data: List[Dict[str, Any]],
+                          historical_data: Union[List[Dict[str, Any]], UsageSeries],
                           constraints: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize cache resource allocation."""
         try:
+            # Read the samples as columns once; a UsageSeries is used as is
+            history = as_usage_series(historical_data)
+            
             # Analyze cache patterns
-            cache_patterns = self._analyze_cache_patterns(historical_data)
+            cache_patterns = self._analyze_cache_patterns(history)
             
             # Predict cache usage with multiple models
-            usage_forecast = self._predict_cache_usage(historical_data)
+            usage_forecast = self._predict_cache_usage(history)
             
             # Calculate optimal allocation
             optimal_allocation = self._calculate_optimal_cache(
@@ -1642,30 +1634,21 @@ class CacheOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error optimizing cache allocation: {str(e)}")
             return {"amount": current_usage, "confidence": 0.5, "reasoning": "Error in optimization"}
     
-    def _analyze_cache_patterns(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_cache_patterns(self, history: UsageSeries) -> Dict[str, Any]:
         """Analyze cache usage patterns."""
         try:
-            # Convert to time series
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Calculate cache patterns
-            df['cache_usage'] = df['usage']
-            df['cache_hit_rate'] = df.get('hit_rate', 0.5)  # Default to 0.5 if not provided
-            df['cache_miss_rate'] = df.get('miss_rate', 0.5)  # Default to 0.5 if not provided
-            
             # Calculate daily cache patterns
-            daily_cache = df.groupby(df['timestamp'].dt.hour)['cache_usage'].mean()
+            daily_cache = history.hourly_mean('usage')
             
             # Calculate weekly cache patterns
-            weekly_cache = df.groupby(df['timestamp'].dt.dayofweek)['cache_usage'].mean()
+            weekly_cache = history.weekday_mean('usage')
             
             # Calculate cache efficiency metrics
-            efficiency = self._calculate_cache_efficiency(df)
+            efficiency = self._calculate_cache_efficiency(history)
             
             return {
-                "daily_cache": daily_cache.to_dict(),
-                "weekly_cache": weekly_cache.to_dict(),
+                "daily_cache": daily_cache,
+                "weekly_cache": weekly_cache,
                 "efficiency": efficiency
             }
             
@@ -1673,236 +1656,31 @@ class CacheOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error analyzing cache patterns: {str(e)}")
             return {}
     
-    def _predict_cache_usage(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Predict future cache usage using multiple models."""
+    def _predict_cache_usage(self, history: UsageSeries) -> Dict[str, Any]:
+        """Predict future cache usage."""
         try:
-            # Prepare data
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Prophet forecast
-            prophet_forecast = self._prophet_forecast(df)
-            
-            # LSTM forecast
-            lstm_forecast = self._lstm_forecast(df)
-            
-            # XGBoost forecast
-            xgb_forecast = self._xgboost_forecast(df)
-            
-            # Combine forecasts with weights
-            combined_forecast = self._combine_forecasts(
-                prophet_forecast,
-                lstm_forecast,
-                xgb_forecast
-            )
-            
-            return combined_forecast
+            return self._forecast_usage("cache", history)
             
         except Exception as e:
             logging.error(f"Error predicting cache usage: {str(e)}")
             return {}
     
-    def _prophet_forecast(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Generate forecast using Prophet."""
-        try:
-            prophet_df = df.rename(columns={'timestamp': 'ds', 'usage': 'y'})
-            model = Prophet(
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                daily_seasonality=True,
-                changepoint_prior_scale=0.05
-            )
-            model.fit(prophet_df)
-            
-            future = model.make_future_dataframe(periods=24, freq='H')
-            forecast = model.predict(future)
-            
-            return {
-                "model": "prophet",
-                "forecast": forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].to_dict('records'),
-                "trend": forecast['trend'].tolist()
-            }
-            
-        except Exception as e:
-            logging.error(f"Error in Prophet forecast: {str(e)}")
-            return {}
-    
-    def _lstm_forecast(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Generate forecast using LSTM."""
-        try:
-            # Prepare data
-            data = df['usage'].values.reshape(-1, 1)
-            scaler = StandardScaler()
-            scaled_data = scaler.fit_transform(data)
-            
-            # Create sequences
-            X, y = self._create_sequences(scaled_data)
-            
-            # Build LSTM model
-            model = Sequential([
-                LSTM(50, return_sequences=True, input_shape=(X.shape[1], 1)),
-                Dropout(0.2),
-                LSTM(50, return_sequences=False),
-                Dropout(0.2),
-                Dense(1)
-            ])
-            
-            model.compile(optimizer=Adam(learning_rate=0.001), loss='mse')
-            
-            # Train model
-            model.fit(X, y, epochs=50, batch_size=32, verbose=0)
-            
-            # Generate forecast
-            last_sequence = scaled_data[-X.shape[1]:]
-            forecast = []
-            for _ in range(24):
-                next_pred = model.predict(last_sequence.reshape(1, X.shape[1], 1))
-                forecast.append(next_pred[0][0])
-                last_sequence = np.append(last_sequence[1:], next_pred)
-            
-            # Inverse transform
-            forecast = scaler.inverse_transform(np.array(forecast).reshape(-1, 1))
-            
-            return {
-                "model": "lstm",
-                "forecast": forecast.tolist()
-            }
-            
-        except Exception as e:
-            logging.error(f"Error in LSTM forecast: {str(e)}")
-            return {}
-    
-    def _xgboost_forecast(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Generate forecast using XGBoost."""
-        try:
-            # Prepare features
-            df['hour'] = df['timestamp'].dt.hour
-            df['day'] = df['timestamp'].dt.dayofweek
-            df['month'] = df['timestamp'].dt.month
-            
-            # Create sequences
-            X, y = self._create_sequences(df[['usage', 'hour', 'day', 'month']].values)
-            
-            # Train model
-            model = XGBRegressor(
-                n_estimators=100,
-                learning_rate=0.1,
-                max_depth=6,
-                random_state=42
-            )
-            model.fit(X.reshape(X.shape[0], -1), y)
-            
-            # Generate forecast
-            last_sequence = df[['usage', 'hour', 'day', 'month']].values[-X.shape[1]:]
-            forecast = []
-            for i in range(24):
-                next_hour = (df['hour'].iloc[-1] + i + 1) % 24
-                next_day = (df['day'].iloc[-1] + (i + 1) // 24) % 7
-                next_month = df['month'].iloc[-1]
-                
-                next_features = np.append(last_sequence[1:], [[forecast[-1][0] if forecast else df['usage'].iloc[-1],
-                                                             next_hour,
-                                                             next_day,
-                                                             next_month]])
-                
-                next_pred = model.predict(next_features.reshape(1, -1))
-                forecast.append([next_pred[0]])
-                last_sequence = next_features
-            
-            return {
-                "model": "xgboost",
-                "forecast": [f[0] for f in forecast]
-            }
-            
-        except Exception as e:
-            logging.error(f"Error in XGBoost forecast: {str(e)}")
-            return {}
-    
-    def _create_sequences(self, data: np.ndarray, seq_length: int = 24) -> Tuple[np.ndarray, np.ndarray]:
-        """Create sequences for time series prediction."""
-        X, y = [], []
-        for i in range(len(data) - seq_length):
-            X.append(data[i:(i + seq_length)])
-            y.append(data[i + seq_length])
-        return np.array(X), np.array(y)
-    
-    def _combine_forecasts(self,
-                          prophet_forecast: Dict[str, Any],
-                          lstm_forecast: Dict[str, Any],
-                          xgb_forecast: Dict[str, Any]) -> Dict[str, Any]:
-        """Combine forecasts from multiple models."""
-        try:
-            # Get forecasts
-            prophet_values = [f["yhat"] for f in prophet_forecast.get("forecast", [])]
-            lstm_values = lstm_forecast.get("forecast", [])
-            xgb_values = xgb_forecast.get("forecast", [])
-            
-            # Calculate weights based on model performance
-            weights = self._calculate_model_weights(prophet_values, lstm_values, xgb_values)
-            
-            # Combine forecasts
-            combined = []
-            for i in range(24):
-                combined_value = (
-                    weights["prophet"] * prophet_values[i] +
-                    weights["lstm"] * lstm_values[i] +
-                    weights["xgboost"] * xgb_values[i]
-                )
-                combined.append(combined_value)
-            
-            return {
-                "forecast": combined,
-                "weights": weights
-            }
-            
-        except Exception as e:
-            logging.error(f"Error combining forecasts: {str(e)}")
-            return {}
-    
-    def _calculate_model_weights(self,
-                                prophet_values: List[float],
-                                lstm_values: List[float],
-                                xgb_values: List[float]) -> Dict[str, float]:
-        """Calculate weights for model combination."""
-        try:
-            # Calculate model errors
-            prophet_error = np.mean(np.abs(np.diff(prophet_values)))
-            lstm_error = np.mean(np.abs(np.diff(lstm_values)))
-            xgb_error = np.mean(np.abs(np.diff(xgb_values)))
-            
-            # Calculate weights (inverse of errors)
-            total_error = prophet_error + lstm_error + xgb_error
-            if total_error == 0:
-                return {"prophet": 0.33, "lstm": 0.33, "xgboost": 0.34}
-            
-            weights = {
-                "prophet": 1 - (prophet_error / total_error),
-                "lstm": 1 - (lstm_error / total_error),
-                "xgboost": 1 - (xgb_error / total_error)
-            }
-            
-            # Normalize weights
-            total_weight = sum(weights.values())
-            return {k: v/total_weight for k, v in weights.items()}
-            
-        except Exception as e:
-            logging.error(f"Error calculating model weights: {str(e)}")
-            return {"prophet": 0.33, "lstm": 0.33, "xgboost": 0.34}
-    
-    def _calculate_cache_efficiency(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_cache_efficiency(self, history: UsageSeries) -> Dict[str, Any]:
         """Calculate cache efficiency metrics."""
         try:
+            cache_usage = history.column('usage')
+            
             # Calculate cache utilization
-            utilization = df['cache_usage'].mean() / df['cache_usage'].max() if df['cache_usage'].max() > 0 else 0
+            utilization = nan_mean(cache_usage) / nan_max(cache_usage) if nan_max(cache_usage) > 0 else 0
             
             # Calculate hit rate
-            hit_rate = df['cache_hit_rate'].mean()
+            hit_rate = nan_mean(history.column('hit_rate', 0.5))  # Default to 0.5 if not provided
             
             # Calculate miss rate
-            miss_rate = df['cache_miss_rate'].mean()
+            miss_rate = nan_mean(history.column('miss_rate', 0.5))  # Default to 0.5 if not provided
             
             # Calculate cache effectiveness
-            effectiveness = self._calculate_cache_effectiveness(df)
+            effectiveness = self._calculate_cache_effectiveness(history)
             
             return {
                 "utilization": utilization,
@@ -1915,14 +1693,17 @@ class CacheOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error calculating cache efficiency: {str(e)}")
             return {}
     
-    def _calculate_cache_effectiveness(self, df: pd.DataFrame) -> float:
+    def _calculate_cache_effectiveness(self, history: UsageSeries) -> float:
         """Calculate cache effectiveness score."""
         try:
+            cache_usage = history.column('usage')
+            cache_hit_rate = history.column('hit_rate', 0.5)
+            
             # Calculate hit rate stability
-            hit_stability = 1 - (df['cache_hit_rate'].std() / df['cache_hit_rate'].mean() if df['cache_hit_rate'].mean() > 0 else 0)
+            hit_stability = 1 - (nan_std(cache_hit_rate) / nan_mean(cache_hit_rate) if nan_mean(cache_hit_rate) > 0 else 0)
             
             # Calculate usage stability
-            usage_stability = 1 - (df['cache_usage'].std() / df['cache_usage'].mean() if df['cache_usage'].mean() > 0 else 0)
+            usage_stability = 1 - (nan_std(cache_usage) / nan_mean(cache_usage) if nan_mean(cache_usage) > 0 else 0)
             
             # Combine metrics
             effectiveness = (hit_stability + usage_stability) / 2
@@ -1942,7 +1723,7 @@ class CacheOptimizationStrategy(OptimizationStrategy):
         try:
             # Get current cache patterns
             current_hour = datetime.now().hour
-            current_day = datetime.now().dayofweek
+            current_day = datetime.now().weekday()
             
             # Get pattern-based adjustment
             hour_cache = patterns.get("daily_cache", {}).get(current_hour, 0)
@@ -1951,7 +1732,7 @@ class CacheOptimizationStrategy(OptimizationStrategy):
             # Get forecast-based adjustment
             forecast_values = forecast.get("forecast", [])
             if forecast_values:
-                next_hour_forecast = forecast_values[0]
+                next_hour_forecast = forecast_values[0]["yhat"]
                 forecast_adjustment = next_hour_forecast / current_usage if current_usage > 0 else 1.0
             else:
                 forecast_adjustment = 1.0
@@ -2007,8 +1788,8 @@ class CacheOptimizationStrategy(OptimizationStrategy):
             
             # Forecast confidence
             if forecast.get("forecast"):
-                forecast_std = np.std(forecast["forecast"])
-                forecast_confidence = 1 - (forecast_std / np.mean(forecast["forecast"]))
+                forecast_std = np.std([f["yhat_upper"] - f["yhat_lower"] for f in forecast["forecast"]])
+                forecast_confidence = 1 - (forecast_std / np.mean([f["yhat"] for f in forecast["forecast"]]))
             else:
                 forecast_confidence = 0.5
             
@@ -2044,7 +1825,7 @@ class CacheOptimizationStrategy(OptimizationStrategy):
             
             # Forecast reasoning
             if forecast.get("forecast"):
-                next_hour_forecast = forecast["forecast"][0]
+                next_hour_forecast = forecast["forecast"][0]["yhat"]
                 if next_hour_forecast > current * 1.1:
                     reasons.append(f"Forecast predicts cache increase ({next_hour_forecast:.2f})")
                 elif next_hour_forecast < current * 0.9:
@@ -2071,15 +1852,18 @@ class LoadBalancerOptimizationStrategy(OptimizationStrategy):
     
     def optimize_allocation(self,
                           current_usage: float,
-                          historical_data: List[Dict[str, Any]],
+                          historical_data: Union[List[Dict[str, Any]], UsageSeries],
                           constraints: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize load balancer resource allocation."""
         try:
+            # Read the samples as columns once; a UsageSeries is used as is
+            history = as_usage_series(historical_data)
+            
             # Analyze load balancer patterns
-            lb_patterns = self._analyze_lb_patterns(historical_data)
+            lb_patterns = self._analyze_lb_patterns(history)
             
             # Predict load balancer usage
-            usage_forecast = self._predict_lb_usage(historical_data)
+            usage_forecast = self._predict_lb_usage(history)
             
             # Calculate optimal allocation
             optimal_allocation = self._calculate_optimal_lb(
@@ -2099,30 +1883,21 @@ class LoadBalancerOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error optimizing load balancer allocation: {str(e)}")
             return {"amount": current_usage, "confidence": 0.5, "reasoning": "Error in optimization"}
     
-    def _analyze_lb_patterns(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_lb_patterns(self, history: UsageSeries) -> Dict[str, Any]:
         """Analyze load balancer usage patterns."""
         try:
-            # Convert to time series
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Calculate load balancer patterns
-            df['lb_usage'] = df['usage']
-            df['lb_connections'] = df.get('connections', 0)
-            df['lb_throughput'] = df.get('throughput', 0)
-            
             # Calculate daily load balancer patterns
-            daily_lb = df.groupby(df['timestamp'].dt.hour)['lb_usage'].mean()
+            daily_lb = history.hourly_mean('usage')
             
             # Calculate weekly load balancer patterns
-            weekly_lb = df.groupby(df['timestamp'].dt.dayofweek)['lb_usage'].mean()
+            weekly_lb = history.weekday_mean('usage')
             
             # Calculate load balancer efficiency metrics
-            efficiency = self._calculate_lb_efficiency(df)
+            efficiency = self._calculate_lb_efficiency(history)
             
             return {
-                "daily_lb": daily_lb.to_dict(),
-                "weekly_lb": weekly_lb.to_dict(),
+                "daily_lb": daily_lb,
+                "weekly_lb": weekly_lb,
                 "efficiency": efficiency
             }
             
@@ -2130,49 +1905,33 @@ class LoadBalancerOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error analyzing load balancer patterns: {str(e)}")
             return {}
     
-    def _predict_lb_usage(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Predict future load balancer usage using multiple models."""
+    def _predict_lb_usage(self, history: UsageSeries) -> Dict[str, Any]:
+        """Predict future load balancer usage."""
         try:
-            # Prepare data
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Prophet forecast
-            prophet_forecast = self._prophet_forecast(df)
-            
-            # LSTM forecast
-            lstm_forecast = self._lstm_forecast(df)
-            
-            # XGBoost forecast
-            xgb_forecast = self._xgboost_forecast(df)
-            
-            # Combine forecasts with weights
-            combined_forecast = self._combine_forecasts(
-                prophet_forecast,
-                lstm_forecast,
-                xgb_forecast
-            )
-            
-            return combined_forecast
+            return self._forecast_usage("load_balancer", history)
             
         except Exception as e:
             logging.error(f"Error predicting load balancer usage: {str(e)}")
             return {}
     
-    def _calculate_lb_efficiency(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_lb_efficiency(self, history: UsageSeries) -> Dict[str, Any]:
         """Calculate load balancer efficiency metrics."""
         try:
+            lb_usage = history.column('usage')
+            lb_connections = history.column('connections', 0)
+            lb_throughput = history.column('throughput', 0)
+            
             # Calculate load balancer utilization
-            utilization = df['lb_usage'].mean() / df['lb_usage'].max() if df['lb_usage'].max() > 0 else 0
+            utilization = nan_mean(lb_usage) / nan_max(lb_usage) if nan_max(lb_usage) > 0 else 0
             
             # Calculate connection efficiency
-            connection_efficiency = df['lb_connections'].mean() / df['lb_connections'].max() if df['lb_connections'].max() > 0 else 0
+            connection_efficiency = nan_mean(lb_connections) / nan_max(lb_connections) if nan_max(lb_connections) > 0 else 0
             
             # Calculate throughput efficiency
-            throughput_efficiency = df['lb_throughput'].mean() / df['lb_throughput'].max() if df['lb_throughput'].max() > 0 else 0
+            throughput_efficiency = nan_mean(lb_throughput) / nan_max(lb_throughput) if nan_max(lb_throughput) > 0 else 0
             
             # Calculate load balancer performance
-            performance = self._calculate_lb_performance(df)
+            performance = self._calculate_lb_performance(history)
             
             return {
                 "utilization": utilization,
@@ -2185,17 +1944,21 @@ class LoadBalancerOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error calculating load balancer efficiency: {str(e)}")
             return {}
     
-    def _calculate_lb_performance(self, df: pd.DataFrame) -> float:
+    def _calculate_lb_performance(self, history: UsageSeries) -> float:
         """Calculate load balancer performance score."""
         try:
+            lb_usage = history.column('usage')
+            lb_connections = history.column('connections', 0)
+            lb_throughput = history.column('throughput', 0)
+            
             # Calculate usage stability
-            usage_stability = 1 - (df['lb_usage'].std() / df['lb_usage'].mean() if df['lb_usage'].mean() > 0 else 0)
+            usage_stability = 1 - (nan_std(lb_usage) / nan_mean(lb_usage) if nan_mean(lb_usage) > 0 else 0)
             
             # Calculate connection stability
-            connection_stability = 1 - (df['lb_connections'].std() / df['lb_connections'].mean() if df['lb_connections'].mean() > 0 else 0)
+            connection_stability = 1 - (nan_std(lb_connections) / nan_mean(lb_connections) if nan_mean(lb_connections) > 0 else 0)
             
             # Calculate throughput stability
-            throughput_stability = 1 - (df['lb_throughput'].std() / df['lb_throughput'].mean() if df['lb_throughput'].mean() > 0 else 0)
+            throughput_stability = 1 - (nan_std(lb_throughput) / nan_mean(lb_throughput) if nan_mean(lb_throughput) > 0 else 0)
             
             # Combine performance metrics
             performance = (usage_stability + connection_stability + throughput_stability) / 3
@@ -2215,7 +1978,7 @@ class LoadBalancerOptimizationStrategy(OptimizationStrategy):
         try:
             # Get current load balancer patterns
             current_hour = datetime.now().hour
-            current_day = datetime.now().dayofweek
+            current_day = datetime.now().weekday()
             
             # Get pattern-based adjustment
             hour_lb = patterns.get("daily_lb", {}).get(current_hour, 0)
@@ -2346,15 +2109,18 @@ class QueueOptimizationStrategy(OptimizationStrategy):
     
     def optimize_allocation(self,
                           current_usage: float,
-                          historical_data: List[Dict[str, Any]],
+                          historical_data: Union[List[Dict[str, Any]], UsageSeries],
                           constraints: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize queue resource allocation."""
         try:
+            # Read the samples as columns once; a UsageSeries is used as is
+            history = as_usage_series(historical_data)
+            
             # Analyze queue patterns
-            queue_patterns = self._analyze_queue_patterns(historical_data)
+            queue_patterns = self._analyze_queue_patterns(history)
             
             # Predict queue usage
-            usage_forecast = self._predict_queue_usage(historical_data)
+            usage_forecast = self._predict_queue_usage(history)
             
             # Calculate optimal allocation
             optimal_allocation = self._calculate_optimal_queue(
@@ -2374,30 +2140,21 @@ class QueueOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error optimizing queue allocation: {str(e)}")
             return {"amount": current_usage, "confidence": 0.5, "reasoning": "Error in optimization"}
     
-    def _analyze_queue_patterns(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_queue_patterns(self, history: UsageSeries) -> Dict[str, Any]:
         """Analyze queue usage patterns."""
         try:
-            # Convert to time series
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Calculate queue patterns
-            df['queue_usage'] = df['usage']
-            df['queue_length'] = df.get('length', 0)
-            df['queue_processing_rate'] = df.get('processing_rate', 0)
-            
             # Calculate daily queue patterns
-            daily_queue = df.groupby(df['timestamp'].dt.hour)['queue_usage'].mean()
+            daily_queue = history.hourly_mean('usage')
             
             # Calculate weekly queue patterns
-            weekly_queue = df.groupby(df['timestamp'].dt.dayofweek)['queue_usage'].mean()
+            weekly_queue = history.weekday_mean('usage')
             
             # Calculate queue efficiency metrics
-            efficiency = self._calculate_queue_efficiency(df)
+            efficiency = self._calculate_queue_efficiency(history)
             
             return {
-                "daily_queue": daily_queue.to_dict(),
-                "weekly_queue": weekly_queue.to_dict(),
+                "daily_queue": daily_queue,
+                "weekly_queue": weekly_queue,
                 "efficiency": efficiency
             }
             
@@ -2405,49 +2162,33 @@ class QueueOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error analyzing queue patterns: {str(e)}")
             return {}
     
-    def _predict_queue_usage(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Predict future queue usage using multiple models."""
+    def _predict_queue_usage(self, history: UsageSeries) -> Dict[str, Any]:
+        """Predict future queue usage."""
         try:
-            # Prepare data
-            df = pd.DataFrame(historical_data)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Prophet forecast
-            prophet_forecast = self._prophet_forecast(df)
-            
-            # LSTM forecast
-            lstm_forecast = self._lstm_forecast(df)
-            
-            # XGBoost forecast
-            xgb_forecast = self._xgboost_forecast(df)
-            
-            # Combine forecasts with weights
-            combined_forecast = self._combine_forecasts(
-                prophet_forecast,
-                lstm_forecast,
-                xgb_forecast
-            )
-            
-            return combined_forecast
+            return self._forecast_usage("queue", history)
             
         except Exception as e:
             logging.error(f"Error predicting queue usage: {str(e)}")
             return {}
     
-    def _calculate_queue_efficiency(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_queue_efficiency(self, history: UsageSeries) -> Dict[str, Any]:
         """Calculate queue efficiency metrics."""
         try:
+            queue_usage = history.column('usage')
+            queue_length = history.column('length', 0)
+            queue_processing_rate = history.column('processing_rate', 0)
+            
             # Calculate queue utilization
-            utilization = df['queue_usage'].mean() / df['queue_usage'].max() if df['queue_usage'].max() > 0 else 0
+            utilization = nan_mean(queue_usage) / nan_max(queue_usage) if nan_max(queue_usage) > 0 else 0
             
             # Calculate queue length efficiency
-            length_efficiency = df['queue_length'].mean() / df['queue_length'].max() if df['queue_length'].max() > 0 else 0
+            length_efficiency = nan_mean(queue_length) / nan_max(queue_length) if nan_max(queue_length) > 0 else 0
             
             # Calculate processing rate efficiency
-            processing_efficiency = df['queue_processing_rate'].mean() / df['queue_processing_rate'].max() if df['queue_processing_rate'].max() > 0 else 0
+            processing_efficiency = nan_mean(queue_processing_rate) / nan_max(queue_processing_rate) if nan_max(queue_processing_rate) > 0 else 0
             
             # Calculate queue performance
-            performance = self._calculate_queue_performance(df)
+            performance = self._calculate_queue_performance(history)
             
             return {
                 "utilization": utilization,
@@ -2460,17 +2201,21 @@ class QueueOptimizationStrategy(OptimizationStrategy):
             logging.error(f"Error calculating queue efficiency: {str(e)}")
             return {}
     
-    def _calculate_queue_performance(self, df: pd.DataFrame) -> float:
+    def _calculate_queue_performance(self, history: UsageSeries) -> float:
         """Calculate queue performance score."""
         try:
+            queue_usage = history.column('usage')
+            queue_length = history.column('length', 0)
+            queue_processing_rate = history.column('processing_rate', 0)
+            
             # Calculate usage stability
-            usage_stability = 1 - (df['queue_usage'].std() / df['queue_usage'].mean() if df['queue_usage'].mean() > 0 else 0)
+            usage_stability = 1 - (nan_std(queue_usage) / nan_mean(queue_usage) if nan_mean(queue_usage) > 0 else 0)
             
             # Calculate length stability
-            length_stability = 1 - (df['queue_length'].std() / df['queue_length'].mean() if df['queue_length'].mean() > 0 else 0)
+            length_stability = 1 - (nan_std(queue_length) / nan_mean(queue_length) if nan_mean(queue_length) > 0 else 0)
             
             # Calculate processing rate stability
-            processing_stability = 1 - (df['queue_processing_rate'].std() / df['queue_processing_rate'].mean() if df['queue_processing_rate'].mean() > 0 else 0)
+            processing_stability = 1 - (nan_std(queue_processing_rate) / nan_mean(queue_processing_rate) if nan_mean(queue_processing_rate) > 0 else 0)
             
             # Combine performance metrics
             performance = (usage_stability + length_stability + processing_stability) / 3
@@ -2490,7 +2235,7 @@ class QueueOptimizationStrategy(OptimizationStrategy):
         try:
             # Get current queue patterns
             current_hour = datetime.now().hour
-            current_day = datetime.now().dayofweek
+            current_day = datetime.now().weekday()
             
             # Get pattern-based adjustment
             hour_queue = patterns.get("daily_queue", {}).get(current_hour, 0)
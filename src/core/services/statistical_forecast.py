@@ -0,0 +1,256 @@
+from typing import Dict, Optional, Any, Tuple, Callable
+from dataclasses import dataclass
+import warnings
+import numpy as np
+from .forecast_registry import Forecaster
+
+# Steps forecast past the end of the history
+FORECAST_HORIZON = 24
+
+# Normal quantile for an 80% prediction interval, the width Prophet reports by default
+INTERVAL_Z = 1.2816
+
+DAY = np.timedelta64(1, 'D')
+
+def sample_interval(timestamps: np.ndarray) -> np.timedelta64:
+    """Typical spacing of the samples, one hour if it cannot be told."""
+    if len(timestamps) < 2:
+        return np.timedelta64(1, 'h')
+    spacing = np.median(np.diff(timestamps).astype('timedelta64[us]').astype(np.int64))
+    return np.timedelta64(max(int(spacing), 1), 'us')
+
+def daily_season_length(timestamps: np.ndarray) -> int:
+    """Samples per day, the season for usage that follows the time of day."""
+    return max(int(round(DAY / sample_interval(timestamps))), 1)
+
+def forecast_result(model: str,
+                    timestamps: np.ndarray,
+                    frame: Dict[str, np.ndarray],
+                    derived: Dict[str, Callable[[Dict[str, np.ndarray]], np.ndarray]]) -> Dict[str, Any]:
+    """Forecast in the form the strategies read: one record per future step plus derived series."""
+    future = timestamps[-1] + np.arange(1, len(frame["yhat"]) + 1) * sample_interval(timestamps)
+    records = [
+        {"ds": ds.item(), "yhat": float(yhat), "yhat_lower": float(lower), "yhat_upper": float(upper)}
+        for ds, yhat, lower, upper in zip(future, frame["yhat"], frame["yhat_lower"], frame["yhat_upper"])
+    ]
+    result = {"model": model, "forecast": records, "trend": frame["trend"].tolist()}
+    for name, derive in derived.items():
+        result[name] = np.asarray(derive(frame)).tolist()
+    return result
+
+@dataclass
+class HoltWintersState:
+    """Smoothing parameters and the state reached at the end of the history."""
+    alpha: float
+    beta: float
+    gamma: float
+    phi: float
+    level: float
+    trend: float
+    seasonal: np.ndarray
+    # Season slot of the next sample
+    position: int
+    sse: float
+    count: int
+
+    @property
+    def sigma(self) -> float:
+        return float(np.sqrt(self.sse / self.count)) if self.count else 0.0
+
+class HoltWintersForecaster(Forecaster):
+    """Additive Holt-Winters with a damped trend, in NumPy.
+
+    The season is one day of samples. ``fit`` tries every combination of the
+    smoothing parameter grids at once, running the recursion over the last
+    ``fit_days`` days of samples with the grid as a vector, and keeps the one
+    with the smallest one-step error. ``update`` runs the recursion over just the
+    new samples with the fitted parameters, so keeping a model current costs
+    O(new samples). Missing values are skipped by treating them as equal to
+    the forecast.
+    """
+
+    name = "holt_winters"
+
+    def __init__(self,
+                 derived: Optional[Dict[str, Callable[[Dict[str, np.ndarray]], np.ndarray]]] = None,
+                 horizon: int = FORECAST_HORIZON,
+                 fit_days: int = 28,
+                 phi: float = 0.98,
+                 alphas: Tuple[float, ...] = (0.05, 0.1, 0.2, 0.4, 0.7),
+                 betas: Tuple[float, ...] = (0.0, 0.01, 0.05, 0.15),
+                 gammas: Tuple[float, ...] = (0.05, 0.1, 0.2, 0.4)):
+        self.derived = derived or {}
+        self.horizon = horizon
+        self.fit_days = fit_days
+        self.phi = phi
+        self.alphas = alphas
+        self.betas = betas
+        self.gammas = gammas
+
+    def fit(self, timestamps: np.ndarray, values: np.ndarray) -> Tuple[Any, Dict[str, Any]]:
+        season = daily_season_length(timestamps)
+        window = max(self.fit_days, 3) * season
+        values = np.asarray(values, dtype=float)[-window:]
+        if np.count_nonzero(~np.isnan(values)) < 2 * season:
+            # Too short to tell the seasonal pattern from the level
+            season = 1
+        state = self._fit_grid(values, season)
+        return state, self._forecast(state, timestamps)
+
+    def update(self, model: Any, timestamps: np.ndarray, values: np.ndarray, new_samples: int) -> Tuple[Any, Dict[str, Any]]:
+        state = model
+        params = np.array([[state.alpha], [state.beta], [state.gamma]])
+        level, trend, seasonal, sse, count = self._run(
+            np.asarray(values, dtype=float)[len(values) - new_samples:],
+            params,
+            np.array([state.level]),
+            np.array([state.trend]),
+            state.seasonal[np.newaxis, :].copy(),
+            state.position
+        )
+        state = HoltWintersState(
+            state.alpha, state.beta, state.gamma, state.phi,
+            float(level[0]), float(trend[0]), seasonal[0],
+            (state.position + new_samples) % len(state.seasonal),
+            state.sse + float(sse[0]), state.count + int(count[0])
+        )
+        return state, self._forecast(state, timestamps)
+
+    def _fit_grid(self, values: np.ndarray, season: int) -> HoltWintersState:
+        gammas = self.gammas if season > 1 else (0.0,)
+        alpha, beta, gamma = (grid.ravel() for grid in np.meshgrid(self.alphas, self.betas, gammas, indexing='ij'))
+        params = np.vstack([alpha, beta, gamma])
+        size = params.shape[1]
+
+        level0, trend0, seasonal0 = self._initial_state(values, season)
+        # Errors over the first season only reflect the initial state, so score the rest
+        burn_in = min(season, len(values) - 1)
+        level, trend, seasonal, _, _ = self._run(
+            values[:burn_in], params, np.full(size, level0), np.full(size, trend0),
+            np.tile(seasonal0, (size, 1)), 0
+        )
+        level, trend, seasonal, sse, count = self._run(values[burn_in:], params, level, trend, seasonal, burn_in % season)
+
+        best = int(np.argmin(np.where(count > 0, sse / np.maximum(count, 1), np.inf)))
+        return HoltWintersState(
+            float(alpha[best]), float(beta[best]), float(gamma[best]), self.phi,
+            float(level[best]), float(trend[best]), seasonal[best].copy(),
+            len(values) % season, float(sse[best]), int(count[best])
+        )
+
+    def _initial_state(self, values: np.ndarray, season: int) -> Tuple[float, float, np.ndarray]:
+        observed = values[~np.isnan(values)]
+        if not len(observed):
+            raise ValueError("No observed values to fit")
+        if season == 1:
+            return float(observed[0]), 0.0, np.zeros(1)
+        first = values[:season]
+        second = values[season:2 * season]
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            level = np.nanmean(first)
+            trend = (np.nanmean(second) - level) / season
+            seasonal = np.nan_to_num(first - level)
+        if np.isnan(level):
+            level = float(observed[0])
+        return float(level), float(np.nan_to_num(trend)), seasonal
+
+    def _run(self,
+             values: np.ndarray,
+             params: np.ndarray,
+             level: np.ndarray,
+             trend: np.ndarray,
+             seasonal: np.ndarray,
+             position: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Run the recursion over values for a vector of parameter sets.
+
+        Returns the final level, trend and seasonal state with the sum of
+        squared one-step errors and the number of observed values.
+        """
+        alpha, beta, gamma = params
+        phi = self.phi
+        season = seasonal.shape[1]
+        sse = np.zeros(params.shape[1])
+        count = np.zeros(params.shape[1], dtype=np.int64)
+        for offset, value in enumerate(values):
+            slot = (position + offset) % season
+            s = seasonal[:, slot]
+            damped = phi * trend
+            if np.isnan(value):
+                level = level + damped
+                trend = damped
+                continue
+            error = value - (level + damped + s)
+            sse += error * error
+            count += 1
+            new_level = level + damped + alpha * error
+            trend = damped + beta * (new_level - level - damped)
+            seasonal[:, slot] = s + gamma * (1 - alpha) * error
+            level = new_level
+        return level, trend, seasonal, sse, count
+
+    def _forecast(self, state: HoltWintersState, timestamps: np.ndarray) -> Dict[str, Any]:
+        steps = np.arange(1, self.horizon + 1)
+        season = len(state.seasonal)
+        damping = np.cumsum(state.phi ** steps)
+        trend = state.level + damping * state.trend
+        seasonal = state.seasonal[(state.position + steps - 1) % season]
+        yhat = trend + seasonal
+
+        # Variance of the h-step error for additive damped Holt-Winters
+        seasonal_hits = (steps[:-1] % season == 0) if season > 1 else np.zeros(len(steps) - 1, dtype=bool)
+        weights = state.alpha * (1 + state.beta * damping[:-1]) + state.gamma * (1 - state.alpha) * seasonal_hits
+        spread = INTERVAL_Z * state.sigma * np.sqrt(1 + np.concatenate([[0.0], np.cumsum(weights ** 2)]))
+        frame = {
+            "yhat": yhat,
+            "yhat_lower": yhat - spread,
+            "yhat_upper": yhat + spread,
+            "trend": trend,
+            "seasonal": seasonal,
+        }
+        return forecast_result(self.name, timestamps, frame, self.derived)
+
+class SeasonalNaiveForecaster(Forecaster):
+    """Repeats the average of the last ``seasons`` days at each time of day.
+
+    Intervals come from the spread of day-over-day differences. Fitting is a
+    single reshape over the recent history, so updates simply refit.
+    """
+
+    name = "seasonal_naive"
+
+    def __init__(self,
+                 derived: Optional[Dict[str, Callable[[Dict[str, np.ndarray]], np.ndarray]]] = None,
+                 horizon: int = FORECAST_HORIZON,
+                 seasons: int = 3):
+        self.derived = derived or {}
+        self.horizon = horizon
+        self.seasons = seasons
+
+    def fit(self, timestamps: np.ndarray, values: np.ndarray) -> Tuple[Any, Dict[str, Any]]:
+        values = np.asarray(values, dtype=float)
+        season = daily_season_length(timestamps)
+        seasons = min(self.seasons, len(values) // season)
+        if seasons == 0:
+            season, seasons = 1, min(self.seasons, len(values))
+
+        with warnings.catch_warnings():
+            # Slots missing from every recent day fall back to the overall mean
+            warnings.simplefilter('ignore', RuntimeWarning)
+            profile = np.nanmean(values[len(values) - seasons * season:].reshape(seasons, season), axis=0)
+            profile = np.where(np.isnan(profile), np.nanmean(values), profile)
+            changes = values[season:] - values[:-season]
+            sigma = float(np.nanstd(changes)) if np.count_nonzero(~np.isnan(changes)) > 1 else 0.0
+
+        steps = np.arange(self.horizon)
+        yhat = profile[steps % season]
+        # Each further season repeats the same profile, so uncertainty grows per season
+        spread = INTERVAL_Z * sigma * np.sqrt(steps // season + 1)
+        frame = {
+            "yhat": yhat,
+            "yhat_lower": yhat - spread,
+            "yhat_upper": yhat + spread,
+            "trend": np.full(self.horizon, float(np.mean(profile))),
+            "seasonal": yhat - float(np.mean(profile)),
+        }
+        return profile, forecast_result(self.name, timestamps, frame, self.derived)
@@ -0,0 +1,282 @@
+from typing import Dict, List, Optional, Any, Union
+from datetime import datetime
+import threading
+import numpy as np
+
+# Samples kept per series; older samples are evicted first
+DEFAULT_CAPACITY = 100000
+
+def to_datetime64(value: Any) -> np.datetime64:
+    """Convert a sample timestamp (datetime, ISO string or UNIX seconds) to datetime64."""
+    if isinstance(value, np.datetime64):
+        return value.astype("datetime64[us]")
+    if isinstance(value, (int, float)):
+        return np.datetime64(int(value * 1e6), "us")
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.replace(tzinfo=None) - value.utcoffset()
+    return np.datetime64(value, "us")
+
+def to_datetime64_array(values: List[Any]) -> np.ndarray:
+    """Convert sample timestamps to a datetime64 array, parsing ISO strings in one pass."""
+    if all(isinstance(value, str) for value in values):
+        try:
+            return np.array(values, dtype="datetime64[us]")
+        except ValueError:
+            pass
+    return np.array([to_datetime64(value) for value in values], dtype="datetime64[us]")
+
+def hour_of_day(timestamps: np.ndarray) -> np.ndarray:
+    return (timestamps.astype("datetime64[h]").astype(np.int64) % 24).astype(np.int8)
+
+def day_of_week(timestamps: np.ndarray) -> np.ndarray:
+    """Day of week with Monday as 0."""
+    # 1970-01-01 was a Thursday
+    return ((timestamps.astype("datetime64[D]").astype(np.int64) + 3) % 7).astype(np.int8)
+
+def month_of_year(timestamps: np.ndarray) -> np.ndarray:
+    """Month from 1 to 12."""
+    return (timestamps.astype("datetime64[M]").astype(np.int64) % 12 + 1).astype(np.int8)
+
+def day_of_year(timestamps: np.ndarray) -> np.ndarray:
+    """Day of year from 1."""
+    days = timestamps.astype("datetime64[D]")
+    return (days - days.astype("datetime64[Y]")).astype(np.int64) + 1
+
+def pct_change(values: np.ndarray) -> np.ndarray:
+    """Change relative to the previous value; the first element is NaN."""
+    result = np.full(len(values), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result[1:] = values[1:] / values[:-1] - 1
+    return result
+
+def diff(values: np.ndarray) -> np.ndarray:
+    """Difference from the previous value; the first element is NaN."""
+    result = np.full(len(values), np.nan)
+    result[1:] = values[1:] - values[:-1]
+    return result
+
+def nan_mean(values: np.ndarray) -> float:
+    """Mean ignoring NaN, NaN if there are no values."""
+    valid = values[~np.isnan(values)]
+    return float(valid.mean()) if len(valid) else float("nan")
+
+def nan_std(values: np.ndarray) -> float:
+    """Sample standard deviation ignoring NaN, NaN with fewer than two values."""
+    valid = values[~np.isnan(values)]
+    return float(valid.std(ddof=1)) if len(valid) > 1 else float("nan")
+
+def nan_max(values: np.ndarray) -> float:
+    """Maximum ignoring NaN, NaN if there are no values."""
+    valid = values[~np.isnan(values)]
+    return float(valid.max()) if len(valid) else float("nan")
+
+def bucket_mean(values: np.ndarray, buckets: np.ndarray, size: int) -> Dict[int, float]:
+    """Mean of values per bucket index, ignoring NaN, for buckets with values."""
+    valid = ~np.isnan(values)
+    sums = np.bincount(buckets[valid], weights=values[valid], minlength=size)
+    counts = np.bincount(buckets[valid], minlength=size)
+    return {int(bucket): float(sums[bucket] / counts[bucket]) for bucket in np.flatnonzero(counts)}
+
+class UsageSeries:
+    """Bounded columnar time series of resource usage samples.
+
+    Timestamps and each numeric sample field are kept in NumPy ring buffers
+    of ``capacity`` samples, evicting the oldest first. Every slot is written
+    twice, at ``i`` and ``i + capacity``, so the live window is always one
+    contiguous slice and ``timestamps``, ``column`` and the calendar bucket
+    arrays are views, not copies. Views reflect the buffer, so they are
+    valid until the next append.
+
+    Hour-of-day and day-of-week sums and counts are kept per column as
+    samples are added and evicted, so ``hourly_mean`` and ``weekday_mean``
+    cost O(buckets) regardless of the history's length.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._timestamps = np.empty(2 * capacity, dtype="datetime64[us]")
+        self._hours = np.empty(2 * capacity, dtype=np.int8)
+        self._weekdays = np.empty(2 * capacity, dtype=np.int8)
+        self._columns: Dict[str, np.ndarray] = {}
+        # Column -> bucket -> [sum, count]
+        self._hourly: Dict[str, np.ndarray] = {}
+        self._weekly: Dict[str, np.ndarray] = {}
+        self._start = 0
+        self._size = 0
+        self._evicted_since_rebuild = 0
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]], capacity: Optional[int] = None) -> 'UsageSeries':
+        """Build a series from sample dicts holding a ``timestamp`` and numeric fields."""
+        series = cls(capacity or max(len(records), 1))
+        series.extend(records)
+        return series
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[self._start:self._start + self._size]
+
+    @property
+    def hours(self) -> np.ndarray:
+        return self._hours[self._start:self._start + self._size]
+
+    @property
+    def weekdays(self) -> np.ndarray:
+        return self._weekdays[self._start:self._start + self._size]
+
+    def column(self, name: str, default: float = np.nan) -> np.ndarray:
+        """Values of a field; a column of ``default`` if no sample had the field."""
+        buffer = self._columns.get(name)
+        if buffer is None:
+            return np.full(self._size, default, dtype=float)
+        return buffer[self._start:self._start + self._size]
+
+    def hourly_mean(self, name: str) -> Dict[int, float]:
+        """Mean of a field per hour of day, for hours with samples."""
+        return self._bucket_means(self._hourly.get(name))
+
+    def weekday_mean(self, name: str) -> Dict[int, float]:
+        """Mean of a field per day of week (Monday is 0), for days with samples."""
+        return self._bucket_means(self._weekly.get(name))
+
+    def extend(self, records: List[Dict[str, Any]]) -> None:
+        """Append sample dicts, which must be in time order."""
+        if not records:
+            return
+        timestamps = to_datetime64_array([record["timestamp"] for record in records])
+        names = {name for record in records for name, value in record.items()
+                 if name != "timestamp" and isinstance(value, (int, float)) and not isinstance(value, bool)}
+        columns = {
+            name: np.array([record.get(name, np.nan) for record in records], dtype=float)
+            for name in names
+        }
+        self.append_arrays(timestamps, columns)
+
+    def append(self, timestamp: Any, values: Dict[str, float]) -> None:
+        """Append one sample."""
+        self.append_arrays(
+            np.array([to_datetime64(timestamp)], dtype="datetime64[us]"),
+            {name: np.array([value], dtype=float) for name, value in values.items()}
+        )
+
+    def append_arrays(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray]) -> None:
+        """Append samples given as a timestamp array and a value array per field."""
+        count = len(timestamps)
+        if count == 0:
+            return
+        if count > self.capacity:
+            timestamps = timestamps[-self.capacity:]
+            columns = {name: values[-self.capacity:] for name, values in columns.items()}
+            count = self.capacity
+        timestamps = timestamps.astype("datetime64[us]", copy=False)
+
+        for name in columns:
+            if name not in self._columns:
+                self._add_column(name)
+
+        overflow = self._size + count - self.capacity
+        if overflow > 0:
+            self._aggregate(slice(self._start, self._start + overflow), -1)
+            self._start = (self._start + overflow) % self.capacity
+            self._size -= overflow
+            self._evicted_since_rebuild += overflow
+
+        position = (self._start + self._size) % self.capacity
+        hours = hour_of_day(timestamps)
+        weekdays = day_of_week(timestamps)
+        first = min(count, self.capacity - position)
+        for offset, start, end in ((position, 0, first), (0, first, count)):
+            if start == end:
+                continue
+            length = end - start
+            self._write(self._timestamps, offset, length, timestamps[start:end])
+            self._write(self._hours, offset, length, hours[start:end])
+            self._write(self._weekdays, offset, length, weekdays[start:end])
+            for name, buffer in self._columns.items():
+                values = columns.get(name)
+                # Fields missing from this batch are NaN
+                self._write(buffer, offset, length, values[start:end] if values is not None else np.nan)
+        self._size += count
+
+        if self._evicted_since_rebuild >= self.capacity:
+            # Re-derive the aggregates now and then so float error from
+            # adding and subtracting does not build up
+            self._rebuild_aggregates()
+        else:
+            self._aggregate(slice(self._start + self._size - count, self._start + self._size), 1)
+
+    def _write(self, buffer: np.ndarray, offset: int, length: int, values: Any) -> None:
+        """Write to a slot range and its mirror."""
+        buffer[offset:offset + length] = values
+        buffer[offset + self.capacity:offset + self.capacity + length] = values
+
+    def _add_column(self, name: str) -> None:
+        self._columns[name] = np.full(2 * self.capacity, np.nan)
+        self._hourly[name] = np.zeros((2, 24))
+        self._weekly[name] = np.zeros((2, 7))
+
+    def _aggregate(self, window: slice, sign: int) -> None:
+        """Add (sign 1) or remove (sign -1) a range of slots from the bucket aggregates."""
+        hours = self._hours[window]
+        weekdays = self._weekdays[window]
+        for name, buffer in self._columns.items():
+            values = buffer[window]
+            valid = ~np.isnan(values)
+            if not valid.any():
+                continue
+            for aggregate, buckets, size in ((self._hourly[name], hours, 24), (self._weekly[name], weekdays, 7)):
+                aggregate[0] += sign * np.bincount(buckets[valid], weights=values[valid], minlength=size)
+                aggregate[1] += sign * np.bincount(buckets[valid], minlength=size)
+
+    def _rebuild_aggregates(self) -> None:
+        for name in self._columns:
+            self._hourly[name][:] = 0
+            self._weekly[name][:] = 0
+        self._aggregate(slice(self._start, self._start + self._size), 1)
+        self._evicted_since_rebuild = 0
+
+    @staticmethod
+    def _bucket_means(aggregate: Optional[np.ndarray]) -> Dict[int, float]:
+        if aggregate is None:
+            return {}
+        sums, counts = aggregate
+        return {int(bucket): float(sums[bucket] / counts[bucket]) for bucket in np.flatnonzero(counts > 0.5)}
+
+def as_usage_series(history: Union[UsageSeries, List[Dict[str, Any]]]) -> UsageSeries:
+    """Use a series as is, converting sample dicts once."""
+    if isinstance(history, UsageSeries):
+        return history
+    return UsageSeries.from_records(history)
+
+class UsageHistoryStore:
+    """Usage series per resource, for feeding the optimization strategies.
+
+    Samples are recorded as they arrive and each strategy call reads the
+    resource's series directly, without converting the history.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.series: Dict[str, UsageSeries] = {}
+        self._lock = threading.Lock()
+
+    def get(self, resource: str) -> UsageSeries:
+        with self._lock:
+            series = self.series.get(resource)
+            if series is None:
+                series = self.series[resource] = UsageSeries(self.capacity)
+            return series
+
+    def record(self, resource: str, sample: Dict[str, Any]) -> None:
+        """Append one sample dict with a ``timestamp`` and numeric fields."""
+        self.get(resource).extend([sample])
+
+    def extend(self, resource: str, samples: List[Dict[str, Any]]) -> None:
+        self.get(resource).extend(samples)
@@ -1,10 +1,12 @@
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+from typing import Dict, List, Optional, Any, Iterable
+from datetime import datetime, timedelta
 import json
+import os
 import sqlite3
 import aiosqlite
 from pathlib import Path
 import shutil
+from contextlib import closing
 
 from ..api.agent_memory import (
     AgentMemory,
@@ -12,15 +14,39 @@ from ..api.agent_memory import (
     MemoryAccessLevel,
     EventType
 )
+from .sqlite_pool import AsyncSQLitePool
+
+EVENT_COLUMNS = "id, type, timestamp, agent_id, details, affected_files, priority"
+
+def _row_to_event(row) -> MemoryEvent:
+    return MemoryEvent(
+        id=row[0],
+        type=EventType(row[1]),
+        timestamp=datetime.fromisoformat(row[2]),
+        agent_id=row[3],
+        details=json.loads(row[4]),
+        affected_files=json.loads(row[5]),
+        priority=row[6]
+    )
 
 class AgentMemoryStore:
-    def __init__(self, db_path: str = "agent_memory.db"):
+    """SQLite storage for agent memory and memory events.
+    
+    Calls share a small pool of long-lived connections in WAL mode. The
+    files an event affects are also stored one per row in ``event_files``,
+    so looking up the events for a file is an index lookup.
+    """
+    
+    def __init__(self, db_path: str = "agent_memory.db", pool_size: int = 4):
         self.db_path = db_path
         self._ensure_db_exists()
+        self.pool = AsyncSQLitePool(db_path, size=pool_size)
 
     def _ensure_db_exists(self):
         """Ensure the database and tables exist."""
-        with sqlite3.connect(self.db_path) as conn:
+        # closing() as well: the connection's own context manager only commits
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS agent_memory (
                     id TEXT PRIMARY KEY,
@@ -44,10 +70,37 @@ class AgentMemoryStore:
                     priority INTEGER NOT NULL
                 )
             """)
+            
+            has_event_files = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'event_files'"
+            ).fetchone()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS event_files (
+                    event_id TEXT NOT NULL REFERENCES memory_events(id) ON DELETE CASCADE,
+                    file_path TEXT NOT NULL,
+                    PRIMARY KEY (event_id, file_path)
+                ) WITHOUT ROWID
+            """)
+            if not has_event_files:
+                # Databases from before event_files: normalize the stored file lists
+                conn.execute("""
+                    INSERT OR IGNORE INTO event_files (event_id, file_path)
+                    SELECT memory_events.id, json_each.value
+                    FROM memory_events, json_each(memory_events.affected_files)
+                """)
+            
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_memory_agent ON agent_memory (agent_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_events_agent_time ON memory_events (agent_id, timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_events_time ON memory_events (timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_event_files_path ON event_files (file_path, event_id)")
+
+    async def close(self) -> None:
+        """Close the pooled connections."""
+        await self.pool.close()
 
     async def save_agent_memory(self, memory: AgentMemory) -> bool:
         """Save agent memory to the database."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.acquire() as db:
             await db.execute("""
                 INSERT OR REPLACE INTO agent_memory
                 (id, agent_id, access_level, memory_data, last_sync,
@@ -67,7 +120,7 @@ class AgentMemoryStore:
 
     async def get_agent_memory(self, agent_id: str) -> Optional[AgentMemory]:
         """Retrieve agent memory by agent ID."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.acquire() as db:
             async with db.execute("""
                 SELECT * FROM agent_memory WHERE agent_id = ?
             """, (agent_id,)) as cursor:
@@ -86,22 +139,35 @@ class AgentMemoryStore:
 
     async def save_memory_event(self, event: MemoryEvent) -> bool:
         """Save a memory event to the database."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT INTO memory_events
-                (id, type, timestamp, agent_id, details, affected_files, priority)
+        await self.save_memory_events([event])
+        return True
+
+    async def save_memory_events(self, events: Iterable[MemoryEvent]) -> int:
+        """Save memory events in one transaction, returning how many were saved."""
+        events = list(events)
+        if not events:
+            return 0
+        async with self.pool.acquire() as db:
+            await db.executemany(f"""
+                INSERT INTO memory_events ({EVENT_COLUMNS})
                 VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                event.id,
-                event.type.value,
-                event.timestamp.isoformat(),
-                event.agent_id,
-                json.dumps(event.details),
-                json.dumps(event.affected_files),
-                event.priority
-            ))
+            """, [
+                (
+                    event.id,
+                    event.type.value,
+                    event.timestamp.isoformat(),
+                    event.agent_id,
+                    json.dumps(event.details),
+                    json.dumps(event.affected_files),
+                    event.priority
+                )
+                for event in events
+            ])
+            await db.executemany("""
+                INSERT OR IGNORE INTO event_files (event_id, file_path) VALUES (?, ?)
+            """, [(event.id, file_path) for event in events for file_path in event.affected_files])
             await db.commit()
-            return True
+            return len(events)
 
     async def get_agent_events(
         self,
@@ -110,8 +176,8 @@ class AgentMemoryStore:
         event_type: Optional[EventType] = None
     ) -> List[MemoryEvent]:
         """Get events for a specific agent."""
-        async with aiosqlite.connect(self.db_path) as db:
-            query = "SELECT * FROM memory_events WHERE agent_id = ?"
+        async with self.pool.acquire() as db:
+            query = f"SELECT {EVENT_COLUMNS} FROM memory_events WHERE agent_id = ?"
             params = [agent_id]
             
             if event_type:
@@ -123,18 +189,7 @@ class AgentMemoryStore:
             
             async with db.execute(query, params) as cursor:
                 rows = await cursor.fetchall()
-                return [
-                    MemoryEvent(
-                        id=row[0],
-                        type=EventType(row[1]),
-                        timestamp=datetime.fromisoformat(row[2]),
-                        agent_id=row[3],
-                        details=json.loads(row[4]),
-                        affected_files=json.loads(row[5]),
-                        priority=row[6]
-                    )
-                    for row in rows
-                ]
+                return [_row_to_event(row) for row in rows]
 
     async def get_relevant_events(
         self,
@@ -143,42 +198,32 @@ class AgentMemoryStore:
         time_range: Optional[Dict[str, datetime]] = None
     ) -> List[MemoryEvent]:
         """Get events relevant to a specific file."""
-        async with aiosqlite.connect(self.db_path) as db:
-            query = """
-                SELECT * FROM memory_events
-                WHERE agent_id = ?
-                AND json_array_length(affected_files) > 0
-                AND json_array_contains(affected_files, ?)
+        async with self.pool.acquire() as db:
+            query = f"""
+                SELECT {", ".join(f"memory_events.{column}" for column in EVENT_COLUMNS.split(", "))}
+                FROM event_files
+                JOIN memory_events ON memory_events.id = event_files.event_id
+                WHERE event_files.file_path = ?
+                AND memory_events.agent_id = ?
             """
-            params = [agent_id, file_path]
+            params = [file_path, agent_id]
             
             if time_range:
-                query += " AND timestamp BETWEEN ? AND ?"
+                query += " AND memory_events.timestamp BETWEEN ? AND ?"
                 params.extend([
                     time_range["start"].isoformat(),
                     time_range["end"].isoformat()
                 ])
             
-            query += " ORDER BY timestamp DESC"
+            query += " ORDER BY memory_events.timestamp DESC"
             
             async with db.execute(query, params) as cursor:
                 rows = await cursor.fetchall()
-                return [
-                    MemoryEvent(
-                        id=row[0],
-                        type=EventType(row[1]),
-                        timestamp=datetime.fromisoformat(row[2]),
-                        agent_id=row[3],
-                        details=json.loads(row[4]),
-                        affected_files=json.loads(row[5]),
-                        priority=row[6]
-                    )
-                    for row in rows
-                ]
+                return [_row_to_event(row) for row in rows]
 
     async def get_active_agents(self) -> List[str]:
         """Get list of agents with active memory."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.acquire() as db:
             async with db.execute("""
                 SELECT agent_id FROM agent_memory
                 WHERE is_active = 1
@@ -191,23 +236,25 @@ class AgentMemoryStore:
         max_age_days: int = 30
     ) -> int:
         """Clean up old memory events."""
-        cutoff_date = datetime.now().replace(
-            day=datetime.now().day - max_age_days
-        )
+        cutoff_date = datetime.now() - timedelta(days=max_age_days)
         
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
+        async with self.pool.acquire() as db:
+            # event_files rows go with their events (ON DELETE CASCADE)
+            cursor = await db.execute("""
                 DELETE FROM memory_events
                 WHERE timestamp < ?
             """, (cutoff_date.isoformat(),))
             await db.commit()
             
-            return db.total_changes
+            return cursor.rowcount
 
     async def backup_database(self, backup_path: str) -> bool:
         """Create a backup of the database."""
         try:
-            shutil.copy2(self.db_path, backup_path)
+            # The online backup API includes changes still in the WAL file
+            async with self.pool.acquire() as db:
+                async with aiosqlite.connect(backup_path) as target:
+                    await db.backup(target)
             return True
         except Exception as e:
             print(f"Error backing up database: {e}")
@@ -216,8 +263,14 @@ class AgentMemoryStore:
     async def restore_database(self, backup_path: str) -> bool:
         """Restore the database from a backup."""
         try:
+            await self.pool.close()
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(self.db_path + suffix):
+                    os.remove(self.db_path + suffix)
             shutil.copy2(backup_path, self.db_path)
+            # Backups taken before a schema change lack its tables and indexes
+            self._ensure_db_exists()
             return True
         except Exception as e:
             print(f"Error restoring database: {e}")
-            return False 
\ No newline at end of file
+            return False
@@ -1,19 +1,26 @@
-from typing import Dict, List, Optional, Any, Type, TypeVar, Generic, ContextManager, Union
+from typing import Dict, List, Optional, Any, Type, TypeVar, Generic, ContextManager, Union, Set, Tuple, Iterable, Iterator, Callable
 from datetime import datetime
 import logging
+from collections import OrderedDict
 from contextvars import ContextVar
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
+import itertools
+from concurrent.futures import Executor
 import threading
+import time
 from abc import ABC, abstractmethod
 import uuid
 import json
 import os
 import shutil
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, MultiFernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
@@ -45,39 +52,227 @@ class TenantContext:
     encryption_key: Optional[bytes] = None
     backup_config: Optional[Dict[str, Any]] = None
 
+def _batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Consecutive lists of up to size items."""
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+# Secret all tenant keys are derived from; together with the tenant id and
+# key version it determines each key, so keys survive restarts and cache evictions
+TENANT_ENCRYPTION_SECRET = os.getenv("TENANT_ENCRYPTION_SECRET")
+
+class TenantKeyCache:
+    """Process-wide cache of tenant keys and of each tenant's key versions.
+    
+    Deriving a key costs 100,000 PBKDF2 iterations, so derived keys are
+    memoized per (tenant, version), least recently used evicted beyond
+    ``max_entries``; an evicted key is simply derived again. Keys passed in
+    explicitly cannot be re-derived and are never evicted. Keys are held
+    only in memory, sealed with a random per-process key.
+    
+    The current and oldest usable key version of each tenant live here too,
+    so every ``TenantEncryption`` of a tenant follows a rotation.
+    """
+    
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._keys: "OrderedDict[Tuple[str, int], bytes]" = OrderedDict()
+        self._pinned: Dict[Tuple[str, int], bytes] = {}
+        self._versions: Dict[str, Tuple[int, int]] = {}
+        self._seal = Fernet(Fernet.generate_key())
+        self._lock = threading.Lock()
+        
+    def get(self, tenant_id: str, version: int) -> Optional[bytes]:
+        """Get a cached key, or None."""
+        with self._lock:
+            sealed = self._pinned.get((tenant_id, version))
+            if sealed is None:
+                sealed = self._keys.get((tenant_id, version))
+                if sealed is None:
+                    return None
+                self._keys.move_to_end((tenant_id, version))
+        return self._seal.decrypt(sealed)
+        
+    def put(self, tenant_id: str, version: int, key: bytes, pinned: bool = False) -> None:
+        """Cache a key; unpinned keys are evicted least recently used first beyond max_entries."""
+        sealed = self._seal.encrypt(key)
+        with self._lock:
+            if pinned:
+                self._pinned[(tenant_id, version)] = sealed
+                return
+            self._keys[(tenant_id, version)] = sealed
+            self._keys.move_to_end((tenant_id, version))
+            while len(self._keys) > self.max_entries:
+                self._keys.popitem(last=False)
+                
+    def forget(self, tenant_id: str, version: Optional[int] = None) -> None:
+        """Drop one key version of a tenant, or all of them along with its key versions."""
+        with self._lock:
+            for keys in (self._keys, self._pinned):
+                for key in [key for key in keys if key[0] == tenant_id and version in (None, key[1])]:
+                    del keys[key]
+            if version is None:
+                self._versions.pop(tenant_id, None)
+                    
+    def versions(self, tenant_id: str, at_least: int = 1, oldest_at_least: int = 1) -> Tuple[int, int]:
+        """The tenant's (current, oldest) key versions, raised to at_least and oldest_at_least."""
+        with self._lock:
+            current, oldest = self._versions.get(tenant_id, (at_least, oldest_at_least))
+            current = max(current, at_least)
+            oldest = min(max(oldest, oldest_at_least), current)
+            self._versions[tenant_id] = (current, oldest)
+            return current, oldest
+            
+    def set_versions(self, tenant_id: str, current: int, oldest: int) -> None:
+        """Record the tenant's current and oldest usable key versions."""
+        with self._lock:
+            self._versions[tenant_id] = (current, oldest)
+
+_key_cache = TenantKeyCache()
+
+# Each tenant's current and oldest usable key version, kept next to the
+# tenant's data so encrypted values stay readable after a restart
+_key_versions_table = sa.Table(
+    "tenant_key_versions",
+    sa.MetaData(),
+    sa.Column("tenant_id", sa.String(255), primary_key=True),
+    sa.Column("current_version", sa.Integer, nullable=False),
+    sa.Column("oldest_version", sa.Integer, nullable=False),
+)
+
 class TenantEncryption:
-    """Handles tenant-specific encryption of sensitive data."""
+    """Handles tenant-specific encryption of sensitive data.
+    
+    Each key is derived from the tenant id, the key version and
+    ``TENANT_ENCRYPTION_SECRET``, and memoized in a process-wide
+    ``TenantKeyCache``. Key versions are shared by every instance for the
+    tenant: after ``rotate_key`` they all encrypt with the new key, and the
+    previous keys still decrypt, so data can be re-encrypted in batches
+    with ``reencrypt_many`` before ``retire_previous_keys`` drops them.
+    The key versions must be persisted by the caller and passed as
+    ``key_version`` and ``oldest_version`` after a restart;
+    ``MultiTenantStore`` keeps them in its ``tenant_key_versions`` table.
+    """
     
-    def __init__(self, tenant_id: str, encryption_key: Optional[bytes] = None):
+    def __init__(
+        self,
+        tenant_id: str,
+        encryption_key: Optional[bytes] = None,
+        key_version: int = 1,
+        secret: Optional[str] = None,
+        oldest_version: int = 1
+    ):
         self.tenant_id = tenant_id
-        self.encryption_key = encryption_key or self._generate_key()
-        self.fernet = Fernet(self.encryption_key)
+        self.secret = secret or TENANT_ENCRYPTION_SECRET
+        if encryption_key:
+            _key_cache.put(tenant_id, key_version, encryption_key, pinned=True)
+        _key_cache.versions(tenant_id, at_least=key_version, oldest_at_least=oldest_version)
+        self._loaded: Optional[Tuple[int, int]] = None
+        self._fernet: Optional[Fernet] = None
+        self._decryptor: Optional[MultiFernet] = None
+        
+    @property
+    def key_version(self) -> int:
+        """The tenant's current key version."""
+        return _key_cache.versions(self.tenant_id)[0]
+        
+    @property
+    def key_versions(self) -> Tuple[int, int]:
+        """The tenant's current and oldest usable key versions."""
+        return _key_cache.versions(self.tenant_id)
+        
+    @property
+    def encryption_key(self) -> bytes:
+        """The tenant's current key."""
+        return self._cached_key(self.key_version)
         
-    def _generate_key(self) -> bytes:
-        """Generate a new encryption key for the tenant."""
-        salt = os.urandom(16)
+    @property
+    def fernet(self) -> Fernet:
+        return self._keys()[0]
+        
+    def _keys(self) -> Tuple[Fernet, MultiFernet]:
+        """Fernets for the current key and for every usable version, following rotations by other instances."""
+        versions = _key_cache.versions(self.tenant_id)
+        if versions != self._loaded:
+            current, oldest = versions
+            fernets = [Fernet(self._cached_key(version)) for version in range(current, oldest - 1, -1)]
+            self._fernet, self._decryptor, self._loaded = fernets[0], MultiFernet(fernets), versions
+        return self._fernet, self._decryptor
+        
+    def _cached_key(self, version: int) -> bytes:
+        """Get the tenant's key for a version, deriving it if it is not cached."""
+        key = _key_cache.get(self.tenant_id, version)
+        if key is None:
+            key = self._generate_key(version)
+            _key_cache.put(self.tenant_id, version, key)
+        return key
+        
+    def _generate_key(self, version: int) -> bytes:
+        """Derive the tenant's key for a version."""
+        if not self.secret:
+            raise ValueError("No tenant encryption secret configured; set TENANT_ENCRYPTION_SECRET")
+        salt = hashlib.sha256(f"{self.tenant_id}:{version}".encode()).digest()[:16]
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
             salt=salt,
             iterations=100000,
         )
-        key = base64.urlsafe_b64encode(kdf.derive(self.tenant_id.encode()))
+        key = base64.urlsafe_b64encode(kdf.derive(self.secret.encode()))
         return key
         
     def encrypt(self, data: str) -> str:
         """Encrypt data for the tenant."""
-        return self.fernet.encrypt(data.encode()).decode()
+        return self._keys()[0].encrypt(data.encode()).decode()
         
     def decrypt(self, encrypted_data: str) -> str:
         """Decrypt data for the tenant."""
-        return self.fernet.decrypt(encrypted_data.encode()).decode()
+        return self._keys()[1].decrypt(encrypted_data.encode()).decode()
+        
+    def encrypt_many(self, values: Iterable[str], executor: Optional[Executor] = None, chunk_size: int = 512) -> List[str]:
+        """Encrypt values in order, in chunks on the executor if one is given."""
+        encrypt = self._keys()[0].encrypt
+        return self._map_chunks(lambda chunk: [encrypt(value.encode()).decode() for value in chunk], values, executor, chunk_size)
+        
+    def decrypt_many(self, values: Iterable[str], executor: Optional[Executor] = None, chunk_size: int = 512) -> List[str]:
+        """Decrypt values in order, in chunks on the executor if one is given."""
+        decrypt = self._keys()[1].decrypt
+        return self._map_chunks(lambda chunk: [decrypt(value.encode()).decode() for value in chunk], values, executor, chunk_size)
+        
+    def reencrypt_many(self, values: Iterable[str], executor: Optional[Executor] = None, chunk_size: int = 512) -> List[str]:
+        """Re-encrypt values made with any usable key version under the current key."""
+        rotate = self._keys()[1].rotate
+        return self._map_chunks(lambda chunk: [rotate(value.encode()).decode() for value in chunk], values, executor, chunk_size)
+        
+    def _map_chunks(
+        self,
+        transform: Callable[[List[str]], List[str]],
+        values: Iterable[str],
+        executor: Optional[Executor],
+        chunk_size: int
+    ) -> List[str]:
+        chunks = list(_batches(values, chunk_size))
+        if executor is None or len(chunks) < 2:
+            return [result for chunk in chunks for result in transform(chunk)]
+        return [result for results in executor.map(transform, chunks) for result in results]
         
     def rotate_key(self) -> bytes:
-        """Rotate the encryption key for the tenant."""
-        self.encryption_key = self._generate_key()
-        self.fernet = Fernet(self.encryption_key)
-        return self.encryption_key
+        """Rotate the encryption key for the tenant, keeping the previous keys for decryption."""
+        current, oldest = _key_cache.versions(self.tenant_id)
+        key = self._cached_key(current + 1)
+        _key_cache.set_versions(self.tenant_id, current + 1, oldest)
+        return key
+        
+    def retire_previous_keys(self) -> None:
+        """Stop decrypting with keys older than the current version, once data is re-encrypted."""
+        current, oldest = _key_cache.versions(self.tenant_id)
+        _key_cache.set_versions(self.tenant_id, current, current)
+        for version in range(oldest, current):
+            _key_cache.forget(self.tenant_id, version)
 
 class TenantBackupManager:
     """Manages tenant-specific database backups."""
@@ -153,6 +348,11 @@ class CrossTenantPrevention:
     def clear_tenant_context(self) -> None:
         """Clear the current tenant context."""
         self._tenant_context.set(None)
+        
+    @property
+    def current_tenant(self) -> Optional[TenantContext]:
+        """Get the current tenant context."""
+        return self._tenant_context.get()
 
 class TenantContextManager:
     """Manages tenant context for database operations."""
@@ -182,54 +382,243 @@ class TenantContextManager:
         """Context manager exit."""
         self.clear_tenant()
 
+@dataclass
+class EngineEntry:
+    """An engine and the tenants whose sessions it serves."""
+    engine: sa.engine.Engine
+    url: str
+    last_used: float
+    tenants: Set[str] = field(default_factory=set)
+
+class ConnectionBudget:
+    """Caps the connections checked out across every engine of a ConnectionManager.
+
+    A checkout waits up to ``timeout`` seconds for a connection to be
+    returned anywhere, then raises ``sqlalchemy.exc.TimeoutError``.
+    """
+    
+    def __init__(self, max_connections: int, timeout: float = 30.0):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.in_use = 0
+        self._semaphore = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        
+    def attach(self, engine: sa.engine.Engine) -> None:
+        """Count the engine's checkouts against the budget."""
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "checkin", self._release)
+        event.listen(engine, "detach", self._release)
+        
+    def _checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        if connection_record.info.get("budgeted"):
+            return
+        if not self._semaphore.acquire(timeout=self.timeout):
+            raise sa.exc.TimeoutError(
+                f"All {self.max_connections} connections are checked out; timed out after {self.timeout}s"
+            )
+        connection_record.info["budgeted"] = True
+        with self._lock:
+            self.in_use += 1
+            
+    def _release(self, dbapi_connection, connection_record) -> None:
+        if connection_record.info.pop("budgeted", False):
+            with self._lock:
+                self.in_use -= 1
+            self._semaphore.release()
+
+def _checked_out(engine: sa.engine.Engine) -> int:
+    """Connections the engine's pool has handed out; 0 for pools that don't track them."""
+    checkedout = getattr(engine.pool, "checkedout", None)
+    return checkedout() if checkedout else 0
+
 class ConnectionManager:
-    """Manages database connections for different tenants."""
+    """Manages database connections for different tenants.
+    
+    Engines are keyed by database URL, so tenants on the same database
+    share one connection pool (``shared_pool=False`` gives each tenant its
+    own). Isolation is applied per session rather than per engine: a
+    schema-based tenant's statements are compiled against its schema with
+    ``schema_translate_map``, and on PostgreSQL each transaction also runs
+    ``SET LOCAL search_path``, which ends with the transaction so no
+    pooled connection carries a tenant's schema to the next checkout.
     
-    def __init__(self, default_url: str, pool_size: int = 5, max_overflow: int = 10):
+    At most ``max_engines`` engines are kept, least recently used idle ones
+    disposed first, and engines unused for ``engine_idle_timeout`` seconds
+    are disposed. Checkouts across all engines are capped at
+    ``max_connections``. ``pool_stats`` reports utilization per engine and
+    per tenant.
+    """
+    
+    def __init__(
+        self,
+        default_url: str,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        shared_pool: bool = True,
+        max_engines: int = 32,
+        engine_idle_timeout: float = 600.0,
+        max_connections: int = 100,
+        checkout_timeout: float = 30.0
+    ):
         self.default_url = default_url
         self.pool_size = pool_size
         self.max_overflow = max_overflow
-        self._engines: Dict[str, sa.engine.Engine] = {}
-        self._sessions: Dict[str, sessionmaker] = {}
-        self._lock = threading.Lock()
+        self.shared_pool = shared_pool
+        self.max_engines = max_engines
+        self.engine_idle_timeout = engine_idle_timeout
+        self.budget = ConnectionBudget(max_connections, checkout_timeout)
+        self._engines: "OrderedDict[Tuple[str, Optional[str]], EngineEntry]" = OrderedDict()
+        self._sessions: Dict[Tuple[str, Optional[str], str], Tuple[sa.engine.Engine, sessionmaker]] = {}
+        self._tenant_usage: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.RLock()
         self._cross_tenant_prevention = CrossTenantPrevention()
         
+    def _engine_key(self, tenant_id: str, url: str) -> Tuple[str, Optional[str]]:
+        return (url, None if self.shared_pool else tenant_id)
+        
     def get_engine(self, tenant_id: str, database_url: Optional[str] = None) -> sa.engine.Engine:
         """Get SQLAlchemy engine for tenant."""
         self._cross_tenant_prevention.validate_tenant_access(tenant_id)
+        url = database_url or self._tenant_url(tenant_id)
+        key = self._engine_key(tenant_id, url)
         
         with self._lock:
-            if tenant_id not in self._engines:
-                url = database_url or self.default_url
-                self._engines[tenant_id] = sa.create_engine(
-                    url,
-                    poolclass=QueuePool,
-                    pool_size=self.pool_size,
-                    max_overflow=self.max_overflow,
-                    pool_pre_ping=True
-                )
-            return self._engines[tenant_id]
+            now = time.monotonic()
+            entry = self._engines.get(key)
+            if entry is None:
+                self._dispose_idle(now)
+                engine_options = {"pool_pre_ping": True}
+                if sa.engine.make_url(url).get_backend_name() != "sqlite":
+                    engine_options.update(poolclass=QueuePool, pool_size=self.pool_size, max_overflow=self.max_overflow)
+                engine = sa.create_engine(url, **engine_options)
+                self.budget.attach(engine)
+                entry = EngineEntry(engine=engine, url=url, last_used=now)
+                self._engines[key] = entry
+                self._evict_engines()
+            self._engines.move_to_end(key)
+            entry.last_used = now
+            entry.tenants.add(tenant_id)
+            return entry.engine
             
     def get_session(self, tenant_id: str) -> sessionmaker:
         """Get session factory for tenant."""
         self._cross_tenant_prevention.validate_tenant_access(tenant_id)
+        tenant = self._cross_tenant_prevention.current_tenant
+        schema = tenant.schema_name if tenant.isolation_strategy == TenantIsolationStrategy.SCHEMA_BASED else None
+        url = self._tenant_url(tenant_id)
+        key = (tenant_id, schema, url)
         
         with self._lock:
-            if tenant_id not in self._sessions:
-                engine = self.get_engine(tenant_id)
-                self._sessions[tenant_id] = sessionmaker(
-                    bind=engine,
+            engine = self.get_engine(tenant_id, url)
+            cached_engine, factory = self._sessions.get(key, (None, None))
+            if cached_engine is not engine:
+                bind = engine.execution_options(schema_translate_map={None: schema}) if schema else engine
+                factory = sessionmaker(
+                    bind=bind,
                     autocommit=False,
-                    autoflush=False
+                    autoflush=False,
+                    info={"tenant_id": tenant_id, "schema_name": schema}
                 )
-            return self._sessions[tenant_id]
+                event.listen(factory, "after_begin", self._on_session_begin)
+                event.listen(factory, "after_transaction_end", self._on_session_end)
+                self._sessions[key] = (engine, factory)
+            return factory
+            
+    def _tenant_url(self, tenant_id: str) -> str:
+        tenant = self._cross_tenant_prevention.current_tenant
+        if tenant and tenant.tenant_id == tenant_id and tenant.database_url:
+            return tenant.database_url
+        return self.default_url
+        
+    def _on_session_begin(self, session: Session, transaction, connection) -> None:
+        schema = session.info.get("schema_name")
+        if schema and connection.dialect.name == "postgresql":
+            # Reverts when the transaction ends, before the connection goes back to the pool
+            quoted = connection.dialect.identifier_preparer.quote_schema(schema)
+            connection.exec_driver_sql(f"SET LOCAL search_path TO {quoted}")
+        if not session.info.get("connection_counted"):
+            session.info["connection_counted"] = True
+            with self._lock:
+                usage = self._tenant_usage.setdefault(session.info["tenant_id"], {"active": 0, "checkouts": 0})
+                usage["active"] += 1
+                usage["checkouts"] += 1
+                
+    def _on_session_end(self, session: Session, transaction) -> None:
+        if transaction.parent is None and session.info.pop("connection_counted", False):
+            with self._lock:
+                self._tenant_usage[session.info["tenant_id"]]["active"] -= 1
+                
+    def _dispose_idle(self, now: float) -> None:
+        for key, entry in list(self._engines.items()):
+            if now - entry.last_used > self.engine_idle_timeout and not _checked_out(entry.engine):
+                self._dispose(key)
+                
+    def _evict_engines(self) -> None:
+        # Least recently used first; engines with connections checked out stay
+        for key, entry in list(self._engines.items()):
+            if len(self._engines) <= self.max_engines:
+                return
+            if not _checked_out(entry.engine):
+                self._dispose(key)
+        if len(self._engines) > self.max_engines:
+            logger.warning(f"{len(self._engines)} engines in use, above the limit of {self.max_engines}")
+            
+    def _dispose(self, key: Tuple[str, Optional[str]]) -> None:
+        entry = self._engines.pop(key)
+        entry.engine.dispose()
+        for session_key in [session_key for session_key in self._sessions if session_key[0] in entry.tenants and session_key[2] == entry.url]:
+            del self._sessions[session_key]
+        logger.info(f"Disposed engine for {entry.engine.url!r} ({len(entry.tenants)} tenants)")
+        
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool utilization per engine and per tenant."""
+        with self._lock:
+            now = time.monotonic()
+            engines = []
+            for (url, owner), entry in self._engines.items():
+                pool = entry.engine.pool
+                engines.append({
+                    "url": entry.engine.url.render_as_string(hide_password=True),
+                    "tenant_id": owner,
+                    "tenants": len(entry.tenants),
+                    "pool_size": pool.size() if hasattr(pool, "size") else None,
+                    "checked_out": _checked_out(entry.engine),
+                    "idle_seconds": round(now - entry.last_used, 1)
+                })
+            engine_of = {tenant_id: engine["url"] for engine, entry in zip(engines, self._engines.values()) for tenant_id in entry.tenants}
+            return {
+                "engines": engines,
+                "connections_in_use": self.budget.in_use,
+                "max_connections": self.budget.max_connections,
+                "tenants": {
+                    tenant_id: {**usage, "engine": engine_of.get(tenant_id)}
+                    for tenant_id, usage in self._tenant_usage.items()
+                }
+            }
             
     def close_all(self) -> None:
         """Close all database connections."""
-        for engine in self._engines.values():
-            engine.dispose()
-        self._engines.clear()
-        self._sessions.clear()
+        with self._lock:
+            for entry in self._engines.values():
+                entry.engine.dispose()
+            self._engines.clear()
+            self._sessions.clear()
+
+def _group_by_keys(rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Split rows into groups with the same columns, as one executemany needs."""
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+    return list(groups.values())
+
+def _key_clause(primary_key: List[sa.Column]) -> sa.ColumnElement:
+    return primary_key[0] if len(primary_key) == 1 else sa.tuple_(*primary_key)
+
+def _key_value(values: Any) -> Any:
+    if isinstance(values, (list, tuple)):
+        return values[0] if len(values) == 1 else tuple(values)
+    return values
 
 class MultiTenantRepository(ABC, Generic[T]):
     """Base class for multi-tenant repositories."""
@@ -320,10 +709,10 @@ class MultiTenantRepository(ABC, Generic[T]):
                 if not existing:
                     raise ValueError("Entity not found or not accessible")
                     
-            session.merge(entity)
+            merged = session.merge(entity)
             session.commit()
-            session.refresh(entity)
-            return entity
+            session.refresh(merged)
+            return merged
         except Exception as e:
             session.rollback()
             raise
@@ -351,6 +740,170 @@ class MultiTenantRepository(ABC, Generic[T]):
             raise
         finally:
             session.close()
+            
+    def iter_all(self, batch_size: int = 1000) -> Iterator[T]:
+        """Stream all entities with tenant isolation, one primary-key page at a time.
+        
+        Pages are keyset-paginated (``WHERE pk > last ORDER BY pk LIMIT``),
+        so each costs the same however deep into the table it starts, and
+        entities of earlier pages are detached so memory stays bounded.
+        """
+        tenant = self.tenant_context_manager.current_tenant
+        if not tenant:
+            raise ValueError("No tenant context set")
+            
+        primary_key = sa.inspect(self.model_class).primary_key
+        session = self.get_session()
+        try:
+            last = None
+            while True:
+                query = sa.select(self.model_class).order_by(*primary_key).limit(batch_size)
+                if tenant.isolation_strategy == TenantIsolationStrategy.ROW_BASED:
+                    query = query.filter_by(tenant_id=tenant.tenant_id)
+                if last is not None:
+                    query = query.where(_key_clause(primary_key) > _key_value(last))
+                count = 0
+                for entity in session.scalars(query.execution_options(yield_per=batch_size)):
+                    yield entity
+                    last = sa.inspect(entity).identity
+                    count += 1
+                session.expunge_all()
+                if count < batch_size:
+                    return
+        finally:
+            session.close()
+            
+    def bulk_create(self, entities: Iterable[Union[T, Dict[str, Any]]], batch_size: int = 1000) -> int:
+        """Insert entities (or attribute mappings) in batched statements within one transaction."""
+        tenant = self.tenant_context_manager.current_tenant
+        if not tenant:
+            raise ValueError("No tenant context set")
+            
+        table = self.model_class.__table__
+        session = self.get_session()
+        try:
+            count = 0
+            for batch in _batches(self._to_rows(entities, tenant), batch_size):
+                for rows in _group_by_keys(batch):
+                    session.execute(table.insert(), rows)
+                count += len(batch)
+            session.commit()
+            return count
+        except Exception as e:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+            
+    def bulk_upsert(self, entities: Iterable[Union[T, Dict[str, Any]]], batch_size: int = 1000) -> int:
+        """Insert entities or update them by primary key, in batched statements within one transaction.
+        
+        Under row-based isolation, rows whose primary key belongs to
+        another tenant are skipped rather than updated.
+        """
+        tenant = self.tenant_context_manager.current_tenant
+        if not tenant:
+            raise ValueError("No tenant context set")
+            
+        table = self.model_class.__table__
+        primary_key = list(table.primary_key.columns)
+        row_based = tenant.isolation_strategy == TenantIsolationStrategy.ROW_BASED
+        session = self.get_session()
+        try:
+            dialect = session.get_bind().dialect.name
+            count = 0
+            for batch in _batches(self._to_rows(entities, tenant), batch_size):
+                for rows in _group_by_keys(batch):
+                    if dialect in ("sqlite", "postgresql"):
+                        insert = (sqlite_insert if dialect == "sqlite" else postgresql_insert)(table)
+                        updated = {
+                            name: insert.excluded[name] for name in rows[0]
+                            if not table.c[name].primary_key
+                        }
+                        if updated:
+                            statement = insert.on_conflict_do_update(
+                                index_elements=primary_key,
+                                set_=updated,
+                                where=table.c.tenant_id == tenant.tenant_id if row_based else None
+                            )
+                        else:
+                            statement = insert.on_conflict_do_nothing(index_elements=primary_key)
+                        session.execute(statement, rows)
+                    else:
+                        self._upsert_rows(session, table, primary_key, rows, tenant)
+                count += len(batch)
+            session.commit()
+            return count
+        except Exception as e:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+            
+    def bulk_delete(self, ids: Iterable[Any], batch_size: int = 1000) -> int:
+        """Delete entities by primary key in batched statements within one transaction."""
+        tenant = self.tenant_context_manager.current_tenant
+        if not tenant:
+            raise ValueError("No tenant context set")
+            
+        table = self.model_class.__table__
+        key = _key_clause(list(table.primary_key.columns))
+        session = self.get_session()
+        try:
+            count = 0
+            for batch in _batches(ids, batch_size):
+                statement = table.delete().where(key.in_([_key_value(id) for id in batch]))
+                if tenant.isolation_strategy == TenantIsolationStrategy.ROW_BASED:
+                    statement = statement.where(table.c.tenant_id == tenant.tenant_id)
+                count += session.execute(statement).rowcount
+            session.commit()
+            return count
+        except Exception as e:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+            
+    def _to_rows(self, entities: Iterable[Union[T, Dict[str, Any]]], tenant: TenantContext) -> Iterator[Dict[str, Any]]:
+        """Column-name keyed rows for entities or attribute mappings."""
+        columns = {attribute.key: attribute.columns[0].name for attribute in sa.inspect(self.model_class).column_attrs}
+        for entity in entities:
+            if isinstance(entity, dict):
+                values = entity
+            else:
+                # Only attributes that were set, so column defaults still apply
+                loaded = sa.inspect(entity).dict
+                values = {key: loaded[key] for key in columns if key in loaded}
+            row = {columns[key]: value for key, value in values.items()}
+            if tenant.isolation_strategy == TenantIsolationStrategy.ROW_BASED:
+                row["tenant_id"] = tenant.tenant_id
+            yield row
+            
+    def _upsert_rows(
+        self,
+        session: Session,
+        table: sa.Table,
+        primary_key: List[sa.Column],
+        rows: List[Dict[str, Any]],
+        tenant: TenantContext
+    ) -> None:
+        """Upsert for dialects without ON CONFLICT: update the rows that exist, insert the rest."""
+        key = _key_clause(primary_key)
+        names = [column.name for column in primary_key]
+        row_based = tenant.isolation_strategy == TenantIsolationStrategy.ROW_BASED
+        owner = [table.c.tenant_id] if row_based else []
+        query = sa.select(*primary_key, *owner).where(key.in_([_key_value([row[name] for name in names]) for row in rows]))
+        existing = {tuple(found[:len(names)]): not row_based or found[-1] == tenant.tenant_id for found in session.execute(query)}
+        updates = [row for row in rows if existing.get(tuple(row[name] for name in names))]
+        inserts = [row for row in rows if tuple(row[name] for name in names) not in existing]
+        if updates and len(updates[0]) > len(names):
+            bound = {name: sa.bindparam(f"key_{name}") for name in names}
+            statement = table.update().where(*[table.c[name] == bound[name] for name in names]).values(
+                {name: sa.bindparam(name) for name in updates[0] if name not in bound}
+            )
+            session.execute(statement, [{**row, **{f"key_{name}": row[name] for name in names}} for row in updates])
+        if inserts:
+            session.execute(table.insert(), inserts)
 
 class SchemaBasedRepository(MultiTenantRepository[T]):
     """Repository implementation for schema-based tenant isolation."""
@@ -370,9 +923,8 @@ class SchemaBasedRepository(MultiTenantRepository[T]):
         if not tenant or not tenant.schema_name:
             raise ValueError("No tenant context or schema name set")
             
-        session = self.connection_manager.get_session(tenant.tenant_id)()
-        session.execute(f"SET search_path TO {tenant.schema_name}")
-        return session
+        # The schema is applied per transaction by the ConnectionManager's session factory
+        return self.connection_manager.get_session(tenant.tenant_id)()
         
     def _encrypt_sensitive_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Encrypt sensitive data before storage."""
@@ -387,6 +939,59 @@ class SchemaBasedRepository(MultiTenantRepository[T]):
                 encrypted_data[key] = value
         return encrypted_data
         
+    def reencrypt_sensitive_fields(self, batch_size: int = 1000, executor: Optional[Executor] = None) -> int:
+        """Re-encrypt sensitive fields under the current key, one primary-key page per transaction.
+        
+        Only one page is held in memory, and an interrupted run can be
+        repeated since values under any known key version decrypt.
+        """
+        if not self.encryption:
+            return 0
+        tenant = self.tenant_context_manager.current_tenant
+        if not tenant:
+            raise ValueError("No tenant context set")
+            
+        table = self.model_class.__table__
+        primary_key = list(table.primary_key.columns)
+        fields = [table.c[name] for name in self.model_class.__sensitive_fields__]
+        statement = table.update().where(
+            *[column == sa.bindparam(f"key_{column.name}") for column in primary_key]
+        ).values({column.name: sa.bindparam(column.name) for column in fields})
+        session = self.get_session()
+        try:
+            count = 0
+            last = None
+            while True:
+                query = sa.select(*primary_key, *fields).order_by(*primary_key).limit(batch_size)
+                if last is not None:
+                    query = query.where(_key_clause(primary_key) > _key_value(last))
+                rows = session.execute(query).all()
+                if not rows:
+                    break
+                updates = [
+                    {f"key_{column.name}": row[i] for i, column in enumerate(primary_key)}
+                    for row in rows
+                ]
+                for offset, column in enumerate(fields, start=len(primary_key)):
+                    present = [i for i, row in enumerate(rows) if row[offset] is not None]
+                    values = self.encryption.reencrypt_many([rows[i][offset] for i in present], executor)
+                    for update in updates:
+                        update[column.name] = None
+                    for i, value in zip(present, values):
+                        updates[i][column.name] = value
+                session.execute(statement, updates)
+                session.commit()
+                count += len(rows)
+                if len(rows) < batch_size:
+                    break
+                last = tuple(rows[-1][:len(primary_key)])
+            return count
+        except Exception as e:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+            
     def _decrypt_sensitive_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Decrypt sensitive data after retrieval."""
         if not self.encryption:
@@ -417,9 +1022,12 @@ class MultiTenantStore:
         self,
         default_database_url: str,
         isolation_strategy: TenantIsolationStrategy = TenantIsolationStrategy.SCHEMA_BASED,
-        backup_dir: Optional[str] = None
+        backup_dir: Optional[str] = None,
+        encryption_secret: Optional[str] = None,
+        **connection_options: Any
     ):
-        self.connection_manager = ConnectionManager(default_database_url)
+        self.connection_manager = ConnectionManager(default_database_url, **connection_options)
+        self.encryption_secret = encryption_secret
         self.tenant_context_manager = TenantContextManager()
         self.isolation_strategy = isolation_strategy
         self.backup_dir = backup_dir
@@ -450,11 +1058,42 @@ class MultiTenantStore:
             )
             
     def _get_encryption(self, tenant_id: str) -> TenantEncryption:
-        """Get or create encryption for tenant."""
+        """Get or create encryption for tenant, at its stored key versions."""
         if tenant_id not in self._encryption:
-            self._encryption[tenant_id] = TenantEncryption(tenant_id)
+            current, oldest = self._load_key_versions(tenant_id)
+            self._encryption[tenant_id] = TenantEncryption(
+                tenant_id,
+                key_version=current,
+                secret=self.encryption_secret,
+                oldest_version=oldest
+            )
         return self._encryption[tenant_id]
         
+    def _key_versions_engine(self, tenant_id: str) -> sa.engine.Engine:
+        engine = self.connection_manager.get_engine(tenant_id)
+        _key_versions_table.create(engine, checkfirst=True)
+        return engine
+        
+    def _load_key_versions(self, tenant_id: str) -> Tuple[int, int]:
+        """The tenant's stored (current, oldest) key versions; (1, 1) if it never rotated."""
+        with self._key_versions_engine(tenant_id).connect() as connection:
+            row = connection.execute(
+                sa.select(_key_versions_table.c.current_version, _key_versions_table.c.oldest_version)
+                .where(_key_versions_table.c.tenant_id == tenant_id)
+            ).first()
+        return (row[0], row[1]) if row else (1, 1)
+        
+    def _save_key_versions(self, tenant_id: str, encryption: TenantEncryption) -> None:
+        """Store the tenant's current and oldest key versions."""
+        current, oldest = encryption.key_versions
+        values = {"current_version": current, "oldest_version": oldest}
+        with self._key_versions_engine(tenant_id).begin() as connection:
+            updated = connection.execute(
+                _key_versions_table.update().where(_key_versions_table.c.tenant_id == tenant_id).values(values)
+            )
+            if not updated.rowcount:
+                connection.execute(_key_versions_table.insert().values(tenant_id=tenant_id, **values))
+        
     def _get_backup_manager(self, tenant_id: str) -> TenantBackupManager:
         """Get or create backup manager for tenant."""
         if not self.backup_dir:
@@ -497,14 +1136,29 @@ class MultiTenantStore:
         backup_manager = self._get_backup_manager(tenant_id)
         return backup_manager.list_backups()
         
-    def rotate_encryption_key(self, tenant_id: str) -> bytes:
-        """Rotate encryption key for a tenant."""
+    def rotate_encryption_key(
+        self,
+        tenant_id: str,
+        model_classes: Iterable[Type] = (),
+        batch_size: int = 1000
+    ) -> bytes:
+        """Rotate encryption key for a tenant, re-encrypting the models' sensitive fields in batches."""
         tenant = self.tenant_context_manager.current_tenant
         if not tenant or tenant.tenant_id != tenant_id:
             raise ValueError("Invalid tenant context")
             
         encryption = self._get_encryption(tenant_id)
-        return encryption.rotate_key()
+        key = encryption.rotate_key()
+        # Stored before any value is re-encrypted, so an interrupted run still decrypts after a restart
+        self._save_key_versions(tenant_id, encryption)
+        repositories = [self.get_repository(model_class, tenant_id) for model_class in model_classes]
+        for repository in repositories:
+            if isinstance(repository, SchemaBasedRepository):
+                repository.reencrypt_sensitive_fields(batch_size)
+        if repositories:
+            encryption.retire_previous_keys()
+            self._save_key_versions(tenant_id, encryption)
+        return key
         
     def set_tenant_context(
         self,
@@ -529,6 +1183,10 @@ class MultiTenantStore:
         self.tenant_context_manager.clear_tenant()
         self.connection_manager._cross_tenant_prevention.clear_tenant_context()
         
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool utilization per engine and per tenant."""
+        return self.connection_manager.pool_stats()
+        
     def close(self) -> None:
         """Close all database connections."""
         self.connection_manager.close_all()
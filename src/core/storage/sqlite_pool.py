@@ -0,0 +1,70 @@
+from typing import AsyncIterator, List, Optional
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+class AsyncSQLitePool:
+    """A fixed set of long-lived aiosqlite connections to one database.
+
+    Connections are opened on first use in WAL mode, where readers do not
+    block the writer or each other, and are handed out one caller at a
+    time. Writers still take SQLite's single write lock in turn, waiting
+    up to ``busy_timeout`` milliseconds for it.
+    """
+
+    def __init__(self, db_path: str, size: int = 4, busy_timeout: int = 5000):
+        self.db_path = db_path
+        self.size = size
+        self.busy_timeout = busy_timeout
+        self._connections: List[aiosqlite.Connection] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._lock = asyncio.Lock()
+
+    async def _open(self) -> aiosqlite.Connection:
+        connection = await aiosqlite.connect(self.db_path)
+        await connection.execute("PRAGMA journal_mode=WAL")
+        await connection.execute("PRAGMA synchronous=NORMAL")
+        await connection.execute("PRAGMA foreign_keys=ON")
+        await connection.execute(f"PRAGMA busy_timeout={int(self.busy_timeout)}")
+        return connection
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a connection, opening another if fewer than size are open."""
+        async with self._lock:
+            if self._idle is None:
+                self._idle = asyncio.Queue()
+            idle = self._idle
+            if idle.empty() and len(self._connections) < self.size:
+                connection = await self._open()
+                self._connections.append(connection)
+                idle.put_nowait(connection)
+        connection = await idle.get()
+        try:
+            yield connection
+        except BaseException:
+            if connection.in_transaction:
+                await connection.rollback()
+            raise
+        finally:
+            # Back to the queue it came from, even if the pool was closed meanwhile
+            idle.put_nowait(connection)
+
+    async def close(self) -> None:
+        """Close every connection once it is returned; the pool reopens them on next use."""
+        async with self._lock:
+            connections, self._connections = self._connections, []
+            idle, self._idle = self._idle, None
+        if idle is not None:
+            # Borrowed connections go back to this queue, so wait until all of them have
+            for _ in connections:
+                await idle.get()
+        for connection in connections:
+            try:
+                await connection.close()
+            except Exception as e:
+                logger.error(f"Error closing SQLite connection: {str(e)}")
@@ -0,0 +1,54 @@
+import json
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Tuple, List
+
+# Maps each file in a backup directory to the path it was copied from
+BACKUP_MANIFEST = "manifest.json"
+
+def create_change_backup(backup_root: Path, file_paths: Iterable[str]) -> Tuple[str, List[str]]:
+    """Copy files into a new backup directory of their own
+
+    Every backup gets a fresh directory, so concurrent tasks never share
+    one, and a manifest recording where each file came from. A change made
+    in a worktree is therefore restored into that worktree.
+
+    Returns:
+        The backup directory and the files backed up; missing files are skipped
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    backup_root = Path(backup_root)
+    backup_root.mkdir(parents=True, exist_ok=True)
+    # Not "backup_*", which names whole-codebase backups
+    backup_path = Path(tempfile.mkdtemp(prefix=f"changes_{timestamp}_", dir=backup_root))
+
+    manifest = {}
+    for index, file_path in enumerate(file_paths):
+        file_path = Path(file_path).resolve()
+        if file_path.exists():
+            backup_name = f"{index}_{file_path.name}"
+            shutil.copy2(file_path, backup_path / backup_name)
+            manifest[backup_name] = str(file_path)
+
+    with open(backup_path / BACKUP_MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return str(backup_path), list(manifest.values())
+
+def restore_change_backup(backup_path: str) -> bool:
+    """Copy a backup's files back to the paths they were taken from
+
+    Returns:
+        False if the directory is not a change backup
+    """
+    backup_dir = Path(backup_path)
+    manifest_path = backup_dir / BACKUP_MANIFEST
+    if not manifest_path.exists():
+        return False
+
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    for backup_name, target_file in manifest.items():
+        shutil.copy2(backup_dir / backup_name, target_file)
+    return True
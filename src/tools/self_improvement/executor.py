@@ -14,11 +14,16 @@ from enum import Enum
 import hashlib
 import tempfile
 import subprocess
+import asyncio
 from typing import Set, Union
 import git
 from git.exc import GitCommandError
 
 from .analyzer import ImprovementSuggestion
+from .backups import create_change_backup, restore_change_backup
+from .import_graph import ImportGraphIndex
+from .validation import ValidationPipeline
+from .worktrees import WorktreeRunner, WorktreeTask
 from ..core.models.llm_integration import LLMIntegration, LLMConfig
 from ..core.models.code_context_manager import CodeContextManager
 from ..core.analysis.impact_analysis import ImpactAnalyzer
@@ -44,9 +49,9 @@ class SafetyCheckResult:
     backup_info: Dict[str, Any]
 
 class SafetyManager:
-    def __init__(self, project_dir: str):
+    def __init__(self, project_dir: str, code_modifier: Optional['SafeCodeModifier'] = None):
         self.project_dir = Path(project_dir)
-        self.code_modifier = SafeCodeModifier(project_dir)
+        self.code_modifier = code_modifier or SafeCodeModifier(project_dir, safety_manager=self)
         self.version_control = VersionControlManager(project_dir)
         self.security_analyzer = SecurityAnalyzer()
         self.impact_analyzer = ImpactAnalyzer(project_dir)
@@ -182,7 +187,7 @@ class SafetyManager:
         return test_results
         
     async def _create_backup(self, changes: List[CodeChange]) -> Dict[str, Any]:
-        """Create backup of changes"""
+        """Create backup of changes in a directory of its own"""
         backup_info = {
             "backup_path": None,
             "timestamp": None,
@@ -190,21 +195,13 @@ class SafetyManager:
         }
         
         try:
-            # Create backup directory
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = self.project_dir / "backups" / f"backup_{timestamp}"
-            backup_path.mkdir(parents=True, exist_ok=True)
-            
-            # Backup each changed file
-            for change in changes:
-                file_path = Path(change.file_path)
-                if file_path.exists():
-                    backup_file = backup_path / file_path.name
-                    shutil.copy2(file_path, backup_file)
-                    backup_info["files_backed_up"].append(str(file_path))
-                    
-            backup_info["backup_path"] = str(backup_path)
-            backup_info["timestamp"] = timestamp
+            backup_path, backed_up = create_change_backup(
+                self.project_dir / "backups",
+                [change.file_path for change in changes]
+            )
+            backup_info["backup_path"] = backup_path
+            backup_info["timestamp"] = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            backup_info["files_backed_up"] = backed_up
             
         except Exception as e:
             logger.error(f"Error creating backup: {e}")
@@ -267,10 +264,16 @@ class ValidationResult:
     dependencies: Set[str]
 
 class SafeCodeModifier:
-    def __init__(self, project_dir: str):
+    def __init__(self, project_dir: str, safety_manager: Optional[SafetyManager] = None):
         self.project_dir = Path(project_dir)
-        self.safety_manager = SafetyManager(project_dir)
+        self.safety_manager = safety_manager or SafetyManager(project_dir, code_modifier=self)
         self.validation_tools = self._initialize_validation_tools()
+        self.validation = ValidationPipeline(
+            str(self.project_dir),
+            security_check=self._run_security_check,
+            use_pylint=self.validation_tools["pylint"],
+            use_mypy=self.validation_tools["mypy"]
+        )
         self.backup_dir = self.project_dir / "backups"
         self.backup_dir.mkdir(exist_ok=True)
         
@@ -364,95 +367,51 @@ class SafeCodeModifier:
             return False
             
     async def _validate_changes(self, changes: List[CodeChange]) -> List[ValidationResult]:
-        """Validate code changes using multiple tools"""
-        results = []
-        
-        for change in changes:
-            try:
-                # 1. Syntax validation
-                try:
-                    ast.parse(change.new_content)
-                except SyntaxError as e:
-                    results.append(ValidationResult(
-                        file_path=change.file_path,
-                        errors=[f"Syntax error: {str(e)}"]
-                    ))
-                    continue
-                    
-                # 2. Style validation
-                style_errors = await self._run_pylint(change)
-                if style_errors:
-                    results.append(ValidationResult(
-                        file_path=change.file_path,
-                        errors=style_errors
-                    ))
-                    
-                # 3. Type checking
-                type_errors = await self._run_mypy(change)
-                if type_errors:
-                    results.append(ValidationResult(
-                        file_path=change.file_path,
-                        errors=type_errors
-                    ))
-                    
-                # 4. Security validation
-                security_errors = await self._run_security_check(change)
-                if security_errors:
-                    results.append(ValidationResult(
-                        file_path=change.file_path,
-                        errors=security_errors
-                    ))
-                    
-            except Exception as e:
-                logger.error(f"Error validating change: {e}")
-                results.append(ValidationResult(
-                    file_path=change.file_path,
-                    errors=[str(e)]
-                ))
-                
-        return results
+        """Validate code changes using multiple tools
         
-    async def _run_pylint(self, change: CodeChange) -> List[str]:
-        """Run pylint on code changes"""
+        Syntax, pylint, mypy and security checks run through the validation
+        pipeline, which batches files per tool, runs the tools concurrently
+        and skips files whose content was already checked.
+        """
         try:
-            result = await self._run_command(f"pylint {change.file_path}")
-            if result.returncode != 0:
-                return [line for line in result.stderr.decode().splitlines() if line.strip()]
-            return []
+            findings = await self.validation.validate({
+                change.file_path: change.new_content for change in changes
+            })
         except Exception as e:
-            logger.error(f"Error running pylint: {e}")
-            return []
-            
-    async def _run_mypy(self, change: CodeChange) -> List[str]:
-        """Run mypy on code changes"""
-        try:
-            result = await self._run_command(f"mypy {change.file_path}")
-            if result.returncode != 0:
-                return [line for line in result.stderr.decode().splitlines() if line.strip()]
-            return []
-        except Exception as e:
-            logger.error(f"Error running mypy: {e}")
-            return []
-            
-    async def _run_security_check(self, change: CodeChange) -> List[str]:
+            logger.error(f"Error validating changes: {e}")
+            findings = {change.file_path: {"errors": [str(e)], "warnings": []} for change in changes}
+            
+        return [
+            ValidationResult(
+                is_valid=not findings[change.file_path]["errors"],
+                errors=findings[change.file_path]["errors"],
+                warnings=findings[change.file_path]["warnings"],
+                metrics=dict(self.validation.timings),
+                dependencies=set()
+            )
+            for change in changes
+        ]
+        
+    async def _run_security_check(self, file_path: str, content: str) -> List[str]:
         """Run security checks on code changes"""
         try:
-            # Use safety manager's security analysis
-            security_analysis = await self.safety_manager._analyze_security([change])
-            return [str(v) for v in security_analysis.get("vulnerabilities", [])]
+            analysis = self.safety_manager.security_analyzer.analyze_code(content)
+            return [str(v) for v in analysis.vulnerabilities]
         except Exception as e:
             logger.error(f"Error running security check: {e}")
             return []
             
     async def _run_command(self, command: str) -> subprocess.CompletedProcess:
-        """Run a shell command"""
+        """Run a shell command to completion"""
         try:
-            return await asyncio.create_subprocess_shell(
+            process = await asyncio.create_subprocess_shell(
                 command,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 cwd=str(self.project_dir)
             )
+            stdout, stderr = await process.communicate()
+            return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
         except Exception as e:
             logger.error(f"Error running command: {e}")
             raise
@@ -492,18 +451,13 @@ class SafeCodeModifier:
             return None
             
     async def _restore_from_backup(self, backup_path: str) -> bool:
-        """Restore from backup"""
+        """Restore from backup
+        
+        Files go back to the paths recorded when the backup was made, which
+        is the worktree the change was applied to, not the project directory.
+        """
         try:
-            backup_dir = Path(backup_path)
-            if not backup_dir.exists():
-                return False
-                
-            # Restore each backed up file
-            for backup_file in backup_dir.glob("*"):
-                target_file = self.project_dir / backup_file.name
-                shutil.copy2(backup_file, target_file)
-                
-            return True
+            return restore_change_backup(backup_path)
             
         except Exception as e:
             logger.error(f"Error restoring from backup: {e}")
@@ -587,18 +541,24 @@ class CodeContext:
     metrics: Dict[str, float]
 
 class ContextAwareFixSystem:
-    def __init__(self, project_dir: str):
+    def __init__(self, project_dir: str, import_graph_refresh_interval: float = 30.0):
         self.project_dir = Path(project_dir)
         self.context_cache: Dict[str, CodeContext] = {}
         self.pattern_analyzer = PatternAnalyzer()
         self.style_analyzer = StyleAnalyzer()
         self.test_analyzer = TestAnalyzer()
+        self.import_graph = ImportGraphIndex(
+            str(self.project_dir), refresh_interval=import_graph_refresh_interval
+        )
         
     async def get_context(self, file_path: str) -> CodeContext:
         """Get or create context for a file"""
         if file_path in self.context_cache:
             return self.context_cache[file_path]
             
+        # Rescan the tree at most once per refresh interval, re-parsing only changed files
+        self.import_graph.refresh_if_due()
+        
         # Analyze file and its context
         content = self._read_file(file_path)
         imports = self._analyze_imports(content)
@@ -645,43 +605,19 @@ class ContextAwareFixSystem:
         
     def _analyze_dependencies(self, file_path: str) -> Set[str]:
         """Analyze file dependencies"""
-        dependencies = set()
-        
-        # Get imports
-        with open(file_path, 'r') as f:
-            content = f.read()
-        imports = self._analyze_imports(content)
-        
-        # Find imported files in project
-        for imp in imports:
-            module_path = self._find_module_path(imp)
-            if module_path:
-                dependencies.add(module_path)
-                
-        return dependencies
+        return self.import_graph.dependencies(file_path)
         
     def _find_module_path(self, module_name: str) -> Optional[str]:
         """Find module path in project"""
-        for path in self.project_dir.rglob("*.py"):
-            if path.stem == module_name:
-                return str(path)
-        return None
+        return self.import_graph.find_module(module_name)
         
     def _find_related_files(self, file_path: str) -> List[str]:
         """Find related files based on imports and dependencies"""
-        related = set()
-        
-        # Get direct dependencies
-        dependencies = self._analyze_dependencies(file_path)
-        related.update(dependencies)
+        related = self.import_graph.dependencies(file_path)
         
         # Get files that import this file
-        for path in self.project_dir.rglob("*.py"):
-            if str(path) != file_path:
-                deps = self._analyze_dependencies(str(path))
-                if file_path in deps:
-                    related.add(str(path))
-                    
+        related.update(self.import_graph.dependents(file_path))
+        
         return list(related)
         
     def _calculate_metrics(self, content: str) -> Dict[str, float]:
@@ -1489,7 +1425,7 @@ class VersionControlManager:
             return False
 
 class ImprovementExecutor:
-    def __init__(self, project_dir: str):
+    def __init__(self, project_dir: str, max_parallel: Optional[int] = None):
         self.project_dir = Path(project_dir)
         self.current_dir = self.project_dir / "current"
         self.improvements_dir = self.project_dir / "improvements"
@@ -1511,6 +1447,10 @@ class ImprovementExecutor:
         self.context_aware_fix = ContextAwareFixSystem(self.project_dir)
         self.solution_generator = MultiSolutionGenerator(self.project_dir)
         self.version_control = VersionControlManager(self.project_dir)
+        self.worktrees = WorktreeRunner(
+            str(self.project_dir),
+            max_parallel=max_parallel or self.config.get("max_parallel_improvements")
+        )
         
         # Initialize fix tracking
         self.fix_history: Dict[str, List[CodeFix]] = {}
@@ -1567,14 +1507,25 @@ class ImprovementExecutor:
             logger.error(f"Error applying fix: {e}")
             return False
             
-    async def _execute_single_improvement(self, suggestion: ImprovementSuggestion) -> ImprovementResult:
-        """Execute a single improvement suggestion using all available systems"""
+    async def _execute_single_improvement(
+        self,
+        suggestion: ImprovementSuggestion,
+        worktree: Optional[Path] = None
+    ) -> ImprovementResult:
+        """Execute a single improvement suggestion using all available systems
+
+        With a worktree the changes are made to the copy of the target file
+        there, while fixes are still generated against the project's context.
+        """
         try:
+            current_dir = worktree / self.current_dir.relative_to(self.project_dir) if worktree else self.current_dir
+            
             # Record metrics before changes
-            metrics_before = self._get_current_metrics()
+            metrics_before = self._get_current_metrics(current_dir)
             
             # Create a copy of the file to modify
-            file_path = self._find_target_file(suggestion)
+            target_file = self._find_target_file(suggestion)
+            file_path = worktree / target_file.relative_to(self.project_dir) if worktree and target_file else target_file
             if not file_path:
                 return ImprovementResult(
                     suggestion=suggestion,
@@ -1591,7 +1542,7 @@ class ImprovementExecutor:
                 original_content = f.read()
             
             # Generate code fixes using context-aware system
-            fixes = await self.generate_code_fixes(suggestion.description, str(file_path))
+            fixes = await self.generate_code_fixes(suggestion.description, str(target_file))
             if not fixes:
                 return ImprovementResult(
                     suggestion=suggestion,
@@ -1624,7 +1575,7 @@ class ImprovementExecutor:
                 diff = self._generate_diff(original_content, new_content)
                 
                 # Record metrics after changes
-                metrics_after = self._get_current_metrics()
+                metrics_after = self._get_current_metrics(current_dir)
                 
                 return ImprovementResult(
                     suggestion=suggestion,
@@ -1661,77 +1612,52 @@ class ImprovementExecutor:
             )
             
     async def execute_improvements(self, suggestions: List[ImprovementSuggestion]) -> List[ImprovementResult]:
-        """Execute a list of improvement suggestions with version control"""
-        results = []
-        
+        """Execute a list of improvement suggestions with version control
+
+        Suggestions touching different files run in parallel, each on its own
+        branch in a temporary git worktree; suggestions sharing a file run in
+        priority order in successive waves. Each wave's successful changes
+        are merged into the current branch in one merge.
+        """
         # Sort suggestions by priority
         sorted_suggestions = sorted(suggestions, key=lambda x: x.priority, reverse=True)
         
-        for suggestion in sorted_suggestions:
-            try:
-                # Create branch for improvement
-                branch_name = f"improvement/{suggestion.category}/{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                if not await self.version_control.create_branch(branch_name):
-                    results.append(
-                        ImprovementResult(
-                            suggestion=suggestion,
-                            success=False,
-                            changes_made=[],
-                            errors=["Failed to create version control branch"],
-                            diff=None,
-                            metrics_before={},
-                            metrics_after={}
-                        )
-                    )
-                    continue
-                
-                try:
-                    # Execute improvement
-                    result = await self._execute_single_improvement(suggestion)
-                    results.append(result)
-                    
-                    # Save improvement result
-                    self._save_improvement_result(result)
-                    
-                    # If improvement failed, revert changes
-                    if not result.success:
-                        await self.version_control.revert_changes("HEAD")
-                    else:
-                        # Commit successful changes
-                        commit_message = f"Applied improvements: {', '.join(result.changes_made)}"
-                        await self.version_control.commit_changes(commit_message, [str(result.suggestion.file_path)])
-                        
-                        # Merge changes to main branch
-                        await self.version_control.merge_changes(branch_name)
-                
-                except Exception as e:
-                    # Revert changes on error
-                    await self.version_control.revert_changes("HEAD")
-                    results.append(
-                        ImprovementResult(
-                            suggestion=suggestion,
-                            success=False,
-                            changes_made=[],
-                            errors=[str(e)],
-                            diff=None,
-                            metrics_before={},
-                            metrics_after={}
-                        )
-                    )
-            
-            except Exception as e:
-                print(f"Error executing improvement: {e}")
-                results.append(
-                    ImprovementResult(
-                        suggestion=suggestion,
-                        success=False,
-                        changes_made=[],
-                        errors=[str(e)],
-                        diff=None,
-                        metrics_before={},
-                        metrics_after={}
-                    )
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        tasks = []
+        for index, suggestion in enumerate(sorted_suggestions):
+            target_file = self._find_target_file(suggestion)
+            tasks.append(WorktreeTask(
+                item=suggestion,
+                files={str(target_file.relative_to(self.project_dir))} if target_file else None,
+                branch=f"improvement/{suggestion.category}/{timestamp}_{index}"
+            ))
+        
+        async def run_in_worktree(task: WorktreeTask, worktree: Path) -> Tuple[ImprovementResult, Optional[str]]:
+            result = await self._execute_single_improvement(task.item, worktree)
+            self._save_improvement_result(result)
+            if not result.success:
+                # Discard the changes; the worktree is removed with them
+                return result, None
+            return result, f"Applied improvements: {', '.join(result.changes_made)}"
+        
+        results = []
+        for outcome in await self.worktrees.run(tasks, run_in_worktree):
+            result = outcome.result
+            if result is None:
+                result = ImprovementResult(
+                    suggestion=outcome.task.item,
+                    success=False,
+                    changes_made=[],
+                    errors=outcome.errors or ["Improvement was not executed"],
+                    diff=None,
+                    metrics_before={},
+                    metrics_after={}
                 )
+            elif outcome.errors:
+                # Applied in its worktree but not merged
+                result.success = False
+                result.errors.extend(outcome.errors)
+            results.append(result)
         
         # Generate improvement report
         self._generate_improvement_report(results)
@@ -2162,11 +2088,11 @@ class ImprovementExecutor:
         )
         return "".join(diff)
     
-    def _get_current_metrics(self) -> Dict[str, float]:
+    def _get_current_metrics(self, current_dir: Optional[Path] = None) -> Dict[str, float]:
         """Get current code metrics"""
         metrics = {}
         
-        for file_path in self.current_dir.rglob("*.py"):
+        for file_path in (current_dir or self.current_dir).rglob("*.py"):
             try:
                 with open(file_path, 'r') as f:
                     content = f.read()
@@ -2206,7 +2132,8 @@ class ImprovementExecutor:
     
     def _save_improvement_result(self, result: ImprovementResult):
         """Save the result of an improvement"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Improvements run concurrently, so seconds alone would collide
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         result_file = self.improvements_dir / f"improvement_{timestamp}.json"
         
         result_dict = {
@@ -0,0 +1,280 @@
+import os
+import json
+import ast
+import hashlib
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple, Set
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Below this many changed files parsing in-process beats starting a pool
+PARALLEL_PARSE_THRESHOLD = 64
+
+SKIP_DIRS = {"__pycache__", "node_modules", "venv", "env"}
+
+def module_name_for(relative_path: str) -> str:
+    """Dotted module name for a project-relative .py path"""
+    parts = list(Path(relative_path).with_suffix("").parts)
+    if parts and parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+def parse_imports(path: str) -> Tuple[str, Optional[List[List[Any]]]]:
+    """Hash a file and extract its imports
+
+    Runs in worker processes, so it takes and returns plain data.
+
+    Returns:
+        The content hash and a list of ``[module, level, names]`` entries,
+        or None for the imports if the file does not parse
+    """
+    with open(path, 'rb') as f:
+        source = f.read()
+    digest = hashlib.sha1(source).hexdigest()
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return digest, None
+
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend([alias.name, 0, []] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append([node.module or "", node.level, [alias.name for alias in node.names]])
+    return digest, imports
+
+class ImportGraphIndex:
+    """Persistent module and import graph for a project
+
+    Maps module names to files and keeps forward (file -> files it imports)
+    and reverse (file -> files importing it) edges, so dependencies and
+    dependents are answered in O(degree). ``refresh`` re-parses only files
+    whose mtime or size changed and whose content hash differs, using a
+    process pool when many files changed, and the parsed imports are saved
+    to ``cache_path`` so later runs start warm. ``refresh_if_due`` rescans
+    at most once per ``refresh_interval`` seconds, for callers on hot paths.
+    """
+
+    def __init__(
+        self,
+        project_dir: str,
+        cache_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        refresh_interval: float = 0.0
+    ):
+        self.project_dir = Path(project_dir).resolve()
+        self.cache_path = Path(cache_path) if cache_path else self.project_dir / ".self_improvement" / "import_graph.json"
+        self.workers = workers
+        self.refresh_interval = refresh_interval
+        self._refreshed_at: Optional[float] = None
+
+        # Project-relative path -> {"mtime", "size", "hash", "imports"}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.modules: Dict[str, str] = {}
+        self.dependencies_of: Dict[str, Set[str]] = {}
+        self.dependents_of: Dict[str, Set[str]] = {}
+        self._modules_by_leaf: Dict[str, List[str]] = {}
+        self._loaded = False
+
+    def refresh(self) -> List[str]:
+        """Bring the index up to date with the files on disk
+
+        Returns:
+            Project-relative paths that were added, changed or removed
+        """
+        if not self._loaded:
+            self._load()
+        self._refreshed_at = time.monotonic()
+
+        seen = set()
+        stale = []
+        for relative, stat in self._scan():
+            seen.add(relative)
+            entry = self.files.get(relative)
+            if entry is None or entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                stale.append((relative, stat))
+
+        removed = [relative for relative in self.files if relative not in seen]
+        for relative in removed:
+            del self.files[relative]
+
+        added = any(relative not in self.files for relative, _ in stale)
+        changed = self._reparse(stale)
+        if added or removed:
+            # The module set changed, so imports elsewhere may now resolve differently
+            self._rebuild_modules()
+            self._rebuild_edges()
+        elif changed:
+            self._rebuild_edges(changed)
+
+        if stale or removed:
+            self._save()
+        return changed + removed
+
+    def refresh_if_due(self) -> List[str]:
+        """Refresh unless the last refresh was under ``refresh_interval`` seconds ago
+
+        Every refresh stats the whole tree, so this bounds that cost for
+        callers that need the graph on every request.
+        """
+        if self._refreshed_at is not None and time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return []
+        return self.refresh()
+
+    def dependencies(self, file_path: str) -> Set[str]:
+        """Project files the given file imports"""
+        return {self._absolute(path) for path in self.dependencies_of.get(self._relative(file_path), ())}
+
+    def dependents(self, file_path: str) -> Set[str]:
+        """Project files that import the given file"""
+        return {self._absolute(path) for path in self.dependents_of.get(self._relative(file_path), ())}
+
+    def find_module(self, module_name: str) -> Optional[str]:
+        """Path of a project module, matching trailing name components if needed"""
+        relative = self._resolve(module_name)
+        return self._absolute(relative) if relative else None
+
+    def _scan(self):
+        """Yield (relative path, stat) for every Python file in the project"""
+        for root, dirs, files in os.walk(self.project_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d not in SKIP_DIRS]
+            for name in files:
+                if name.endswith(".py"):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, self.project_dir), os.stat(path)
+
+    def _reparse(self, stale: List[Tuple[str, os.stat_result]]) -> List[str]:
+        """Parse files whose content changed; returns the ones that did"""
+        if not stale:
+            return []
+
+        paths = [str(self.project_dir / relative) for relative, _ in stale]
+        if len(stale) >= PARALLEL_PARSE_THRESHOLD:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(parse_imports, paths, chunksize=32))
+        else:
+            results = [parse_imports(path) for path in paths]
+
+        changed = []
+        for (relative, stat), (digest, imports) in zip(stale, results):
+            entry = self.files.get(relative)
+            if entry is None or entry["hash"] != digest:
+                changed.append(relative)
+            self.files[relative] = {
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "hash": digest,
+                "imports": imports or []
+            }
+        return changed
+
+    def _rebuild_modules(self) -> None:
+        self.modules = {module_name_for(relative): relative for relative in self.files}
+        self._modules_by_leaf = {}
+        for module in self.modules:
+            self._modules_by_leaf.setdefault(module.rpartition(".")[2], []).append(module)
+
+    def _rebuild_edges(self, relatives: Optional[List[str]] = None) -> None:
+        """Recompute forward edges for some files, or all, and patch the reverse edges"""
+        if relatives is None:
+            relatives = list(self.files)
+            self.dependencies_of = {}
+            self.dependents_of = {}
+        else:
+            for relative in relatives:
+                for target in self.dependencies_of.pop(relative, ()):
+                    self.dependents_of[target].discard(relative)
+
+        for relative in relatives:
+            targets = self._import_targets(relative, self.files[relative]["imports"])
+            targets.discard(relative)
+            self.dependencies_of[relative] = targets
+            for target in targets:
+                self.dependents_of.setdefault(target, set()).add(relative)
+
+    def _import_targets(self, relative: str, imports: List[List[Any]]) -> Set[str]:
+        """Project files an import list refers to"""
+        package = module_name_for(relative).split(".")
+        if not relative.endswith("__init__.py"):
+            package = package[:-1]
+
+        targets = set()
+        for module, level, names in imports:
+            if level:
+                base = package[:len(package) - (level - 1)]
+                module = ".".join(base + ([module] if module else []))
+
+            # "from package import module" depends on the submodule, other names on the package
+            needs_module = not names
+            for name in names:
+                submodule = self._resolve(f"{module}.{name}" if module else name) if name != "*" else None
+                if submodule:
+                    targets.add(submodule)
+                else:
+                    needs_module = True
+            if needs_module and module:
+                target = self._resolve(module)
+                if target:
+                    targets.add(target)
+        return targets
+
+    def _resolve(self, module: str) -> Optional[str]:
+        """Project file for a module name
+
+        Tries the exact name first, then modules whose trailing components
+        match, so imports rooted above or below the project directory still
+        resolve.
+        """
+        if module in self.modules:
+            return self.modules[module]
+        suffix = "." + module
+        for candidate in self._modules_by_leaf.get(module.rpartition(".")[2], ()):
+            if candidate.endswith(suffix) or module.endswith("." + candidate):
+                return self.modules[candidate]
+        return None
+
+    def _relative(self, file_path: str) -> str:
+        prefix = str(self.project_dir) + os.sep
+        if str(file_path).startswith(prefix):
+            return str(file_path)[len(prefix):]
+        path = Path(file_path)
+        if not path.is_absolute():
+            path = self.project_dir / path
+        try:
+            return os.path.relpath(path.resolve(), self.project_dir)
+        except ValueError:
+            return str(path)
+
+    def _absolute(self, relative: str) -> str:
+        return os.path.join(self.project_dir, relative)
+
+    def _load(self) -> None:
+        """Load the saved index, ignoring it if missing or from another version"""
+        self._loaded = True
+        try:
+            with open(self.cache_path) as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.files = data["files"]
+                self._rebuild_modules()
+                self._rebuild_edges()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable import graph index: {str(e)}")
+
+    def _save(self) -> None:
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_suffix(".tmp")
+            with open(temp_path, 'w') as f:
+                json.dump({"version": INDEX_VERSION, "files": self.files}, f)
+            os.replace(temp_path, self.cache_path)
+        except Exception as e:
+            logger.warning(f"Failed to save import graph index: {str(e)}")
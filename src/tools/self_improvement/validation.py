@@ -0,0 +1,254 @@
+import os
+import re
+import ast
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Callable, Awaitable, Tuple
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["syntax", "pylint", "mypy", "security"]
+
+MYPY_FLAGS = ["--show-absolute-path", "--no-error-summary", "--no-color-output", "--follow-imports=silent"]
+
+MYPY_LINE = re.compile(r"^(?P<path>.+?):(?P<line>\d+)(?::\d+)?: (?P<level>error|warning|note): (?P<message>.*)$")
+
+class ValidationPipeline:
+    """Batched, concurrent and cached validation of changed files
+
+    Syntax is checked in-process first; files that parse go through pylint,
+    mypy and the security check concurrently. All files needing pylint are
+    checked in one pylint run and likewise for mypy, which goes through a
+    long-lived ``dmypy`` daemon when available so its cache stays warm
+    between runs. Each validator's findings are cached per file by content
+    hash, so a file is only re-checked by a tool after it changes.
+
+    ``timings`` holds the seconds each stage took in the last run and
+    ``stats`` counts checks and cache hits over the pipeline's lifetime.
+    """
+
+    def __init__(
+        self,
+        project_dir: str,
+        security_check: Optional[Callable[[str, str], Awaitable[List[str]]]] = None,
+        use_pylint: bool = True,
+        use_mypy: bool = True,
+        use_daemon: bool = True,
+        cache_path: Optional[str] = None,
+        max_cache_entries: int = 10000,
+        timeout: float = 300.0
+    ):
+        self.project_dir = Path(project_dir).resolve()
+        self.security_check = security_check
+        self.timeout = timeout
+        self.max_cache_entries = max_cache_entries
+        self.cache_path = Path(cache_path) if cache_path else self.project_dir / ".self_improvement" / "validation_cache.json"
+
+        self.pylint_command = ["pylint"] if use_pylint and shutil.which("pylint") else None
+        if use_mypy and use_daemon and shutil.which("dmypy"):
+            status_file = self.cache_path.parent / "dmypy.json"
+            self.mypy_command = ["dmypy", "--status-file", str(status_file), "run", "--timeout", "3600", "--"]
+        elif use_mypy and shutil.which("mypy"):
+            self.mypy_command = ["mypy"]
+        else:
+            self.mypy_command = None
+
+        self.timings: Dict[str, float] = {}
+        self.stats: Dict[str, int] = {"checked": 0, "cache_hits": 0, "tool_runs": 0}
+        self._cache: Optional[Dict[str, Dict[str, List[str]]]] = None
+
+    async def validate(self, files: Dict[str, str]) -> Dict[str, Dict[str, List[str]]]:
+        """Validate files given as path -> content to check
+
+        Paths are taken relative to the project directory. pylint and mypy
+        read the files from disk, so they check what is written there.
+
+        Returns:
+            Path -> {"errors": [...], "warnings": [...]}
+        """
+        started = time.perf_counter()
+        self.timings = {}
+        results = {path: {"errors": [], "warnings": []} for path in files}
+
+        stage_started = time.perf_counter()
+        parsed = {}
+        for path, content in files.items():
+            try:
+                ast.parse(content)
+                parsed[path] = content
+            except SyntaxError as e:
+                results[path]["errors"].append(f"Syntax error: {str(e)}")
+        self.timings["syntax"] = time.perf_counter() - stage_started
+
+        if parsed:
+            # pylint and mypy check the file on disk, so key their cache by what is there
+            disk_hashes = {path: self._disk_hash(path) for path in parsed}
+            content_hashes = {path: hashlib.sha256(content.encode()).hexdigest() for path, content in parsed.items()}
+
+            stage_findings = await asyncio.gather(
+                self._run_stage("pylint", disk_hashes, self._run_pylint if self.pylint_command else None),
+                self._run_stage("mypy", disk_hashes, self._run_mypy if self.mypy_command else None),
+                self._run_stage("security", content_hashes, self._run_security if self.security_check else None, parsed)
+            )
+            for findings in stage_findings:
+                for path, outcome in findings.items():
+                    results[path]["errors"].extend(outcome["errors"])
+                    results[path]["warnings"].extend(outcome["warnings"])
+            self._save_cache()
+
+        self.timings["total"] = time.perf_counter() - started
+        return results
+
+    async def close(self) -> None:
+        """Stop the mypy daemon"""
+        if self.mypy_command and self.mypy_command[0] == "dmypy":
+            await self._exec(self.mypy_command[:3] + ["stop"])
+
+    async def _run_stage(
+        self,
+        stage: str,
+        hashes: Dict[str, str],
+        runner: Optional[Callable[..., Awaitable[Dict[str, Dict[str, List[str]]]]]],
+        contents: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Dict[str, List[str]]]:
+        """Serve a stage from the cache and run its tool once for the misses"""
+        started = time.perf_counter()
+        if runner is None:
+            self.timings[stage] = 0.0
+            return {}
+
+        cache = self._get_cache()
+        findings = {}
+        misses = []
+        for path, digest in hashes.items():
+            cached = cache.get(self._cache_key(stage, path, digest))
+            if cached is not None:
+                findings[path] = cached
+                self.stats["cache_hits"] += 1
+            else:
+                misses.append(path)
+
+        if misses:
+            try:
+                fresh = await runner(misses, contents) if contents is not None else await runner(misses)
+                self.stats["checked"] += len(misses)
+                for path in misses:
+                    outcome = fresh.get(path, {"errors": [], "warnings": []})
+                    findings[path] = outcome
+                    if hashes[path]:
+                        cache[self._cache_key(stage, path, hashes[path])] = outcome
+            except Exception as e:
+                # Tool failures are not cached, so the files are checked again next run
+                logger.error(f"Error running {stage}: {e}")
+
+        self.timings[stage] = time.perf_counter() - started
+        return findings
+
+    async def _run_pylint(self, paths: List[str]) -> Dict[str, Dict[str, List[str]]]:
+        """Run one pylint process over all paths"""
+        returncode, stdout, stderr = await self._exec(
+            self.pylint_command + ["--output-format=json", "--score=n"] + paths
+        )
+        if returncode & 32:
+            raise RuntimeError(f"pylint usage error: {stderr.strip()}")
+
+        by_path = self._path_map(paths)
+        findings = {path: {"errors": [], "warnings": []} for path in paths}
+        for message in json.loads(stdout or "[]"):
+            path = by_path.get(self._absolute(message.get("path", "")))
+            if path is None:
+                continue
+            text = f"{message.get('line')}: [{message.get('symbol')}] {message.get('message')}"
+            level = "errors" if message.get("type") in ("error", "fatal") else "warnings"
+            findings[path][level].append(text)
+        return findings
+
+    async def _run_mypy(self, paths: List[str]) -> Dict[str, Dict[str, List[str]]]:
+        """Run mypy once over all paths, through the daemon when configured"""
+        returncode, stdout, stderr = await self._exec(self.mypy_command + MYPY_FLAGS + paths)
+        if returncode not in (0, 1):
+            raise RuntimeError(f"mypy failed: {(stderr or stdout).strip()}")
+
+        by_path = self._path_map(paths)
+        findings = {path: {"errors": [], "warnings": []} for path in paths}
+        for line in stdout.splitlines():
+            match = MYPY_LINE.match(line)
+            if not match:
+                continue
+            path = by_path.get(self._absolute(match.group("path")))
+            if path is None:
+                continue
+            level = "errors" if match.group("level") == "error" else "warnings"
+            findings[path][level].append(f"{match.group('line')}: {match.group('message')}")
+        return findings
+
+    async def _run_security(self, paths: List[str], contents: Dict[str, str]) -> Dict[str, Dict[str, List[str]]]:
+        """Run the security check for every path concurrently"""
+        reports = await asyncio.gather(*(self.security_check(path, contents[path]) for path in paths))
+        return {path: {"errors": list(report), "warnings": []} for path, report in zip(paths, reports)}
+
+    async def _exec(self, command: List[str]) -> Tuple[int, str, str]:
+        """Run a command to completion in the project directory"""
+        self.stats["tool_runs"] += 1
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(self.project_dir)
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        return process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+    def _absolute(self, path: str) -> str:
+        return os.path.normpath(os.path.join(self.project_dir, path))
+
+    def _path_map(self, paths: List[str]) -> Dict[str, str]:
+        """Absolute path -> path as given, for matching tool output"""
+        return {self._absolute(path): path for path in paths}
+
+    def _disk_hash(self, path: str) -> Optional[str]:
+        try:
+            with open(self._absolute(path), 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    def _cache_key(self, stage: str, path: str, digest: Optional[str]) -> str:
+        return f"{stage}:{self._absolute(path)}:{digest}"
+
+    def _get_cache(self) -> Dict[str, Dict[str, List[str]]]:
+        if self._cache is None:
+            self._cache = {}
+            try:
+                with open(self.cache_path) as f:
+                    self._cache = json.load(f)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable validation cache: {e}")
+        return self._cache
+
+    def _save_cache(self) -> None:
+        if self._cache is None:
+            return
+        try:
+            # Oldest entries go first; dicts keep insertion order
+            while len(self._cache) > self.max_cache_entries:
+                del self._cache[next(iter(self._cache))]
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_suffix(".tmp")
+            with open(temp_path, 'w') as f:
+                json.dump(self._cache, f)
+            os.replace(temp_path, self.cache_path)
+        except Exception as e:
+            logger.warning(f"Failed to save validation cache: {e}")
@@ -0,0 +1,200 @@
+import os
+import shutil
+import asyncio
+import logging
+import tempfile
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Tuple, Set
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class WorktreeTask:
+    """A unit of work run in its own git worktree"""
+    item: Any
+    # Repository-relative paths the task may modify, None if not known up front
+    files: Optional[Set[str]]
+    branch: str
+
+@dataclass
+class WorktreeOutcome:
+    """What became of a task: its result, its commit and whether it was merged"""
+    task: WorktreeTask
+    result: Any = None
+    commit: Optional[str] = None
+    merged: bool = False
+    errors: List[str] = field(default_factory=list)
+
+def plan_waves(tasks: List[WorktreeTask], max_wave_size: Optional[int] = None) -> List[List[WorktreeTask]]:
+    """Group tasks into waves of tasks with disjoint file sets
+
+    Tasks keep their relative order wherever they share a file: a task is
+    placed in a wave after every earlier task touching one of its files.
+    Tasks with unknown files run alone, after everything before them.
+    """
+    waves: List[List[WorktreeTask]] = []
+    exclusive: List[bool] = []
+    last_wave_of: Dict[str, int] = {}
+    floor = 0
+
+    for task in tasks:
+        if task.files is None:
+            waves.append([task])
+            exclusive.append(True)
+            floor = len(waves)
+            continue
+
+        index = max([floor] + [last_wave_of[path] + 1 for path in task.files if path in last_wave_of])
+        while index < len(waves) and (exclusive[index] or (max_wave_size and len(waves[index]) >= max_wave_size)):
+            index += 1
+        if index == len(waves):
+            waves.append([])
+            exclusive.append(False)
+        waves[index].append(task)
+        for path in task.files:
+            last_wave_of[path] = index
+    return waves
+
+class WorktreeRunner:
+    """Runs independent tasks in parallel, each in a temporary git worktree
+
+    Tasks are grouped into waves whose file sets are disjoint. Every task of
+    a wave gets a worktree on a new branch from the current HEAD and runs
+    concurrently with the others; tasks that succeed are committed on their
+    branch. The wave's commits are then merged into the checked-out branch
+    in a single merge, after checking that no two of them, and nothing
+    committed to HEAD since the wave started, changed the same file.
+
+    Worktrees only contain committed files, so uncommitted changes in the
+    main working tree are not seen by tasks.
+    """
+
+    def __init__(self, repo_dir: str, max_parallel: Optional[int] = None, worktree_root: Optional[str] = None):
+        self.repo_dir = Path(repo_dir).resolve()
+        self.max_parallel = max_parallel or os.cpu_count() or 1
+        self.worktree_root = worktree_root
+
+    async def run(
+        self,
+        tasks: List[WorktreeTask],
+        execute: Callable[[WorktreeTask, Path], Awaitable[Tuple[Any, Optional[str]]]]
+    ) -> List[WorktreeOutcome]:
+        """Run tasks wave by wave and merge what they commit
+
+        Args:
+            tasks: Tasks in priority order
+            execute: Called with a task and its worktree directory; returns
+                the task's result and a commit message, or None as the
+                message to discard the task's changes
+
+        Returns:
+            One outcome per task, in the order given
+        """
+        outcomes = {id(task): WorktreeOutcome(task) for task in tasks}
+        for wave in plan_waves(tasks, self.max_parallel):
+            await self._run_wave([outcomes[id(task)] for task in wave], execute)
+        return [outcomes[id(task)] for task in tasks]
+
+    async def _run_wave(
+        self,
+        wave: List[WorktreeOutcome],
+        execute: Callable[[WorktreeTask, Path], Awaitable[Tuple[Any, Optional[str]]]]
+    ) -> None:
+        base = (await self._git("rev-parse", "HEAD")).strip()
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        # Concurrent "worktree add" calls race on the repository's worktree
+        # metadata, so only registration is serialized; checkouts run in parallel
+        register_lock = asyncio.Lock()
+        worktree_dir = tempfile.mkdtemp(prefix="improvement_worktrees_", dir=self.worktree_root)
+
+        async def run_task(index: int, outcome: WorktreeOutcome) -> None:
+            path = Path(worktree_dir) / f"task{index}"
+            async with semaphore:
+                try:
+                    async with register_lock:
+                        await self._git("worktree", "add", "-q", "--no-checkout", "-b", outcome.task.branch, str(path), base)
+                    await self._git("reset", "-q", "--hard", cwd=path)
+                except Exception as e:
+                    outcome.errors.append(f"Failed to create worktree: {str(e)}")
+                    return
+                try:
+                    outcome.result, message = await execute(outcome.task, path)
+                    if message is not None:
+                        outcome.commit = await self._commit(path, message)
+                except Exception as e:
+                    logger.error(f"Error running task on {outcome.task.branch}: {str(e)}")
+                    outcome.errors.append(str(e))
+
+        try:
+            await asyncio.gather(*(run_task(index, outcome) for index, outcome in enumerate(wave)))
+            await self._merge(base, [outcome for outcome in wave if outcome.commit])
+        finally:
+            await self._remove_worktrees(worktree_dir)
+
+    async def _commit(self, path: Path, message: str) -> Optional[str]:
+        """Commit everything changed in a worktree; None if nothing changed"""
+        await self._git("add", "-A", cwd=path)
+        if not (await self._git("status", "--porcelain", cwd=path)).strip():
+            return None
+        await self._git("commit", "-q", "-m", message, cwd=path)
+        return (await self._git("rev-parse", "HEAD", cwd=path)).strip()
+
+    async def _merge(self, base: str, committed: List[WorktreeOutcome]) -> None:
+        """Merge the wave's commits into HEAD in one pass, skipping conflicting ones"""
+        if not committed:
+            return
+
+        head = (await self._git("rev-parse", "HEAD")).strip()
+        claimed: Dict[str, str] = {}
+        if head != base:
+            for path in await self._changed_files(base, head):
+                claimed[path] = "HEAD"
+
+        mergeable = []
+        for outcome in committed:
+            changed = await self._changed_files(base, outcome.commit)
+            conflicts = sorted(path for path in changed if path in claimed)
+            if conflicts:
+                owners = sorted({claimed[path] for path in conflicts})
+                outcome.errors.append(f"Merge conflict with {', '.join(owners)} on {', '.join(conflicts)}")
+                continue
+            for path in changed:
+                claimed[path] = outcome.task.branch
+            mergeable.append(outcome)
+
+        if not mergeable:
+            return
+        branches = [outcome.task.branch for outcome in mergeable]
+        try:
+            await self._git("merge", "--no-ff", "-q", "-m", f"Merge improvements: {', '.join(branches)}", *branches)
+        except Exception as e:
+            await self._git("merge", "--abort", check=False)
+            for outcome in mergeable:
+                outcome.errors.append(f"Merge failed: {str(e)}")
+            return
+        for outcome in mergeable:
+            outcome.merged = True
+
+    async def _changed_files(self, old: str, new: str) -> Set[str]:
+        output = await self._git("diff", "--name-only", "--no-renames", old, new)
+        return {line for line in output.splitlines() if line}
+
+    async def _remove_worktrees(self, worktree_dir: str) -> None:
+        for path in sorted(Path(worktree_dir).iterdir()):
+            await self._git("worktree", "remove", "--force", str(path), check=False)
+        shutil.rmtree(worktree_dir, ignore_errors=True)
+        await self._git("worktree", "prune", check=False)
+
+    async def _git(self, *args: str, cwd: Optional[Path] = None, check: bool = True) -> str:
+        """Run a git command and return its output"""
+        process = await asyncio.create_subprocess_exec(
+            "git", *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(cwd or self.repo_dir)
+        )
+        stdout, stderr = await process.communicate()
+        if check and process.returncode != 0:
+            raise RuntimeError(f"git {args[0]} failed: {stderr.decode(errors='replace').strip()}")
+        return stdout.decode(errors="replace")
@@ -7,6 +7,7 @@ import os
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch, AsyncMock
 import json
+import hashlib
 import asyncio
 from fastapi.websockets import WebSocket
 import io
@@ -68,6 +69,12 @@ def test_directory():
     # Cleanup
     shutil.rmtree(temp_dir)
 
+def search_results(response):
+    """File results from a streamed NDJSON search response, without the summary."""
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    assert 'summary' in lines[-1]
+    return [line for line in lines if 'path' in line]
+
 def test_list_files(test_client, test_directory, mock_user):
     with patch('src.core.api.file_explorer.get_current_user', return_value=mock_user):
         response = test_client.get(f"/api/files/list?path={test_directory}")
@@ -168,7 +175,7 @@ def test_search_files(test_client, test_directory, mock_user):
         response = test_client.post("/api/files/search", json=search_data)
         assert response.status_code == 200
         
-        data = response.json()
+        data = search_results(response)
         assert len(data) > 0
         assert any('test.txt' in result['path'] for result in data)
         
@@ -182,7 +189,7 @@ def test_search_files(test_client, test_directory, mock_user):
         response = test_client.post("/api/files/search", json=search_data)
         assert response.status_code == 200
         
-        data = response.json()
+        data = search_results(response)
         assert len(data) > 0
         assert any('test.py' in result['path'] for result in data)
         
@@ -195,7 +202,7 @@ def test_search_files(test_client, test_directory, mock_user):
         response = test_client.post("/api/files/search", json=search_data)
         assert response.status_code == 200
         
-        data = response.json()
+        data = search_results(response)
         assert all(result['path'].endswith('.txt') for result in data)
 
 def test_error_handling(test_client, test_directory, mock_user):
@@ -364,7 +371,7 @@ def test_enhanced_search(test_client, test_directory, mock_user):
         }
         response = test_client.post("/api/files/search", json=search_data)
         assert response.status_code == 200
-        data = response.json()
+        data = search_results(response)
         assert len(data) > 0
         
         # Test content type filter
@@ -374,7 +381,7 @@ def test_enhanced_search(test_client, test_directory, mock_user):
         }
         response = test_client.post("/api/files/search", json=search_data)
         assert response.status_code == 200
-        data = response.json()
+        data = search_results(response)
         assert all(result['metadata']['mime_type'] == 'text/plain' for result in data)
         
         # Test language filter
@@ -384,18 +391,18 @@ def test_enhanced_search(test_client, test_directory, mock_user):
         }
         response = test_client.post("/api/files/search", json=search_data)
         assert response.status_code == 200
-        data = response.json()
+        data = search_results(response)
         assert all(result['metadata']['language'] == 'python' for result in data)
         
         # Test hash-based search
         test_file = Path(test_directory) / 'test.txt'
-        file_hash = test_file.read_bytes().hex()
+        file_hash = hashlib.sha256(test_file.read_bytes()).hexdigest()
         search_data = {
             "pattern": "Hello",
             "hash": file_hash
         }
         response = test_client.post("/api/files/search", json=search_data)
         assert response.status_code == 200
-        data = response.json()
+        data = search_results(response)
         assert len(data) == 1
         assert data[0]['path'] == 'test.txt' 
\ No newline at end of file
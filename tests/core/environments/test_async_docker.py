@@ -0,0 +1,73 @@
+import time
+import asyncio
+import pytest
+from src.core.environments.async_docker import AsyncDockerClient, StatsCollector
+from tests.performance.fake_docker import FakeDockerClient
+
+async def max_tick_lag(work, interval=0.005):
+    """Run work while a ticker measures how late the event loop wakes it up."""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - started - interval)
+
+    task = asyncio.ensure_future(ticker())
+    try:
+        result = await work
+    finally:
+        done.set()
+        await task
+    return result, max(lags)
+
+@pytest.mark.asyncio
+async def test_blocking_calls_run_off_the_event_loop():
+    client = FakeDockerClient()
+    docker = AsyncDockerClient(client, max_workers=8)
+    client.images.build(tag="runtime")
+    containers = [client.containers.create("runtime") for _ in range(8)]
+    for container in containers:
+        container.start()
+    client.latencies["exec"], client.scale = 0.2, 1.0
+
+    try:
+        started = time.perf_counter()
+        results, lag = await max_tick_lag(asyncio.gather(
+            *(docker.call(container.exec_run, ["true"]) for container in containers)
+        ))
+        elapsed = time.perf_counter() - started
+    finally:
+        docker.close()
+
+    assert len(results) == 8
+    # The eight 0.2s calls overlap and the loop keeps running meanwhile
+    assert elapsed < 0.2 * 8 / 2
+    assert lag < 0.1
+
+@pytest.mark.asyncio
+async def test_stats_collector_streams_samples():
+    client = FakeDockerClient()
+    client.images.build(tag="runtime")
+    container = client.containers.create("runtime")
+    client.latencies["stats_interval"], client.scale = 0.02, 1.0
+    stats = StatsCollector()
+
+    stats.subscribe(container)
+    stats.subscribe(container)
+    first = await stats.wait_for_sample(container.id)
+    assert first["memory_stats"]["usage"] > 0
+    await asyncio.sleep(0.1)
+    usage = stats.usage(container.id)
+    assert usage["cpu_usage"] > 0
+    assert usage["network_rx"] == 0
+    assert client.calls["stats_stream"] == 1
+    # No blocking one-shot samples were taken
+    assert client.calls["stats"] == 0
+
+    stats.unsubscribe(container.id)
+    await asyncio.sleep(0.05)
+    assert stats.latest(container.id) is None
+    assert stats.usage(container.id)["cpu_usage"] == 0
@@ -0,0 +1,119 @@
+import time
+import pytest
+from src.core.environments.container_manager import ContainerConfig, ContainerManager
+from src.core.environments.container_pool import ContainerPool, DemandEstimate, get_runtime
+from tests.performance.fake_docker import FakeDockerClient
+
+@pytest.fixture
+def client():
+    return FakeDockerClient()
+
+@pytest.fixture
+def pool(client):
+    return ContainerPool(client, min_idle=1, max_idle=4)
+
+@pytest.mark.asyncio
+async def test_runtime_images_are_built_once_per_language(client, pool):
+    for _ in range(3):
+        for language in ("python", "javascript"):
+            sandbox = await pool.acquire(ContainerConfig(language=language))
+            await pool.release(sandbox)
+
+    assert client.calls["build"] == 2
+    dockerfile = client.images.dockerfiles[get_runtime("python").image_tag]
+    assert dockerfile.startswith("FROM python:3.9-slim")
+    assert "COPY" not in dockerfile
+
+@pytest.mark.asyncio
+async def test_warm_sandboxes_are_reused_and_wiped(client, pool):
+    config = ContainerConfig(language="python", timeout=5)
+    first = await pool.acquire(config)
+    await pool.inject(first, {"main.py": "print('first')"})
+    exit_code, output, timed_out = await pool.run(first, config.timeout)
+    assert (exit_code, output, timed_out) == (0, b"print('first')", False)
+    await pool.release(first)
+    assert first.paused and first.container.status == "paused"
+    assert first.container.files == {}
+
+    created = client.calls["create"]
+    second = await pool.acquire(config)
+    assert second is first
+    assert second.container.status == "running"
+    assert client.calls["create"] == created
+    assert first.container.commands[0][:4] == ["timeout", "-s", "KILL", "5"]
+
+@pytest.mark.asyncio
+async def test_sandboxes_are_pooled_by_container_settings(pool):
+    small = await pool.acquire(ContainerConfig(language="python", memory_limit="128m"))
+    await pool.release(small)
+    large = await pool.acquire(ContainerConfig(language="python", memory_limit="1g"))
+    assert large is not small
+    assert large.container.options["mem_limit"] == "1g"
+    assert large.container.options["read_only"] is True
+    assert large.container.options["mounts"][0]["Target"] == "/workspace"
+
+@pytest.mark.asyncio
+async def test_timed_out_and_worn_out_sandboxes_are_replaced(client):
+    def slow(container, command):
+        time.sleep(1.1)
+        return 0, b""
+    pool = ContainerPool(client, max_uses=2)
+    config = ContainerConfig(language="python", timeout=5)
+
+    sandbox = await pool.acquire(config)
+    await pool.run(sandbox, config.timeout)
+    await pool.release(sandbox)
+    sandbox = await pool.acquire(config)
+    await pool.run(sandbox, config.timeout)
+    await pool.release(sandbox)
+    assert sandbox.container.status == "removed"
+
+    client.runner = slow
+    sandbox = await pool.acquire(config)
+    _, _, timed_out = await pool.run(sandbox, 1)
+    assert timed_out
+    await pool.release(sandbox, reusable=not timed_out)
+    assert sandbox.container.status == "removed"
+
+@pytest.mark.asyncio
+async def test_idle_target_follows_demand(client):
+    pool = ContainerPool(client, min_idle=1, max_idle=6, idle_ttl=0.0)
+    config = ContainerConfig(language="python")
+    key = pool.pool_key(config)
+    await pool.prewarm([config])
+    assert len(pool.idle[key]) == 1
+
+    # Four requests a second, each holding a sandbox for half a second
+    now = time.monotonic()
+    pool.demand[key] = DemandEstimate(interarrival=0.25, service_time=0.5, last_acquire=now)
+    assert pool.target_idle(key) == 3
+    await pool.replenish(key)
+    assert len(pool.idle[key]) == 3
+
+    # Demand drops off: surplus idle sandboxes are removed
+    pool.demand[key] = DemandEstimate(interarrival=0.25, service_time=0.5, last_acquire=now - 3600)
+    await pool.maintain()
+    assert len(pool.idle[key]) == 1
+    assert len(client.containers.list(all=True)) == 1
+
+@pytest.mark.asyncio
+async def test_manager_executes_in_pooled_sandboxes(client, tmp_path):
+    manager = ContainerManager(str(tmp_path), client=client)
+    try:
+        config = ContainerConfig(language="python")
+        for _ in range(10):
+            execution_id = await manager.create_container("print('hi')", config)
+            result = await manager.execute_code(execution_id, config)
+            assert result.status == "completed"
+            assert result.output == "print('hi')"
+            assert result.resource_usage["network_rx"] == 0
+            assert result.resource_usage["memory_usage"] > 0
+
+        assert client.calls["build"] == 1
+        assert client.calls["create"] <= 4
+        assert manager.sandboxes == {}
+    finally:
+        await manager.shutdown()
+        manager.cleanup_task.cancel()
+        manager.monitoring_task.cancel()
+    assert client.containers.list(all=True) == []
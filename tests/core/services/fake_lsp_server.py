@@ -0,0 +1,158 @@
+"""Scripted language server for tests, speaking LSP over stdin/stdout.
+
+Each request is answered on its own thread, so responses come back in the
+order they finish rather than the order they were asked:
+
+    initialize              capabilities
+    test/echo               params, after ``params["delay"]`` seconds
+    test/notify             sends a ``test/event`` notification, then answers
+    test/askClient          asks the client for ``workspace/configuration``
+                            and answers with the client's reply
+    test/received           every message received so far
+    test/freeze             stops answering requests, as a hung server would
+    textDocument/diagnostic a full report with one diagnostic per "error"
+                            in the document
+    textDocument/formatting an edit replacing tabs with four spaces, made
+                            ``FAKE_LSP_FORMAT_DELAY`` seconds after the request
+    textDocument/*          echoes the method and params, after ``delay``
+    shutdown                null; ``exit`` ends the process
+
+Opened and changed documents are tracked, applying incremental changes, and
+``publishDiagnostics`` is sent for each new version. The capabilities can be
+overridden with JSON in the ``FAKE_LSP_CAPABILITIES`` environment variable.
+
+``$/cancelRequest`` answers the cancelled request with RequestCancelled
+(-32800) unless it already finished.
+"""
+import json
+import os
+import sys
+import threading
+
+write_lock = threading.Lock()
+received = []
+cancelled = {}
+client_replies = {}
+next_id = [0]
+frozen = threading.Event()
+documents = {}
+
+def send(message):
+    body = json.dumps(message).encode("utf-8")
+    with write_lock:
+        sys.stdout.buffer.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+        sys.stdout.buffer.flush()
+
+def read():
+    length = None
+    while True:
+        line = sys.stdin.buffer.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode("ascii").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return json.loads(sys.stdin.buffer.read(length))
+
+def offset(text, position):
+    lines = text.split("\n")
+    return sum(len(line) + 1 for line in lines[:position["line"]]) + position["character"]
+
+def diagnostics(text):
+    found = []
+    for number, line in enumerate(text.split("\n")):
+        start = line.find("error")
+        if start >= 0:
+            found.append({
+                "range": {"start": {"line": number, "character": start}, "end": {"line": number, "character": start + 5}},
+                "message": "error found",
+                "severity": 1
+            })
+    return found
+
+def document_changed(params):
+    document = params["textDocument"]
+    if "text" in document:
+        documents[document["uri"]] = document["text"]
+    for change in params.get("contentChanges", []):
+        text = documents[document["uri"]]
+        if "range" in change:
+            start, end = offset(text, change["range"]["start"]), offset(text, change["range"]["end"])
+            text = text[:start] + change["text"] + text[end:]
+        else:
+            text = change["text"]
+        documents[document["uri"]] = text
+    send({"jsonrpc": "2.0", "method": "textDocument/publishDiagnostics", "params": {
+        "uri": document["uri"], "version": document["version"], "diagnostics": diagnostics(documents[document["uri"]])
+    }})
+
+def wait(request_id, delay):
+    """Sleep for delay unless cancelled; True if cancelled."""
+    return cancelled.setdefault(request_id, threading.Event()).wait(delay)
+
+def handle(message):
+    request_id, method, params = message["id"], message["method"], message.get("params") or {}
+    result = None
+    if method == "initialize":
+        capabilities = {"completionProvider": {"triggerCharacters": ["."]}, "hoverProvider": True, "textDocumentSync": 2}
+        capabilities.update(json.loads(os.environ.get("FAKE_LSP_CAPABILITIES", "{}")))
+        result = {"capabilities": capabilities}
+    elif method == "test/notify":
+        send({"jsonrpc": "2.0", "method": "test/event", "params": params})
+    elif method == "test/askClient":
+        next_id[0] += 1
+        reply = client_replies.setdefault(f"s{next_id[0]}", {"event": threading.Event()})
+        send({"jsonrpc": "2.0", "id": f"s{next_id[0]}", "method": "workspace/configuration", "params": {"items": [{}, {}]}})
+        reply["event"].wait(5)
+        result = reply.get("message")
+    elif method == "test/received":
+        result = received
+    elif method == "test/freeze":
+        frozen.set()
+    elif method == "textDocument/diagnostic":
+        result = {"kind": "full", "items": diagnostics(documents[params["textDocument"]["uri"]])}
+    elif method == "textDocument/formatting":
+        wait(request_id, float(os.environ.get("FAKE_LSP_FORMAT_DELAY", 0)))
+        text = documents[params["textDocument"]["uri"]]
+        lines = text.split("\n")
+        result = [
+            {"range": {"start": {"line": number, "character": 0}, "end": {"line": number, "character": len(line)}},
+             "newText": line.replace("\t", "    ")}
+            for number, line in enumerate(lines) if "\t" in line
+        ]
+    elif method in ("test/echo",) or method.startswith("textDocument/"):
+        if wait(request_id, params.get("delay", 0)):
+            send({"jsonrpc": "2.0", "id": request_id, "error": {"code": -32800, "message": "cancelled"}})
+            return
+        result = params if method == "test/echo" else {"method": method, "params": params}
+    elif method != "shutdown":
+        send({"jsonrpc": "2.0", "id": request_id, "error": {"code": -32601, "message": f"Unknown method {method}"}})
+        return
+    send({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+def main():
+    while True:
+        message = read()
+        if message is None:
+            return
+        received.append(message)
+        method = message.get("method")
+        if method == "exit":
+            return
+        if method in ("textDocument/didOpen", "textDocument/didChange"):
+            document_changed(message["params"])
+        elif method == "$/cancelRequest":
+            cancelled.setdefault(message["params"]["id"], threading.Event()).set()
+        elif method is None:
+            reply = client_replies.get(message["id"])
+            if reply:
+                reply["message"] = message
+                reply["event"].set()
+        elif "id" in message and not frozen.is_set():
+            threading.Thread(target=handle, args=(message,), daemon=True).start()
+
+if __name__ == "__main__":
+    main()
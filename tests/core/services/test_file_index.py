@@ -0,0 +1,68 @@
+import os
+from src.core.services.file_index import FileIndex, required_literals, trigrams
+
+def make_tree(root):
+    files = {
+        "src/app.py": "def handler(request):\n    return Response('Hello')\n",
+        "src/util.py": "def helper():\n    pass\n",
+        "docs/readme.md": "Say hello to the handler\n",
+        "node_modules/lib/index.js": "function handler() {}\n",
+        "data.bin": b"\x00\x01handler",
+    }
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            path.write_text(content)
+
+def names(root, entries):
+    return sorted(os.path.relpath(entry.path, root) for entry in entries)
+
+def test_required_literals_come_from_mandatory_parts_of_the_pattern():
+    assert required_literals("Hello", use_regex=False) == ["Hello"]
+    assert required_literals(r"def\s+handler\(", use_regex=True) == ["def", "handler("]
+    assert required_literals(r"(?:foo|bar)baz", use_regex=True) == ["baz"]
+    assert required_literals(r"a.b", use_regex=True) == []
+    assert "hel" in trigrams("HELLO")
+
+def test_candidates_are_files_containing_the_trigrams(tmp_path):
+    make_tree(tmp_path)
+    index = FileIndex(str(tmp_path))
+    index.build()
+    assert index.ready
+
+    assert names(tmp_path, index.candidates(["HANDLER"])) == ["data.bin", "docs/readme.md", "src/app.py"]
+    assert names(tmp_path, index.candidates(["response('hello"])) == ["data.bin", "src/app.py"]
+    # Nothing to narrow on: every file
+    assert len(index.candidates([])) == 4
+    entry = index.files[str(tmp_path / "data.bin")]
+    assert not entry.is_text and not entry.indexed
+
+def test_index_follows_changes(tmp_path):
+    make_tree(tmp_path)
+    index = FileIndex(str(tmp_path))
+    index.build()
+
+    (tmp_path / "src" / "util.py").write_text("def handler():\n    pass\n")
+    os.utime(tmp_path / "src" / "util.py", ns=(1, 1))
+    index.update(str(tmp_path / "src" / "util.py"))
+    assert "src/util.py" in names(tmp_path, index.candidates(["handler"]))
+
+    os.rename(tmp_path / "src", tmp_path / "lib")
+    index.move(str(tmp_path / "src"), str(tmp_path / "lib"))
+    assert names(tmp_path, index.candidates(["def handler"])) == ["data.bin", "lib/app.py", "lib/util.py"]
+
+    (tmp_path / "docs" / "readme.md").unlink()
+    index.remove(str(tmp_path / "docs"))
+    assert names(tmp_path, index.candidates(["handler"])) == ["data.bin", "lib/app.py", "lib/util.py"]
+    assert not any(path.startswith(str(tmp_path / "src")) for posting in index.postings.values() for path in posting)
+
+def test_large_files_are_not_indexed_but_always_candidates(tmp_path):
+    (tmp_path / "big.txt").write_text("x" * 100)
+    (tmp_path / "small.txt").write_text("needle")
+    index = FileIndex(str(tmp_path), max_file_size=50)
+    index.build()
+    assert names(tmp_path, index.candidates(["needle"])) == ["big.txt", "small.txt"]
+    assert names(tmp_path, index.candidates(["absent"])) == ["big.txt"]
@@ -0,0 +1,152 @@
+import pytest
+import threading
+import time
+from datetime import datetime, timedelta
+from src.core.services.forecast_registry import ForecastModelRegistry, Forecaster
+from src.core.services.usage_history import UsageSeries
+
+class RecordingForecaster(Forecaster):
+    """Forecasts the last value, recording each fit and update."""
+
+    name = "recording"
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def fit(self, timestamps, values):
+        return self._train("fit", timestamps, values)
+
+    def update(self, model, timestamps, values, new_samples):
+        assert model["samples"] == len(values) - new_samples
+        return self._train("update", timestamps, values, new_samples)
+
+    def _train(self, kind, timestamps, values, new_samples=None):
+        self.release.wait()
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("training failed")
+        self.calls.append((kind, len(values), new_samples))
+        return {"samples": len(values)}, {"forecast": [float(values[-1])] * 24, "through": str(timestamps[-1])}
+
+def make_history(count, start=datetime(2024, 1, 1)):
+    return [{"timestamp": (start + timedelta(hours=i)).isoformat(), "usage": float(i)} for i in range(count)]
+
+@pytest.fixture
+def registry():
+    registry = ForecastModelRegistry(max_workers=2, refit_every=3)
+    yield registry
+    registry.shutdown()
+
+def test_first_request_fits_and_later_requests_are_served_from_cache(registry):
+    forecaster = RecordingForecaster()
+    history = make_history(48)
+
+    first = registry.forecast("compute", "usage", history, forecaster)
+    assert first["forecast"][0] == 47.0
+    for _ in range(100):
+        assert registry.forecast("compute", "usage", history, forecaster) is first
+    assert forecaster.calls == [("fit", 48, None)]
+
+def test_new_samples_update_in_background_and_refit_periodically(registry):
+    forecaster = RecordingForecaster()
+    history = make_history(48)
+    registry.forecast("compute", "usage", history, forecaster)
+
+    for step in range(4):
+        history = make_history(50 + step * 2)
+        registry.forecast("compute", "usage", history, forecaster)
+        registry.wait()
+
+    # Updates carry only the new samples; every third job is a full refit
+    assert forecaster.calls == [
+        ("fit", 48, None),
+        ("update", 50, 2),
+        ("update", 52, 2),
+        ("fit", 54, None),
+        ("update", 56, 2),
+    ]
+    assert registry.forecast("compute", "usage", history, forecaster)["forecast"][0] == 55.0
+
+def test_series_history_is_read_without_conversion(registry):
+    forecaster = RecordingForecaster()
+    series = UsageSeries(capacity=64)
+    series.extend(make_history(48))
+    registry.forecast("compute", "usage", series, forecaster)
+
+    # Samples appended to the series after a job is queued are not seen by it
+    series.extend(make_history(52)[48:])
+    registry.forecast("compute", "usage", series, forecaster)
+    series.extend(make_history(64)[52:])
+    registry.wait()
+    assert forecaster.calls == [("fit", 48, None), ("update", 52, 4)]
+
+    registry.forecast("compute", "usage", series, forecaster)
+    registry.wait()
+    assert forecaster.calls[-1] == ("update", 64, 12)
+    assert registry.forecast("compute", "usage", series, forecaster)["forecast"][0] == 63.0
+
+def test_requests_do_not_wait_for_updates(registry):
+    forecaster = RecordingForecaster()
+    registry.forecast("compute", "usage", make_history(48), forecaster)
+    forecaster.release.clear()
+
+    started = time.perf_counter()
+    stale = registry.forecast("compute", "usage", make_history(60), forecaster)
+    # Samples arriving while the update runs are left for the next job
+    again = registry.forecast("compute", "usage", make_history(72), forecaster)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.05
+    assert stale["forecast"][0] == again["forecast"][0] == 47.0
+    forecaster.release.set()
+    registry.wait()
+    assert forecaster.calls[-1] == ("update", 60, 12)
+
+    registry.forecast("compute", "usage", make_history(72), forecaster)
+    registry.wait()
+    assert forecaster.calls[-1] == ("update", 72, 12)
+
+def test_series_are_cached_separately_and_fit_concurrently(registry):
+    forecasters = [RecordingForecaster(delay=0.2) for _ in range(2)]
+    history = make_history(48)
+
+    started = time.perf_counter()
+    for resource, forecaster in zip(["cache", "queue"], forecasters):
+        registry.refresh(resource, "usage", history, forecaster)
+    forecasts = [registry.forecast(resource, "usage", history, forecaster)
+                 for resource, forecaster in zip(["cache", "queue"], forecasters)]
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.35
+    assert all(forecast["forecast"][0] == 47.0 for forecast in forecasts)
+    assert set(registry.entries) == {("cache", "usage", "recording"), ("queue", "usage", "recording")}
+
+def test_failed_fit_is_retried_on_next_request(registry):
+    forecaster = RecordingForecaster(fail=True)
+    history = make_history(48)
+
+    assert registry.forecast("compute", "usage", history, forecaster) == {}
+    assert registry.stats["errors"] == 1
+
+    forecaster.fail = False
+    assert registry.forecast("compute", "usage", history, forecaster)["forecast"][0] == 47.0
+
+def test_entries_are_bounded_and_replaced_history_refits():
+    registry = ForecastModelRegistry(max_entries=2)
+    forecaster = RecordingForecaster()
+    try:
+        for resource in ["compute", "storage", "network"]:
+            registry.forecast(resource, "usage", make_history(30), forecaster)
+        assert [key[0] for key in registry.entries] == ["storage", "network"]
+
+        # An older history than the one fitted means the series was reset
+        registry.forecast("network", "usage", make_history(30, start=datetime(2023, 1, 1)), forecaster)
+        registry.wait()
+        assert forecaster.calls[-1] == ("fit", 30, None)
+        assert forecaster.calls.count(("fit", 30, None)) == 4
+    finally:
+        registry.shutdown()
@@ -0,0 +1,120 @@
+import sys
+import json
+import asyncio
+from pathlib import Path
+import pytest
+import pytest_asyncio
+from src.core.services.language_servers import LanguageServerManager, PythonLanguageServer
+from src.core.services.lsp_documents import position_at, text_change, apply_text_edits
+
+FAKE_SERVER = str(Path(__file__).with_name("fake_lsp_server.py"))
+
+def fake_server():
+    server = PythonLanguageServer()
+    server.server_path, server.server_args = sys.executable, [FAKE_SERVER]
+    return server
+
+@pytest_asyncio.fixture
+async def manager():
+    manager = LanguageServerManager(servers={"python": fake_server}, completion_debounce=0.05)
+    yield manager
+    await manager.shutdown()
+
+async def received(manager, method):
+    [instance] = manager.pool.all_instances()
+    response = await instance.server.send_request({"jsonrpc": "2.0", "method": "test/received"})
+    return [message for message in response["result"] if message.get("method") == method]
+
+def test_text_change_replaces_only_the_differing_span():
+    old = "import os\nprint(os.name)\n"
+    new = "import os\nprint(os.getcwd())\n"
+    change = text_change(old, new)
+    assert change == {
+        "range": {"start": {"line": 1, "character": 9}, "end": {"line": 1, "character": 13}},
+        "text": "getcwd()"
+    }
+    # Characters outside the BMP are two UTF-16 code units
+    assert position_at("a😀b", 3) == {"line": 0, "character": 4}
+    assert apply_text_edits(old, [{"range": change["range"], "newText": change["text"]}]) == new
+
+@pytest.mark.asyncio
+async def test_edits_are_sent_as_incremental_versioned_changes(manager):
+    await manager.lint("python", "x = 1\n", "/tmp/example.py")
+    await manager.lint("python", "x = 1\ny = 2\n", "/tmp/example.py")
+    await manager.lint("python", "x = 1\ny = 2\n", "/tmp/example.py")
+
+    opened = await received(manager, "textDocument/didOpen")
+    changed = await received(manager, "textDocument/didChange")
+    assert [message["params"]["textDocument"]["version"] for message in opened] == [1]
+    # The unchanged third call sent nothing
+    assert [message["params"]["textDocument"]["version"] for message in changed] == [2]
+    assert changed[0]["params"]["contentChanges"] == [{
+        "range": {"start": {"line": 1, "character": 0}, "end": {"line": 1, "character": 0}},
+        "text": "y = 2\n"
+    }]
+
+@pytest.mark.asyncio
+async def test_diagnostics_are_cached_per_version(manager, monkeypatch):
+    result = await manager.lint("python", "ok\n")
+    assert result["diagnostics"] == []
+    result = await manager.lint("python", "ok\nerror here\n")
+    assert result["diagnostics"][0]["range"]["start"] == {"line": 1, "character": 0}
+    await manager.lint("python", "ok\nerror here\n")
+    assert manager.pool.all_instances()[0].cache.hits == 1
+
+    # Servers with pull diagnostics are asked once per version
+    await manager.shutdown()
+    monkeypatch.setenv("FAKE_LSP_CAPABILITIES", json.dumps({"diagnosticProvider": {}}))
+    for _ in range(3):
+        result = await manager.lint("python", "error\n")
+    assert len(result["diagnostics"]) == 1
+    assert len(await received(manager, "textDocument/diagnostic")) == 1
+
+@pytest.mark.asyncio
+async def test_hover_and_definition_are_memoized_until_the_next_edit(manager):
+    position = {"line": 0, "character": 1}
+    for _ in range(3):
+        await manager.hover("python", "import os", position)
+        await manager.definition("python", "import os", position)
+    assert len(await received(manager, "textDocument/hover")) == 1
+    assert len(await received(manager, "textDocument/definition")) == 1
+
+    await manager.hover("python", "import sys", position)
+    assert len(await received(manager, "textDocument/hover")) == 2
+
+@pytest.mark.asyncio
+async def test_completions_within_the_debounce_window_are_coalesced(manager):
+    keystrokes = ["o", "os", "os."]
+    results = await asyncio.gather(*(
+        manager.complete("python", code, {"line": 0, "character": len(code)})
+        for code in keystrokes
+    ))
+    assert all(result["trigger_characters"] == ["."] for result in results)
+
+    completions = await received(manager, "textDocument/completion")
+    assert len(completions) == 1
+    assert completions[0]["params"]["position"] == {"line": 0, "character": 3}
+    changed = await received(manager, "textDocument/didChange")
+    assert changed == []
+
+@pytest.mark.asyncio
+async def test_format_applies_the_servers_edits(manager):
+    result = await manager.format("python", "if x:\n\tpass\n")
+    assert result["formatted_code"] == "if x:\n    pass\n"
+    assert len(result["changes"]) == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_on_the_untitled_document_see_their_own_text(monkeypatch):
+    # The server formats whatever text the document has once the delay is over
+    monkeypatch.setenv("FAKE_LSP_FORMAT_DELAY", "0.05")
+    manager = LanguageServerManager(servers={"python": fake_server}, max_per_workspace=1)
+    codes = ["y\n" * number + "if x:\n\tpass\n" for number in range(5)]
+    results = await asyncio.gather(*(manager.format("python", code) for code in codes))
+    assert [result["formatted_code"] for result in results] == [code.replace("\t", "    ") for code in codes]
+
+    # Each formatting request went out before the document changed again
+    [instance] = manager.pool.all_instances()
+    response = await instance.server.send_request({"jsonrpc": "2.0", "method": "test/received"})
+    sent = [message["method"] for message in response["result"] if message.get("method", "").startswith("textDocument/")]
+    assert sent == ["textDocument/didOpen", "textDocument/formatting"] + ["textDocument/didChange", "textDocument/formatting"] * 4
+    await manager.shutdown()
@@ -0,0 +1,121 @@
+import sys
+import asyncio
+from pathlib import Path
+import pytest
+import pytest_asyncio
+from src.core.services.language_servers import LanguageServerManager, PythonLanguageServer
+from src.core.services.lsp_pool import LanguageServerPool, workspace_root
+
+FAKE_SERVER = str(Path(__file__).with_name("fake_lsp_server.py"))
+
+def fake_server():
+    server = PythonLanguageServer()
+    server.server_path, server.server_args = sys.executable, [FAKE_SERVER]
+    return server
+
+@pytest_asyncio.fixture
+async def pool():
+    pool = LanguageServerPool({"python": fake_server}, max_instances=3, max_per_workspace=2, probe_timeout=0.5)
+    yield pool
+    await pool.shutdown()
+
+async def echo(pool, root, delay=0.0):
+    async with pool.lease("python", root) as instance:
+        await instance.server.connection.request("test/echo", {"delay": delay})
+        return instance
+
+def test_workspace_root_is_the_nearest_project_directory(tmp_path):
+    project = tmp_path / "project"
+    (project / "src" / "pkg").mkdir(parents=True)
+    (project / "pyproject.toml").touch()
+    assert workspace_root(str(project / "src" / "pkg" / "module.py")) == str(project)
+    assert workspace_root(None) is None
+
+@pytest.mark.asyncio
+async def test_servers_are_reused_per_workspace(pool, tmp_path):
+    first = await echo(pool, str(tmp_path / "a"))
+    again = await echo(pool, str(tmp_path / "a"))
+    other = await echo(pool, str(tmp_path / "b"))
+    assert first is again
+    assert other is not first
+    assert first.server.root_uri == (tmp_path / "a").as_uri()
+    assert len(pool.all_instances()) == 2
+
+@pytest.mark.asyncio
+async def test_busy_workspaces_get_another_server_and_route_to_the_least_busy(pool):
+    slow = [asyncio.ensure_future(echo(pool, "/work", delay=0.5)) for _ in range(2)]
+    await asyncio.sleep(0.1)
+    instances = pool.instances[("python", "/work")]
+    assert len(instances) == 2
+    assert [instance.in_flight for instance in instances] == [1, 1]
+
+    # At the per-workspace limit, a third request shares a busy server
+    await echo(pool, "/work")
+    assert len(pool.instances[("python", "/work")]) == 2
+    await asyncio.gather(*slow)
+    assert sum(instance.requests for instance in instances) == 3
+
+@pytest.mark.asyncio
+async def test_least_recently_used_idle_server_is_evicted_at_the_limit(pool):
+    first = await echo(pool, "/one")
+    await echo(pool, "/two")
+    await echo(pool, "/three")
+    await echo(pool, "/two")
+    await echo(pool, "/four")
+    assert ("python", "/one") not in pool.instances
+    assert len(pool.all_instances()) == 3
+    await asyncio.sleep(0.2)
+    assert not first.server.is_running()
+
+@pytest.mark.asyncio
+async def test_crashed_and_hung_servers_are_restarted(pool):
+    instance = await echo(pool, "/work")
+    instance.server.process.kill()
+    await instance.server.process.wait()
+    assert await echo(pool, "/work") is instance
+    assert instance.restarts == 1
+
+    await instance.server.connection.request("test/freeze")
+    await pool.maintain()
+    assert instance.restarts == 2
+    assert await pool.probe(instance)
+
+@pytest.mark.asyncio
+async def test_busy_servers_are_not_probed(pool):
+    instance = await echo(pool, "/work")
+    slow = asyncio.ensure_future(echo(pool, "/work", delay=1.0))
+    await asyncio.sleep(0.1)
+    # The server answers nothing new, but the request it is working on still completes
+    await instance.server.connection.request("test/freeze")
+    await pool.maintain()
+    assert await slow is instance
+    assert instance.restarts == 0
+
+    await pool.maintain()
+    assert instance.restarts == 1
+
+@pytest.mark.asyncio
+async def test_idle_servers_stop_and_memory_is_reported(pool):
+    instance = await echo(pool, "/work")
+    [stats] = pool.stats()
+    assert stats["pid"] == instance.pid
+    assert stats["memory_rss"] > 0
+    assert stats["requests"] == 1
+
+    pool.idle_ttl = 0
+    await pool.maintain()
+    assert pool.stats() == []
+    assert not instance.server.is_running()
+
+@pytest.mark.asyncio
+async def test_manager_routes_files_to_their_workspace(tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / ".git").mkdir()
+    manager = LanguageServerManager(servers={"python": fake_server})
+    try:
+        await manager.hover("python", "import os", {"line": 0, "character": 1}, str(tmp_path / "a" / "x.py"))
+        await manager.hover("python", "import os", {"line": 0, "character": 1}, str(tmp_path / "b" / "x.py"))
+        assert sorted(stats["workspace"] for stats in manager.server_stats()) == [str(tmp_path / "a"), str(tmp_path / "b")]
+    finally:
+        await manager.shutdown()
@@ -0,0 +1,118 @@
+import sys
+import time
+import asyncio
+from pathlib import Path
+import pytest
+import pytest_asyncio
+from src.core.services.language_servers import PythonLanguageServer
+from src.core.services.lsp_transport import (
+    LspConnection,
+    JsonRpcError,
+    RequestCancelled,
+    encode_message,
+    read_message
+)
+
+FAKE_SERVER = str(Path(__file__).with_name("fake_lsp_server.py"))
+
+@pytest_asyncio.fixture
+async def connection():
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, FAKE_SERVER,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE
+    )
+    connection = LspConnection(process.stdout, process.stdin)
+    connection.start()
+    yield connection
+    await connection.close()
+    if process.returncode is None:
+        process.kill()
+    await process.wait()
+
+@pytest.mark.asyncio
+async def test_messages_are_framed_with_content_length():
+    reader = asyncio.StreamReader()
+    first = {"jsonrpc": "2.0", "id": 1, "result": {"text": "héllo\nworld"}}
+    reader.feed_data(encode_message(first))
+    body = b'{"jsonrpc":"2.0","method":"x","params":1}'
+    reader.feed_data(b'Content-Length: %d\r\nContent-Type: application/vscode-jsonrpc; charset=utf-8\r\n\r\n' % len(body) + body)
+    reader.feed_eof()
+
+    header, encoded = encode_message(first).split(b"\r\n\r\n", 1)
+    assert header == b"Content-Length: %d" % len(encoded)
+    assert await read_message(reader) == first
+    assert await read_message(reader) == {"jsonrpc": "2.0", "method": "x", "params": 1}
+    assert await read_message(reader) is None
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_resolve_out_of_order(connection):
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        connection.request("test/echo", {"delay": delay, "n": n})
+        for n, delay in enumerate([0.4, 0.1, 0.25])
+    ))
+    assert [result["n"] for result in results] == [0, 1, 2]
+    # All three were outstanding at once
+    assert time.perf_counter() - started < 0.7
+
+    with pytest.raises(JsonRpcError) as error:
+        await connection.request("test/unknown")
+    assert error.value.code == -32601
+
+@pytest.mark.asyncio
+async def test_notifications_and_server_requests_are_dispatched(connection):
+    events = []
+    connection.on_notification("test/event", events.append)
+    connection.on_request("workspace/configuration", lambda params: [{"tabSize": 4}] * len(params["items"]))
+
+    await connection.request("test/notify", {"value": 1})
+    assert events == [{"value": 1}]
+    reply = await connection.request("test/askClient")
+    assert reply["result"] == [{"tabSize": 4}, {"tabSize": 4}]
+
+@pytest.mark.asyncio
+async def test_superseded_and_abandoned_requests_are_cancelled(connection):
+    first = asyncio.ensure_future(connection.request("test/echo", {"delay": 5, "n": 1}, supersede="completion"))
+    await asyncio.sleep(0.05)
+    second = await connection.request("test/echo", {"n": 2}, supersede="completion")
+    assert second["n"] == 2
+    with pytest.raises(RequestCancelled):
+        await first
+
+    with pytest.raises(asyncio.TimeoutError):
+        await connection.request("test/echo", {"delay": 5}, timeout=0.1)
+
+    received = await connection.request("test/received")
+    cancelled = [message["params"]["id"] for message in received if message.get("method") == "$/cancelRequest"]
+    assert len(cancelled) == 2
+    assert connection.pending == {}
+
+@pytest.mark.asyncio
+async def test_outstanding_requests_fail_when_the_server_exits(connection):
+    pending = asyncio.ensure_future(connection.request("test/echo", {"delay": 5}))
+    await asyncio.sleep(0.05)
+    await connection.notify("exit")
+    with pytest.raises(ConnectionError):
+        await pending
+    with pytest.raises(ConnectionError):
+        await connection.request("test/echo")
+
+@pytest.mark.asyncio
+async def test_language_server_multiplexes_requests():
+    server = PythonLanguageServer()
+    server.server_path, server.server_args = sys.executable, [FAKE_SERVER]
+    try:
+        await server.start()
+        assert server.capabilities["hoverProvider"] is True
+        position = {"line": 0, "character": 3}
+        completions, hover = await asyncio.gather(
+            server.send_request({"jsonrpc": "2.0", "method": "textDocument/completion", "params": {"delay": 0.2}}),
+            server.hover("import os", position)
+        )
+        assert completions["result"]["method"] == "textDocument/completion"
+        assert hover is not None
+        assert server.is_running()
+    finally:
+        await server.stop()
+    assert not server.is_running()
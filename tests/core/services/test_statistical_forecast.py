@@ -0,0 +1,101 @@
+import pytest
+import sys
+import numpy as np
+from src.core.services.statistical_forecast import (
+    FORECAST_HORIZON,
+    HoltWintersForecaster,
+    SeasonalNaiveForecaster,
+    daily_season_length
+)
+from src.core.services.usage_history import pct_change
+
+def make_trace(days, step_minutes=60, noise=2.0, seed=0):
+    rng = np.random.default_rng(seed)
+    per_day = 24 * 60 // step_minutes
+    t = np.arange(days * per_day)
+    hours = t / per_day * 24
+    values = 50 + 0.002 * t + 15 * np.sin(2 * np.pi * hours / 24) + rng.normal(0, noise, len(t))
+    timestamps = np.datetime64("2024-01-01T00:00", "us") + t * np.timedelta64(step_minutes, "m")
+    return timestamps, values
+
+def forecast_values(forecast, key="yhat"):
+    return np.array([record[key] for record in forecast["forecast"]])
+
+@pytest.mark.parametrize("forecaster", [HoltWintersForecaster(), SeasonalNaiveForecaster()])
+def test_forecasts_follow_the_daily_cycle(forecaster):
+    timestamps, values = make_trace(29)
+    _, forecast = forecaster.fit(timestamps[:-24], values[:-24])
+
+    assert len(forecast["forecast"]) == FORECAST_HORIZON
+    assert forecast["forecast"][0]["ds"] == timestamps[-24].item()
+    yhat = forecast_values(forecast)
+    actual = values[-24:]
+    assert np.mean(np.abs(actual - yhat)) < 4
+    # Much better than repeating the last value
+    assert np.mean(np.abs(actual - yhat)) < np.mean(np.abs(actual - values[-25])) / 2
+    lower, upper = forecast_values(forecast, "yhat_lower"), forecast_values(forecast, "yhat_upper")
+    assert np.all(lower <= yhat) and np.all(yhat <= upper)
+    assert np.mean((actual >= lower) & (actual <= upper)) >= 0.6
+
+def test_update_continues_from_the_fitted_state():
+    forecaster = HoltWintersForecaster()
+    timestamps, values = make_trace(20)
+    model, _ = forecaster.fit(timestamps[:-48], values[:-48])
+
+    stepped, _ = forecaster.update(model, timestamps[:-24], values[:-24], 24)
+    stepped, stepped_forecast = forecaster.update(stepped, timestamps, values, 24)
+    direct, direct_forecast = forecaster.update(model, timestamps, values, 48)
+
+    assert stepped.level == pytest.approx(direct.level)
+    assert np.allclose(stepped.seasonal, direct.seasonal)
+    assert forecast_values(stepped_forecast) == pytest.approx(forecast_values(direct_forecast))
+    assert (stepped.alpha, stepped.beta, stepped.gamma) == (model.alpha, model.beta, model.gamma)
+    assert stepped_forecast["forecast"][0]["ds"] == (timestamps[-1] + np.timedelta64(1, "h")).item()
+
+def test_intervals_widen_with_the_horizon():
+    _, forecast = HoltWintersForecaster(horizon=72).fit(*make_trace(20))
+    width = forecast_values(forecast, "yhat_upper") - forecast_values(forecast, "yhat_lower")
+    assert np.all(np.diff(width) >= -1e-9)
+    assert width[-1] > width[0]
+
+def test_season_follows_the_sample_spacing():
+    timestamps, values = make_trace(10, step_minutes=15)
+    assert daily_season_length(timestamps) == 96
+    model, forecast = HoltWintersForecaster().fit(timestamps, values)
+    assert len(model.seasonal) == 96
+    assert forecast["forecast"][1]["ds"] - forecast["forecast"][0]["ds"] == np.timedelta64(15, "m").item()
+
+def test_fit_window_spans_days_at_any_sample_spacing():
+    timestamps, values = make_trace(40, step_minutes=15)
+    model, _ = HoltWintersForecaster(fit_days=28).fit(timestamps, values)
+    # Errors over the first day of the window are not scored
+    assert model.count == 27 * 96
+
+def test_missing_and_short_histories():
+    timestamps, values = make_trace(10)
+    values[30:60] = np.nan
+    _, forecast = HoltWintersForecaster().fit(timestamps, values)
+    assert np.isfinite(forecast_values(forecast)).all()
+
+    # Less than two days: no seasonal component, the level carries forward
+    model, forecast = HoltWintersForecaster().fit(timestamps[:20], np.full(20, 7.0))
+    assert len(model.seasonal) == 1
+    assert forecast_values(forecast) == pytest.approx(7.0)
+    _, forecast = SeasonalNaiveForecaster().fit(timestamps[:5], np.arange(5.0))
+    assert len(forecast["forecast"]) == FORECAST_HORIZON
+
+    with pytest.raises(ValueError):
+        HoltWintersForecaster().fit(timestamps[:5], np.full(5, np.nan))
+
+def test_derived_series_use_forecast_columns():
+    forecaster = HoltWintersForecaster({"growth_rate": lambda forecast: pct_change(forecast["yhat"])})
+    _, forecast = forecaster.fit(*make_trace(10))
+    yhat = forecast_values(forecast)
+    assert len(forecast["growth_rate"]) == FORECAST_HORIZON
+    assert forecast["growth_rate"][1] == pytest.approx(yhat[1] / yhat[0] - 1)
+    assert len(forecast["trend"]) == FORECAST_HORIZON
+
+def test_strategies_import_without_machine_learning_libraries():
+    import src.core.services.resource_optimization_strategies as strategies
+    assert strategies.DEFAULT_FORECAST_BACKEND == "holt_winters"
+    assert not {"tensorflow", "prophet", "xgboost"} & set(sys.modules)
@@ -0,0 +1,111 @@
+import pytest
+from datetime import datetime, timedelta
+import numpy as np
+from src.core.services.usage_history import (
+    UsageHistoryStore,
+    UsageSeries,
+    as_usage_series,
+    bucket_mean,
+    day_of_week,
+    day_of_year,
+    month_of_year,
+    pct_change,
+    to_datetime64,
+    to_datetime64_array
+)
+
+def make_samples(count, start=datetime(2024, 1, 1), **fields):
+    samples = []
+    for i in range(count):
+        sample = {"timestamp": (start + timedelta(hours=i)).isoformat(), "usage": float(i % 24 + i // 24)}
+        for name, value in fields.items():
+            sample[name] = value(i)
+        samples.append(sample)
+    return samples
+
+def expected_bucket_means(samples, field, bucket):
+    groups = {}
+    for sample in samples:
+        if field in sample:
+            groups.setdefault(bucket(datetime.fromisoformat(sample["timestamp"])), []).append(sample[field])
+    return {key: np.mean(values) for key, values in groups.items()}
+
+def test_timestamps_are_converted_from_any_format():
+    values = ["2024-01-01T00:00:00", datetime(2024, 1, 1, 1), 1704074400]
+    timestamps = to_datetime64_array(values)
+    assert timestamps.dtype == np.dtype("datetime64[us]")
+    assert timestamps[2] == np.datetime64("2024-01-01T02:00:00")
+    assert to_datetime64(datetime.fromisoformat("2024-01-01T03:00:00+02:00")) == np.datetime64("2024-01-01T01:00:00")
+
+def test_calendar_buckets_match_datetime():
+    moments = [datetime(2024, 1, 1) + timedelta(hours=37 * i) for i in range(500)]
+    timestamps = to_datetime64_array(moments)
+    assert list(day_of_week(timestamps)) == [moment.weekday() for moment in moments]
+    assert list(month_of_year(timestamps)) == [moment.month for moment in moments]
+    assert list(day_of_year(timestamps)) == [moment.timetuple().tm_yday for moment in moments]
+
+def test_columns_are_views_of_the_buffer():
+    series = UsageSeries.from_records(make_samples(48, hit_rate=lambda i: 0.9))
+    assert len(series) == 48
+    usage = series.column("usage")
+    assert usage.base is not None
+    assert np.shares_memory(usage, series.column("usage"))
+    assert list(usage[:3]) == [0.0, 1.0, 2.0]
+    # Missing fields read as the default
+    assert list(series.column("connections", 0)) == [0.0] * 48
+
+def test_bucket_aggregates_match_grouped_means():
+    samples = make_samples(24 * 20, hit_rate=lambda i: (i % 7) / 10)
+    series = UsageSeries.from_records(samples)
+
+    hourly = series.hourly_mean("usage")
+    for hour, mean in expected_bucket_means(samples, "usage", lambda moment: moment.hour).items():
+        assert hourly[hour] == pytest.approx(mean)
+    weekly = series.weekday_mean("hit_rate")
+    for day, mean in expected_bucket_means(samples, "hit_rate", lambda moment: moment.weekday()).items():
+        assert weekly[day] == pytest.approx(mean)
+
+def test_ring_keeps_the_newest_samples_and_their_aggregates():
+    samples = make_samples(24 * 30, throughput=lambda i: float(i))
+    series = UsageSeries(capacity=100)
+    # Odd batch sizes exercise wrapping and eviction across the buffer's end
+    for start in range(0, len(samples), 37):
+        series.extend(samples[start:start + 37])
+
+    kept = samples[-100:]
+    assert len(series) == 100
+    assert series.timestamps[0] == np.datetime64(kept[0]["timestamp"])
+    assert list(series.column("throughput")) == [sample["throughput"] for sample in kept]
+    hourly = series.hourly_mean("throughput")
+    expected = expected_bucket_means(kept, "throughput", lambda moment: moment.hour)
+    assert set(hourly) == set(expected)
+    for hour, mean in expected.items():
+        assert hourly[hour] == pytest.approx(mean)
+
+def test_fields_added_later_are_missing_for_earlier_samples():
+    series = UsageSeries(capacity=10)
+    series.extend(make_samples(4))
+    series.append(datetime(2024, 1, 1, 4), {"usage": 4.0, "length": 3.0})
+    length = series.column("length")
+    assert np.isnan(length[:4]).all() and length[4] == 3.0
+    assert series.hourly_mean("length") == {4: 3.0}
+
+    # Evicting every sample that had the field empties its aggregates
+    series.extend(make_samples(10, start=datetime(2024, 1, 2)))
+    assert series.hourly_mean("length") == {}
+
+def test_derived_series_helpers():
+    values = np.array([1.0, 2.0, 0.0, 3.0])
+    changes = pct_change(values)
+    assert np.isnan(changes[0]) and list(changes[1:3]) == [1.0, -1.0] and np.isinf(changes[3])
+    buckets = np.array([0, 1, 0, 1])
+    assert bucket_mean(np.array([np.nan, 2.0, 4.0, 6.0]), buckets, 3) == {0: 4.0, 1: 4.0}
+
+def test_store_shares_series_per_resource():
+    store = UsageHistoryStore(capacity=50)
+    store.extend("compute", make_samples(30))
+    store.record("compute", make_samples(31)[30])
+    series = store.get("compute")
+    assert len(series) == 31
+    assert as_usage_series(series) is series
+    assert store.get("storage") is not series
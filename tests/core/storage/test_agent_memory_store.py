@@ -0,0 +1,120 @@
+import json
+import sqlite3
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+import pytest_asyncio
+from src.core.api.agent_memory import EventType, MemoryEvent
+from src.core.storage.agent_memory_store import AgentMemoryStore
+
+NOW = datetime(2026, 10, 1, 12, 0, 0)
+
+def event(number, agent_id="agent-1", files=(), age=timedelta(0)):
+    return MemoryEvent(
+        id=f"event-{number}",
+        type=EventType.CODE_CHANGE,
+        timestamp=NOW - age + timedelta(seconds=number),
+        agent_id=agent_id,
+        details={"number": number},
+        affected_files=list(files),
+        priority=1
+    )
+
+@pytest_asyncio.fixture
+async def store(tmp_path):
+    store = AgentMemoryStore(str(tmp_path / "memory.db"), pool_size=2)
+    yield store
+    await store.close()
+
+@pytest.mark.asyncio
+async def test_relevant_events_are_looked_up_by_file(store):
+    saved = await store.save_memory_events([
+        event(1, files=["src/app.py", "src/util.py"]),
+        event(2, files=["src/util.py"]),
+        event(3, files=["README.md"]),
+        event(4, agent_id="agent-2", files=["src/util.py"]),
+    ])
+    assert saved == 4
+    await store.save_memory_event(event(5, files=["src/util.py"]))
+
+    events = await store.get_relevant_events("agent-1", "src/util.py")
+    assert [e.id for e in events] == ["event-5", "event-2", "event-1"]
+    assert events[-1].affected_files == ["src/app.py", "src/util.py"]
+    in_range = await store.get_relevant_events(
+        "agent-1", "src/util.py", {"start": NOW + timedelta(seconds=2), "end": NOW + timedelta(seconds=4)}
+    )
+    assert [e.id for e in in_range] == ["event-2"]
+
+    with sqlite3.connect(store.db_path) as conn:
+        plan = " ".join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT event_id FROM event_files WHERE file_path = ?", ("src/util.py",)
+        ))
+    assert "idx_event_files_path" in plan
+
+@pytest.mark.asyncio
+async def test_connections_are_reused(store):
+    await asyncio.gather(*[store.get_agent_events("agent-1") for _ in range(20)])
+    assert len(store.pool._connections) == 2
+    async with store.pool.acquire() as db:
+        async with db.execute("PRAGMA journal_mode") as cursor:
+            assert (await cursor.fetchone())[0] == "wal"
+
+@pytest.mark.asyncio
+async def test_cleanup_removes_old_events_and_their_files(store):
+    await store.save_memory_events([
+        event(1, files=["old.py"], age=timedelta(days=90)),
+        event(2, files=["new.py"]),
+    ])
+    assert await store.cleanup_old_events(max_age_days=30) == 1
+    with sqlite3.connect(store.db_path) as conn:
+        assert conn.execute("SELECT file_path FROM event_files").fetchall() == [("new.py",)]
+
+def create_database_without_event_files(path):
+    with sqlite3.connect(path) as conn:
+        conn.execute("""
+            CREATE TABLE memory_events (
+                id TEXT PRIMARY KEY, type TEXT NOT NULL, timestamp TEXT NOT NULL, agent_id TEXT NOT NULL,
+                details TEXT NOT NULL, affected_files TEXT NOT NULL, priority INTEGER NOT NULL
+            )
+        """)
+        conn.execute(
+            "INSERT INTO memory_events VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ("event-1", "code_change", NOW.isoformat(), "agent-1", "{}", json.dumps(["a.py", "b.py"]), 1)
+        )
+
+@pytest.mark.asyncio
+async def test_existing_databases_get_event_files(tmp_path):
+    path = str(tmp_path / "old.db")
+    create_database_without_event_files(path)
+    store = AgentMemoryStore(path)
+    assert [e.id for e in await store.get_relevant_events("agent-1", "b.py")] == ["event-1"]
+    await store.close()
+
+@pytest.mark.asyncio
+async def test_backup_includes_uncheckpointed_writes(store, tmp_path):
+    await store.save_memory_events([event(1, files=["a.py"])])
+    backup = str(tmp_path / "backup.db")
+    assert await store.backup_database(backup)
+    await store.save_memory_events([event(2, files=["a.py"])])
+
+    assert await store.restore_database(backup)
+    assert [e.id for e in await store.get_relevant_events("agent-1", "a.py")] == ["event-1"]
+
+@pytest.mark.asyncio
+async def test_backups_from_before_event_files_restore(store, tmp_path):
+    backup = str(tmp_path / "old.db")
+    create_database_without_event_files(backup)
+
+    assert await store.restore_database(backup)
+    assert [e.id for e in await store.get_relevant_events("agent-1", "b.py")] == ["event-1"]
+
+@pytest.mark.asyncio
+async def test_close_waits_for_borrowed_connections(store):
+    async with store.pool.acquire() as db:
+        closing = asyncio.create_task(store.pool.close())
+        await asyncio.sleep(0.05)
+        assert not closing.done()
+        async with db.execute("SELECT 1") as cursor:
+            assert (await cursor.fetchone())[0] == 1
+    await asyncio.wait_for(closing, timeout=5)
+    assert await store.get_agent_events("agent-1") == []
@@ -0,0 +1,276 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import sqlalchemy as sa
+from cryptography.fernet import Fernet, InvalidToken
+from sqlalchemy import event
+from sqlalchemy.orm import declarative_base
+from src.core.storage.multi_tenant_store import ConnectionManager, MultiTenantStore, TenantContext, TenantEncryption, TenantIsolationStrategy, _key_cache
+
+Base = declarative_base()
+
+SECRET = "test tenant secret"
+
+class Note(Base):
+    __tablename__ = "notes"
+    id = sa.Column(sa.Integer, primary_key=True)
+    text = sa.Column(sa.String)
+
+def use_tenant(manager, tenant_id, schema_name=None, database_url=None):
+    strategy = TenantIsolationStrategy.SCHEMA_BASED if schema_name else TenantIsolationStrategy.ROW_BASED
+    manager._cross_tenant_prevention.set_tenant_context(
+        TenantContext(tenant_id=tenant_id, schema_name=schema_name, database_url=database_url, isolation_strategy=strategy)
+    )
+
+def attach_schemas(engine, tmp_path, *schemas):
+    # SQLite's stand-in for schemas: one attached database per tenant
+    @event.listens_for(engine, "connect")
+    def attach(dbapi_connection, connection_record):
+        for schema in schemas:
+            dbapi_connection.execute(f"ATTACH DATABASE '{tmp_path / schema}.db' AS {schema}")
+
+def test_tenants_on_one_database_share_an_engine(tmp_path):
+    url = f"sqlite:///{tmp_path / 'shared.db'}"
+    manager = ConnectionManager(url)
+    use_tenant(manager, "a")
+    engine_a = manager.get_engine("a")
+    use_tenant(manager, "b")
+    assert manager.get_engine("b") is engine_a
+    use_tenant(manager, "c", database_url=f"sqlite:///{tmp_path / 'other.db'}")
+    assert manager.get_engine("c") is not engine_a
+
+    separate = ConnectionManager(url, shared_pool=False)
+    use_tenant(separate, "a")
+    engine_a = separate.get_engine("a")
+    use_tenant(separate, "b")
+    assert separate.get_engine("b") is not engine_a
+    manager.close_all()
+    separate.close_all()
+
+def test_schema_is_applied_per_session_on_a_shared_engine(tmp_path):
+    manager = ConnectionManager(f"sqlite:///{tmp_path / 'main.db'}")
+    use_tenant(manager, "a", schema_name="tenant_a")
+    engine = manager.get_engine("a")
+    attach_schemas(engine, tmp_path, "tenant_a", "tenant_b")
+    for schema in ("tenant_a", "tenant_b"):
+        Base.metadata.create_all(engine.execution_options(schema_translate_map={None: schema}))
+
+    with manager.get_session("a")() as session:
+        session.add(Note(text="only for a"))
+        session.commit()
+    use_tenant(manager, "b", schema_name="tenant_b")
+    with manager.get_session("b")() as session:
+        assert session.query(Note).count() == 0
+    use_tenant(manager, "a", schema_name="tenant_a")
+    with manager.get_session("a")() as session:
+        assert [note.text for note in session.query(Note)] == ["only for a"]
+    assert len(manager._engines) == 1
+    manager.close_all()
+
+def test_least_recently_used_idle_engines_are_disposed(tmp_path):
+    manager = ConnectionManager(f"sqlite:///{tmp_path / 'default.db'}", max_engines=2)
+    urls = [f"sqlite:///{tmp_path / name}.db" for name in ("one", "two", "three", "four")]
+    engines = []
+    for number, url in enumerate(urls[:2]):
+        use_tenant(manager, str(number), database_url=url)
+        engines.append(manager.get_engine(str(number)))
+    busy = engines[0].connect()
+
+    use_tenant(manager, "2", database_url=urls[2])
+    manager.get_engine("2")
+    # The first engine has a connection checked out, so the second goes
+    assert [entry.url for entry in manager._engines.values()] == [urls[0], urls[2]]
+    busy.close()
+
+    manager.engine_idle_timeout = 0
+    use_tenant(manager, "3", database_url=urls[3])
+    manager.get_engine("3")
+    assert [entry.url for entry in manager._engines.values()] == [urls[3]]
+    manager.close_all()
+
+def test_connections_are_capped_across_engines(tmp_path):
+    manager = ConnectionManager(f"sqlite:///{tmp_path / 'default.db'}", max_connections=1, checkout_timeout=0.1)
+    use_tenant(manager, "a", database_url=f"sqlite:///{tmp_path / 'a.db'}")
+    engine_a = manager.get_engine("a")
+    use_tenant(manager, "b", database_url=f"sqlite:///{tmp_path / 'b.db'}")
+    engine_b = manager.get_engine("b")
+
+    held = engine_a.connect()
+    assert manager.pool_stats()["connections_in_use"] == 1
+    with pytest.raises(sa.exc.TimeoutError):
+        engine_b.connect()
+    held.close()
+    with engine_b.connect() as connection:
+        assert connection.execute(sa.text("SELECT 1")).scalar() == 1
+    assert manager.pool_stats()["connections_in_use"] == 0
+    manager.close_all()
+
+def test_pool_utilization_is_reported_per_tenant(tmp_path):
+    url = f"sqlite:///{tmp_path / 'shared.db'}"
+    manager = ConnectionManager(url)
+    use_tenant(manager, "a")
+    Base.metadata.create_all(manager.get_engine("a"))
+    open_session = manager.get_session("a")()
+    open_session.query(Note).all()
+    with manager.get_session("a")() as session:
+        session.query(Note).all()
+    use_tenant(manager, "b")
+    with manager.get_session("b")() as session:
+        session.query(Note).all()
+
+    stats = manager.pool_stats()
+    assert stats["tenants"]["a"] == {"active": 1, "checkouts": 2, "engine": f"sqlite:///{tmp_path / 'shared.db'}"}
+    assert stats["tenants"]["b"]["active"] == 0
+    assert stats["engines"][0]["tenants"] == 2
+    open_session.close()
+    assert manager.pool_stats()["tenants"]["a"]["active"] == 0
+    manager.close_all()
+
+class Task(Base):
+    __tablename__ = "tasks"
+    id = sa.Column(sa.Integer, primary_key=True)
+    tenant_id = sa.Column(sa.String, nullable=False)
+    title = sa.Column(sa.String)
+    status = sa.Column(sa.String, default="open")
+
+@pytest.fixture
+def store(tmp_path):
+    store = MultiTenantStore(f"sqlite:///{tmp_path / 'tasks.db'}", isolation_strategy=TenantIsolationStrategy.ROW_BASED)
+    store.set_tenant_context("a")
+    Base.metadata.create_all(store.connection_manager.get_engine("a"))
+    yield store
+    store.close()
+
+def test_iter_all_pages_through_the_tenants_rows(store):
+    tasks = store.get_repository(Task)
+    assert tasks.bulk_create({"id": number, "title": f"task {number}"} for number in range(1, 26)) == 25
+    store.set_tenant_context("b")
+    tasks.bulk_create([Task(id=100, title="other tenant")])
+
+    assert [task.id for task in tasks.iter_all(batch_size=10)] == [100]
+    store.set_tenant_context("a")
+    streamed = list(tasks.iter_all(batch_size=10))
+    assert [task.id for task in streamed] == list(range(1, 26))
+    assert {task.tenant_id for task in streamed} == {"a"}
+    assert streamed[0].status == "open"
+
+def test_bulk_upsert_and_delete_stay_within_the_tenant(store):
+    tasks = store.get_repository(Task)
+    tasks.bulk_create([Task(id=1, title="first"), Task(id=2, title="second")])
+    store.set_tenant_context("b")
+    tasks.bulk_create([Task(id=3, title="theirs")])
+
+    # Another tenant's row with the same key is skipped, not updated
+    tasks.bulk_upsert([{"id": 3, "title": "renamed"}, {"id": 4, "title": "new"}, {"id": 1, "title": "hijacked"}], batch_size=2)
+    assert [(task.id, task.title) for task in tasks.get_all()] == [(3, "renamed"), (4, "new")]
+    assert tasks.bulk_delete([1, 2, 4]) == 1
+    assert [(task.id, task.title) for task in tasks.get_all()] == [(3, "renamed")]
+
+    store.set_tenant_context("a")
+    assert [(task.id, task.title) for task in tasks.iter_all()] == [(1, "first"), (2, "second")]
+
+class Secret(Base):
+    __tablename__ = "secrets"
+    __sensitive_fields__ = ["token"]
+    id = sa.Column(sa.Integer, primary_key=True)
+    token = sa.Column(sa.String)
+
+def test_tenant_keys_are_derived_once_per_version(monkeypatch):
+    tenant_id = str(uuid.uuid4())
+    derivations = []
+    original = TenantEncryption._generate_key
+    monkeypatch.setattr(TenantEncryption, "_generate_key", lambda self, version: derivations.append(version) or original(self, version))
+
+    first = TenantEncryption(tenant_id, secret=SECRET)
+    second = TenantEncryption(tenant_id, secret=SECRET)
+    key = first.encryption_key
+    assert second.encryption_key == key
+    assert derivations == [1]
+    assert TenantEncryption(tenant_id, key_version=2, secret=SECRET).encryption_key != key
+    assert derivations == [1, 2]
+
+def test_tenant_keys_survive_losing_the_cache():
+    tenant_id = str(uuid.uuid4())
+    token = TenantEncryption(tenant_id, secret=SECRET).encrypt("kept")
+    # As after an eviction or a restart
+    _key_cache.forget(tenant_id)
+    assert TenantEncryption(tenant_id, secret=SECRET).decrypt(token) == "kept"
+    _key_cache.forget(tenant_id)
+    with pytest.raises(InvalidToken):
+        TenantEncryption(tenant_id, secret="another secret").decrypt(token)
+    with pytest.raises(ValueError):
+        TenantEncryption(str(uuid.uuid4())).encrypt("no secret")
+
+def test_rotation_applies_to_every_instance_of_the_tenant():
+    tenant_id = str(uuid.uuid4())
+    rotating = TenantEncryption(tenant_id, secret=SECRET)
+    other = TenantEncryption(tenant_id, secret=SECRET)
+    old_token = other.encrypt("before")
+    old_key = Fernet(other.encryption_key)
+
+    rotating.rotate_key()
+    assert other.key_version == 2
+    new_token = other.encrypt("after")
+    with pytest.raises(InvalidToken):
+        old_key.decrypt(new_token.encode())
+    assert rotating.decrypt_many([old_token, new_token]) == ["before", "after"]
+
+    rotated = other.reencrypt_many([old_token])
+    rotating.retire_previous_keys()
+    with pytest.raises(InvalidToken):
+        other.decrypt(old_token)
+    assert other.decrypt(rotated[0]) == "before"
+
+def test_encrypt_many_round_trips_in_order():
+    encryption = TenantEncryption(str(uuid.uuid4()), secret=SECRET)
+    values = [f"secret {number}" for number in range(50)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        encrypted = encryption.encrypt_many(values, executor, chunk_size=8)
+        assert encryption.decrypt_many(encrypted, executor, chunk_size=8) == values
+    assert encryption.decrypt_many(encrypted) == values
+    assert encryption.decrypt(encrypted[3]) == "secret 3"
+
+def test_key_rotation_reencrypts_sensitive_fields_in_batches(tmp_path):
+    tenant_id = str(uuid.uuid4())
+    store = MultiTenantStore(f"sqlite:///{tmp_path / 'main.db'}", encryption_secret=SECRET)
+    store.set_tenant_context(tenant_id, schema_name="tenant_a")
+    engine = store.connection_manager.get_engine(tenant_id)
+    attach_schemas(engine, tmp_path, "tenant_a")
+    Base.metadata.create_all(engine.execution_options(schema_translate_map={None: "tenant_a"}))
+
+    secrets = store.get_repository(Secret)
+    old = Fernet(secrets.encryption.encryption_key)
+    values = [f"token {number}" for number in range(10)]
+    secrets.bulk_create({"id": number, "token": token} for number, token in enumerate(secrets.encryption.encrypt_many(values)))
+    secrets.bulk_create([{"id": 10, "token": None}])
+
+    store.rotate_encryption_key(tenant_id, [Secret], batch_size=3)
+    rotated = [secret.token for secret in secrets.iter_all()]
+    assert rotated[-1] is None
+    assert secrets.encryption.decrypt_many(rotated[:-1]) == values
+    with pytest.raises(InvalidToken):
+        old.decrypt(rotated[0].encode())
+    store.close()
+
+def test_rotated_key_versions_survive_a_restart(tmp_path):
+    tenant_id = str(uuid.uuid4())
+    store = MultiTenantStore(f"sqlite:///{tmp_path / 'main.db'}", encryption_secret=SECRET)
+    store.set_tenant_context(tenant_id, schema_name="tenant_a")
+    engine = store.connection_manager.get_engine(tenant_id)
+    attach_schemas(engine, tmp_path, "tenant_a")
+    Base.metadata.create_all(engine.execution_options(schema_translate_map={None: "tenant_a"}))
+    secrets = store.get_repository(Secret)
+    secrets.bulk_create({"id": number, "token": secrets.encryption.encrypt(f"token {number}")} for number in range(3))
+    store.rotate_encryption_key(tenant_id, [Secret])
+    store.close()
+
+    # As after a restart: no cached keys or key versions
+    _key_cache.forget(tenant_id)
+    store = MultiTenantStore(f"sqlite:///{tmp_path / 'main.db'}", encryption_secret=SECRET)
+    store.set_tenant_context(tenant_id, schema_name="tenant_a")
+    attach_schemas(store.connection_manager.get_engine(tenant_id), tmp_path, "tenant_a")
+    secrets = store.get_repository(Secret)
+    assert secrets.encryption.key_versions == (2, 2)
+    tokens = [secret.token for secret in secrets.iter_all()]
+    assert secrets.encryption.decrypt_many(tokens) == ["token 0", "token 1", "token 2"]
+    store.close()
@@ -0,0 +1,98 @@
+"""Event write and file lookup throughput of AgentMemoryStore.
+
+Saves ``--events`` memory events for ``--agents`` agents, each touching a
+few of ``--files`` paths, and times:
+
+    single   - ``save_memory_event`` per event (one transaction each) on the
+               first ``--single-events`` events
+    batched  - ``save_memory_events`` of the rest in ``--batch-size`` batches
+    lookup   - ``get_relevant_events`` for ``--lookups`` random agent/file
+               pairs, answered from the ``event_files`` index
+
+Usage:
+    python -m tests.performance.agent_memory_benchmark --events 50000 --batch-size 1000 --db /tmp/agent-memory.db
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any
+
+from src.core.api.agent_memory import EventType, MemoryEvent
+from src.core.storage.agent_memory_store import AgentMemoryStore
+
+def make_events(count: int, agents: int, files: int, seed: int = 7):
+    rng = random.Random(seed)
+    started = datetime(2026, 1, 1)
+    return [
+        MemoryEvent(
+            id=f"event-{number}",
+            type=rng.choice(list(EventType)),
+            timestamp=started + timedelta(seconds=number),
+            agent_id=f"agent-{rng.randrange(agents)}",
+            details={"summary": f"change {number}"},
+            affected_files=[f"src/module_{rng.randrange(files)}.py" for _ in range(rng.randint(1, 4))],
+            priority=rng.randint(1, 5)
+        )
+        for number in range(count)
+    ]
+
+async def run_benchmark(
+    events: int = 50000,
+    single_events: int = 1000,
+    batch_size: int = 1000,
+    agents: int = 20,
+    files: int = 2000,
+    lookups: int = 500,
+    db: str = "/tmp/agent-memory.db"
+) -> Dict[str, Any]:
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db + suffix):
+            os.remove(db + suffix)
+    store = AgentMemoryStore(db)
+    generated = make_events(events, agents, files)
+
+    started = time.perf_counter()
+    for event in generated[:single_events]:
+        await store.save_memory_event(event)
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for offset in range(single_events, events, batch_size):
+        await store.save_memory_events(generated[offset:offset + batch_size])
+    batched_seconds = time.perf_counter() - started
+
+    rng = random.Random(11)
+    found = 0
+    started = time.perf_counter()
+    for _ in range(lookups):
+        found += len(await store.get_relevant_events(f"agent-{rng.randrange(agents)}", f"src/module_{rng.randrange(files)}.py"))
+    lookup_seconds = time.perf_counter() - started
+    await store.close()
+
+    return {
+        "single": {"events": single_events, "events_per_second": round(single_events / single_seconds)},
+        "batched": {"events": events - single_events, "batch_size": batch_size, "events_per_second": round((events - single_events) / batched_seconds)},
+        "lookup": {"lookups": lookups, "events_found": found, "ms_per_lookup": round(lookup_seconds / lookups * 1000, 3)},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure AgentMemoryStore event writes and file lookups")
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--single-events", type=int, default=1000, help="Events saved one per transaction")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--db", default="/tmp/agent-memory.db")
+    args = parser.parse_args()
+    results = asyncio.run(run_benchmark(
+        args.events, args.single_events, args.batch_size, args.agents, args.files, args.lookups, args.db
+    ))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
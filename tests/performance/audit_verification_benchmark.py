@@ -0,0 +1,107 @@
+"""Audit log verification throughput benchmark.
+
+Logs a run of chained audit events into an in-memory Elasticsearch and
+measures how many events per second ``AuditLogger.verify_range`` checks with
+and without a process pool, against verifying events one at a time with
+``verify_event_integrity`` (one search per event, timed over a sample).
+
+The in-memory store answers searches far faster than a real cluster, so the
+per-event figure is an upper bound; against Elasticsearch every lookup also
+pays a network round trip.
+
+Usage:
+    python -m tests.performance.audit_verification_benchmark --events 100000 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any
+
+from src.core.monitoring.audit_logging import AuditLogger
+from src.core.monitoring.bulk_sink import BulkSinkConfig
+from src.core.monitoring.tests.test_audit_chain import InMemoryElasticsearch, make_event
+
+async def run_benchmark(
+    event_count: int = 100000,
+    batch_size: int = 1000,
+    workers: int = 0,
+    page_size: int = 1000,
+    sample: int = 200
+) -> Dict[str, Any]:
+    """Log ``event_count`` events, then time each verification strategy"""
+    workers = workers or os.cpu_count() or 1
+    es = InMemoryElasticsearch()
+    with tempfile.TemporaryDirectory() as config_dir:
+        audit_logger = AuditLogger(
+            config_dir=config_dir,
+            secret_key="benchmark-secret",
+            sink_config=BulkSinkConfig(flush_interval=60, max_queue_size=event_count * 2),
+            checkpoint_batch_size=batch_size
+        )
+        await audit_logger.es.close()
+        audit_logger.es = es
+        audit_logger.sink.es = es
+
+        start = datetime(2024, 1, 1)
+        started = time.perf_counter()
+        for i in range(event_count):
+            await audit_logger.log_event(make_event(i, start + timedelta(milliseconds=i)))
+        await audit_logger.flush()
+        log_seconds = time.perf_counter() - started
+
+        end = start + timedelta(milliseconds=event_count)
+        # Warm the store's sorted result cache so both runs pay the same search cost
+        await audit_logger.verify_range(start, end, workers=0, page_size=page_size)
+
+        inline = await audit_logger.verify_range(start, end, workers=0, page_size=page_size)
+        pooled = await audit_logger.verify_range(start, end, workers=workers, page_size=page_size)
+
+        sample = min(sample, event_count)
+        started = time.perf_counter()
+        for i in range(sample):
+            assert await audit_logger.verify_event_integrity(f"event_{i * (event_count // sample)}")
+        per_event_seconds = time.perf_counter() - started
+
+        await audit_logger.close()
+
+    return {
+        "events": event_count,
+        "batch_size": batch_size,
+        "workers": workers,
+        "log_events_per_second": round(event_count / log_seconds, 1),
+        "per_event_lookup": {
+            "sampled_events": sample,
+            "events_per_second": round(sample / per_event_seconds, 1),
+            "searches_for_all_events": event_count,
+        },
+        "verify_range_inline": {
+            "verified": inline["verified"],
+            "events_per_second": inline["events_per_second"],
+        },
+        "verify_range_pool": {
+            "verified": pooled["verified"],
+            "events_per_second": pooled["events_per_second"],
+            "batches": pooled["batches"],
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audit log verification throughput")
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=0, help="Process pool size, 0 for one per CPU")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--sample", type=int, default=200)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(
+        args.events, args.batch_size, args.workers, args.page_size, args.sample
+    ))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
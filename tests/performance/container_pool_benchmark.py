@@ -0,0 +1,130 @@
+"""Code execution latency benchmark: per-run images vs the warm container pool.
+
+Times create→execute for a stream of short programs two ways:
+
+    build_per_run  - build an image containing the code, create and start a
+                     container from it, run, read stats and remove it, as
+                     the container manager did for every execution
+    pool           - ``ContainerManager.create_container`` and
+                     ``execute_code`` with a ``ContainerPool``: the code is
+                     copied into a warm, paused sandbox which is wiped and
+                     paused again afterwards
+
+By default Docker is simulated with ``FakeDockerClient``, whose per-call
+latencies (``DOCKER_LATENCIES``) are multiplied by ``--scale``; results at
+scale 1 are the scaled numbers divided by the scale. ``--docker`` runs
+against the local Docker daemon instead.
+
+Usage:
+    python -m tests.performance.container_pool_benchmark --executions 20 --scale 0.1
+    python -m tests.performance.container_pool_benchmark --docker --language python --executions 10
+"""
+import argparse
+import asyncio
+import io
+import json
+import time
+from typing import Dict, Any, List
+
+import numpy as np
+
+from src.core.environments.container_manager import ContainerConfig, ContainerManager
+from src.core.environments.container_pool import ContainerPool, get_runtime, pack_files
+from tests.performance.fake_docker import FakeDockerClient
+
+PROGRAMS = {
+    "python": "print(sum(range(1000)))\n",
+    "javascript": "console.log([...Array(1000).keys()].reduce((a, b) => a + b, 0));\n",
+    "ruby": "puts (0...1000).sum\n",
+}
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    milliseconds = np.array(seconds) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(milliseconds, 50)), 1),
+        "p95_ms": round(float(np.percentile(milliseconds, 95)), 1),
+        "mean_ms": round(float(np.mean(milliseconds)), 1),
+    }
+
+def build_per_run(client, config: ContainerConfig, code: str) -> float:
+    """One execution the way it was done before the pool."""
+    runtime = get_runtime(config.language)
+    started = time.perf_counter()
+    context = pack_files({
+        "Dockerfile": runtime.dockerfile() + f"COPY {runtime.source_file} /workspace/\n",
+        runtime.source_file: code,
+    })
+    image, _ = client.images.build(fileobj=io.BytesIO(context), custom_context=True, rm=True)
+    container = client.containers.create(
+        image.id,
+        mem_limit=config.memory_limit,
+        network_disabled=config.network_disabled,
+        detach=True
+    )
+    container.start()
+    container.exec_run(runtime.command, workdir="/workspace")
+    container.stats(stream=False)
+    elapsed = time.perf_counter() - started
+    container.remove(force=True)
+    return elapsed
+
+async def run_pool(client, config: ContainerConfig, code: str, executions: int, tmp_path: str) -> Dict[str, Any]:
+    pool = ContainerPool(client)
+    manager = ContainerManager(tmp_path, client=client, pool=pool)
+    try:
+        started = time.perf_counter()
+        await pool.prewarm([config])
+        prewarm_seconds = time.perf_counter() - started
+
+        latencies = []
+        for _ in range(executions):
+            started = time.perf_counter()
+            execution_id = await manager.create_container(code, config)
+            await manager.execute_code(execution_id, config)
+            latencies.append(time.perf_counter() - started)
+            # Let the background replenishment run between requests
+            await asyncio.sleep(0)
+        return {"prewarm_seconds": round(prewarm_seconds, 2), **latency_summary(latencies)}
+    finally:
+        await manager.shutdown()
+        manager.cleanup_task.cancel()
+        manager.monitoring_task.cancel()
+
+def run_benchmark(client, language: str, executions: int, scale: float, tmp_path: str) -> Dict[str, Any]:
+    config = ContainerConfig(language=language)
+    code = PROGRAMS.get(language, PROGRAMS["python"])
+
+    cold = latency_summary([build_per_run(client, config, code) for _ in range(executions)])
+    pooled = asyncio.run(run_pool(client, config, code, executions, tmp_path))
+    results = {
+        "language": language,
+        "executions": executions,
+        "build_per_run": cold,
+        "pool": pooled,
+        "speedup_p50": round(cold["p50_ms"] / max(pooled["p50_ms"], 1e-3), 1),
+    }
+    if scale:
+        results["latency_scale"] = scale
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark create→execute latency with and without the container pool")
+    parser.add_argument("--executions", type=int, default=20)
+    parser.add_argument("--language", default="python", choices=list(PROGRAMS))
+    parser.add_argument("--scale", type=float, default=0.1, help="Multiplier for the simulated Docker latencies")
+    parser.add_argument("--docker", action="store_true", help="Use the local Docker daemon instead of the fake client")
+    parser.add_argument("--base-path", default="/tmp/containers")
+    args = parser.parse_args()
+
+    if args.docker:
+        import docker
+        client, scale = docker.from_env(), None
+    else:
+        client, scale = FakeDockerClient(scale=args.scale), args.scale
+    results = run_benchmark(client, args.language, args.executions, scale, args.base_path)
+    if not args.docker:
+        results["docker_calls"] = dict(client.calls)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
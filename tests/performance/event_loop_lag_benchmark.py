@@ -0,0 +1,150 @@
+"""Event loop lag of the container manager under concurrent executions.
+
+Starts ``--executions`` create→execute requests at once against a simulated
+Docker daemon (``FakeDockerClient``, latencies times ``--scale``) while a
+ticker coroutine measures how late the event loop wakes it, and a
+monitoring pass runs alongside as it does every few seconds in production.
+Two configurations are compared:
+
+    blocking  - SDK calls made directly in the coroutines and one-shot
+                ``stats(stream=False)`` reads, as the manager did before
+    async     - SDK calls offloaded to ``AsyncDockerClient``'s threads and
+                stats read from ``StatsCollector``'s streams
+
+Reports the loop lag percentiles, the wall time for the whole batch and
+per-execution latency.
+
+Usage:
+    python -m tests.performance.event_loop_lag_benchmark --executions 100 --scale 0.1
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from src.core.environments.async_docker import AsyncDockerClient
+from src.core.environments.container_manager import ContainerConfig, ContainerManager
+from src.core.environments.container_pool import ContainerPool, get_runtime
+from tests.performance.fake_docker import FakeDockerClient
+
+class InlineDockerClient(AsyncDockerClient):
+    """Makes SDK calls on the event loop thread, blocking it like direct calls"""
+
+    async def call(self, function, *args, **kwargs):
+        return function(*args, **kwargs)
+
+class OneShotStats:
+    """Reads stats with a blocking ``stats(stream=False)`` call per execution"""
+
+    def __init__(self):
+        self.containers = {}
+        self.samples = {}
+
+    def subscribe(self, container):
+        self.containers[container.id] = container
+
+    def unsubscribe(self, container_id):
+        self.containers.pop(container_id, None)
+        self.samples.pop(container_id, None)
+
+    def latest(self, container_id) -> Optional[Dict[str, Any]]:
+        container = self.containers.get(container_id)
+        if container:
+            self.samples[container_id] = container.stats(stream=False)
+        return self.samples.get(container_id)
+
+    async def wait_for_sample(self, container_id, timeout=1.0):
+        return self.latest(container_id)
+
+    def usage(self, container_id) -> Dict[str, int]:
+        sample = self.samples.get(container_id) or {}
+        return {
+            "cpu_usage": sample.get("cpu_stats", {}).get("cpu_usage", {}).get("total_usage", 0),
+            "memory_usage": sample.get("memory_stats", {}).get("usage", 0),
+            "network_rx": 0,
+            "network_tx": 0
+        }
+
+def percentiles(seconds: List[float]) -> Dict[str, float]:
+    milliseconds = np.array(seconds) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(milliseconds, 50)), 1),
+        "p99_ms": round(float(np.percentile(milliseconds, 99)), 1),
+        "max_ms": round(float(np.max(milliseconds)), 1),
+    }
+
+async def run_mode(mode: str, executions: int, scale: float, run_seconds: float, workers: int, base_path: str) -> Dict[str, Any]:
+    def program(container, command):
+        time.sleep(run_seconds)
+        return 0, b"done\n"
+
+    client = FakeDockerClient(scale=scale, runner=program)
+    docker = InlineDockerClient(client) if mode == "blocking" else AsyncDockerClient(client, max_workers=workers)
+    pool = ContainerPool(docker, min_idle=0)
+    manager = ContainerManager(base_path, client=client, pool=pool)
+    if mode == "blocking":
+        manager.stats = OneShotStats()
+    config = ContainerConfig(language="python")
+    # The runtime image is built ahead of time in both modes
+    await pool.ensure_image(get_runtime(config.language))
+
+    lags: List[float] = []
+    latencies: List[float] = []
+    done = asyncio.Event()
+
+    async def ticker(interval=0.01):
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - started - interval)
+
+    async def execution():
+        started = time.perf_counter()
+        execution_id = await manager.create_container("print('done')", config)
+        await manager.execute_code(execution_id, config)
+        latencies.append(time.perf_counter() - started)
+
+    async def monitor():
+        # One pass while the executions are under way
+        await asyncio.sleep(0.05)
+        await manager._monitor_containers()
+
+    tick = asyncio.ensure_future(ticker())
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(monitor(), *(execution() for _ in range(executions)))
+        wall = time.perf_counter() - started
+    finally:
+        done.set()
+        await tick
+        await manager.shutdown()
+        manager.cleanup_task.cancel()
+        manager.monitoring_task.cancel()
+    return {
+        "loop_lag": percentiles(lags),
+        "wall_seconds": round(wall, 2),
+        "execution_latency": percentiles(latencies),
+    }
+
+def run_benchmark(executions: int = 100, scale: float = 0.1, run_seconds: float = 0.2,
+                  workers: int = 128, base_path: str = "/tmp/containers") -> Dict[str, Any]:
+    results = {"executions": executions, "latency_scale": scale, "run_seconds": run_seconds}
+    for mode in ("blocking", "async"):
+        results[mode] = asyncio.run(run_mode(mode, executions, scale, run_seconds, workers, base_path))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure event loop lag under concurrent code executions")
+    parser.add_argument("--executions", type=int, default=100)
+    parser.add_argument("--scale", type=float, default=0.1, help="Multiplier for the simulated Docker latencies")
+    parser.add_argument("--run-seconds", type=float, default=0.2, help="How long each program runs")
+    parser.add_argument("--workers", type=int, default=128, help="Docker adapter threads")
+    parser.add_argument("--base-path", default="/tmp/containers")
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.executions, args.scale, args.run_seconds, args.workers, args.base_path), indent=2))
+
+if __name__ == "__main__":
+    main()
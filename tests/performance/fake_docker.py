@@ -0,0 +1,210 @@
+"""In-memory stand-in for the Docker SDK client.
+
+Implements the part of ``docker.DockerClient`` the container manager and
+pool use: building and looking up images, creating, starting, pausing and
+removing containers, ``put_archive`` and ``exec_run``. Each call sleeps for
+a configurable latency so benchmarks see Docker-like costs, and every call
+is counted in ``client.calls``.
+
+Commands run by ``exec_run`` are answered by ``runner(container, command)``,
+which by default prints the source file being run. The pool's own commands
+(the workspace reset and ``timeout``) are interpreted here.
+"""
+import io
+import tarfile
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Any, Optional, List, Callable, Tuple
+
+import docker
+from docker.models.containers import ExecResult
+
+# Rough costs of the Docker API calls on a developer machine, in seconds
+DOCKER_LATENCIES = {
+    "build": 8.0,
+    "image_get": 0.005,
+    "create": 0.12,
+    "start": 0.35,
+    "pause": 0.02,
+    "unpause": 0.02,
+    "put_archive": 0.01,
+    "exec": 0.04,
+    "stats": 1.0,
+    "stats_interval": 1.0,
+    "remove": 0.15,
+    "kill": 0.05,
+}
+
+def print_source(container: "FakeContainer", command: List[str]) -> Tuple[int, bytes]:
+    source = container.files.get(f"{container.workdir}/{command[-1]}")
+    if source is None:
+        return 1, f"{command[-1]}: No such file or directory\n".encode()
+    return 0, source
+
+class FakeImage:
+    def __init__(self, tag: str):
+        self.id = f"sha256:{uuid.uuid4().hex}"
+        self.tags = [tag]
+
+class FakeImages:
+    def __init__(self, client: "FakeDockerClient"):
+        self.client = client
+        self.images: Dict[str, FakeImage] = {}
+        self.dockerfiles: Dict[str, str] = {}
+
+    def get(self, name: str) -> FakeImage:
+        self.client._call("image_get")
+        if name not in self.images:
+            raise docker.errors.ImageNotFound(f"No such image: {name}")
+        return self.images[name]
+
+    def build(self, fileobj=None, tag: str = None, **kwargs):
+        self.client._call("build")
+        image = FakeImage(tag)
+        self.images[tag] = self.images[image.id] = image
+        if fileobj is not None:
+            self.dockerfiles[tag] = fileobj.read().decode()
+        return image, iter([])
+
+class FakeContainer:
+    def __init__(self, client: "FakeDockerClient", image: str, name: str, options: Dict[str, Any]):
+        self.client = client
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.image = image
+        self.options = options
+        self.status = "created"
+        self.workdir = "/workspace"
+        self.files: Dict[str, bytes] = {}
+        self.commands: List[List[str]] = []
+        self.cpu_usage = 0
+
+    def start(self):
+        self.client._call("start")
+        self._require("created", "exited")
+        self.status = "running"
+
+    def pause(self):
+        self.client._call("pause")
+        self._require("running")
+        self.status = "paused"
+
+    def unpause(self):
+        self.client._call("unpause")
+        self._require("paused")
+        self.status = "running"
+
+    def kill(self):
+        self.client._call("kill")
+        self._require("running", "paused")
+        self.status = "exited"
+
+    def reload(self):
+        self._check_exists()
+
+    def put_archive(self, path: str, data: bytes) -> bool:
+        self.client._call("put_archive")
+        self._check_exists()
+        with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+            for member in archive.getmembers():
+                self.files[f"{path}/{member.name}"] = archive.extractfile(member).read()
+        return True
+
+    def exec_run(self, cmd, workdir: Optional[str] = None, user: str = "", **kwargs) -> ExecResult:
+        self.client._call("exec")
+        self._require("running")
+        command = list(cmd)
+        self.commands.append(command)
+        if command[0] == "sh" and "-delete" in command[-1]:
+            self.files.clear()
+            return ExecResult(0, b"")
+        if command[0] == "timeout":
+            limit, command = float(command[3]), command[4:]
+            started = time.monotonic()
+            exit_code, output = self.client.runner(self, command)
+            if time.monotonic() - started >= limit:
+                return ExecResult(137, output)
+            return ExecResult(exit_code, output)
+        return ExecResult(*self.client.runner(self, command))
+
+    def stats(self, stream: bool = False, decode: bool = False):
+        if stream:
+            return self._stream_stats()
+        self.client._call("stats")
+        return self._sample()
+
+    def _stream_stats(self):
+        # Like Docker: a sample right away, then one per interval until the container is gone
+        self.client.calls["stats_stream"] += 1
+        interval = self.client.latencies["stats_interval"] * self.client.scale or 0.01
+        while self.id in self.client.containers.containers:
+            yield self._sample()
+            time.sleep(interval)
+
+    def _sample(self) -> Dict[str, Any]:
+        self.cpu_usage += 1200000
+        return {
+            "cpu_stats": {"cpu_usage": {"total_usage": self.cpu_usage}},
+            "memory_stats": {"usage": 8 * 1024 * 1024},
+            "networks": {} if self.options.get("network_disabled") else {"eth0": {"rx_bytes": 0, "tx_bytes": 0}},
+        }
+
+    def remove(self, force: bool = False, v: bool = False):
+        self.client._call("remove")
+        self._check_exists()
+        if self.status in ("running", "paused") and not force:
+            raise docker.errors.APIError(f"Container {self.id} is {self.status}")
+        self.status = "removed"
+        del self.client.containers.containers[self.id]
+
+    def _check_exists(self):
+        if self.id not in self.client.containers.containers:
+            raise docker.errors.NotFound(f"No such container: {self.id}")
+
+    def _require(self, *statuses: str):
+        self._check_exists()
+        if self.status not in statuses:
+            raise docker.errors.APIError(f"Container {self.id} is {self.status}")
+
+class FakeContainers:
+    def __init__(self, client: "FakeDockerClient"):
+        self.client = client
+        self.containers: Dict[str, FakeContainer] = {}
+
+    def create(self, image: str, name: Optional[str] = None, **options) -> FakeContainer:
+        self.client._call("create")
+        if image not in self.client.images.images:
+            raise docker.errors.ImageNotFound(f"No such image: {image}")
+        container = FakeContainer(self.client, image, name or uuid.uuid4().hex[:12], options)
+        self.containers[container.id] = container
+        return container
+
+    def get(self, container_id: str) -> FakeContainer:
+        for container in self.containers.values():
+            if container_id in (container.id, container.name):
+                return container
+        raise docker.errors.NotFound(f"No such container: {container_id}")
+
+    def list(self, all: bool = False) -> List[FakeContainer]:
+        return [container for container in self.containers.values() if all or container.status == "running"]
+
+class FakeDockerClient:
+    """Docker client whose calls take ``latencies[call] * scale`` seconds."""
+
+    def __init__(self,
+                 latencies: Optional[Dict[str, float]] = None,
+                 scale: float = 0.0,
+                 runner: Callable[[FakeContainer, List[str]], Tuple[int, bytes]] = print_source):
+        self.latencies = {**DOCKER_LATENCIES, **(latencies or {})}
+        self.scale = scale
+        self.runner = runner
+        self.calls: Counter = Counter()
+        self.images = FakeImages(self)
+        self.containers = FakeContainers(self)
+
+    def _call(self, name: str):
+        self.calls[name] += 1
+        delay = self.latencies.get(name, 0.0) * self.scale
+        if delay:
+            time.sleep(delay)
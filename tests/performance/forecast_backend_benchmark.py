@@ -0,0 +1,170 @@
+"""Forecasting backend accuracy and latency benchmark.
+
+Replays usage traces through each forecasting backend the optimization
+strategies can use, with a rolling origin: the model is fitted on the first
+``--train-days`` days, then after every day it is updated with that day's
+samples (refitted every ``--refit-every`` days, as the forecast registry
+does) and its next-day forecast is scored against what followed.
+
+    seasonal_naive  - average of the last days at each time of day (NumPy)
+    holt_winters    - additive damped Holt-Winters (NumPy, the default)
+    prophet         - Prophet (opt-in)
+    ensemble        - Prophet, LSTM and XGBoost combined (opt-in)
+
+Traces are JSON lists of ``{"timestamp": ..., "usage": ...}`` samples, as
+recorded in a ``UsageHistoryStore``. Without ``--trace``, synthetic traces
+with daily, weekly, trend and burst components are used. Backends whose
+libraries are not installed are reported as unavailable.
+
+Usage:
+    python -m tests.performance.forecast_backend_benchmark --days 42
+    python -m tests.performance.forecast_backend_benchmark --trace compute.json --trace queue.json
+"""
+import argparse
+import importlib
+import json
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Callable
+
+import numpy as np
+
+from src.core.services.forecast_registry import Forecaster
+from src.core.services.statistical_forecast import FORECAST_HORIZON, HoltWintersForecaster, SeasonalNaiveForecaster, daily_season_length
+from src.core.services.usage_history import UsageSeries
+
+def synthetic_traces(days: int, seed: int = 0) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Hourly traces shaped like the resources the strategies manage"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(days * 24)
+    hour = t % 24
+    weekday = (t // 24) % 7
+    timestamps = np.datetime64("2024-01-01T00:00", "us") + t * np.timedelta64(1, "h")
+    business = ((hour >= 9) & (hour < 18) & (weekday < 5)).astype(float)
+    bursts = rng.random(len(t)) < 0.02
+    return {
+        "web_compute": (timestamps, 40 + 20 * np.sin(2 * np.pi * (hour - 8) / 24) - 8 * (weekday >= 5) + rng.normal(0, 3, len(t))),
+        "business_database": (timestamps, 20 + 45 * business + rng.normal(0, 4, len(t))),
+        "growing_storage": (timestamps, 100 + 0.05 * t + 2 * np.sin(2 * np.pi * hour / 24) + rng.normal(0, 0.5, len(t)).cumsum() * 0.1),
+        "bursty_queue": (timestamps, 10 + 5 * np.sin(2 * np.pi * hour / 24) + 40 * bursts + rng.normal(0, 2, len(t))),
+    }
+
+def load_trace(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    series = UsageSeries.from_records(json.loads(Path(path).read_text()))
+    return series.timestamps.copy(), series.column("usage").copy()
+
+class EnsembleForecaster(Forecaster):
+    """Prophet, LSTM and XGBoost combined the way the strategies combine them"""
+
+    name = "ensemble"
+
+    def __init__(self):
+        from src.core.services.ml_forecast import ProphetForecaster, LSTMForecaster, XGBoostForecaster
+        from src.core.services.resource_optimization_strategies import OptimizationStrategy
+        self.forecasters = [ProphetForecaster(), LSTMForecaster(), XGBoostForecaster()]
+        self.strategy = OptimizationStrategy("benchmark", {}, {}, {})
+
+    def fit(self, timestamps, values):
+        fitted = [forecaster.fit(timestamps, values) for forecaster in self.forecasters]
+        return [model for model, _ in fitted], self.strategy._combine_forecasts(*(forecast for _, forecast in fitted))
+
+    def update(self, models, timestamps, values, new_samples):
+        fitted = [forecaster.update(model, timestamps, values, new_samples)
+                  for forecaster, model in zip(self.forecasters, models)]
+        return [model for model, _ in fitted], self.strategy._combine_forecasts(*(forecast for _, forecast in fitted))
+
+def prophet_forecaster() -> Forecaster:
+    from src.core.services.ml_forecast import ProphetForecaster
+    return ProphetForecaster()
+
+BACKENDS: Dict[str, Tuple[str, Callable[[], Forecaster]]] = {
+    "seasonal_naive": ("src.core.services.statistical_forecast", SeasonalNaiveForecaster),
+    "holt_winters": ("src.core.services.statistical_forecast", HoltWintersForecaster),
+    "prophet": ("src.core.services.ml_forecast", prophet_forecaster),
+    "ensemble": ("src.core.services.ml_forecast", EnsembleForecaster),
+}
+
+def load_backend(name: str) -> Dict[str, Any]:
+    """Import a backend's module, timing the import and the memory it adds"""
+    module, factory = BACKENDS[name]
+    loaded = module in sys.modules
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    try:
+        importlib.import_module(module)
+        forecaster = factory()
+    except ImportError as e:
+        return {"error": f"unavailable: {e}"}
+    return {
+        "forecaster": forecaster,
+        "import_seconds": 0.0 if loaded else round(time.perf_counter() - started, 3),
+        "import_max_rss_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024, 1),
+    }
+
+def evaluate(forecaster: Forecaster, timestamps: np.ndarray, values: np.ndarray, train_days: int, refit_every: int) -> Dict[str, Any]:
+    season = daily_season_length(timestamps)
+    errors, coverage, fit_seconds, update_seconds = [], [], [], []
+    model = None
+    for index, origin in enumerate(range(train_days * season, len(values) - FORECAST_HORIZON + 1, season)):
+        started = time.perf_counter()
+        if model is None or index % refit_every == 0:
+            model, forecast = forecaster.fit(timestamps[:origin], values[:origin])
+            fit_seconds.append(time.perf_counter() - started)
+        else:
+            model, forecast = forecaster.update(model, timestamps[:origin], values[:origin], season)
+            update_seconds.append(time.perf_counter() - started)
+
+        records = forecast["forecast"][-FORECAST_HORIZON:]
+        actual = values[origin:origin + FORECAST_HORIZON]
+        yhat = np.array([record["yhat"] for record in records])
+        errors.append(actual - yhat)
+        coverage.append((actual >= [record["yhat_lower"] for record in records]) &
+                        (actual <= [record["yhat_upper"] for record in records]))
+
+    errors = np.concatenate(errors)
+    return {
+        "forecasts": len(coverage),
+        "mae": round(float(np.mean(np.abs(errors))), 3),
+        "rmse": round(float(np.sqrt(np.mean(errors ** 2))), 3),
+        "interval_coverage": round(float(np.mean(np.concatenate(coverage))), 3),
+        "fit_ms": round(float(np.median(fit_seconds)) * 1000, 2),
+        "update_ms": round(float(np.median(update_seconds)) * 1000, 2) if update_seconds else None,
+    }
+
+def run_benchmark(traces: Dict[str, Tuple[np.ndarray, np.ndarray]],
+                  backends: List[str],
+                  train_days: int = 28,
+                  refit_every: int = 7) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for name in backends:
+        loaded = load_backend(name)
+        if "error" in loaded:
+            results[name] = loaded["error"]
+            continue
+        results[name] = {
+            "import_seconds": loaded["import_seconds"],
+            "import_max_rss_mb": loaded["import_max_rss_mb"],
+            "traces": {
+                trace: evaluate(loaded["forecaster"], timestamps, values, train_days, refit_every)
+                for trace, (timestamps, values) in traces.items()
+            },
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark forecasting backends on usage traces")
+    parser.add_argument("--trace", action="append", default=[], help="JSON list of usage samples; repeatable")
+    parser.add_argument("--days", type=int, default=42, help="Length of the synthetic traces")
+    parser.add_argument("--train-days", type=int, default=28)
+    parser.add_argument("--refit-every", type=int, default=7)
+    parser.add_argument("--backend", action="append", choices=list(BACKENDS), help="Backends to run; all by default")
+    args = parser.parse_args()
+
+    traces = {Path(path).stem: load_trace(path) for path in args.trace} or synthetic_traces(args.days)
+    results = run_benchmark(traces, args.backend or list(BACKENDS), args.train_days, args.refit_every)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Import graph index benchmark for the self-improvement context system.
+
+Generates a synthetic project (5k files by default) of packages whose
+modules import each other with absolute and relative imports, then times:
+
+    cold_build        - first refresh, parsing every file (process pool)
+    warm_start        - a new index loading the saved graph, nothing changed
+    noop_refresh      - refresh on an up-to-date index (mtime scan only)
+    incremental       - refresh after editing a handful of files
+    lookup            - dependencies + dependents for one file
+
+and compares them with the previous approach, which for one ``get_context``
+re-parsed every file and ran a project-wide ``rglob`` per import. That cost
+is measured for a sample of files and extrapolated to the whole tree.
+
+Usage:
+    python -m tests.performance.import_graph_benchmark --files 5000
+"""
+import argparse
+import ast
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Set
+
+from src.tools.self_improvement.import_graph import ImportGraphIndex
+
+def build_tree(root: Path, file_count: int, modules_per_package: int, imports_per_file: int, seed: int) -> None:
+    """Write packages of modules importing random peers"""
+    rng = random.Random(seed)
+    package_count = max(1, file_count // modules_per_package)
+    modules = [(f"pkg{p}", f"mod{m}") for p in range(package_count) for m in range(modules_per_package)]
+
+    for p in range(package_count):
+        (root / "project" / f"pkg{p}").mkdir(parents=True)
+        (root / "project" / f"pkg{p}" / "__init__.py").write_text("")
+
+    for package, module in modules:
+        lines = ["import os", "import json"]
+        for target_package, target_module in rng.sample(modules, imports_per_file):
+            if target_package == package:
+                lines.append(f"from .{target_module} import helper")
+            else:
+                lines.append(f"from project.{target_package}.{target_module} import helper")
+        lines.append("")
+        lines.append("def helper(value):")
+        lines.append("    return value")
+        (root / "project" / package / f"{module}.py").write_text("\n".join(lines) + "\n")
+
+def legacy_dependencies(project_dir: Path, file_path: str) -> Set[str]:
+    """Dependency lookup as previously done by ContextAwareFixSystem"""
+    with open(file_path) as f:
+        tree = ast.parse(f.read())
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend(name.name for name in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append(node.module)
+
+    dependencies = set()
+    for imp in imports:
+        for path in project_dir.rglob("*.py"):
+            if path.stem == imp:
+                dependencies.add(str(path))
+                break
+    return dependencies
+
+def timed(func, *args) -> float:
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+def run_benchmark(
+    file_count: int = 5000,
+    modules_per_package: int = 50,
+    imports_per_file: int = 6,
+    edits: int = 10,
+    legacy_sample: int = 3,
+    workers: Optional[int] = None,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """Build a synthetic tree and time index operations against the old scan"""
+    root = Path(tempfile.mkdtemp(prefix="import_graph_bench_"))
+    try:
+        build_tree(root, file_count, modules_per_package, imports_per_file, seed)
+        project_dir = root / "project"
+        cache_path = str(root / "import_graph.json")
+
+        index = ImportGraphIndex(str(project_dir), cache_path=cache_path, workers=workers)
+        cold_build = timed(index.refresh)
+        noop_refresh = timed(index.refresh)
+
+        warm_index = ImportGraphIndex(str(project_dir), cache_path=cache_path, workers=workers)
+        warm_start = timed(warm_index.refresh)
+
+        rng = random.Random(seed)
+        files = sorted(project_dir.rglob("mod*.py"))
+        for path in rng.sample(files, edits):
+            with open(path, "a") as f:
+                f.write("\nfrom . import mod0\n")
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        incremental = timed(index.refresh)
+
+        target = str(files[0])
+        started = time.perf_counter()
+        for _ in range(1000):
+            index.dependencies(target)
+            index.dependents(target)
+        lookup = (time.perf_counter() - started) / 1000
+
+        # One get_context used to run legacy_dependencies for every file in the project
+        started = time.perf_counter()
+        for path in files[:legacy_sample]:
+            legacy_dependencies(project_dir, str(path))
+        legacy_per_file = (time.perf_counter() - started) / legacy_sample
+
+        edges = sum(len(targets) for targets in index.dependencies_of.values())
+        return {
+            "files": len(index.files),
+            "edges": edges,
+            "cold_build_seconds": round(cold_build, 3),
+            "warm_start_seconds": round(warm_start, 3),
+            "noop_refresh_seconds": round(noop_refresh, 3),
+            "incremental_refresh_seconds": round(incremental, 3),
+            "edited_files": edits,
+            "lookup_microseconds": round(lookup * 1e6, 2),
+            "legacy_seconds_per_file": round(legacy_per_file, 3),
+            "legacy_get_context_estimate_seconds": round(legacy_per_file * len(files), 1),
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the self-improvement import graph index")
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--modules-per-package", type=int, default=50)
+    parser.add_argument("--imports-per-file", type=int, default=6)
+    parser.add_argument("--edits", type=int, default=10)
+    parser.add_argument("--legacy-sample", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.files, args.modules_per_package, args.imports_per_file,
+        args.edits, args.legacy_sample, args.workers, args.seed
+    )
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Row throughput of MultiTenantRepository's per-entity and bulk paths on SQLite.
+
+Writes ``--rows`` rows for one tenant of a row-isolated store (with
+``--other-rows`` belonging to a second tenant, so the tenant filter has
+something to exclude) and times each operation both ways:
+
+    create   - ``create`` per entity versus ``bulk_create``
+    upsert   - ``update`` per entity versus ``bulk_upsert``
+    read     - ``get_all`` versus streaming ``iter_all``, with peak memory
+    delete   - ``delete`` per id versus ``bulk_delete``
+
+The per-entity paths commit once per row, so they run on the first
+``--single-rows`` rows only and are reported as rows per second.
+
+Usage:
+    python -m tests.performance.multi_tenant_bulk_benchmark --rows 50000 --single-rows 2000 --db /tmp/tenants.db
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+from typing import Dict, Any
+
+import sqlalchemy as sa
+from sqlalchemy.orm import declarative_base
+
+from src.core.storage.multi_tenant_store import MultiTenantStore, TenantIsolationStrategy
+
+Base = declarative_base()
+
+class Record(Base):
+    __tablename__ = "records"
+    id = sa.Column(sa.Integer, primary_key=True)
+    tenant_id = sa.Column(sa.String, nullable=False, index=True)
+    name = sa.Column(sa.String)
+    payload = sa.Column(sa.String)
+
+def timed(action) -> float:
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+def throughput(rows: int, seconds: float) -> Dict[str, Any]:
+    return {"rows": rows, "seconds": round(seconds, 3), "rows_per_second": round(rows / seconds) if seconds else None}
+
+def peak_memory(action) -> int:
+    tracemalloc.start()
+    action()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def run_benchmark(rows: int = 50000, single_rows: int = 2000, other_rows: int = 10000, db: str = "/tmp/tenants.db") -> Dict[str, Any]:
+    if os.path.exists(db):
+        os.remove(db)
+    store = MultiTenantStore(f"sqlite:///{db}", isolation_strategy=TenantIsolationStrategy.ROW_BASED)
+    store.set_tenant_context("other")
+    Base.metadata.create_all(store.connection_manager.get_engine("other"))
+    records = store.get_repository(Record)
+    records.bulk_create({"id": rows + number, "name": f"other {number}"} for number in range(other_rows))
+    store.set_tenant_context("tenant")
+
+    def values(start, count, suffix):
+        return ({"id": number, "name": f"record {number}", "payload": f"{suffix} {number}" * 4} for number in range(start, start + count))
+
+    def create_each():
+        for row in values(0, single_rows, "created"):
+            records.create(Record(**row))
+
+    def update_each():
+        for row in values(0, single_rows, "updated"):
+            records.update(Record(tenant_id="tenant", **row))
+
+    def delete_each():
+        for number in range(single_rows):
+            records.delete(number)
+
+    results = {
+        "create": {
+            "single": throughput(single_rows, timed(create_each)),
+            "bulk": throughput(rows - single_rows, timed(lambda: records.bulk_create(values(single_rows, rows - single_rows, "created")))),
+        },
+        "upsert": {
+            "single": throughput(single_rows, timed(update_each)),
+            "bulk": throughput(rows, timed(lambda: records.bulk_upsert(values(0, rows, "upserted")))),
+        },
+        "read": {
+            "get_all": {**throughput(rows, timed(records.get_all)), "peak_bytes": peak_memory(records.get_all)},
+            "iter_all": {
+                **throughput(rows, timed(lambda: sum(1 for _ in records.iter_all()))),
+                "peak_bytes": peak_memory(lambda: sum(1 for _ in records.iter_all())),
+            },
+        },
+        "delete": {
+            "single": throughput(single_rows, timed(delete_each)),
+            "bulk": throughput(rows - single_rows, timed(lambda: records.bulk_delete(range(single_rows, rows)))),
+        },
+    }
+    store.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-entity and bulk multi-tenant repository throughput")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--single-rows", type=int, default=2000, help="Rows written through the per-entity methods")
+    parser.add_argument("--other-rows", type=int, default=10000, help="Rows belonging to another tenant")
+    parser.add_argument("--db", default="/tmp/tenants.db")
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.rows, args.single_rows, args.other_rows, args.db), indent=2))
+
+if __name__ == "__main__":
+    main()
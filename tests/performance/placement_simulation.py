@@ -0,0 +1,256 @@
+"""Makespan simulation for locality-aware placement and work stealing.
+
+Streams tasks through the distributed task scheduler on a simulated cluster,
+with Poisson arrivals at a target utilisation. Each node has a fixed number of
+execution slots and a small LRU cache of scripts; running a script the node
+has not cached first pays a fetch cost. Task durations are heavy tailed, so
+some nodes end up with long local queues while others go idle.
+
+Three policies are compared:
+    least_loaded  - the scheduler without advertised digests (previous policy)
+    locality      - nodes advertise cached digests and tasks prefer them
+    locality_steal - locality plus idle nodes stealing half a busy peer's queue
+
+Usage:
+    python -m tests.performance.placement_simulation --nodes 50 --tasks 5000
+"""
+import argparse
+import heapq
+import json
+import math
+import random
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, Any, List, Tuple
+
+from src.core.distributed.executor import TaskInfo
+from src.core.distributed.scheduler import TaskScheduler
+
+POLICIES = ["least_loaded", "locality", "locality_steal"]
+
+class SimNode:
+    """A simulated worker with execution slots, a local queue and a script cache"""
+
+    def __init__(self, node_id: str, slots: int, cache_size: int):
+        self.node_id = node_id
+        self.slots = slots
+        self.cache_size = cache_size
+        self.running = 0
+        self.queue: deque = deque()
+        self.cache: OrderedDict = OrderedDict()
+
+    def cache_script(self, script_id: str) -> bool:
+        """Load a script into the cache, returning True if it was already there"""
+        hit = script_id in self.cache
+        self.cache[script_id] = True
+        self.cache.move_to_end(script_id)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return hit
+
+def build_tasks(
+    task_count: int,
+    script_count: int,
+    arrival_rate: float,
+    rng: random.Random
+) -> Tuple[List[Tuple[float, TaskInfo]], Dict[str, float]]:
+    """Create arriving tasks with Zipf-distributed scripts and heavy-tailed durations"""
+    weights = [1.0 / (rank + 1) for rank in range(script_count)]
+    scripts = [f"script_{i}" for i in range(script_count)]
+    now = datetime.now()
+    tasks = []
+    durations = {}
+    arrival = 0.0
+    for i in range(task_count):
+        arrival += rng.expovariate(arrival_rate)
+        task = TaskInfo(
+            task_id=f"task_{i}",
+            script_id=rng.choices(scripts, weights)[0],
+            node_id=None,
+            status="pending",
+            priority=0,
+            created_at=now,
+            started_at=None,
+            completed_at=None,
+            result=None,
+            error=None,
+            requirements={"capabilities": ["python"], "memory": 256}
+        )
+        tasks.append((arrival, task))
+        durations[task.task_id] = rng.lognormvariate(0.0, 1.0)
+    return tasks, durations
+
+def simulate(
+    policy: str,
+    tasks: List[Tuple[float, TaskInfo]],
+    durations: Dict[str, float],
+    node_count: int,
+    slots: int,
+    queue_depth: int,
+    cache_size: int,
+    fetch_cost: float,
+    steal_min_backlog: int = 4
+) -> Dict[str, Any]:
+    """Run one policy to completion and report makespan and cache behaviour"""
+    locality = policy != "least_loaded"
+    stealing = policy == "locality_steal"
+
+    scheduler = TaskScheduler()
+    nodes = {f"node_{i}": SimNode(f"node_{i}", slots, cache_size) for i in range(node_count)}
+    for node in nodes.values():
+        scheduler.update_node(
+            node.node_id, ["python"], max_load=slots + queue_depth,
+            load=0.0, available_memory=1 << 30, digests=[] if locality else None
+        )
+
+    events: List[Tuple[float, int, str, TaskInfo]] = []
+    seq = 0
+    now = 0.0
+    done = 0
+    hits = 0
+    steals = 0
+    fetch_time = 0.0
+    latencies = []
+    arrivals = {task.task_id: arrival for arrival, task in tasks}
+    next_arrival = 0
+
+    def report(node: SimNode):
+        # As in a worker's heartbeat, the load counts every task the node holds
+        scheduler.update_node(
+            node.node_id, ["python"], max_load=slots + queue_depth,
+            load=node.running + len(node.queue), available_memory=1 << 30,
+            digests=node.cache.keys() if locality else None
+        )
+
+    def start_ready(node: SimNode):
+        nonlocal seq, hits, fetch_time
+        started = False
+        while node.running < node.slots and node.queue:
+            task = node.queue.popleft()
+            hit = node.cache_script(task.script_id)
+            hits += hit
+            cost = 0.0 if hit else fetch_cost
+            fetch_time += cost
+            node.running += 1
+            seq += 1
+            heapq.heappush(events, (now + cost + durations[task.task_id], seq, node.node_id, task))
+            started = True
+        if started:
+            report(node)
+
+    def steal_for(thief: SimNode):
+        nonlocal steals
+        free = thief.slots - thief.running
+        if free <= 0 or thief.queue:
+            return
+        victim = max(nodes.values(), key=lambda node: len(node.queue))
+        if not victim.queue:
+            return
+        # Take scripts the thief already caches; others only from a long backlog
+        candidates = [task for task in reversed(victim.queue) if task.script_id in thief.cache]
+        if len(victim.queue) >= steal_min_backlog:
+            candidates += [task for task in reversed(victim.queue) if task.script_id not in thief.cache]
+        for task in candidates[:min(free, max(1, len(victim.queue) // 2))]:
+            victim.queue.remove(task)
+            scheduler.release(victim.node_id, task)
+            scheduler.reserve(thief.node_id, task)
+            thief.queue.append(task)
+            steals += 1
+        report(victim)
+        start_ready(thief)
+
+    while done < len(tasks):
+        # Admit everything that has arrived by now
+        pending = []
+        while next_arrival < len(tasks) and tasks[next_arrival][0] <= now:
+            pending.append(tasks[next_arrival][1])
+            next_arrival += 1
+
+        for task, node_id in scheduler.schedule(pending):
+            nodes[node_id].queue.append(task)
+
+        for node in nodes.values():
+            start_ready(node)
+        if stealing:
+            for node in nodes.values():
+                steal_for(node)
+
+        # Advance to the next arrival or completion
+        next_time = tasks[next_arrival][0] if next_arrival < len(tasks) else float("inf")
+        if not events or next_time < events[0][0]:
+            now = next_time
+            continue
+
+        now, _, node_id, task = heapq.heappop(events)
+        finished = [(node_id, task)]
+        while events and events[0][0] == now:
+            _, _, node_id, task = heapq.heappop(events)
+            finished.append((node_id, task))
+
+        for node_id, task in finished:
+            nodes[node_id].running -= 1
+            scheduler.release(node_id, task)
+            latencies.append(now - arrivals[task.task_id])
+            done += 1
+        for node_id in {node_id for node_id, _ in finished}:
+            report(nodes[node_id])
+
+    return {
+        "policy": policy,
+        "makespan": round(now, 2),
+        "mean_task_latency": round(sum(latencies) / len(latencies), 2),
+        "cache_hit_rate": round(hits / len(tasks), 3),
+        "fetch_time": round(fetch_time, 2),
+        "steals": steals,
+    }
+
+def run_simulation(
+    node_count: int = 50,
+    task_count: int = 5000,
+    script_count: int = 200,
+    slots: int = 4,
+    queue_depth: int = 4,
+    cache_size: int = 20,
+    fetch_cost: float = 2.0,
+    utilization: float = 0.8,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """Run every policy over the same workload
+    
+    The arrival rate is set so the cluster would be ``utilization`` busy if
+    every script were already cached.
+    """
+    mean_duration = math.exp(0.5)  # Mean of lognormvariate(0, 1)
+    arrival_rate = utilization * node_count * slots / mean_duration
+    tasks, durations = build_tasks(task_count, script_count, arrival_rate, random.Random(seed))
+    return {
+        "nodes": node_count,
+        "tasks": task_count,
+        "arrival_rate": round(arrival_rate, 2),
+        "results": [
+            simulate(policy, tasks, durations, node_count, slots, queue_depth, cache_size, fetch_cost)
+            for policy in POLICIES
+        ],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate makespan under different placement policies")
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--scripts", type=int, default=200)
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--queue-depth", type=int, default=4)
+    parser.add_argument("--cache-size", type=int, default=20)
+    parser.add_argument("--fetch-cost", type=float, default=2.0)
+    parser.add_argument("--utilization", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = run_simulation(
+        args.nodes, args.tasks, args.scripts, args.slots, args.queue_depth,
+        args.cache_size, args.fetch_cost, args.utilization, args.seed
+    )
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
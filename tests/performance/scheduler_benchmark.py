@@ -0,0 +1,222 @@
+"""Placement benchmark for the distributed task scheduler.
+
+Simulates a cluster of worker nodes with mixed capabilities receiving a stream
+of tasks, and reports placement throughput and latency for the batch
+scheduler alongside the previous linear-scan policy on the same workload.
+
+Usage:
+    python -m tests.performance.scheduler_benchmark --nodes 500 --tasks 10000
+"""
+import argparse
+import heapq
+import json
+import random
+import statistics
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.core.distributed.executor import TaskInfo
+from src.core.distributed.scheduler import TaskScheduler, task_capabilities, task_memory
+
+FEATURE_SETS = [
+    ["python"],
+    ["python", "docker"],
+    ["python", "docker", "gpu"],
+    ["python", "node"],
+]
+
+REQUIREMENTS = [
+    (["python"], 0.6),
+    (["python", "docker"], 0.25),
+    (["python", "gpu"], 0.1),
+    (["node"], 0.05),
+]
+
+def build_cluster(node_count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Create node descriptions with random features and capacity"""
+    return [
+        {
+            "node_id": f"node_{i}",
+            "features": rng.choice(FEATURE_SETS),
+            "max_load": rng.randint(4, 16),
+            "memory": rng.choice([4096, 8192, 16384]),
+        }
+        for i in range(node_count)
+    ]
+
+def build_tasks(task_count: int, rng: random.Random) -> List[TaskInfo]:
+    """Create tasks with weighted capability requirements"""
+    capabilities, weights = zip(*REQUIREMENTS)
+    now = datetime.now()
+    return [
+        TaskInfo(
+            task_id=f"task_{i}",
+            script_id=f"script_{i % 100}",
+            node_id=None,
+            status="pending",
+            priority=rng.randint(0, 5),
+            created_at=now,
+            started_at=None,
+            completed_at=None,
+            result=None,
+            error=None,
+            requirements={
+                "capabilities": rng.choices(capabilities, weights)[0],
+                "memory": rng.choice([256, 512, 1024]),
+            }
+        )
+        for i in range(task_count)
+    ]
+
+class LinearScanPolicy:
+    """The previous policy: scan every node and pick the lowest load"""
+
+    def __init__(self, nodes: List[Dict[str, Any]]):
+        self.nodes = {
+            node["node_id"]: {
+                "features": set(node["features"]),
+                "max_load": node["max_load"],
+                "load": 0,
+                "memory": node["memory"],
+            }
+            for node in nodes
+        }
+        self.waiting: List[TaskInfo] = []
+
+    def schedule(self, tasks: List[TaskInfo]) -> List[Tuple[TaskInfo, str]]:
+        assignments = []
+        pending, self.waiting = self.waiting + list(tasks), []
+        for task in pending:
+            node_id = self._find_suitable_node(task)
+            if node_id is None:
+                self.waiting.append(task)
+                continue
+            self.nodes[node_id]["load"] += 1
+            self.nodes[node_id]["memory"] -= task_memory(task)
+            assignments.append((task, node_id))
+        return assignments
+
+    def release(self, node_id: str, task: TaskInfo):
+        self.nodes[node_id]["load"] -= 1
+        self.nodes[node_id]["memory"] += task_memory(task)
+
+    def _find_suitable_node(self, task: TaskInfo) -> Optional[str]:
+        required = task_capabilities(task)
+        memory = task_memory(task)
+        suitable = [
+            (node_id, node) for node_id, node in self.nodes.items()
+            if required <= node["features"]
+            and node["load"] < node["max_load"]
+            and node["memory"] >= memory
+        ]
+        if not suitable:
+            return None
+        return min(suitable, key=lambda item: item[1]["load"])[0]
+
+class BatchPolicy:
+    """Adapter exposing the batch scheduler with the benchmark interface"""
+
+    def __init__(self, nodes: List[Dict[str, Any]]):
+        self.scheduler = TaskScheduler()
+        for node in nodes:
+            self.scheduler.update_node(
+                node["node_id"], node["features"], node["max_load"],
+                load=0.0, available_memory=node["memory"]
+            )
+
+    def schedule(self, tasks: List[TaskInfo]) -> List[Tuple[TaskInfo, str]]:
+        return self.scheduler.schedule(tasks)
+
+    def release(self, node_id: str, task: TaskInfo):
+        self.scheduler.release(node_id, task)
+
+def simulate(policy, tasks: List[TaskInfo], batch_size: int, rng: random.Random) -> Dict[str, Any]:
+    """Feed tasks to a policy in arrival batches, completing work in simulated time
+
+    Each simulated tick delivers one batch of tasks and completes every task
+    whose runtime has elapsed, which is what frees capacity for waiting tasks.
+    """
+    running: List[Tuple[int, int, str, TaskInfo]] = []
+    arrival_tick: Dict[str, int] = {}
+    call_latencies: List[float] = []
+    queue_delays: List[int] = []
+    scheduling_time = 0.0
+    placed = 0
+    tick = 0
+    next_task = 0
+    seq = 0
+
+    while placed < len(tasks):
+        # Complete finished tasks
+        released = []
+        while running and running[0][0] <= tick:
+            _, _, node_id, task = heapq.heappop(running)
+            released.append((node_id, task))
+
+        batch = tasks[next_task:next_task + batch_size]
+        next_task += len(batch)
+        for task in batch:
+            arrival_tick[task.task_id] = tick
+
+        start = time.perf_counter()
+        for node_id, task in released:
+            policy.release(node_id, task)
+        assignments = policy.schedule(batch)
+        elapsed = time.perf_counter() - start
+
+        scheduling_time += elapsed
+        call_latencies.append(elapsed)
+        for task, node_id in assignments:
+            seq += 1
+            heapq.heappush(running, (tick + rng.randint(2, 10), seq, node_id, task))
+            queue_delays.append(tick - arrival_tick[task.task_id])
+        placed += len(assignments)
+        tick += 1
+
+    call_latencies.sort()
+    return {
+        "tasks": len(tasks),
+        "ticks": tick,
+        "scheduling_seconds": round(scheduling_time, 4),
+        "placements_per_second": round(placed / scheduling_time, 1) if scheduling_time else None,
+        "batch_latency_ms": {
+            "mean": round(statistics.mean(call_latencies) * 1000, 3),
+            "p50": round(call_latencies[len(call_latencies) // 2] * 1000, 3),
+            "p99": round(call_latencies[int(len(call_latencies) * 0.99)] * 1000, 3),
+        },
+        "mean_queue_delay_ticks": round(statistics.mean(queue_delays), 3),
+    }
+
+def run_benchmark(
+    node_count: int = 500,
+    task_count: int = 10000,
+    batch_size: int = 1000,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """Run the placement benchmark for both policies"""
+    rng = random.Random(seed)
+    nodes = build_cluster(node_count, rng)
+    tasks = build_tasks(task_count, rng)
+
+    return {
+        "nodes": node_count,
+        "tasks": task_count,
+        "batch_size": batch_size,
+        "batch_scheduler": simulate(BatchPolicy(nodes), tasks, batch_size, random.Random(seed)),
+        "linear_scan": simulate(LinearScanPolicy(nodes), tasks, batch_size, random.Random(seed)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark distributed task placement")
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.nodes, args.tasks, args.batch_size, args.seed)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
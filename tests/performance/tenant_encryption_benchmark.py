@@ -0,0 +1,68 @@
+"""Cost of tenant key setup and of bulk encryption with TenantEncryption.
+
+Times three things:
+
+    setup    - loading the key of ``--tenants`` TenantEncryption objects twice;
+               the first pass derives each key (100,000 PBKDF2 iterations),
+               the second finds it in the key cache
+    encrypt  - ``--values`` strings one ``encrypt`` call at a time versus
+               ``encrypt_many``, inline and on a ``--workers`` thread pool
+    rotate   - ``reencrypt_many`` of the same values after ``rotate_key``
+
+Usage:
+    python -m tests.performance.tenant_encryption_benchmark --tenants 20 --values 100000 --workers 4
+"""
+import argparse
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any
+
+from src.core.storage.multi_tenant_store import TenantEncryption
+
+def timed(action) -> float:
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+def run_benchmark(tenants: int = 20, values: int = 100000, workers: int = 4, secret: str = "benchmark secret") -> Dict[str, Any]:
+    tenant_ids = [str(uuid.uuid4()) for _ in range(tenants)]
+    derive_seconds = timed(lambda: [TenantEncryption(tenant_id, secret=secret).encryption_key for tenant_id in tenant_ids])
+    cached_seconds = timed(lambda: [TenantEncryption(tenant_id, secret=secret).encryption_key for tenant_id in tenant_ids])
+
+    encryption = TenantEncryption(tenant_ids[0], secret=secret)
+    plaintexts = [f"customer-{number}@example.com" for number in range(values)]
+    results = {
+        "setup": {
+            "tenants": tenants,
+            "derived_ms_per_tenant": round(derive_seconds / tenants * 1000, 2),
+            "cached_ms_per_tenant": round(cached_seconds / tenants * 1000, 3),
+        },
+        "encrypt": {
+            "values": values,
+            "single_seconds": round(timed(lambda: [encryption.encrypt(value) for value in plaintexts]), 3),
+            "many_seconds": round(timed(lambda: encryption.encrypt_many(plaintexts)), 3),
+        },
+    }
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results["encrypt"]["many_pool_seconds"] = round(timed(lambda: encryption.encrypt_many(plaintexts, executor)), 3)
+        tokens = encryption.encrypt_many(plaintexts, executor)
+        encryption.rotate_key()
+        results["rotate"] = {
+            "values": values,
+            "reencrypt_seconds": round(timed(lambda: encryption.reencrypt_many(tokens, executor)), 3),
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure tenant key caching and bulk encryption")
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--values", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=4, help="Thread pool size for the batched calls")
+    parser.add_argument("--secret", default="benchmark secret", help="Secret the tenant keys are derived from")
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.tenants, args.values, args.workers, args.secret), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Usage history benchmark.
+
+Feeds a stream of hourly usage samples to the optimization strategies' pattern
+analysis and times each analysis pass in two ways:
+
+    records     - the history is kept as a list of sample dicts and converted
+                  to columns on every call, as every strategy did before
+    store       - samples are appended to a ``UsageHistoryStore`` as they
+                  arrive and each call reads the series' columns and bucket
+                  aggregates directly
+
+Also reports the memory held by each representation once the stream is
+longer than the store's capacity.
+
+Usage:
+    python -m tests.performance.usage_history_benchmark --samples 200000 --capacity 50000
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List
+
+import numpy as np
+
+from src.core.services.usage_history import UsageHistoryStore, UsageSeries, as_usage_series, pct_change, bucket_mean
+
+def make_samples(count: int) -> List[Dict[str, Any]]:
+    start = datetime(2024, 1, 1)
+    rng = np.random.default_rng(0)
+    noise = rng.normal(0, 5, count)
+    return [
+        {
+            "timestamp": (start + timedelta(hours=i)).isoformat(),
+            "usage": 50 + 20 * np.sin(i * np.pi / 12) + noise[i],
+            "hit_rate": 0.8 + noise[i] / 100,
+        }
+        for i in range(count)
+    ]
+
+def analyze(history: UsageSeries) -> Dict[str, Any]:
+    """The work each strategy's pattern analysis does on a history"""
+    usage = history.column("usage")
+    growth = pct_change(usage)
+    return {
+        "daily": history.hourly_mean("usage"),
+        "weekly": history.weekday_mean("usage"),
+        "daily_growth": bucket_mean(growth, history.hours, 24),
+        "hit_rate": float(np.nanmean(history.column("hit_rate"))),
+    }
+
+def records_size(records: List[Dict[str, Any]]) -> int:
+    return sys.getsizeof(records) + sum(
+        sys.getsizeof(record) + sum(sys.getsizeof(value) for value in record.values())
+        for record in records
+    )
+
+def series_size(series: UsageSeries) -> int:
+    buffers = [series._timestamps, series._hours, series._weekdays, *series._columns.values()]
+    return sum(buffer.nbytes for buffer in buffers)
+
+def run_benchmark(samples: int = 200000, capacity: int = 50000, calls: int = 20) -> Dict[str, Any]:
+    stream = make_samples(samples)
+    window = stream[-capacity:]
+
+    started = time.perf_counter()
+    for _ in range(calls):
+        records_result = analyze(as_usage_series(window))
+    records_seconds = (time.perf_counter() - started) / calls
+
+    store = UsageHistoryStore(capacity=capacity)
+    started = time.perf_counter()
+    for offset in range(0, samples, 1000):
+        store.extend("compute", stream[offset:offset + 1000])
+    ingest_seconds = time.perf_counter() - started
+
+    series = store.get("compute")
+    started = time.perf_counter()
+    for _ in range(calls):
+        store_result = analyze(series)
+    store_seconds = (time.perf_counter() - started) / calls
+
+    same = all(
+        np.isclose(records_result["daily"][hour], store_result["daily"][hour])
+        for hour in records_result["daily"]
+    )
+    return {
+        "samples": samples,
+        "capacity": capacity,
+        "records": {
+            "ms_per_analysis": round(records_seconds * 1000, 2),
+            "window_mb": round(records_size(window) / 1e6, 1),
+            "stream_mb": round(records_size(stream) / 1e6, 1),
+        },
+        "store": {
+            "ms_per_analysis": round(store_seconds * 1000, 3),
+            "ingest_us_per_sample": round(ingest_seconds / samples * 1e6, 2),
+            "mb": round(series_size(series) / 1e6, 1),
+            "kept_samples": len(series),
+        },
+        "speedup": round(records_seconds / store_seconds, 1),
+        "same_result": bool(same),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-call conversion vs the shared usage history store")
+    parser.add_argument("--samples", type=int, default=200000)
+    parser.add_argument("--capacity", type=int, default=50000)
+    parser.add_argument("--calls", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.samples, args.capacity, args.calls), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Improvement execution throughput benchmark.
+
+Creates a synthetic git repository and runs a batch of improvements, each
+rewriting one file after a simulated fix generation and validation delay,
+in two ways:
+
+    serial      - the previous flow: for each suggestion create and check out
+                  a branch, apply, commit, check out the main branch and
+                  merge, one suggestion at a time
+    worktrees   - ``WorktreeRunner``: suggestions on distinct files run
+                  concurrently in temporary worktrees and each wave is
+                  merged in one pass
+
+``--shared`` makes that many suggestions target the same few files, so they
+must run in successive waves.
+
+Usage:
+    python -m tests.performance.worktree_execution_benchmark --suggestions 50 --work-seconds 0.5
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+from src.tools.self_improvement.worktrees import WorktreeRunner, WorktreeTask, plan_waves
+
+def git(repo: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+
+def build_repo(root: Path, file_count: int) -> Path:
+    """Write a repository of small modules under current/ and commit it"""
+    repo = root / "repo"
+    (repo / "current").mkdir(parents=True)
+    for i in range(file_count):
+        (repo / "current" / f"module{i}.py").write_text(
+            "\n".join(f"def function_{j}(value):\n    return value + {j}\n" for j in range(20))
+        )
+    git(repo, "init", "-q", "-b", "main")
+    git(repo, "config", "user.email", "bench@example.com")
+    git(repo, "config", "user.name", "Benchmark")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "Initial commit")
+    return repo
+
+def targets_for(suggestions: int, shared: int) -> List[str]:
+    """Target file of each suggestion; the first ``shared`` reuse three files"""
+    return [f"current/module{i % 3 if i < shared else i}.py" for i in range(suggestions)]
+
+async def apply_improvement(path: Path, index: int, work_seconds: float) -> None:
+    # Stands in for fix generation and validation, dominated by waiting on tools
+    await asyncio.sleep(work_seconds)
+    with open(path, "a") as f:
+        f.write(f"\n# improvement {index}\n")
+
+async def run_serial(repo: Path, targets: List[str], work_seconds: float) -> float:
+    started = time.perf_counter()
+    for index, target in enumerate(targets):
+        branch = f"improvement/serial_{index}"
+        git(repo, "checkout", "-q", "-b", branch)
+        await apply_improvement(repo / target, index, work_seconds)
+        git(repo, "add", target)
+        git(repo, "commit", "-q", "-m", f"Applied improvement {index}")
+        git(repo, "checkout", "-q", "main")
+        git(repo, "merge", "-q", branch)
+    return time.perf_counter() - started
+
+async def run_worktrees(repo: Path, targets: List[str], work_seconds: float, max_parallel: int) -> Dict[str, Any]:
+    runner = WorktreeRunner(str(repo), max_parallel=max_parallel)
+    tasks = [
+        WorktreeTask(item=index, files={target}, branch=f"improvement/parallel_{index}")
+        for index, target in enumerate(targets)
+    ]
+
+    async def execute(task, worktree):
+        await apply_improvement(worktree / targets[task.item], task.item, work_seconds)
+        return task.item, f"Applied improvement {task.item}"
+
+    started = time.perf_counter()
+    outcomes = await runner.run(tasks, execute)
+    return {
+        "seconds": time.perf_counter() - started,
+        "waves": len(plan_waves(tasks, max_parallel)),
+        "merged": sum(outcome.merged for outcome in outcomes),
+    }
+
+async def run_benchmark(
+    suggestions: int = 50,
+    files: int = 200,
+    work_seconds: float = 0.5,
+    max_parallel: int = 16,
+    shared: int = 0
+) -> Dict[str, Any]:
+    """Time both flows on identical fresh repositories"""
+    targets = targets_for(suggestions, shared)
+    root = Path(tempfile.mkdtemp(prefix="worktree_bench_"))
+    try:
+        serial_seconds = await run_serial(build_repo(root / "serial", files), targets, work_seconds)
+        parallel_repo = build_repo(root / "parallel", files)
+        parallel = await run_worktrees(parallel_repo, targets, work_seconds, max_parallel)
+        # Both flows must leave the same files behind
+        serial_tree = git(root / "serial" / "repo", "rev-parse", "HEAD^{tree}")
+        parallel_tree = git(parallel_repo, "rev-parse", "HEAD^{tree}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        "suggestions": suggestions,
+        "files": files,
+        "work_seconds_per_suggestion": work_seconds,
+        "max_parallel": max_parallel,
+        "serial": {
+            "seconds": round(serial_seconds, 2),
+            "suggestions_per_minute": round(suggestions / serial_seconds * 60, 1),
+        },
+        "worktrees": {
+            "seconds": round(parallel["seconds"], 2),
+            "suggestions_per_minute": round(suggestions / parallel["seconds"] * 60, 1),
+            "waves": parallel["waves"],
+            "merged": parallel["merged"],
+        },
+        "speedup": round(serial_seconds / parallel["seconds"], 2),
+        "same_result": serial_tree == parallel_tree,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial vs worktree-parallel improvement execution")
+    parser.add_argument("--suggestions", type=int, default=50)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--work-seconds", type=float, default=0.5)
+    parser.add_argument("--max-parallel", type=int, default=16)
+    parser.add_argument("--shared", type=int, default=0, help="Suggestions targeting the same three files")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(
+        args.suggestions, args.files, args.work_seconds, args.max_parallel, args.shared
+    ))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import pytest
+import asyncio
+from datetime import datetime
+from aiohttp.test_utils import TestClient, TestServer
+from src.core.distributed.coordinator import Coordinator
+from src.core.distributed.executor import TaskInfo
+from src.core.distributed.transport import RequestBatcher
+
+class FakePeerClient:
+    """Peer client stand-in that records requests and answers every item"""
+
+    def __init__(self, reject=(), fail: bool = False):
+        self.requests = []
+        self.reject = set(reject)
+        self.fail = fail
+
+    async def post(self, host, port, path, payload):
+        self.requests.append((host, port, path, payload))
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("connection refused")
+        items = payload.get("updates", payload.get("tasks", []))
+        return {
+            "status": "success",
+            "results": [
+                {"task_id": item["task_id"], "error": "rejected"}
+                if item["task_id"] in self.reject
+                else {"task_id": item["task_id"], "status": "success"}
+                for item in items
+            ]
+        }
+
+def make_task(task_id: str, priority: int = 1) -> TaskInfo:
+    """Create a pending task"""
+    return TaskInfo(
+        task_id=task_id,
+        script_id=f"script_{task_id}",
+        node_id=None,
+        status="pending",
+        priority=priority,
+        created_at=datetime.now(),
+        started_at=None,
+        completed_at=None,
+        result=None,
+        error=None,
+        requirements={"capabilities": ["python"], "memory": 512}
+    )
+
+def register_node(coordinator: Coordinator, node_id: str, port: int):
+    """Register a node directly with the coordinator"""
+    from src.core.distributed.coordinator import NodeState
+    from src.core.distributed.executor import NodeInfo
+    coordinator.nodes[node_id] = NodeState(
+        info=NodeInfo(
+            id=node_id,
+            host="localhost",
+            port=port,
+            capabilities={"max_load": 10, "memory": 8192, "features": ["python"]},
+            load=0.0,
+            available_memory=8192,
+            status="registered",
+            last_heartbeat=datetime.now()
+        ),
+        tasks=set(),
+        last_heartbeat=datetime.now(),
+        health_status="healthy"
+    )
+    coordinator._sync_scheduler_node(node_id)
+
+@pytest.mark.asyncio
+async def test_batcher_coalesces_concurrent_items_per_peer():
+    """Test concurrent submissions share one request per peer"""
+    client = FakePeerClient()
+    batcher = RequestBatcher(client, "/tasks/status_batch", lambda items: {"updates": items})
+
+    results = await asyncio.gather(
+        *(batcher.submit("a", 1, {"task_id": f"a{i}"}) for i in range(5)),
+        *(batcher.submit("b", 1, {"task_id": f"b{i}"}) for i in range(3))
+    )
+
+    assert len(client.requests) == 2
+    assert sorted(len(payload["updates"]) for *_, payload in client.requests) == [3, 5]
+    assert [result["task_id"] for result in results] == [f"a{i}" for i in range(5)] + [f"b{i}" for i in range(3)]
+
+@pytest.mark.asyncio
+async def test_batcher_flushes_at_max_batch():
+    """Test a full batch is sent without waiting for the flush interval"""
+    client = FakePeerClient()
+    batcher = RequestBatcher(
+        client, "/tasks/status_batch", lambda items: {"updates": items},
+        max_batch=2, flush_interval=10.0
+    )
+
+    await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit("a", 1, {"task_id": f"t{i}"}) for i in range(4))),
+        timeout=1.0
+    )
+
+    assert [len(payload["updates"]) for *_, payload in client.requests] == [2, 2]
+
+@pytest.mark.asyncio
+async def test_batcher_propagates_failures():
+    """Test every submitter sees a failed batch"""
+    batcher = RequestBatcher(FakePeerClient(fail=True), "/x", lambda items: {"updates": items})
+
+    results = await asyncio.gather(
+        *(batcher.submit("a", 1, {"task_id": f"t{i}"}) for i in range(3)),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+@pytest.mark.asyncio
+async def test_assignments_are_sent_in_one_request_per_node():
+    """Test dispatch groups assignments by node and requeues rejected tasks"""
+    coordinator = Coordinator()
+    coordinator.client = FakePeerClient(reject={"t3"})
+    register_node(coordinator, "n1", 9001)
+    register_node(coordinator, "n2", 9002)
+
+    tasks = [make_task(f"t{i}") for i in range(6)]
+    for task in tasks:
+        coordinator.tasks[task.task_id] = task
+    assignments = coordinator.scheduler.schedule(tasks)
+    for task, node_id in assignments:
+        task.node_id = node_id
+        coordinator.nodes[node_id].tasks.add(task.task_id)
+
+    await coordinator._dispatch_assignments(assignments)
+
+    assert len(coordinator.client.requests) == 2
+    assert {path for _, _, path, _ in coordinator.client.requests} == {"/tasks/assign_batch"}
+    assert sum(len(payload["tasks"]) for *_, payload in coordinator.client.requests) == 6
+
+    # The rejected task is released and queued again
+    rejected = coordinator.tasks["t3"]
+    assert rejected.node_id is None
+    assert coordinator.task_queue.qsize() == 1
+
+@pytest.mark.asyncio
+async def test_failed_dispatch_marks_node_unhealthy():
+    """Test an unreachable node is taken out of placement and its tasks requeued"""
+    coordinator = Coordinator()
+    coordinator.client = FakePeerClient(fail=True)
+    register_node(coordinator, "n1", 9001)
+
+    task = make_task("t1")
+    coordinator.tasks["t1"] = task
+    task.node_id = "n1"
+    coordinator.nodes["n1"].tasks.add("t1")
+
+    await coordinator._dispatch_assignments([(task, "n1")])
+
+    assert coordinator.nodes["n1"].health_status == "unhealthy"
+    assert task.node_id is None
+    assert coordinator.task_queue.qsize() == 1
+
+@pytest.mark.asyncio
+async def test_status_batch_applies_updates_and_heartbeat():
+    """Test the status batch endpoint updates tasks and refreshes the node"""
+    coordinator = Coordinator()
+    register_node(coordinator, "n1", 9001)
+    task = make_task("t1")
+    task.node_id = "n1"
+    coordinator.tasks["t1"] = task
+    coordinator.nodes["n1"].tasks.add("t1")
+
+    async with TestClient(TestServer(coordinator.app)) as client:
+        response = await client.post("/tasks/status_batch", json={
+            "node_id": "n1",
+            "heartbeat": {"load": 0.5, "available_memory": 4096, "status": "running"},
+            "updates": [
+                {"task_id": "t1", "status": "completed", "result": {"ok": True}, "error": None},
+                {"task_id": "missing", "status": "completed", "result": None, "error": None}
+            ]
+        })
+        assert response.status == 200
+        data = await response.json()
+
+    assert data["results"] == [
+        {"task_id": "t1", "status": "success"},
+        {"task_id": "missing", "error": "Task not found"}
+    ]
+    assert task.status == "completed"
+    assert task.result == {"ok": True}
+    assert "t1" not in coordinator.nodes["n1"].tasks
+    assert coordinator.nodes["n1"].info.load == 0.5
+    assert coordinator.nodes["n1"].info.available_memory == 4096
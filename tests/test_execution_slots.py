@@ -0,0 +1,178 @@
+import pytest
+import asyncio
+import os
+from aiohttp.test_utils import TestClient, TestServer
+from src.core.distributed.slots import ExecutionSlots, ASYNC_MODE, PROCESS_MODE, execution_mode
+from src.core.distributed.worker import WorkerNode
+
+class FakeScriptManager:
+    """Script manager stand-in whose scripts sleep and record concurrency"""
+
+    def __init__(self, duration: float = 0.1):
+        self.duration = duration
+        self.active = 0
+        self.peak = 0
+        self.stopped = []
+
+    async def execute_script(self, script_id, requirements=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.duration)
+            return {"output": script_id}
+        finally:
+            self.active -= 1
+
+    async def stop_script(self, script_id):
+        self.stopped.append(script_id)
+
+class FakeCoordinatorClient:
+    """Peer client stand-in acknowledging every status update"""
+
+    def __init__(self):
+        self.updates = []
+
+    async def post(self, host, port, path, payload):
+        self.updates.extend(payload.get("updates", []))
+        return {"status": "success", "results": [{"task_id": u["task_id"], "status": "success"} for u in payload.get("updates", [])]}
+
+def make_worker(capabilities, duration: float = 0.1) -> WorkerNode:
+    """Create a worker with fake script execution and coordinator"""
+    worker = WorkerNode(capabilities=capabilities)
+    worker.script_manager = FakeScriptManager(duration)
+    worker.status_batcher.client = FakeCoordinatorClient()
+    return worker
+
+@pytest.mark.asyncio
+async def test_async_slots_bound_concurrency():
+    """Test no more than the configured number of tasks run at once"""
+    slots = ExecutionSlots(async_slots=2, process_slots=1)
+    active = 0
+    peak = 0
+
+    async def job():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+
+    tasks = [slots.spawn(f"t{i}", slots.run(ASYNC_MODE, job)) for i in range(5)]
+    assert slots.load == 5
+
+    await asyncio.gather(*tasks)
+    assert peak == 2
+    assert slots.load == 0
+
+@pytest.mark.asyncio
+async def test_cancel_stops_running_and_waiting_tasks():
+    """Test cancellation reaches tasks holding or waiting for a slot"""
+    slots = ExecutionSlots(async_slots=1, process_slots=1)
+    started = []
+
+    async def job(name):
+        started.append(name)
+        await asyncio.sleep(10)
+
+    running = slots.spawn("running", slots.run(ASYNC_MODE, job, "running"))
+    waiting = slots.spawn("waiting", slots.run(ASYNC_MODE, job, "waiting"))
+    await asyncio.sleep(0.01)
+
+    assert slots.cancel("waiting")
+    assert slots.cancel("running")
+    await asyncio.gather(running, waiting, return_exceptions=True)
+
+    assert started == ["running"]
+    assert slots.load == 0
+    assert not slots.cancel("running")
+
+@pytest.mark.asyncio
+async def test_process_slots_run_in_separate_process():
+    """Test CPU-bound work runs in the process pool"""
+    slots = ExecutionSlots(async_slots=1, process_slots=1)
+    try:
+        pid = await slots.run(PROCESS_MODE, os.getpid)
+        assert pid != os.getpid()
+    finally:
+        await slots.shutdown()
+
+def test_slots_sized_from_capabilities():
+    """Test slot counts follow node capabilities"""
+    slots = ExecutionSlots.from_capabilities({"max_load": 6, "process_slots": 2})
+    assert slots.async_slots == 6
+    assert slots.process_slots == 2
+
+    slots = ExecutionSlots.from_capabilities({"async_slots": 3, "max_load": 1})
+    assert slots.async_slots == 3
+    assert slots.process_slots == 1
+
+    assert execution_mode({"execution": "process"}) == PROCESS_MODE
+    assert execution_mode({}) == ASYNC_MODE
+
+@pytest.mark.asyncio
+async def test_worker_runs_tasks_concurrently_and_reports_load():
+    """Test a worker runs assigned tasks in parallel up to its slots"""
+    worker = make_worker({"max_load": 3, "memory": 4096, "features": ["python"]})
+    processor = asyncio.create_task(worker._process_tasks())
+    try:
+        for i in range(5):
+            worker._accept_task({"task_id": f"t{i}", "script_id": f"s{i}"})
+        await asyncio.sleep(0.02)
+
+        assert worker._heartbeat_payload()["load"] == 5
+        assert sum(task.status == "running" for task in worker.current_tasks.values()) == 3
+
+        await asyncio.wait_for(asyncio.gather(*worker.slots.running.values()), timeout=2)
+        assert worker.script_manager.peak == 3
+        # Reported tasks are no longer tracked by the worker
+        assert worker.current_tasks == {}
+        assert worker._heartbeat_payload()["load"] == 0
+
+        await worker.status_batcher.flush()
+        assert {u["task_id"] for u in worker.status_batcher.client.updates} == {f"t{i}" for i in range(5)}
+    finally:
+        processor.cancel()
+        await worker.slots.shutdown()
+
+@pytest.mark.asyncio
+async def test_worker_forgets_failed_tasks_once_reported():
+    """Test failed tasks leave the current tasks after their status is sent"""
+    worker = make_worker({"max_load": 2, "memory": 4096, "features": ["python"]})
+    async def fail(script_id, requirements=None):
+        raise RuntimeError(f"{script_id} crashed")
+    worker.script_manager.execute_script = fail
+    processor = asyncio.create_task(worker._process_tasks())
+    try:
+        worker._accept_task({"task_id": "t1", "script_id": "s1"})
+        worker._accept_task({"task_id": "t2", "script_id": "s2"})
+        await asyncio.sleep(0.02)
+        await asyncio.wait_for(asyncio.gather(*worker.slots.running.values()), timeout=2)
+
+        assert worker.current_tasks == {}
+        await worker.status_batcher.flush()
+        assert [u["status"] for u in worker.status_batcher.client.updates] == ["failed", "failed"]
+    finally:
+        processor.cancel()
+        await worker.slots.shutdown()
+
+@pytest.mark.asyncio
+async def test_worker_stop_cancels_running_task():
+    """Test /tasks/stop cancels the task cooperatively and reports it"""
+    worker = make_worker({"max_load": 2, "memory": 4096, "features": ["python"]}, duration=10)
+    processor = asyncio.create_task(worker._process_tasks())
+    try:
+        worker._accept_task({"task_id": "t1", "script_id": "s1"})
+        await asyncio.sleep(0.02)
+        assert worker.current_tasks["t1"].status == "running"
+
+        async with TestClient(TestServer(worker.app)) as client:
+            response = await client.post("/tasks/stop", json={"task_id": "t1"})
+            assert response.status == 200
+
+        assert "t1" not in worker.current_tasks
+        assert worker.slots.load == 0
+        assert worker.script_manager.stopped == ["s1"]
+        assert [u["status"] for u in worker.status_batcher.client.updates] == ["stopped"]
+    finally:
+        processor.cancel()
+        await worker.slots.shutdown()
@@ -0,0 +1,128 @@
+import pytest
+import asyncio
+import threading
+
+from src.core.llm.llm_client import ErrorAnalysis, LLMClient
+from src.core.llm.request_coalescer import ErrorAnalysisCoalescer, CoalescerConfig
+
+def _analysis(message: str) -> ErrorAnalysis:
+    return ErrorAnalysis(
+        primary_cause=message,
+        contributing_factors=[],
+        suggested_fixes=[],
+        confidence_score=0.9,
+        reasoning="fake"
+    )
+
+class FakeLLMClient:
+    """LLM client stand-in that records every completion it serves"""
+
+    def __init__(self, drop_batch_results: bool = False):
+        self.single_calls = []
+        self.batch_calls = []
+        self.drop_batch_results = drop_batch_results
+        self._lock = threading.Lock()
+
+    def analyze_error(self, error_message, stack_trace=None, patterns=None, context=None):
+        with self._lock:
+            self.single_calls.append(error_message)
+        return _analysis(error_message)
+
+    def analyze_errors_batch(self, errors, batch_size=5):
+        with self._lock:
+            self.batch_calls.append([error["message"] for error in errors])
+        results = [_analysis(error["message"]) for error in errors]
+        return results[:-1] if self.drop_batch_results else results
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_completion():
+    """Test single-flight deduplication of identical in-flight errors"""
+    client = FakeLLMClient()
+    coalescer = ErrorAnalysisCoalescer(client)
+
+    results = await asyncio.gather(*(
+        coalescer.analyze_error("TypeError: boom", context={"line": 1})
+        for _ in range(10)
+    ))
+
+    assert all(result.primary_cause == "TypeError: boom" for result in results)
+    assert client.single_calls == ["TypeError: boom"]
+    assert client.batch_calls == []
+    assert coalescer.stats.deduplicated == 9
+
+@pytest.mark.asyncio
+async def test_errors_within_window_are_batched():
+    """Test distinct errors arriving together share a batch completion"""
+    client = FakeLLMClient()
+    coalescer = ErrorAnalysisCoalescer(client, CoalescerConfig(max_batch_size=3))
+
+    errors = [{"message": f"ValueError: {i}", "type": "ValueError"} for i in range(7)]
+    results = await coalescer.analyze_errors(errors)
+
+    assert [result.primary_cause for result in results] == [e["message"] for e in errors]
+    assert [len(batch) for batch in client.batch_calls] == [3, 3]
+    assert client.single_calls == ["ValueError: 6"]
+    assert coalescer.stats.completions == 3
+
+@pytest.mark.asyncio
+async def test_token_budget_splits_batches():
+    """Test batches respect the prompt token budget"""
+    client = FakeLLMClient()
+    coalescer = ErrorAnalysisCoalescer(
+        client, CoalescerConfig(max_batch_size=10, max_batch_tokens=40)
+    )
+
+    errors = [{"message": f"E{i}: " + "x" * 100} for i in range(4)]
+    await coalescer.analyze_errors(errors)
+
+    assert client.batch_calls == []
+    assert len(client.single_calls) == 4
+
+@pytest.mark.asyncio
+async def test_misaligned_batch_falls_back_to_individual_analysis():
+    """Test results are not guessed when the batch response is short"""
+    client = FakeLLMClient(drop_batch_results=True)
+    coalescer = ErrorAnalysisCoalescer(client)
+
+    errors = [{"message": f"KeyError: {i}"} for i in range(3)]
+    results = await coalescer.analyze_errors(errors)
+
+    assert [result.primary_cause for result in results] == [e["message"] for e in errors]
+    assert coalescer.stats.fallbacks == 1
+    assert len(client.single_calls) == 3
+
+@pytest.mark.asyncio
+async def test_failures_propagate_to_every_awaiter():
+    """Test a failed completion raises for all coalesced callers"""
+    client = FakeLLMClient()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("provider down")
+
+    client.analyze_error = fail
+    coalescer = ErrorAnalysisCoalescer(client)
+
+    results = await asyncio.gather(
+        coalescer.analyze_error("OSError: disk"),
+        coalescer.analyze_error("OSError: disk"),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert coalescer._inflight == {}
+
+def test_batch_prompt_keeps_stack_traces_and_patterns():
+    """Test coalesced errors are analyzed with the context single ones get"""
+    errors = [
+        {
+            "message": "KeyError: 'id'",
+            "stack_trace": ["File \"app.py\", line 3, in handler"],
+            "patterns": [{"type": "missing_key", "description": "dict lookup without default"}]
+        },
+        {"message": "ValueError: bad"}
+    ]
+    prompt = LLMClient()._create_batch_analysis_prompt(errors)
+
+    assert 'File "app.py", line 3, in handler' in prompt
+    assert "- missing_key: dict lookup without default" in prompt
+    assert prompt.count("Stack Trace:") == 1
@@ -6,7 +6,7 @@ import ast
 from datetime import datetime
 import shutil
 
-from src.tools.self_improvement.executor import ImprovementExecutor, ImprovementResult
+from src.tools.self_improvement.executor import ImprovementExecutor, ImprovementResult, SafeCodeModifier, CodeChange
 from src.tools.self_improvement.analyzer import ImprovementSuggestion
 
 @pytest.fixture
@@ -248,6 +248,34 @@ def test_backup_and_restore(executor, test_file):
         content = f.read()
     assert "# Test modification" not in content
 
+@pytest.mark.asyncio
+async def test_change_backups_restore_into_their_worktree(test_project_dir, tmp_path):
+    """Test concurrent change backups stay apart and restore where they were made"""
+    modifier = SafeCodeModifier(str(test_project_dir))
+    safety_manager = modifier.safety_manager
+    assert safety_manager.code_modifier is modifier
+    
+    worktrees = [tmp_path / "task0", tmp_path / "task1"]
+    for index, worktree in enumerate(worktrees):
+        (worktree / "current").mkdir(parents=True)
+        (worktree / "current" / "module.py").write_text(f"VALUE = {index}\n")
+    changes = [
+        CodeChange(file_path=str(worktree / "current" / "module.py"), original_content="", new_content="",
+                   line_numbers=[], description="change")
+        for worktree in worktrees
+    ]
+    
+    backups = [await safety_manager._create_backup([change]) for change in changes]
+    assert backups[0]["backup_path"] != backups[1]["backup_path"]
+    
+    for worktree in worktrees:
+        (worktree / "current" / "module.py").write_text("broken\n")
+    assert await modifier._restore_from_backup(backups[1]["backup_path"])
+    
+    assert (worktrees[1] / "current" / "module.py").read_text() == "VALUE = 1\n"
+    assert (worktrees[0] / "current" / "module.py").read_text() == "broken\n"
+    assert not (test_project_dir / "module.py").exists()
+
 def test_execute_improvements(executor, test_suggestions):
     """Test executing multiple improvements"""
     results = executor.execute_improvements(test_suggestions)
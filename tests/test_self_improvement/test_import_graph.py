@@ -0,0 +1,112 @@
+import os
+import pytest
+from pathlib import Path
+
+from src.tools.self_improvement.import_graph import ImportGraphIndex, module_name_for
+
+@pytest.fixture
+def project_dir(tmp_path):
+    """Create a small package with absolute and relative imports"""
+    project_dir = tmp_path / "project"
+    files = {
+        "app/__init__.py": "",
+        "app/models.py": "import json\n",
+        "app/services.py": "from .models import Model\nfrom . import utils\n",
+        "app/utils.py": "import os\n",
+        "app/api/__init__.py": "",
+        "app/api/routes.py": "from ..services import Service\nfrom app.models import Model\n",
+        "scripts/run.py": "import app.api.routes\n",
+    }
+    for relative, content in files.items():
+        path = project_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return project_dir
+
+def touch(path: Path, content: str):
+    """Rewrite a file and move its mtime forward"""
+    path.write_text(content)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+def test_module_names():
+    """Test module names follow package layout"""
+    assert module_name_for("app/api/routes.py") == "app.api.routes"
+    assert module_name_for("app/__init__.py") == "app"
+
+def test_dependencies_and_dependents(project_dir):
+    """Test forward and reverse edges resolve absolute and relative imports"""
+    index = ImportGraphIndex(str(project_dir))
+    index.refresh()
+
+    routes = str(project_dir / "app/api/routes.py")
+    services = str(project_dir / "app/services.py")
+    models = str(project_dir / "app/models.py")
+
+    assert index.dependencies(routes) == {services, models}
+    assert index.dependencies(services) == {models, str(project_dir / "app/utils.py")}
+    assert index.dependents(models) == {services, routes}
+    assert index.dependents(routes) == {str(project_dir / "scripts/run.py")}
+    assert index.find_module("models") == models
+
+def test_refresh_reparses_only_changed_files(project_dir):
+    """Test unchanged files are not re-parsed and edits update both edge directions"""
+    index = ImportGraphIndex(str(project_dir))
+    assert len(index.refresh()) == 7
+    assert index.refresh() == []
+
+    utils = project_dir / "app/utils.py"
+    touch(utils, "from app.models import Model\n")
+    assert index.refresh() == ["app/utils.py"]
+    assert str(utils) in index.dependents(str(project_dir / "app/models.py"))
+
+    # A newer mtime with identical content is not a change
+    touch(utils, "from app.models import Model\n")
+    assert index.refresh() == []
+
+def test_refresh_if_due_rescans_once_per_interval(project_dir, monkeypatch):
+    """Test the tree is not rescanned again until the refresh interval has passed"""
+    now = [1000.0]
+    monkeypatch.setattr("src.tools.self_improvement.import_graph.time.monotonic", lambda: now[0])
+    index = ImportGraphIndex(str(project_dir), refresh_interval=30.0)
+    assert len(index.refresh_if_due()) == 7
+
+    touch(project_dir / "app/utils.py", "from app.models import Model\n")
+    now[0] += 10
+    assert index.refresh_if_due() == []
+    now[0] += 30
+    assert index.refresh_if_due() == ["app/utils.py"]
+
+def test_added_and_removed_modules(project_dir):
+    """Test new modules resolve imports that previously pointed nowhere"""
+    index = ImportGraphIndex(str(project_dir))
+    index.refresh()
+
+    (project_dir / "app/cache.py").write_text("")
+    touch(project_dir / "app/utils.py", "from .cache import Cache\n")
+    index.refresh()
+    assert index.dependents(str(project_dir / "app/cache.py")) == {str(project_dir / "app/utils.py")}
+
+    (project_dir / "app/cache.py").unlink()
+    assert "app/cache.py" in index.refresh()
+    assert index.dependencies(str(project_dir / "app/utils.py")) == set()
+
+def test_index_persists_between_instances(project_dir):
+    """Test a new index starts from the saved state"""
+    ImportGraphIndex(str(project_dir)).refresh()
+
+    index = ImportGraphIndex(str(project_dir))
+    assert index.refresh() == []
+    assert index.dependents(str(project_dir / "app/services.py")) == {str(project_dir / "app/api/routes.py")}
+
+def test_parallel_parse_matches_serial(project_dir, monkeypatch):
+    """Test the process pool build produces the same graph"""
+    serial = ImportGraphIndex(str(project_dir), cache_path=str(project_dir / "serial.json"))
+    serial.refresh()
+
+    monkeypatch.setattr("src.tools.self_improvement.import_graph.PARALLEL_PARSE_THRESHOLD", 1)
+    parallel = ImportGraphIndex(str(project_dir), cache_path=str(project_dir / "parallel.json"), workers=2)
+    parallel.refresh()
+
+    assert parallel.dependencies_of == serial.dependencies_of
+    assert parallel.dependents_of == serial.dependents_of
@@ -0,0 +1,145 @@
+import sys
+import json
+import time
+import asyncio
+import pytest
+from pathlib import Path
+
+from src.tools.self_improvement.validation import ValidationPipeline
+
+FAKE_PYLINT = """
+import json, sys, time
+with open(sys.argv[1], "a") as log:
+    log.write(json.dumps(sys.argv[2:]) + "\\n")
+time.sleep(float(sys.argv[2]))
+paths = [arg for arg in sys.argv[3:] if not arg.startswith("--")]
+print(json.dumps([
+    {"path": path, "line": 1, "symbol": "undefined-variable", "message": "Undefined variable 'x'", "type": "error"}
+    for path in paths if "bad" in open(path).read()
+] + [
+    {"path": path, "line": 2, "symbol": "missing-docstring", "message": "Missing docstring", "type": "convention"}
+    for path in paths
+]))
+"""
+
+FAKE_MYPY = """
+import json, os, sys, time
+with open(sys.argv[1], "a") as log:
+    log.write(json.dumps(sys.argv[2:]) + "\\n")
+time.sleep(float(sys.argv[2]))
+paths = [arg for arg in sys.argv[3:] if not arg.startswith("--")]
+for path in paths:
+    if "untyped" in open(path).read():
+        print(f"{os.path.abspath(path)}:3: error: Function is missing a type annotation  [no-untyped-def]")
+sys.exit(1 if paths else 0)
+"""
+
+@pytest.fixture
+def project_dir(tmp_path):
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+    (project_dir / "fake_pylint.py").write_text(FAKE_PYLINT)
+    (project_dir / "fake_mypy.py").write_text(FAKE_MYPY)
+    return project_dir
+
+def make_pipeline(project_dir: Path, delay: float = 0.0, security_delay: float = 0.0) -> ValidationPipeline:
+    """Create a pipeline running fake pylint and mypy scripts"""
+    async def security_check(path, content):
+        await asyncio.sleep(security_delay)
+        return ["Use of eval"] if "eval(" in content else []
+
+    pipeline = ValidationPipeline(str(project_dir), security_check=security_check)
+    pipeline.pylint_command = [sys.executable, str(project_dir / "fake_pylint.py"), str(project_dir / "pylint.log"), str(delay)]
+    pipeline.mypy_command = [sys.executable, str(project_dir / "fake_mypy.py"), str(project_dir / "mypy.log"), str(delay)]
+    return pipeline
+
+def write_files(project_dir: Path, files):
+    for name, content in files.items():
+        (project_dir / name).write_text(content)
+    return files
+
+def tool_runs(project_dir: Path, tool: str):
+    log = project_dir / f"{tool}.log"
+    if not log.exists():
+        return []
+    return [[arg for arg in json.loads(line)[1:] if not arg.startswith("--")] for line in log.read_text().splitlines()]
+
+@pytest.mark.asyncio
+async def test_files_are_batched_into_one_run_per_tool(project_dir):
+    """Test every changed file goes to a single pylint and mypy invocation"""
+    files = write_files(project_dir, {
+        "a.py": "x = 1\n",
+        "b.py": "bad = 1\n",
+        "c.py": "def untyped(x):\n    return x\n",
+        "d.py": "eval('1')\n",
+    })
+    pipeline = make_pipeline(project_dir)
+
+    results = await pipeline.validate(files)
+
+    assert tool_runs(project_dir, "pylint") == [sorted(files)]
+    assert tool_runs(project_dir, "mypy") == [sorted(files)]
+    assert results["a.py"]["errors"] == []
+    assert results["a.py"]["warnings"] == ["2: [missing-docstring] Missing docstring"]
+    assert results["b.py"]["errors"] == ["1: [undefined-variable] Undefined variable 'x'"]
+    assert results["c.py"]["errors"] == ["3: Function is missing a type annotation  [no-untyped-def]"]
+    assert results["d.py"]["errors"] == ["Use of eval"]
+
+@pytest.mark.asyncio
+async def test_unchanged_files_are_served_from_cache(project_dir):
+    """Test only files whose content changed are checked again"""
+    files = write_files(project_dir, {"a.py": "x = 1\n", "b.py": "bad = 1\n"})
+    pipeline = make_pipeline(project_dir)
+    first = await pipeline.validate(files)
+
+    assert await pipeline.validate(files) == first
+    assert len(tool_runs(project_dir, "pylint")) == 1
+
+    files = write_files(project_dir, {"a.py": "x = 2\n", "b.py": "bad = 1\n"})
+    await pipeline.validate(files)
+    assert tool_runs(project_dir, "pylint")[-1] == ["a.py"]
+    assert tool_runs(project_dir, "mypy")[-1] == ["a.py"]
+
+    # A new pipeline starts from the saved cache
+    assert await make_pipeline(project_dir).validate(files) == await pipeline.validate(files)
+    assert len(tool_runs(project_dir, "pylint")) == 2
+
+@pytest.mark.asyncio
+async def test_validators_run_concurrently_with_stage_timings(project_dir):
+    """Test pylint, mypy and the security check overlap and are timed"""
+    files = write_files(project_dir, {"a.py": "x = 1\n", "b.py": "y = 2\n"})
+    pipeline = make_pipeline(project_dir, delay=0.5, security_delay=0.5)
+
+    started = time.perf_counter()
+    await pipeline.validate(files)
+    elapsed = time.perf_counter() - started
+
+    assert set(pipeline.timings) == {"syntax", "pylint", "mypy", "security", "total"}
+    assert min(pipeline.timings["pylint"], pipeline.timings["mypy"], pipeline.timings["security"]) >= 0.5
+    assert elapsed < pipeline.timings["pylint"] + pipeline.timings["mypy"] + pipeline.timings["security"]
+
+@pytest.mark.asyncio
+async def test_syntax_errors_skip_other_validators(project_dir):
+    """Test files that do not parse are not sent to the tools"""
+    files = write_files(project_dir, {"a.py": "x = 1\n", "broken.py": "def f(:\n"})
+    pipeline = make_pipeline(project_dir)
+
+    results = await pipeline.validate(files)
+
+    assert results["broken.py"]["errors"][0].startswith("Syntax error")
+    assert tool_runs(project_dir, "pylint") == [["a.py"]]
+
+@pytest.mark.asyncio
+async def test_tool_failures_are_not_cached(project_dir):
+    """Test a failing tool run is retried on the next validation"""
+    files = write_files(project_dir, {"a.py": "x = 1\n"})
+    pipeline = make_pipeline(project_dir)
+    pipeline.mypy_command = [sys.executable, "-c", "import sys; sys.exit(2)"]
+
+    await pipeline.validate(files)
+    assert pipeline.stats["tool_runs"] == 2
+
+    # pylint and security results are cached, mypy runs again
+    await pipeline.validate(files)
+    assert pipeline.stats["tool_runs"] == 3
+    assert pipeline.stats["cache_hits"] == 2
@@ -0,0 +1,163 @@
+import time
+import asyncio
+import subprocess
+import pytest
+from pathlib import Path
+
+from src.tools.self_improvement.backups import create_change_backup, restore_change_backup
+from src.tools.self_improvement.worktrees import WorktreeRunner, WorktreeTask, plan_waves
+
+def git(repo: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "current").mkdir(parents=True)
+    for i in range(4):
+        (repo / "current" / f"module{i}.py").write_text(f"VALUE = {i}\n")
+    git(repo, "init", "-q")
+    git(repo, "config", "user.email", "test@example.com")
+    git(repo, "config", "user.name", "Test")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "Initial commit")
+    return repo
+
+def task(name: str, *files: str) -> WorktreeTask:
+    return WorktreeTask(item=name, files=set(files), branch=f"improvement/test/{name}")
+
+def rewrite(path: str, content: str):
+    """Execute callback writing a file in the worktree and committing it"""
+    async def execute(task, worktree):
+        (worktree / path).write_text(content)
+        return task.item, f"Update {path}"
+    return execute
+
+def test_plan_waves_keeps_order_for_shared_files():
+    a = task("a", "x.py")
+    b = task("b", "y.py")
+    c = task("c", "x.py", "z.py")
+    d = task("d", "z.py")
+    unknown = WorktreeTask(item="unknown", files=None, branch="improvement/test/unknown")
+    e = task("e", "w.py")
+
+    waves = plan_waves([a, b, c, d, unknown, e])
+
+    assert [[t.item for t in wave] for wave in waves] == [["a", "b"], ["c"], ["d"], ["unknown"], ["e"]]
+    assert [len(wave) for wave in plan_waves([task(str(i), f"{i}.py") for i in range(5)], 2)] == [2, 2, 1]
+
+@pytest.mark.asyncio
+async def test_independent_tasks_run_in_parallel_and_merge_once(repo):
+    runner = WorktreeRunner(str(repo), max_parallel=4)
+    tasks = [task(f"t{i}", f"current/module{i}.py") for i in range(4)]
+
+    async def execute(task, worktree):
+        await asyncio.sleep(0.3)
+        index = task.item[1:]
+        (worktree / "current" / f"module{index}.py").write_text(f"VALUE = {index}0\n")
+        return task.item, f"Improve module{index}"
+
+    started = time.perf_counter()
+    outcomes = await runner.run(tasks, execute)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0
+    assert all(outcome.merged and not outcome.errors for outcome in outcomes)
+    assert [outcome.result for outcome in outcomes] == ["t0", "t1", "t2", "t3"]
+    for i in range(4):
+        assert (repo / "current" / f"module{i}.py").read_text() == f"VALUE = {i}0\n"
+    # One octopus merge with all four branches as parents
+    assert len(git(repo, "log", "-1", "--format=%P", "HEAD").split()) == 5
+    assert git(repo, "worktree", "list").count("\n") == 1
+
+@pytest.mark.asyncio
+async def test_tasks_sharing_a_file_apply_in_order(repo):
+    runner = WorktreeRunner(str(repo), max_parallel=4)
+
+    async def execute(task, worktree):
+        path = worktree / "current" / "module0.py"
+        path.write_text(path.read_text() + f"# {task.item}\n")
+        return task.item, f"Apply {task.item}"
+
+    outcomes = await runner.run([task("first", "current/module0.py"), task("second", "current/module0.py")], execute)
+
+    assert all(outcome.merged for outcome in outcomes)
+    assert (repo / "current" / "module0.py").read_text() == "VALUE = 0\n# first\n# second\n"
+
+@pytest.mark.asyncio
+async def test_discarded_and_failing_tasks_are_not_merged(repo):
+    runner = WorktreeRunner(str(repo), max_parallel=2)
+
+    async def execute(task, worktree):
+        (worktree / "current" / f"module{task.item[-1]}.py").write_text("broken(\n")
+        if task.item == "raises1":
+            raise ValueError("fix generation failed")
+        return task.item, None
+
+    outcomes = await runner.run([task("raises1", "current/module1.py"), task("discard2", "current/module2.py")], execute)
+
+    assert outcomes[0].errors == ["fix generation failed"] and not outcomes[0].merged
+    assert outcomes[1].result == "discard2" and outcomes[1].commit is None and not outcomes[1].merged
+    assert (repo / "current" / "module1.py").read_text() == "VALUE = 1\n"
+    assert (repo / "current" / "module2.py").read_text() == "VALUE = 2\n"
+
+@pytest.mark.asyncio
+async def test_conflicts_with_head_are_detected(repo):
+    runner = WorktreeRunner(str(repo), max_parallel=2)
+
+    async def execute(task, worktree):
+        if task.item == "conflicting":
+            # Someone commits to the same file on the main branch meanwhile
+            (repo / "current" / "module1.py").write_text("VALUE = 'main'\n")
+            git(repo, "commit", "-q", "-am", "Concurrent change")
+        return await rewrite(f"current/module{'1' if task.item == 'conflicting' else '2'}.py", "VALUE = None\n")(task, worktree)
+
+    outcomes = await runner.run([task("conflicting", "current/module1.py"), task("clean", "current/module2.py")], execute)
+
+    assert not outcomes[0].merged
+    assert outcomes[0].errors == ["Merge conflict with HEAD on current/module1.py"]
+    assert outcomes[1].merged
+    assert (repo / "current" / "module1.py").read_text() == "VALUE = 'main'\n"
+    assert (repo / "current" / "module2.py").read_text() == "VALUE = None\n"
+
+@pytest.mark.asyncio
+async def test_undeclared_overlap_is_detected(repo):
+    runner = WorktreeRunner(str(repo), max_parallel=2)
+    tasks = [task("a", "current/module1.py"), task("b", "current/module2.py")]
+
+    async def execute(task, worktree):
+        # Both tasks end up touching module3.py although neither declared it
+        (worktree / "current" / "module3.py").write_text(f"VALUE = '{task.item}'\n")
+        return task.item, f"Apply {task.item}"
+
+    outcomes = await runner.run(tasks, execute)
+
+    assert outcomes[0].merged
+    assert outcomes[1].errors == ["Merge conflict with improvement/test/a on current/module3.py"]
+    assert (repo / "current" / "module3.py").read_text() == "VALUE = 'a'\n"
+
+@pytest.mark.asyncio
+async def test_change_backups_restore_into_their_worktree(repo, tmp_path):
+    runner = WorktreeRunner(str(repo), max_parallel=2)
+    tasks = [task(f"t{i}", f"current/module{i}.py") for i in range(2)]
+    backup_root = repo / "backups"
+
+    async def execute(task, worktree):
+        module = worktree / "current" / f"module{task.item[1:]}.py"
+        backup_path, backed_up = create_change_backup(backup_root, [str(module)])
+        assert backed_up == [str(module.resolve())]
+        module.write_text("broken\n")
+        # Let the other task back up and break its file in between
+        await asyncio.sleep(0.2)
+        assert restore_change_backup(backup_path)
+        return (backup_path, module.read_text()), None
+
+    outcomes = await runner.run(tasks, execute)
+
+    assert [outcome.errors for outcome in outcomes] == [[], []]
+    backups = [outcome.result[0] for outcome in outcomes]
+    assert len(set(backups)) == 2
+    assert [outcome.result[1] for outcome in outcomes] == ["VALUE = 0\n", "VALUE = 1\n"]
+    # Nothing was restored into the main working tree
+    assert [(repo / "current" / f"module{i}.py").read_text() for i in range(2)] == ["VALUE = 0\n", "VALUE = 1\n"]
+    assert not restore_change_backup(str(tmp_path))
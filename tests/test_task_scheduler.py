@@ -0,0 +1,180 @@
+import pytest
+from datetime import datetime
+from src.core.distributed.executor import TaskInfo
+from src.core.distributed.scheduler import TaskScheduler
+
+def make_task(task_id: str, priority: int = 1, capabilities=None, memory: int = 512) -> TaskInfo:
+    """Create a pending task"""
+    return TaskInfo(
+        task_id=task_id,
+        script_id=f"script_{task_id}",
+        node_id=None,
+        status="pending",
+        priority=priority,
+        created_at=datetime.now(),
+        started_at=None,
+        completed_at=None,
+        result=None,
+        error=None,
+        requirements={"capabilities": capabilities or ["python"], "memory": memory}
+    )
+
+@pytest.fixture
+def scheduler():
+    """Create a scheduler with two python nodes, one with a GPU"""
+    scheduler = TaskScheduler()
+    scheduler.update_node("cpu", ["python"], max_load=2, load=0.0, available_memory=4096)
+    scheduler.update_node("gpu", ["python", "gpu"], max_load=2, load=0.5, available_memory=4096)
+    return scheduler
+
+def test_places_on_least_loaded_node(scheduler):
+    """Test tasks go to the node with the lowest load"""
+    assignments = scheduler.schedule([make_task("t1")])
+    assert [(task.task_id, node) for task, node in assignments] == [("t1", "cpu")]
+
+def test_batch_spreads_load(scheduler):
+    """Test a batch is spread as assignments raise node load"""
+    assignments = scheduler.schedule([make_task(f"t{i}") for i in range(4)])
+    nodes = [node for _, node in assignments]
+    assert sorted(nodes) == ["cpu", "cpu", "gpu", "gpu"]
+
+def test_capability_matching(scheduler):
+    """Test tasks only go to nodes with the required capabilities"""
+    assignments = scheduler.schedule([make_task("t1", capabilities=["python", "gpu"])])
+    assert assignments[0][1] == "gpu"
+
+def test_unplaceable_tasks_wait_for_capacity(scheduler):
+    """Test tasks park until capacity frees instead of being retried"""
+    tasks = [make_task(f"t{i}", capabilities=["python", "gpu"]) for i in range(3)]
+    assignments = scheduler.schedule(tasks)
+    assert len(assignments) == 2
+    assert scheduler.waiting_count() == 1
+
+    # Nothing changes until capacity frees
+    assert scheduler.schedule() == []
+
+    scheduler.release("gpu", assignments[0][0])
+    assignments = scheduler.schedule()
+    assert [(task.task_id, node) for task, node in assignments] == [("t2", "gpu")]
+    assert scheduler.waiting_count() == 0
+
+def test_priority_order_within_wait_queue(scheduler):
+    """Test higher priority tasks are placed first"""
+    scheduler.update_node("cpu", ["python"], max_load=1, load=0.0, available_memory=4096)
+    scheduler.update_node("gpu", ["python", "gpu"], max_load=0, load=0.0, available_memory=4096)
+
+    tasks = [make_task("low", priority=1), make_task("high", priority=5)]
+    assignments = scheduler.schedule(tasks)
+    assert [task.task_id for task, _ in assignments] == ["high"]
+
+def test_memory_requirements(scheduler):
+    """Test nodes without enough memory are skipped"""
+    scheduler.update_node("cpu", ["python"], max_load=2, load=0.0, available_memory=256)
+    assignments = scheduler.schedule([make_task("t1", memory=1024)])
+    assert assignments[0][1] == "gpu"
+
+def test_unhealthy_and_removed_nodes_are_skipped(scheduler):
+    """Test unhealthy or removed nodes receive no tasks"""
+    scheduler.update_node("cpu", ["python"], max_load=2, load=0.0, available_memory=4096, healthy=False)
+    scheduler.remove_node("gpu")
+    assert scheduler.schedule([make_task("t1")]) == []
+
+    scheduler.update_node("cpu", ["python"], max_load=2, load=0.0, available_memory=4096)
+    assert scheduler.schedule()[0][1] == "cpu"
+
+def test_new_nodes_join_existing_pools(scheduler):
+    """Test nodes registered after a pool exists are used by it"""
+    scheduler.schedule([make_task(f"t{i}", capabilities=["docker"]) for i in range(2)])
+    assert scheduler.waiting_count() == 2
+
+    scheduler.update_node("docker", ["python", "docker"], max_load=5, load=0.0, available_memory=4096)
+    assignments = scheduler.schedule()
+    assert {node for _, node in assignments} == {"docker"}
+    assert len(assignments) == 2
+
+def test_prefers_node_caching_the_script(scheduler):
+    """Test tasks go to a node caching their script when its load is close"""
+    scheduler.update_node("gpu", ["python", "gpu"], max_load=2, load=0.5, available_memory=4096,
+                          digests=["script_t1"])
+    assignments = scheduler.schedule([make_task("t1")])
+    assert assignments[0][1] == "gpu"
+
+def test_locality_yields_to_much_lower_load():
+    """Test locality is ignored when the caching node is far busier"""
+    scheduler = TaskScheduler(locality_slack=1.0)
+    scheduler.update_node("idle", ["python"], max_load=10, load=0.0, available_memory=4096)
+    scheduler.update_node("busy", ["python"], max_load=10, load=5.0, available_memory=4096,
+                          digests=["script_t1"])
+    assert scheduler.schedule([make_task("t1")])[0][1] == "idle"
+
+    # Clearing the advertised digests removes the node from the locality index
+    scheduler.update_node("busy", ["python"], max_load=10, load=0.0, available_memory=4096, digests=[])
+    assert scheduler._holders == {}
+
+def test_artifact_digests_count_towards_locality(scheduler):
+    """Test artifacts a task reads attract it like its script"""
+    task = make_task("t1")
+    task.requirements["artifacts"] = ["dataset"]
+    scheduler.update_node("gpu", ["python", "gpu"], max_load=2, load=0.5, available_memory=4096,
+                          digests=["dataset"])
+    assert scheduler.schedule([task])[0][1] == "gpu"
+
+def test_reserve_places_stolen_task(scheduler):
+    """Test a task can be placed on a chosen node only if it fits"""
+    assert scheduler.reserve("gpu", make_task("t1", capabilities=["python", "gpu"]))
+    assert scheduler.nodes["gpu"].assigned == 1
+    assert not scheduler.reserve("cpu", make_task("t2", capabilities=["python", "gpu"]))
+    assert not scheduler.reserve("cpu", make_task("t3", memory=8192))
+
+def test_reports_replace_assignments_they_include(scheduler):
+    """Test a report counts assigned tasks once, in load and in memory"""
+    task = make_task("t1", memory=1024)
+    assert scheduler.schedule([task])[0][1] == "cpu"
+    cpu = scheduler.nodes["cpu"]
+    assert (cpu.effective_load, cpu.available_memory) == (1.0, 3072)
+
+    # The node's report already includes the task
+    scheduler.update_node("cpu", ["python"], max_load=2, load=1.0, available_memory=3000)
+    assert (cpu.effective_load, cpu.available_memory) == (1.0, 3000)
+
+    # A reported task frees its capacity through the next report, not on release
+    scheduler.release("cpu", task)
+    assert (cpu.effective_load, cpu.available_memory) == (1.0, 3000)
+
+    # Tasks assigned since the report are added on top until released
+    late = make_task("late", memory=1024)
+    assert scheduler.reserve("cpu", late)
+    assert (cpu.effective_load, cpu.available_memory) == (2.0, 1976)
+    assert not cpu.has_capacity()
+    scheduler.release("cpu", late)
+    assert (cpu.effective_load, cpu.available_memory) == (1.0, 3000)
+
+def test_oversized_task_does_not_block_smaller_ones():
+    """Test a task no node can fit is passed over for tasks that fit"""
+    scheduler = TaskScheduler()
+    scheduler.update_node("small", ["python"], max_load=4, load=0.0, available_memory=1000)
+    tasks = [make_task("big", priority=5, memory=4096), make_task("a", memory=100), make_task("b", memory=100)]
+    assignments = scheduler.schedule(tasks)
+    assert sorted(task.task_id for task, _ in assignments) == ["a", "b"]
+    assert scheduler.waiting_count() == 1
+
+    scheduler.update_node("large", ["python"], max_load=4, load=0.0, available_memory=8192)
+    assert [(task.task_id, node) for task, node in scheduler.schedule()] == [("big", "large")]
+
+def test_changed_features_move_a_node_between_pools(scheduler):
+    """Test a node's refreshed features decide which pools it serves"""
+    scheduler.update_node("cpu", ["python", "docker"], max_load=2, load=0.0, available_memory=4096)
+    assert scheduler.schedule([make_task("t1", capabilities=["docker"])])[0][1] == "cpu"
+
+    scheduler.update_node("cpu", ["python"], max_load=2, load=0.0, available_memory=4096)
+    assert scheduler.schedule([make_task("t2", capabilities=["docker"])]) == []
+    assert scheduler.schedule([make_task("t3")])[0][1] == "cpu"
+
+def test_narrow_pools_are_placed_first():
+    """Test tasks only a few nodes can run get those nodes before broader tasks"""
+    scheduler = TaskScheduler()
+    scheduler.update_node("cpu", ["python"], max_load=2, load=1.0, available_memory=4096)
+    scheduler.update_node("gpu", ["python", "gpu"], max_load=1, load=0.0, available_memory=4096)
+    tasks = [make_task("any", priority=5), make_task("needs_gpu", capabilities=["python", "gpu"])]
+    assignments = scheduler.schedule(tasks)
+    assert sorted((task.task_id, node) for task, node in assignments) == [("any", "cpu"), ("needs_gpu", "gpu")]
@@ -0,0 +1,129 @@
+import pytest
+from datetime import datetime
+from aiohttp.test_utils import TestClient, TestServer
+from src.core.distributed.coordinator import Coordinator, NodeState
+from src.core.distributed.executor import NodeInfo, TaskInfo
+from src.core.distributed.worker import WorkerNode
+
+class FakeNodeClient:
+    """Peer client stand-in that releases the first requested tasks"""
+
+    def __init__(self):
+        self.requests = []
+
+    async def post(self, host, port, path, payload):
+        self.requests.append((port, path, payload))
+        if path == "/tasks/release":
+            return {"status": "success", "released": payload["task_ids"][:payload["max_tasks"]]}
+        return {
+            "status": "success",
+            "results": [{"task_id": task["task_id"], "status": "success"} for task in payload["tasks"]]
+        }
+
+def make_task(task_id: str, script_id: str = None) -> TaskInfo:
+    """Create a pending task"""
+    return TaskInfo(
+        task_id=task_id,
+        script_id=script_id or f"script_{task_id}",
+        node_id=None,
+        status="pending",
+        priority=1,
+        created_at=datetime.now(),
+        started_at=None,
+        completed_at=None,
+        result=None,
+        error=None,
+        requirements={"capabilities": ["python"], "memory": 512}
+    )
+
+def add_node(coordinator: Coordinator, node_id: str, port: int, queued: int = 0, cached=()):
+    """Register a node directly with the coordinator"""
+    coordinator.nodes[node_id] = NodeState(
+        info=NodeInfo(
+            id=node_id,
+            host="localhost",
+            port=port,
+            capabilities={"max_load": 20, "memory": 16384, "features": ["python"]},
+            load=0.0,
+            available_memory=16384,
+            status="running",
+            last_heartbeat=datetime.now(),
+            queued=queued,
+            cached_digests=list(cached)
+        ),
+        tasks=set(),
+        last_heartbeat=datetime.now(),
+        health_status="healthy"
+    )
+    coordinator._sync_scheduler_node(node_id)
+
+def assign(coordinator: Coordinator, node_id: str, tasks):
+    """Record tasks as assigned to a node"""
+    for task in tasks:
+        coordinator.tasks[task.task_id] = task
+        assert coordinator.scheduler.reserve(node_id, task)
+        task.node_id = node_id
+        coordinator.nodes[node_id].tasks.add(task.task_id)
+
+@pytest.mark.asyncio
+async def test_idle_node_steals_half_of_busiest_queue():
+    """Test stolen tasks move from the busiest peer to the idle node"""
+    coordinator = Coordinator()
+    coordinator.client = FakeNodeClient()
+    add_node(coordinator, "busy", 9001, queued=6)
+    add_node(coordinator, "idle", 9002)
+    assign(coordinator, "busy", [make_task(f"t{i}") for i in range(6)])
+
+    stolen = await coordinator._steal_tasks("idle", max_tasks=10)
+
+    assert len(stolen) == 3
+    assert all(task.node_id == "idle" for task in stolen)
+    assert len(coordinator.nodes["busy"].tasks) == 3
+    assert coordinator.nodes["idle"].tasks == {task.task_id for task in stolen}
+    assert coordinator.scheduler.nodes["busy"].assigned == 3
+    assert coordinator.scheduler.nodes["idle"].assigned == 3
+
+    paths = [(port, path) for port, path, _ in coordinator.client.requests]
+    assert paths == [(9001, "/tasks/release"), (9002, "/tasks/assign_batch")]
+
+@pytest.mark.asyncio
+async def test_short_backlogs_only_give_up_cached_scripts():
+    """Test tasks the thief would have to fetch stay on lightly queued peers"""
+    coordinator = Coordinator()
+    coordinator.client = FakeNodeClient()
+    add_node(coordinator, "busy", 9001, queued=2)
+    add_node(coordinator, "idle", 9002, cached=["shared"])
+    assign(coordinator, "busy", [make_task("cold"), make_task("warm", script_id="shared")])
+
+    stolen = await coordinator._steal_tasks("idle", max_tasks=2)
+
+    assert [task.task_id for task in stolen] == ["warm"]
+
+@pytest.mark.asyncio
+async def test_nothing_stolen_without_backlog():
+    """Test no requests are made when no peer has queued tasks"""
+    coordinator = Coordinator()
+    coordinator.client = FakeNodeClient()
+    add_node(coordinator, "busy", 9001, queued=0)
+    add_node(coordinator, "idle", 9002)
+    assign(coordinator, "busy", [make_task("t1")])
+
+    assert await coordinator._steal_tasks("idle", max_tasks=4) == []
+    assert coordinator.client.requests == []
+
+@pytest.mark.asyncio
+async def test_worker_releases_only_unstarted_tasks():
+    """Test a worker gives up queued tasks but keeps running ones"""
+    worker = WorkerNode(capabilities={"max_load": 1, "memory": 4096, "features": ["python"]})
+    worker._accept_task({"task_id": "queued", "script_id": "s1"})
+    worker._accept_task({"task_id": "running", "script_id": "s2"})
+    worker.current_tasks["running"].status = "running"
+
+    async with TestClient(TestServer(worker.app)) as client:
+        response = await client.post("/tasks/release", json={"task_ids": ["running", "queued"], "max_tasks": 2})
+        assert response.status == 200
+        data = await response.json()
+
+    assert data["released"] == ["queued"]
+    assert set(worker.current_tasks) == {"running"}
+    assert worker._heartbeat_payload()["queued"] == 0
@@ -0,0 +1,266 @@
+import pytest
+import asyncio
+import json
+import threading
+import time
+from typing import Dict, Any, Optional, List, Iterator
+
+from src.core.providers.config import ProviderConfig, Capability
+from src.core.providers.adapters.base import BaseProviderAdapter
+from src.core.providers.router import ModelRouter
+from src.core.providers.streaming import iterate_in_thread
+from src.core.api import websocket_server as websocket_server_module
+from src.core.api.websocket_server import WebSocketServer, get_websocket_server
+
+class FakeStreamingAdapter(BaseProviderAdapter):
+    """Local provider that streams a fixed list of tokens from a blocking iterator"""
+
+    def __init__(self, config: ProviderConfig, tokens: List[str], delay: float = 0.0, fail: bool = False):
+        self.tokens = tokens
+        self.delay = delay
+        self.fail = fail
+        self.produced = 0
+        super().__init__(config)
+        self.name = "fake"
+
+    def _initialize(self) -> None:
+        pass
+
+    async def generate_code_completion(self, prompt, context=None, max_tokens=100,
+                                       temperature=0.7, top_p=0.95, stop_sequences=None) -> str:
+        return "".join(self.tokens)
+
+    async def generate_plan(self, task, context=None, max_tokens=500,
+                            temperature=0.7, top_p=0.95) -> str:
+        return "".join(self.tokens)
+
+    async def stream_code_completion(self, prompt, context=None, max_tokens=100,
+                                     temperature=0.7, top_p=0.95, stop_sequences=None):
+        async for chunk in self._stream_text(prompt):
+            yield chunk
+
+    def _stream_text_impl(self, prompt: str, **kwargs) -> Iterator[str]:
+        if self.fail:
+            raise ConnectionError("provider unavailable")
+        for token in self.tokens:
+            if self.delay:
+                time.sleep(self.delay)
+            self.produced += 1
+            yield token
+
+    def _generate_text_impl(self, prompt: str, **kwargs) -> str:
+        return "".join(self.tokens)
+
+    def _generate_code_impl(self, spec: str, **kwargs) -> str:
+        return "".join(self.tokens)
+
+    def _analyze_image_impl(self, image_data: bytes, prompt: str, **kwargs) -> str:
+        return ""
+
+    def _create_plan_impl(self, goal: str, **kwargs) -> Dict[str, Any]:
+        return {}
+
+class FakeRegistry:
+    """Registry stand-in returning fixed adapters in priority order"""
+
+    def __init__(self, adapters: Dict[str, BaseProviderAdapter]):
+        self.adapters = adapters
+
+    def get_providers_for_capability(self, capability):
+        return [(name, 1.0) for name in self.adapters]
+
+    def get_adapter(self, name):
+        return self.adapters.get(name)
+
+class MockWebSocket:
+    """WebSocket stand-in that records frames, optionally sending slowly"""
+
+    def __init__(self, send_delay: float = 0.0):
+        self.sent_messages = []
+        self.send_delay = send_delay
+
+    async def send_json(self, data):
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        self.sent_messages.append(data)
+
+def make_config() -> ProviderConfig:
+    return ProviderConfig(
+        model_path="fake-model",
+        capabilities={Capability.CODE_COMPLETION: 0.9, Capability.PLANNING: 0.9}
+    )
+
+@pytest.mark.asyncio
+async def test_default_stream_yields_complete_completion():
+    """Test providers without native streaming yield a single chunk"""
+    adapter = FakeStreamingAdapter(make_config(), ["def ", "foo", "():"])
+
+    chunks = [chunk async for chunk in adapter.stream_plan("task")]
+
+    assert chunks == ["def foo():"]
+
+@pytest.mark.asyncio
+async def test_native_stream_yields_tokens_in_order():
+    """Test blocking provider streams are delivered token by token"""
+    tokens = [f"t{i} " for i in range(50)]
+    adapter = FakeStreamingAdapter(make_config(), tokens)
+
+    chunks = [chunk async for chunk in adapter.stream_code_completion("prompt")]
+
+    assert chunks == tokens
+
+@pytest.mark.asyncio
+async def test_thread_stream_applies_backpressure_and_stops_on_close():
+    """Test a consumer that stops reading stalls and then stops the producer"""
+    produced = []
+    finished = threading.Event()
+
+    def produce():
+        try:
+            for i in range(1000):
+                produced.append(i)
+                yield str(i)
+        finally:
+            finished.set()
+
+    stream = iterate_in_thread(produce, max_buffered=4)
+    assert await stream.__anext__() == "0"
+    await asyncio.sleep(0.1)
+
+    # Only the buffer's worth of chunks may be read ahead of the consumer
+    assert len(produced) <= 6
+
+    await stream.aclose()
+    await asyncio.get_running_loop().run_in_executor(None, finished.wait, 2)
+    assert finished.is_set()
+    assert len(produced) < 1000
+
+@pytest.mark.asyncio
+async def test_thread_streams_run_on_their_own_executor():
+    """Test producers do not take threads from the default executor"""
+    threads = []
+
+    def produce():
+        threads.append(threading.current_thread().name)
+        yield "a"
+
+    assert [chunk async for chunk in iterate_in_thread(produce)] == ["a"]
+    assert threads[0].startswith("stream-producer")
+
+@pytest.mark.asyncio
+async def test_router_falls_back_and_records_metrics():
+    """Test the router skips providers that fail before their first token"""
+    failing = FakeStreamingAdapter(make_config(), ["x"], fail=True)
+    working = FakeStreamingAdapter(make_config(), ["a", "b", "c"], delay=0.01)
+    router = ModelRouter(FakeRegistry({"broken": failing, "local": working}))
+
+    chunks = [chunk async for chunk in router.stream_code_completion("prompt")]
+
+    assert chunks == ["a", "b", "c"]
+    metrics = router.get_stream_metrics()
+    assert metrics["broken"]["failures"] == 1
+    assert metrics["local"]["streams"] == 1
+    assert metrics["local"]["tokens"] == 3
+    assert metrics["local"]["last_time_to_first_token"] > 0
+    assert metrics["local"]["tokens_per_second"] > 0
+
+@pytest.mark.asyncio
+async def test_router_raises_when_all_providers_fail():
+    """Test an error is raised when no provider can stream"""
+    failing = FakeStreamingAdapter(make_config(), ["x"], fail=True)
+    router = ModelRouter(FakeRegistry({"broken": failing}))
+
+    with pytest.raises(RuntimeError):
+        async for _ in router.stream_code_completion("prompt"):
+            pass
+
+@pytest.mark.asyncio
+async def test_websocket_forwards_stream_and_coalesces_frames():
+    """Test chunks reach the client in order and slow sends coalesce frames"""
+    tokens = [f"t{i} " for i in range(40)]
+    adapter = FakeStreamingAdapter(make_config(), tokens)
+    router = ModelRouter(FakeRegistry({"local": adapter}))
+    server = WebSocketServer(model_router=router)
+    websocket = MockWebSocket(send_delay=0.01)
+    server.connection_manager.active_connections["user"] = websocket
+
+    frames = await server.forward_stream("user", "s1", router.stream_code_completion("prompt"))
+
+    messages = websocket.sent_messages
+    assert messages[0]["type"] == "stream.start"
+    assert messages[-1]["type"] == "stream.end"
+    text = "".join(m["data"]["text"] for m in messages if m["type"] == "stream.chunk")
+    assert text == "".join(tokens)
+    assert 0 < frames < len(tokens)
+
+@pytest.mark.asyncio
+async def test_websocket_stream_cancellation():
+    """Test a stream can be cancelled by ID"""
+    adapter = FakeStreamingAdapter(make_config(), ["x"] * 500, delay=0.01)
+    router = ModelRouter(FakeRegistry({"local": adapter}))
+    server = WebSocketServer(model_router=router)
+    server.connection_manager.active_connections["user"] = MockWebSocket()
+
+    task = asyncio.create_task(
+        server.forward_stream("user", "s1", router.stream_code_completion("prompt"))
+    )
+    server.active_streams["user"] = {"s1": task}
+    await asyncio.sleep(0.05)
+    server.cancel_streams("user", "s1")
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0.05)
+    assert adapter.produced < 500
+
+@pytest.mark.asyncio
+async def test_shared_websocket_server_streams_through_the_model_router(monkeypatch):
+    """Test the server from get_websocket_server is created with a router"""
+    router = ModelRouter(FakeRegistry({"local": FakeStreamingAdapter(make_config(), ["a", "b", "c"])}))
+    monkeypatch.setattr(websocket_server_module, "websocket_server", None)
+    monkeypatch.setattr(websocket_server_module, "_default_model_router", lambda: router)
+    server = get_websocket_server()
+    assert get_websocket_server() is server
+    assert server.model_router is router
+    websocket = MockWebSocket()
+    server.connection_manager.active_connections["user"] = websocket
+
+    request = {"type": "stream.request", "data": {"stream_id": "s1", "prompt": "prompt"}}
+    await server.handle_message("user", json.dumps(request))
+    await server.active_streams["user"]["s1"]
+
+    types = [m["type"] for m in websocket.sent_messages]
+    assert types[0] == "stream.start" and types[-1] == "stream.end"
+    assert "".join(m["data"]["text"] for m in websocket.sent_messages if m["type"] == "stream.chunk") == "abc"
+
+    replacement = ModelRouter(FakeRegistry({}))
+    assert get_websocket_server(model_router=replacement).model_router is replacement
+
+@pytest.mark.asyncio
+async def test_stream_requests_only_pass_known_options():
+    """Test unknown options are refused and max_tokens is capped"""
+    received = []
+
+    class RecordingAdapter(FakeStreamingAdapter):
+        async def stream_code_completion(self, prompt, context=None, max_tokens=100,
+                                         temperature=0.7, top_p=0.95, stop_sequences=None):
+            received.append((max_tokens, temperature))
+            yield "done"
+
+    router = ModelRouter(FakeRegistry({"local": RecordingAdapter(make_config(), [])}))
+    server = WebSocketServer(model_router=router)
+    websocket = MockWebSocket()
+    server.connection_manager.active_connections["user"] = websocket
+
+    options = {"max_tokens": 10 ** 9, "temperature": 0.1}
+    await server.handle_message("user", json.dumps({"type": "stream.request", "data": {"stream_id": "s1", "prompt": "p", "options": options}}))
+    await server.active_streams["user"]["s1"]
+    assert received == [(websocket_server_module.MAX_STREAM_TOKENS, 0.1)]
+
+    for stream_id, options in [("s2", {"api_key": "x"}), ("s3", {"max_tokens": -1}), ("s4", {"stop_sequences": ["x"]})]:
+        kind = "plan" if stream_id == "s4" else "code_completion"
+        request = {"type": "stream.request", "data": {"stream_id": stream_id, "kind": kind, "prompt": "p", "options": options}}
+        await server.handle_message("user", json.dumps(request))
+    errors = [m["data"]["stream_id"] for m in websocket.sent_messages if m["type"] == "stream.error"]
+    assert errors == ["s2", "s3", "s4"]
+    assert len(received) == 1